@@ -1,8 +1,29 @@
 #!/usr/bin/env python
 
+import concurrent.futures
+import contextlib
+import hashlib
+import importlib.util
+import io
+import marshal
 import os
-import subprocess
 import sys
+import types
+import uuid
+
+CACHE_DIR = ".cache"
+
+JOBS = 1
+
+RLMETA_MODULES = {}
+
+COMMAND_ARITY = {
+    "--support": 0,
+    "--copy": 1,
+    "--embed": 2,
+    "--compile": 1,
+    "--backend": 1,
+}
 
 def make_next_version():
     final_compiler = meta_compile_rlmeta()
@@ -25,12 +46,14 @@ def meta_compile_rlmeta():
 
 def compile_rlmeta(rlmeta):
     log("Compiling rlmeta using {}".format(rlmeta))
-    return run_rlmeta(rlmeta, [
+    return run_rlmeta_cached(rlmeta, [
         "--embed", "SUPPORT", "src/support.py",
         "--support",
         "--compile", "src/parser.rlmeta",
         "--compile", "src/codegenerator.rlmeta",
         "--compile", "src/assembler.rlmeta",
+        "--compile", "src/functiongenerator.rlmeta",
+        "--copy", "src/optimizer.py",
         "--copy", "src/main.py",
     ])
 
@@ -39,38 +62,344 @@ def test(rlmeta):
     assert run_rlmeta(rlmeta, ["--support"]) == read("src/support.py")
     log("Test: Disallow semantic action in the middle")
     run_rlmeta(rlmeta, [], b"Grammar { x = . -> [] . }", expect_failure=True)
-    log("Test: Call unknown rule foo")
-    assert test_grammar(
-        rlmeta,
-        b"Grammar { x = % | . }",
-        b"print(compile_chain([(Grammar, 'x')], ['foo']))"
-    ) == b"foo\n"
-
-def test_grammar(rlmeta, grammar, main_code):
-    compiled = run_rlmeta(rlmeta, ["--support", "--compile", "-"], grammar)
-    total = compiled + main_code
-    process = subprocess.Popen(
-        ["python"],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE
-    )
-    stdout, _ = process.communicate(total)
-    return stdout
+    log("Test: Backtrack report locates the compiler's own rules")
+    report_path = os.path.join(CACHE_DIR, "backtracks")
+    run_rlmeta(rlmeta, ["--profile-backtracks", report_path, "--compile", "-"], b"Parser { x = 'a' | 'b' }")
+    rules = [line.split()[:2] for line in read(report_path).splitlines()[1:]]
+    os.remove(report_path)
+    assert any(rule.startswith(b"Parser.") for location, rule in rules)
+    for location, rule in rules:
+        assert location.startswith(b"src/parser.rlmeta:") == rule.startswith(b"Parser.")
+    grammar_tests = [
+        (
+            "Call unknown rule foo",
+            b"Grammar { x = % | . }",
+            b"print(compile_chain([(Grammar, 'x')], ['foo']))",
+            [],
+            b"foo\n",
+        ),
+        (
+            "Call unknown rule foo (pyfunc backend)",
+            b"Grammar { x = % | . }",
+            b"print(compile_chain([(Grammar, 'x')], ['foo']))",
+            ["--backend", "pyfunc"],
+            b"foo\n",
+        ),
+    ] + [
+        (
+            "Memoization annotations ({} backend)".format(backend),
+            b"Grammar { @memo x = y 'a' | y  @nomemo y = . }",
+            b"print(compile_chain([(Grammar, 'x')], ['foo']))\n" + memoized,
+            ["--backend", backend, "--no-inline"],
+            b"foo\nTrue False\n",
+        )
+        for backend, memoized in [
+            ("vm", b"print(Grammar.rules['x'][1], Grammar.rules['y'][1])\n"),
+            ("pyfunc", b"print(*['memo' in Grammar.rules[x].__code__.co_names for x in 'xy'])\n"),
+        ]
+    ] + [
+        (
+            "Memo eviction and memo_limit",
+            b"Grammar { x = y*:xs !. -> xs  @memo y = z:a '+' z:b -> [a b] | z  @memo z = 'a'-'z' }",
+            b"source = 'a+bc+de' * 50\n"
+            b"expected = Grammar().run('x', source)\n"
+            b"MEMO_EVICT_SIZE = 8\n"
+            b"swept = Grammar().run('x', source)\n"
+            b"Grammar.memo_limit = 4\n"
+            b"capped = Grammar().run('x', source)\n"
+            b"print(len(expected), swept == expected, capped == expected)\n",
+            [],
+            b"150 True True\n",
+        ),
+    ] + [
+        (
+            "Memoization inside lists",
+            b"Grammar { x = [y:a 'b'] -> a | [y:a 'c'] -> a  @memo y = . }",
+            b"profile = Profile()\n"
+            b"print(Grammar().run('x', [['q', 'c']], profile=profile))\n"
+            b"print(profile.rules['Grammar.y']['memo_misses'], profile.rules['Grammar.y']['memo_hits'])\n",
+            [],
+            b"q\n1 1\n",
+        ),
+    ] + [
+        (
+            "Cut operator ({} backend)".format(backend),
+            b"Grammar { x = y*:xs !. -> xs | .* -> [] "
+            b"y = 'a' ^ 'b' -> \"ab\" | 'a' -> \"a\" | 'c' }",
+            b"print(compile_chain([(Grammar, 'x')], 'abc'))\n"
+            b"print(compile_chain([(Grammar, 'x')], 'aac'))",
+            ["--backend", backend],
+            b"['ab', 'c']\n[]\n",
+        )
+        for backend in ["vm", "pyfunc"]
+    ] + [
+        (
+            "Failed string match keeps the action ({} backend)".format(backend),
+            b"Grammar { r0 = 'xy' | !'a' }",
+            b"print(Grammar().run('r0', 'x'))\n",
+            ["--backend", backend],
+            b"None\n",
+        )
+        for backend in ["vm", "pyfunc"]
+    ] + [
+        (
+            "Fused match error messages ({} backend)".format(backend),
+            b"Grammar { x = 'ab'  y = 'a' | 'b'  z = 'a'-'c' | 'e'-'f' }",
+            b"for rule, source in [('x', 'ax'), ('y', 'z'), ('z', 'z')]:\n"
+            b"    try:\n"
+            b"        Grammar().run(rule, source)\n"
+            b"    except MatchError as e:\n"
+            b"        print(e.message)\n",
+            ["--backend", backend],
+            b"expected b\nexpected b\nexpected range 'e'-'f'\n",
+        )
+        for backend in ["vm", "pyfunc"]
+    ] + [
+        (
+            "Negation failure position ({} backend)".format(backend),
+            b"Grammar { x = !('a' 'b') . }",
+            b"try:\n"
+            b"    Grammar().run('x', 'ab')\n"
+            b"except MatchError as e:\n"
+            b"    print(e.message, e.pos)\n",
+            ["--backend", backend],
+            b"no match 2\n",
+        )
+        for backend in ["vm", "pyfunc"]
+    ] + [
+        (
+            "Left factoring ({})".format(" ".join(args) or "default"),
+            b"Grammar { x = y:a '+' x:b -> [a b] | y:a '-' -> [a] | y  y = 'a'-'z' }",
+            b"print(compile_chain([(Grammar, 'x')], 'a+b-'))\n"
+            b"print(compile_chain([(Grammar, 'x')], 'c'))",
+            args,
+            b"['a', ['b']]\nc\n",
+        )
+        for args in [[], ["--no-left-factor"]]
+    ] + [
+        (
+            "Inline small rules ({})".format(" ".join(args)),
+            b"Grammar { x = y:a y:b -> [a b]  y = 'a'-'z'  z = . }",
+            b"print(compile_chain([(Grammar, 'x')], 'ab'))\n"
+            b"for rule in ['y', 'z']:\n"
+            b"    try:\n"
+            b"        print(Grammar().run(rule, 'a'))\n"
+            b"    except KeyError as e:\n"
+            b"        print(e)\n",
+            args,
+            expected,
+        )
+        for backend in ["vm", "pyfunc"]
+        for args, expected in [
+            (
+                ["--backend", backend],
+                b"['a', 'b']\na\na\n",
+            ),
+            (
+                ["--backend", backend, "--entry", "x"],
+                b"['a', 'b']\n"
+                b"'Grammar.y was inlined into x'\n"
+                b"'Grammar.z was unreachable from x'\n",
+            ),
+        ]
+    ] + [
+        (
+            "Incremental reparse after edit",
+            b"Grammar { x = y*:xs !. -> xs  y = ' '* .:a .:b -> { b a } }",
+            b"memo = IncrementalMemo()\n"
+            b"print(Grammar().run('x', 'ab cd', memo=memo))\n"
+            b"memo.edit(3, 1, 'xyz')\n"
+            b"print(Grammar().run('x', 'ab xyzd', memo=memo))\n",
+            [],
+            b"['ba', 'dc']\n['ba', 'yx', 'dz']\n",
+        ),
+        (
+            "Incremental reparse drops failures read by the edit",
+            b"Grammar { x = z*:xs !. -> xs  z = !y .:a -> \"dot\" | y:a -> \"Y\"  @memo y = 'a' 'c' }",
+            b"memo = IncrementalMemo()\n"
+            b"print(Grammar().run('x', 'bc', memo=memo))\n"
+            b"memo.edit(0, 1, 'a')\n"
+            b"print(Grammar().run('x', 'ac', memo=memo))\n",
+            [],
+            b"['dot', 'dot']\n['Y']\n",
+        ),
+        (
+            "Incremental reparse reports the same error as a full parse",
+            b"Grammar { x = z*:xs !. -> xs  @memo z = 'a' 'b' 'c' | 'q' }",
+            b"memo = IncrementalMemo()\n"
+            b"for source in ['qabcab', 'abcab']:\n"
+            b"    try:\n"
+            b"        Grammar().run('x', source, memo=memo)\n"
+            b"    except MatchError as e:\n"
+            b"        print(e.message, e.pos)\n"
+            b"    memo.edit(0, 1, '')\n",
+            [],
+            b"expected c 6\nexpected c 5\n",
+        ),
+        (
+            "Input window across chunk boundaries",
+            b"Grammar { x = y*:xs !. -> xs  y = ' '* 'while' ' ' -> \"kw\" | ' '* 'a'-'z':a ('a'-'z')*:as -> { a as } }",
+            b"import io\n"
+            b"source = ' whilex  while  abcdefgh while ' * 3\n"
+            b"expected = Grammar().run('x', source)\n"
+            b"window = InputWindow(io.StringIO(source), chunk_size=4)\n"
+            b"print(len(expected), Grammar().run('x', window) == expected)\n",
+            [],
+            b"12 True\n",
+        ),
+        (
+            "Indented output is returned as str",
+            b"Grammar { x = .:a -> { \"a:\\n\" > a \"\\n\" < } }",
+            b"for result in [compile_chain([(Grammar, 'x')], 'q'), Grammar().run('x', 'q')]:\n"
+            b"    print(type(result).__name__, repr(result))\n",
+            [],
+            b"str 'a:\\n    q\\n'\nstr 'a:\\n    q\\n'\n",
+        ),
+        (
+            "Load compiled source through the marshal cache",
+            b"Grammar { x = .*:xs -> { xs } }",
+            b"import os, shutil, tempfile\n"
+            b"cache_dir = tempfile.mkdtemp()\n"
+            b"source = 'result = Grammar().run(\"x\", \"ab\")\\n'\n"
+            b"for _ in range(2):\n"
+            b"    print(load_compiled(source, '<test>', cache_dir, dict(globals()))['result'])\n"
+            b"print(len(os.listdir(cache_dir)))\n"
+            b"shutil.rmtree(cache_dir)\n",
+            [],
+            b"ab\nab\n1\n",
+        ),
+        (
+            "Bytes input",
+            b"Grammar { x = ('a'-'z')*:xs '!' .:y -> [{ xs } y] }",
+            b"print(compile_chain([(Grammar, 'x')], b'abc!d'))",
+            [],
+            b"[b'abc', b'd']\n",
+        ),
+    ]
+    outputs = map_jobs(test_grammar, [
+        (rlmeta, grammar, main_code, args)
+        for _, grammar, main_code, args, _ in grammar_tests
+    ])
+    for (name, _, _, _, expected), output in zip(grammar_tests, outputs):
+        log("Test: {}".format(name))
+        assert output == expected
+
+def test_grammar(rlmeta, grammar, main_code, args=[]):
+    compiled = run_rlmeta(rlmeta, ["--support"]+args+["--compile", "-"], grammar)
+    return run_python(compiled + main_code)
+
+def map_jobs(fn, jobs):
+    if JOBS > 1:
+        with concurrent.futures.ProcessPoolExecutor(JOBS) as executor:
+            return list(executor.map(fn, *zip(*jobs)))
+    return [fn(*job) for job in jobs]
+
+def run_rlmeta_cached(rlmeta, args):
+    commands = split_commands(args)
+    keys = [cache_key(rlmeta, command) for command in commands]
+    outputs = [read_cache(key) for key in keys]
+    missing = [index for index, output in enumerate(outputs) if output is None]
+    log("Cache hits: {}/{}".format(len(commands)-len(missing), len(commands)))
+    if missing:
+        separator = "\n--- rlmeta cache separator {} ---\n".format(uuid.uuid4())
+        separator_path = os.path.join(CACHE_DIR, "separator")
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        write(separator_path, separator.encode("utf-8"))
+        missing_args = []
+        for index in missing:
+            if missing_args:
+                missing_args.extend(["--copy", separator_path])
+            missing_args.extend(commands[index])
+        missing_outputs = run_rlmeta(rlmeta, missing_args).split(
+            separator.encode("utf-8")
+        )
+        os.remove(separator_path)
+        for index, output in zip(missing, missing_outputs):
+            write_cache(keys[index], output)
+            outputs[index] = output
+    return b"".join(outputs)
+
+def split_commands(args):
+    commands = []
+    state = []
+    args = list(args)
+    while args:
+        command = args[:COMMAND_ARITY[args[0]]+1]
+        args = args[len(command):]
+        if command[0] == "--backend":
+            state = command
+        else:
+            commands.append(state+command)
+    return commands
+
+def cache_key(rlmeta, command):
+    key = hashlib.sha256(read(rlmeta))
+    for arg in command:
+        key.update(b"\0"+arg.encode("utf-8"))
+        if os.path.isfile(arg):
+            key.update(b"\0"+read(arg))
+    return key.hexdigest()
+
+def read_cache(key):
+    path = os.path.join(CACHE_DIR, key)
+    if os.path.exists(path):
+        return read(path)
+
+def write_cache(key, content):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, key)
+    write(path+".tmp", content)
+    os.replace(path+".tmp", path)
 
 def run_rlmeta(rlmeta, args, stdin=b"", expect_failure=False):
-    process = subprocess.Popen(
-        ["python", rlmeta]+args,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE
-    )
-    stdout, _ = process.communicate(stdin)
+    output = io.StringIO()
+    try:
+        load_rlmeta(rlmeta).main(
+            args,
+            io.StringIO(stdin.decode("utf-8")),
+            output.write
+        )
+        failed = False
+    except SystemExit as e:
+        if isinstance(e.code, str):
+            sys.stderr.write("{}\n".format(e.code))
+        failed = e.code not in [None, 0]
     if expect_failure:
-        if process.returncode == 0:
+        if not failed:
             fail("Expected failure")
     else:
-        if process.returncode != 0:
+        if failed:
             fail("Expected success")
-    return stdout
+    return output.getvalue().encode("utf-8")
+
+def load_rlmeta(rlmeta):
+    content = read(rlmeta)
+    key = hashlib.sha256(content).hexdigest()
+    if key not in RLMETA_MODULES:
+        module = types.ModuleType("rlmeta_{}".format(key))
+        module.__file__ = os.path.abspath(rlmeta)
+        exec(compile_cached(content, rlmeta), module.__dict__)
+        RLMETA_MODULES[key] = module
+    return RLMETA_MODULES[key]
+
+def compile_cached(content, path):
+    key = hashlib.sha256(importlib.util.MAGIC_NUMBER+b"\0"+content).hexdigest()
+    cached = read_cache(key+".marshal")
+    if cached is not None:
+        return marshal.loads(cached)
+    code = compile(content, path, "exec")
+    write_cache(key+".marshal", marshal.dumps(code))
+    return code
+
+def run_python(code):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            exec(compile(code, "<test>", "exec"), {"__name__": "__main__"})
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                sys.stderr.write("{}\n".format(e.code))
+    return output.getvalue().encode("utf-8")
 
 def mv(src, dest):
     log("Moving {} -> {}".format(src, dest))
@@ -113,7 +442,11 @@ def color(message, color):
 
 if __name__ == "__main__":
     cleanup()
-    if sys.argv[1:] == ["--compile"]:
+    args = sys.argv[1:]
+    if args[:1] == ["--jobs"]:
+        JOBS = int(args[1])
+        args = args[2:]
+    if args == ["--compile"]:
         sys.stdout.buffer.write(compile_rlmeta("rlmeta.py"))
     else:
         make_next_version()
@@ -1,141 +1,695 @@
-SUPPORT = 'class VM:\n\n    def __init__(self, code, rules):\n        self.code = code\n        self.rules = rules\n\n    def run(self, start_rule, stream):\n        self.action = SemanticAction(None)\n        self.pc = self.rules[start_rule]\n        self.call_backtrack_stack = []\n        self.stream, self.stream_rest = (stream, None)\n        self.pos, self.pos_rest = (0, tuple())\n        self.scope, self.scope_rest = (None, None)\n        self.latest_fail_message, self.latest_fail_pos = (None, tuple())\n        self.memo = {}\n        while True:\n            result = self.pop_arg()(self)\n            if result:\n                return result\n\n    def pop_arg(self):\n        code = self.code[self.pc]\n        self.pc += 1\n        return code\n\ndef PUSH_SCOPE(vm):\n    vm.scope_rest = (vm.scope, vm.scope_rest)\n    vm.scope = {}\n\ndef POP_SCOPE(vm):\n    vm.scope, vm.scope_rest = vm.scope_rest\n\ndef BACKTRACK(vm):\n    vm.call_backtrack_stack.append((\n        vm.pop_arg(), vm.stream, vm.stream_rest, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest\n    ))\n\ndef COMMIT(vm):\n    vm.call_backtrack_stack.pop()\n    vm.pc = vm.pop_arg()\n\ndef CALL(vm):\n    CALL_(vm, vm.pop_arg())\n\ndef CALL_(vm, pc):\n    key = (pc, vm.pos_rest+(vm.pos,))\n    if key in vm.memo:\n        if vm.memo[key][0] is None:\n            FAIL_(vm, vm.memo[key][1])\n        else:\n            vm.action, vm.stream, vm.stream_rest, vm.pos, vm.pos_rest = vm.memo[key]\n    else:\n        vm.call_backtrack_stack.append((vm.pc, key))\n        vm.pc = pc\n\ndef RETURN(vm):\n    if not vm.call_backtrack_stack:\n        return vm.action\n    vm.pc, key = vm.call_backtrack_stack.pop()\n    vm.memo[key] = (vm.action, vm.stream, vm.stream_rest, vm.pos, vm.pos_rest)\n\ndef MATCH(vm):\n    object_description = vm.pop_arg()\n    fn = vm.pop_arg()\n    MATCH_(vm, fn, ("expected {}", object_description))\n\ndef MATCH_(vm, fn, message):\n    if vm.pos >= len(vm.stream) or not fn(vm.stream[vm.pos]):\n        FAIL_(vm, message)\n    else:\n        vm.action = SemanticAction(vm.stream[vm.pos])\n        vm.pos += 1\n        return True\n\ndef MATCH_CALL_RULE(vm):\n    if MATCH_(vm, lambda x: x in vm.rules, ("expected rule name",)):\n        CALL_(vm, vm.rules[vm.action.value])\n\ndef LIST_START(vm):\n    vm.scope_rest = (vm.scope, vm.scope_rest)\n    vm.scope = []\n\ndef LIST_APPEND(vm):\n    vm.scope.append(vm.action)\n\ndef LIST_END(vm):\n    vm.action = SemanticAction(vm.scope, lambda self: [x.eval(self.runtime) for x in self.value])\n    vm.scope, vm.scope_rest = vm.scope_rest\n\ndef BIND(vm):\n    vm.scope[vm.pop_arg()] = vm.action\n\ndef ACTION(vm):\n    vm.action = SemanticAction(vm.scope, vm.pop_arg())\n\ndef PUSH_STREAM(vm):\n    if vm.pos >= len(vm.stream) or not isinstance(vm.stream[vm.pos], list):\n        FAIL_(vm, ("expected list",))\n    else:\n        vm.stream_rest = (vm.stream, vm.stream_rest)\n        vm.pos_rest = vm.pos_rest + (vm.pos,)\n        vm.stream = vm.stream[vm.pos]\n        vm.pos = 0\n\ndef POP_STREAM(vm):\n    if vm.pos < len(vm.stream):\n        FAIL_(vm, ("expected end of list",))\n    else:\n        vm.stream, vm.stream_rest = vm.stream_rest\n        vm.pos, vm.pos_rest = vm.pos_rest[-1], vm.pos_rest[:-1]\n        vm.pos += 1\n\ndef FAIL(vm):\n    FAIL_(vm, (vm.pop_arg(),))\n\ndef FAIL_(vm, fail_message):\n    fail_pos = vm.pos_rest+(vm.pos,)\n    if fail_pos >= vm.latest_fail_pos:\n        vm.latest_fail_message = fail_message\n        vm.latest_fail_pos = fail_pos\n    call_backtrack_entry = tuple()\n    while vm.call_backtrack_stack:\n        call_backtrack_entry = vm.call_backtrack_stack.pop()\n        if len(call_backtrack_entry) == 7:\n            break\n        else:\n            vm.memo[call_backtrack_entry[1]] = (None, fail_message)\n    if len(call_backtrack_entry) != 7:\n        raise MatchError(\n            vm.latest_fail_message[0].format(*vm.latest_fail_message[1:]),\n            vm.latest_fail_pos[-1],\n            vm.stream\n        )\n    (vm.pc, vm.stream, vm.stream_rest, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest) = call_backtrack_entry\n\nclass SemanticAction(object):\n\n    def __init__(self, value, fn=lambda self: self.value):\n        self.value = value\n        self.fn = fn\n\n    def eval(self, runtime):\n        self.runtime = runtime\n        return self.fn(self)\n\n    def bind(self, name, value, continuation):\n        self.runtime = self.runtime.set(name, value)\n        return continuation()\n\n    def lookup(self, name):\n        if name in self.value:\n            return self.value[name].eval(self.runtime)\n        else:\n            return self.runtime[name]\n\nclass MatchError(Exception):\n\n    def __init__(self, message, pos, stream):\n        Exception.__init__(self)\n        self.message = message\n        self.pos = pos\n        self.stream = stream\n\nclass Grammar(object):\n\n    def run(self, rule, stream, runtime={}):\n        return Runtime(self, dict(runtime, **{\n            "label": Counter(),\n            "indentprefix": "    ",\n            "list": list,\n            "dict": dict,\n            "add": lambda x, y: x.append(y),\n            "get": lambda x, y: x[y],\n            "set": lambda x, y, z: x.__setitem__(y, z),\n            "len": len,\n            "repr": repr,\n            "join": join,\n        })).run(rule, stream)\n\nclass Runtime(dict):\n\n    def __init__(self, grammar, values):\n        dict.__init__(self, dict(values, run=self.run))\n        self.grammar = grammar\n\n    def set(self, key, value):\n        return Runtime(self.grammar, dict(self, **{key: value}))\n\n    def run(self, rule, stream):\n        return VM(self.grammar.code, self.grammar.rules).run(rule, stream).eval(self)\n\nclass Counter(object):\n\n    def __init__(self):\n        self.value = 0\n\n    def __call__(self):\n        result = self.value\n        self.value += 1\n        return result\n\ndef splice(depth, item):\n    if depth == 0:\n        return [item]\n    else:\n        return concat([splice(depth-1, subitem) for subitem in item])\n\ndef concat(lists):\n    return [x for xs in lists for x in xs]\n\ndef join(items, delimiter=""):\n    return delimiter.join(\n        join(item, delimiter) if isinstance(item, list) else str(item)\n        for item in items\n    )\n\ndef indent(text, prefix="    "):\n    return "".join(prefix+line for line in text.splitlines(True))\n\ndef compile_chain(grammars, source):\n    import os\n    import sys\n    import pprint\n    for grammar, rule in grammars:\n        try:\n            source = grammar().run(rule, source)\n        except MatchError as e:\n            marker = "<ERROR POSITION>"\n            if os.isatty(sys.stderr.fileno()):\n                marker = f"\\033[0;31m{marker}\\033[0m"\n            if isinstance(e.stream, str):\n                stream_string = e.stream[:e.pos] + marker + e.stream[e.pos:]\n            else:\n                stream_string = pprint.pformat(e.stream)\n            sys.exit("ERROR: {}\\nPOSITION: {}\\nSTREAM:\\n{}".format(\n                e.message,\n                e.pos,\n                indent(stream_string)\n            ))\n    return source\n'
+SUPPORT = 'import mmap\nimport re\nimport time\n\nMEMO_EVICT_SIZE = 10000\n\nRUNTIME_MAX_DEPTH = 8\n\nWRITER_BUFFER_SIZE = 4096\n\nINPUT_CHUNK_SIZE = 65536\n\nclass VM:\n\n    def __init__(self, code, rules, memo_limit=None, name="VM"):\n        self.code = code\n        self.rules = rules\n        self.memo_limit = memo_limit\n        self.name = name\n\n    def run(self, start_rule, stream, memo=None, profile=None):\n        self.action = NONE_ACTION\n        self.pc, _ = self.rules[start_rule]\n        self.call_backtrack_stack = []\n        self.stream, self.stream_rest = (stream, None)\n        self.pos, self.pos_rest = (0, tuple())\n        self.scope, self.scope_rest = (None, None)\n        self.latest_fail_message, self.latest_fail_pos = (None, tuple())\n        self.memo_stride = len(self.code)+1\n        code = self.code\n        if isinstance(stream, InputWindow):\n            code = stream.attach(code)\n        elif isinstance(stream, BYTES_TYPES):\n            code = bytes_code(code)\n        if memo is None:\n            self.memo = {}\n            self.memo_evict_size = MEMO_EVICT_SIZE\n            if self.memo_limit is not None:\n                self.memo_evict_size = min(self.memo_evict_size, self.memo_limit)\n        else:\n            self.memo = memo\n            self.memo_evict_size = float("inf")\n            code = memo.attach(self, code)\n        if profile is not None:\n            code = profile.attach(self, code, start_rule)\n        while True:\n            fn, arg = code[self.pc]\n            self.pc += 1\n            result = fn(self, arg)\n            if result:\n                return result\n\nclass IncrementalMemo(dict):\n\n    def __init__(self):\n        dict.__init__(self)\n        self.code = None\n        self.reaches = {}\n        self.fails = {}\n        self.calls = []\n        self.reach = 0\n\n    def attach(self, vm, code):\n        if code is not self.code:\n            self.clear()\n            self.reaches.clear()\n            self.fails.clear()\n            self.code = code\n            self.stride = vm.memo_stride\n            self.reaching_code = [\n                (REACH_(fn, len if fn is MATCH_STRING else lambda arg: 1), arg)\n                if fn in STREAM_OPS else (fn, arg)\n                for fn, arg in code\n            ]\n        self.vm = vm\n        self.calls.clear()\n        self.reach = 0\n        return self.reaching_code\n\n    def __contains__(self, key):\n        if dict.__contains__(self, key):\n            self.reach = max(self.reach, self.reaches[key])\n            fail_pos, fail_message = self.fails[key]\n            if fail_pos >= self.vm.latest_fail_pos:\n                self.vm.latest_fail_pos, self.vm.latest_fail_message = (fail_pos, fail_message)\n            return True\n        self.calls.append((self.reach, self.vm.latest_fail_pos, self.vm.latest_fail_message))\n        self.reach = key//self.stride\n        self.vm.latest_fail_pos = tuple()\n        return False\n\n    def __setitem__(self, key, value):\n        dict.__setitem__(self, key, value)\n        self.reaches[key] = self.reach\n        self.fails[key] = (self.vm.latest_fail_pos, self.vm.latest_fail_message)\n        reach, fail_pos, fail_message = self.calls.pop()\n        self.reach = max(reach, self.reach)\n        if fail_pos > self.vm.latest_fail_pos:\n            self.vm.latest_fail_pos, self.vm.latest_fail_message = (fail_pos, fail_message)\n\n    def edit(self, offset, removed, inserted):\n        end = offset+removed\n        shift = len(inserted)-removed\n        entries = [\n            (\n                key,\n                value,\n                self.reaches.get(key, key//self.stride+1),\n                self.fails.get(key, (tuple(), None))\n            )\n            for key, value in self.items()\n        ]\n        self.clear()\n        self.reaches.clear()\n        self.fails.clear()\n        for key, value, reach, (fail_pos, fail_message) in entries:\n            if key//self.stride >= end:\n                key += shift*self.stride\n                reach += shift\n                if isinstance(value, tuple) and value[0] is not None:\n                    value = (value[0], value[1]+shift)\n                if fail_pos:\n                    fail_pos = (fail_pos[0]+shift,)+fail_pos[1:]\n            elif reach > offset:\n                continue\n            dict.__setitem__(self, key, value)\n            self.reaches[key] = reach\n            self.fails[key] = (fail_pos, fail_message)\n\ndef REACH_(fn, extent):\n    def reach(vm, arg):\n        if vm.pos_rest:\n            return fn(vm, arg)\n        memo = vm.memo\n        memo.reach = max(memo.reach, vm.pos+extent(arg))\n        result = fn(vm, arg)\n        if fn is MATCH_STAR:\n            memo.reach = max(memo.reach, vm.pos+1)\n        return result\n    return reach\n\nclass InputWindow(object):\n\n    def __init__(self, file, chunk_size=INPUT_CHUNK_SIZE):\n        self.file = file\n        self.chunk_size = chunk_size\n        self.buffer = ""\n        self.offset = 0\n        self.eof = False\n        self.code = None\n\n    def attach(self, code):\n        if code is not self.code:\n            self.code = code\n            self.filling_code = [\n                (FILL_(fn, len if fn is MATCH_STRING else lambda arg: 1), arg)\n                if fn in STREAM_OPS else (fn, arg)\n                for fn, arg in code\n            ]\n        return self.filling_code\n\n    def fill(self, end):\n        while len(self) < end and not self.eof:\n            self.read()\n\n    def read(self):\n        chunk = self.file.read(self.chunk_size)\n        if chunk:\n            self.buffer += chunk\n        else:\n            self.eof = True\n\n    def release(self, pos):\n        if pos-self.offset >= self.chunk_size:\n            self.buffer = self.buffer[pos-self.offset:]\n            self.offset = pos\n\n    def match_star(self, pattern, pos):\n        end = pos\n        while True:\n            end = pattern.match(self.buffer, end-self.offset).end()+self.offset\n            if end < len(self) or self.eof:\n                return end\n            self.read()\n\n    def __len__(self):\n        return self.offset+len(self.buffer)\n\n    def __getitem__(self, index):\n        if isinstance(index, slice):\n            start, stop = (index.start, index.stop)\n        else:\n            start, stop = (index, None)\n        if start < self.offset:\n            raise IndexError("position {} is no longer buffered".format(start))\n        if stop is None:\n            return self.buffer[start-self.offset]\n        return self.buffer[start-self.offset:stop-self.offset]\n\ndef FILL_(fn, extent):\n    def fill(vm, arg):\n        if not vm.pos_rest:\n            end = vm.pos+extent(arg)\n            if end > len(vm.stream) and not vm.stream.eof:\n                RELEASE_(vm)\n                vm.stream.fill(end)\n        return fn(vm, arg)\n    return fill\n\ndef RELEASE_(vm):\n    floor = vm.pos\n    for entry in vm.call_backtrack_stack:\n        if len(entry) == 8 and entry[1] is vm.stream:\n            floor = entry[4]\n            break\n    vm.stream.release(floor)\n\nclass Profile(object):\n\n    def __init__(self):\n        self.rules = {}\n        self.opcodes = {}\n        self.stacks = {}\n        self.backtrack_sites = {}\n        self.frames = []\n        self.codes = {}\n\n    def attach(self, vm, code, start_rule):\n        if id(code) not in self.codes:\n            names = {\n                pc: "{}.{}".format(vm.name, rule)\n                for rule, (pc, _) in vm.rules.items()\n            }\n            sites = backtrack_sites(vm.code, names)\n            self.codes[id(code)] = (code, [\n                (self.profiled(original, fn, names, sites), arg)\n                for (original, _), (fn, arg) in zip(vm.code, code)\n            ])\n        self.count("{}.{}".format(vm.name, start_rule), "calls")\n        self.enter("{}.{}".format(vm.name, start_rule), -1)\n        return self.codes[id(code)][1]\n\n    def profiled(self, original, fn, names, sites):\n        name = original.__name__\n        def op(vm, arg):\n            self.opcodes[name] = self.opcodes.get(name, 0) + 1\n            depth = len(vm.call_backtrack_stack)\n            top_pos = vm.pos_rest[0] if vm.pos_rest else vm.pos\n            callee, pos = (None, vm.pos)\n            if original is CALL:\n                callee = arg\n            elif original is MATCH_CALL_RULE:\n                if (pos < len(vm.stream) and\n                        not isinstance(vm.stream[pos], list) and\n                        vm.stream[pos] in vm.rules):\n                    callee, pos = (vm.rules[vm.stream[pos]], pos+1)\n            hit = (\n                callee is not None and callee[1] and\n                dict.__contains__(vm.memo, pos*vm.memo_stride+callee[0])\n            )\n            try:\n                result = fn(vm, arg)\n            except MatchError:\n                self.leave(-1)\n                raise\n            if hit:\n                self.count(names[callee[0]], "calls", "memo_hits")\n            elif callee is not None and len(vm.call_backtrack_stack) > depth:\n                if callee[1]:\n                    self.count(names[callee[0]], "calls", "memo_misses")\n                else:\n                    self.count(names[callee[0]], "calls")\n                self.enter(names[callee[0]], depth)\n            if (len(vm.call_backtrack_stack) < depth and\n                    original is not RETURN and\n                    original is not COMMIT):\n                self.count(self.frames[-1][0], "backtracks")\n                if vm.pc in sites:\n                    self.backtracked(\n                        sites[vm.pc],\n                        top_pos-(vm.pos_rest[0] if vm.pos_rest else vm.pos)\n                    )\n            self.leave(-1 if result else len(vm.call_backtrack_stack))\n            return result\n        return op\n\n    def enter(self, name, depth):\n        path = name if depth < 0 else "{};{}".format(self.frames[-1][4], name)\n        self.frames.append([name, depth, time.perf_counter(), 0, path])\n\n    def leave(self, depth):\n        while self.frames and self.frames[-1][1] >= depth:\n            name, _, start, children, path = self.frames.pop()\n            elapsed = time.perf_counter()-start\n            self.stats(name)["total_seconds"] += elapsed\n            self.stats(name)["self_seconds"] += elapsed-children\n            self.stacks[path] = self.stacks.get(path, 0)+elapsed-children\n            if self.frames:\n                self.frames[-1][3] += elapsed\n\n    def count(self, name, *counters):\n        for counter in counters:\n            self.stats(name)[counter] += 1\n\n    def stats(self, name):\n        if name not in self.rules:\n            self.rules[name] = dict.fromkeys(PROFILE_COUNTERS, 0)\n        return self.rules[name]\n\n    def backtracked(self, site, wasted):\n        if site not in self.backtrack_sites:\n            self.backtrack_sites[site] = [0, 0, 0]\n        counts = self.backtrack_sites[site]\n        counts[0] += 1\n        counts[1] += wasted\n        counts[2] = max(counts[2], wasted)\n\n    def report(self):\n        lines = ["{:<32} {:>8} {:>10} {:>12} {:>10} {:>10} {:>10}".format(\n            "rule", "calls", "memo hits", "memo misses", "backtracks", "total", "self"\n        )]\n        for name, counts in sorted(\n            self.rules.items(),\n            key=lambda item: -item[1]["self_seconds"]\n        ):\n            lines.append("{:<32} {:>8} {:>10} {:>12} {:>10} {:>9.3f}s {:>9.3f}s".format(\n                name,\n                counts["calls"],\n                counts["memo_hits"],\n                counts["memo_misses"],\n                counts["backtracks"],\n                counts["total_seconds"],\n                counts["self_seconds"]\n            ))\n        lines.append("")\n        lines.append("{:<32} {:>12}".format("opcode", "count"))\n        for name, count in sorted(self.opcodes.items(), key=lambda item: -item[1]):\n            lines.append("{:<32} {:>12}".format(name, count))\n        return "\\n".join(lines)+"\\n"\n\n    def backtrack_report(self, sources=[]):\n        lines = rule_lines(sources)\n        report = ["{:<24} {:<48} {:>8} {:>10} {:>8}".format(\n            "line", "site", "fails", "wasted", "max"\n        )]\n        for (rule, site), (fails, wasted, longest) in sorted(\n            self.backtrack_sites.items(),\n            key=lambda item: (-item[1][1], -item[1][0])\n        ):\n            report.append("{:<24} {:<48} {:>8} {:>10} {:>8}".format(\n                lines.get(rule, rule),\n                "{} {}".format(rule, site),\n                fails,\n                wasted,\n                longest\n            ))\n        return "\\n".join(report)+"\\n"\n\n    def collapsed_stacks(self):\n        return "".join(\n            "{} {}\\n".format(path, round(seconds*1000000))\n            for path, seconds in sorted(self.stacks.items())\n        )\n\ndef backtrack_sites(code, names):\n    starts = sorted(names)\n    alternatives = {}\n    ordinals = {}\n    sites = {}\n    for pc, (fn, arg) in enumerate(code):\n        if fn is not BACKTRACK:\n            continue\n        rule = names[max(start for start in starts if start <= pc)]\n        if pc > 0 and code[pc-1][0] is LIST_START:\n            kind = "star"\n        elif code[arg-1] == (FAIL, "no match"):\n            kind = "not"\n        elif pc in alternatives or code[pc-1][0] is LOOKAHEAD and pc-1 in alternatives:\n            ordinal, alternative = alternatives.get(pc) or alternatives[pc-1]\n            alternatives[arg] = (ordinal, alternative+1)\n            sites[arg] = (rule, "or #{} alternative {}".format(ordinal, alternative+1))\n            continue\n        else:\n            kind = "or"\n        ordinals[(rule, kind)] = ordinals.get((rule, kind), 0) + 1\n        if kind == "or":\n            alternatives[arg] = (ordinals[(rule, kind)], 1)\n            sites[arg] = (rule, "or #{} alternative 1".format(ordinals[(rule, kind)]))\n        else:\n            sites[arg] = (rule, "{} #{}".format(kind, ordinals[(rule, kind)]))\n    return sites\n\ndef rule_lines(sources):\n    lines = {}\n    for path, source in sources:\n        grammar = None\n        for match in re.finditer(r"(@\\w+\\s+)?(\\w+)\\s*([{=])", source):\n            name = match.group(2)\n            if match.group(3) == "{":\n                grammar = name\n            elif grammar is not None:\n                lines.setdefault(\n                    "{}.{}".format(grammar, name),\n                    "{}:{}".format(path, source.count("\\n", 0, match.start(2))+1)\n                )\n    return lines\n\nPROFILE_COUNTERS = [\n    "calls",\n    "memo_hits",\n    "memo_misses",\n    "backtracks",\n    "total_seconds",\n    "self_seconds",\n]\n\ndef PUSH_SCOPE(vm, arg):\n    vm.scope_rest = (vm.scope, vm.scope_rest)\n    vm.scope = {}\n\ndef POP_SCOPE(vm, arg):\n    vm.scope, vm.scope_rest = vm.scope_rest\n\ndef BACKTRACK(vm, pc):\n    vm.call_backtrack_stack.append((\n        pc, vm.stream, vm.stream_rest, vm.memo, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest\n    ))\n\ndef COMMIT(vm, pc):\n    vm.call_backtrack_stack.pop()\n    vm.pc = pc\n\ndef CUT(vm, arg):\n    call_backtrack_stack = vm.call_backtrack_stack\n    index = len(call_backtrack_stack)-1\n    while index >= 0 and len(call_backtrack_stack[index]) == 8:\n        call_backtrack_stack[index] = CUT_ENTRY\n        index -= 1\n\n# Cut entries keep COMMIT pops balanced, but FAIL_, EVICT_, and RELEASE_\n# skip them like calls without memo.\nCUT_ENTRY = (None, None, None)\n\ndef CALL(vm, arg):\n    pc, memoize = arg\n    if not memoize:\n        vm.call_backtrack_stack.append((vm.pc, None, None))\n        vm.pc = pc\n        return\n    key = vm.pos*vm.memo_stride+pc\n    if key in vm.memo:\n        if vm.memo_limit is not None:\n            dict.__setitem__(vm.memo, key, dict.pop(vm.memo, key))\n        if vm.memo[key][0] is None:\n            FAIL_(vm, vm.memo[key][1])\n        else:\n            vm.action, vm.pos = vm.memo[key]\n    else:\n        vm.call_backtrack_stack.append((vm.pc, vm.memo, key))\n        vm.pc = pc\n\ndef RETURN(vm, arg):\n    if not vm.call_backtrack_stack:\n        return vm.action\n    vm.pc, memo, key = vm.call_backtrack_stack.pop()\n    if memo is not None:\n        memo[key] = (vm.action, vm.pos)\n        if len(memo) > vm.memo_evict_size:\n            EVICT_(vm, memo)\n\ndef EVICT_(vm, memo):\n    floor = vm.pos\n    for entry in vm.call_backtrack_stack:\n        if len(entry) == 8 and entry[3] is memo:\n            floor = entry[4]\n            break\n    floor_key = floor*vm.memo_stride\n    for key in [key for key in memo if key < floor_key]:\n        del memo[key]\n    vm.memo_evict_size = 2*len(memo)+MEMO_EVICT_SIZE\n    if vm.memo_limit is not None:\n        for key in list(memo)[:len(memo)-vm.memo_limit//2]:\n            del memo[key]\n        vm.memo_evict_size = min(vm.memo_evict_size, vm.memo_limit)\n\ndef LOOKAHEAD(vm, arg):\n    keys, pc = arg\n    if (vm.pos >= len(vm.stream) or\n            isinstance(vm.stream[vm.pos], list) or\n            vm.stream[vm.pos] not in keys):\n        vm.pc = pc\n\ndef MATCH(vm, arg):\n    object_description, fn, _ = arg\n    MATCH_(vm, fn, ("expected {}", object_description))\n\ndef MATCH_(vm, fn, message):\n    if vm.pos >= len(vm.stream) or not fn(vm.stream[vm.pos]):\n        FAIL_(vm, message)\n    else:\n        vm.action = value_action(vm.stream[vm.pos])\n        vm.pos += 1\n        return True\n\ndef MATCH_STRING(vm, string):\n    index = mismatch(vm.stream, vm.pos, string)\n    if index is None:\n        vm.action = value_action(string[-1])\n        vm.pos += len(string)\n    else:\n        vm.pos += index\n        FAIL_(vm, ("expected {}", string[index]))\n\ndef MATCH_SET(vm, arg):\n    object_description, keys = arg\n    if (vm.pos >= len(vm.stream) or\n            isinstance(vm.stream[vm.pos], list) or\n            vm.stream[vm.pos] not in keys):\n        FAIL_(vm, ("expected {}", object_description))\n    else:\n        vm.action = value_action(vm.stream[vm.pos])\n        vm.pos += 1\n\ndef MATCH_STAR(vm, arg):\n    object_description, keys, pattern = arg\n    start, vm.pos = (vm.pos, match_star(vm.stream, vm.pos, keys, pattern))\n    vm.action = SemanticAction(vm.stream[start:vm.pos], eval_slice)\n    LATEST_FAIL_(vm, ("expected {}", object_description))\n\ndef MATCH_CALL_RULE(vm, arg):\n    if MATCH_(vm, lambda x: x in vm.rules, ("expected rule name",)):\n        CALL(vm, vm.rules[vm.action.value])\n\ndef LIST_START(vm, arg):\n    vm.scope_rest = (vm.scope, vm.scope_rest)\n    vm.scope = []\n\ndef LIST_APPEND(vm, arg):\n    vm.scope.append(vm.action)\n\ndef LIST_END(vm, arg):\n    vm.action = SemanticAction(vm.scope, eval_list)\n    vm.scope, vm.scope_rest = vm.scope_rest\n\ndef BIND(vm, name):\n    vm.scope[name] = vm.action\n\ndef ACTION(vm, fn):\n    vm.action = SemanticAction(vm.scope, fn)\n\ndef PUSH_STREAM(vm, arg):\n    if vm.pos >= len(vm.stream) or not isinstance(vm.stream[vm.pos], list):\n        FAIL_(vm, ("expected list",))\n    else:\n        vm.stream_rest = (vm.stream, vm.memo, vm.stream_rest)\n        vm.pos_rest = vm.pos_rest + (vm.pos,)\n        key = (vm.pos+1)*vm.memo_stride-1\n        memo = vm.memo.get(key)\n        if memo is None:\n            memo = {}\n            dict.__setitem__(vm.memo, key, memo)\n        vm.stream = vm.stream[vm.pos]\n        vm.memo = memo\n        vm.pos = 0\n\ndef POP_STREAM(vm, arg):\n    if vm.pos < len(vm.stream):\n        FAIL_(vm, ("expected end of list",))\n    else:\n        vm.stream, vm.memo, vm.stream_rest = vm.stream_rest\n        vm.pos, vm.pos_rest = vm.pos_rest[-1], vm.pos_rest[:-1]\n        vm.pos += 1\n\ndef MATCH_BYTE(vm, arg):\n    object_description, fn = arg\n    if vm.pos >= len(vm.stream) or not fn(vm.stream[vm.pos]):\n        FAIL_(vm, ("expected {}", object_description))\n    else:\n        vm.action = BYTE_ACTIONS[vm.stream[vm.pos]]\n        vm.pos += 1\n\ndef MATCH_BYTES(vm, arg):\n    string, encoded = arg\n    index = mismatch(vm.stream, vm.pos, encoded)\n    if index is None:\n        vm.action = BYTE_ACTIONS[encoded[-1]]\n        vm.pos += len(encoded)\n    else:\n        vm.pos += index\n        FAIL_(vm, ("expected {}", string[index]))\n\ndef MATCH_BYTE_SET(vm, arg):\n    object_description, keys = arg\n    if vm.pos >= len(vm.stream) or vm.stream[vm.pos] not in keys:\n        FAIL_(vm, ("expected {}", object_description))\n    else:\n        vm.action = BYTE_ACTIONS[vm.stream[vm.pos]]\n        vm.pos += 1\n\ndef MATCH_BYTE_STAR(vm, arg):\n    object_description, keys, pattern = arg\n    start, vm.pos = (vm.pos, pattern.match(vm.stream, vm.pos).end())\n    vm.action = ValueAction(ByteSlice(vm.stream[start:vm.pos]))\n    LATEST_FAIL_(vm, ("expected {}", object_description))\n\ndef FAIL(vm, message):\n    FAIL_(vm, (message,))\n\ndef FAIL_(vm, fail_message):\n    LATEST_FAIL_(vm, fail_message)\n    call_backtrack_entry = tuple()\n    while vm.call_backtrack_stack:\n        call_backtrack_entry = vm.call_backtrack_stack.pop()\n        if len(call_backtrack_entry) == 8:\n            break\n        else:\n            _, memo, key = call_backtrack_entry\n            if memo is not None:\n                memo[key] = (None, fail_message)\n    if len(call_backtrack_entry) != 8:\n        raise MatchError(\n            vm.latest_fail_message[0].format(*vm.latest_fail_message[1:]),\n            vm.latest_fail_pos[-1],\n            vm.stream\n        )\n    (vm.pc, vm.stream, vm.stream_rest, vm.memo, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest) = call_backtrack_entry\n\ndef LATEST_FAIL_(vm, fail_message):\n    fail_pos = vm.pos_rest+(vm.pos,)\n    if fail_pos >= vm.latest_fail_pos:\n        vm.latest_fail_message = fail_message\n        vm.latest_fail_pos = fail_pos\n\nSTREAM_OPS = {\n    LOOKAHEAD,\n    MATCH,\n    MATCH_STRING,\n    MATCH_SET,\n    MATCH_STAR,\n    MATCH_CALL_RULE,\n    PUSH_STREAM,\n}\n\nBYTES_TYPES = (bytes, bytearray, memoryview, mmap.mmap)\n\nBYTES_CODES = {}\n\ndef bytes_code(code):\n    if id(code) not in BYTES_CODES:\n        BYTES_CODES[id(code)] = (code, [\n            BYTES_OPS[fn](arg) if fn in BYTES_OPS else (fn, arg)\n            for fn, arg in code\n        ])\n    return BYTES_CODES[id(code)][1]\n\ndef byte_predicate(bounds):\n    if bounds is None:\n        return lambda x: True\n    low, high = (ord(bounds[0]), ord(bounds[1]))\n    return lambda x: low <= x <= high\n\ndef byte_keys(keys):\n    return frozenset(\n        ord(key) for key in keys\n        if isinstance(key, str) and len(key) == 1 and ord(key) < 256\n    )\n\ndef byte_class(keys):\n    if not keys:\n        return re.compile(b"")\n    return re.compile(b"[" + b"".join(re.escape(bytes([key])) for key in sorted(keys)) + b"]*")\n\ndef byte_string(string):\n    if all(ord(char) < 256 for char in string):\n        return string.encode("latin-1")\n    return tuple(ord(char) for char in string)\n\nBYTES_OPS = {\n    MATCH: lambda arg: (MATCH_BYTE, (arg[0], byte_predicate(arg[2]))),\n    MATCH_STRING: lambda arg: (MATCH_BYTES, (arg, byte_string(arg))),\n    MATCH_SET: lambda arg: (MATCH_BYTE_SET, (arg[0], byte_keys(arg[1]))),\n    MATCH_STAR: lambda arg: (MATCH_BYTE_STAR, (\n        arg[0], byte_keys(arg[1]), byte_class(byte_keys(arg[1]))\n    )),\n    LOOKAHEAD: lambda arg: (LOOKAHEAD, (byte_keys(arg[0]), arg[1])),\n}\n\nclass SemanticAction(object):\n\n    __slots__ = ["value", "fn", "runtime"]\n\n    def __init__(self, value, fn=lambda self: self.value):\n        self.value = value\n        self.fn = fn\n\n    def eval(self, runtime):\n        self.runtime = runtime\n        return self.fn(self)\n\n    def bind(self, name, value, continuation):\n        self.runtime = self.runtime.set(name, value)\n        return continuation()\n\n    def lookup(self, name):\n        if name in self.value:\n            return self.value[name].eval(self.runtime)\n        else:\n            return self.runtime[name]\n\nclass ValueAction(object):\n\n    __slots__ = ["value"]\n\n    def __init__(self, value):\n        self.value = value\n\n    def eval(self, runtime):\n        return self.value\n\nNONE_ACTION = ValueAction(None)\n\nCHARACTER_ACTIONS = {chr(x): ValueAction(chr(x)) for x in range(256)}\n\nBYTES = [bytes([x]) for x in range(256)]\n\nBYTE_ACTIONS = [ValueAction(x) for x in BYTES]\n\ndef value_action(value):\n    if value.__class__ is str and value in CHARACTER_ACTIONS:\n        return CHARACTER_ACTIONS[value]\n    return ValueAction(value)\n\ndef eval_list(self):\n    return [x.eval(self.runtime) for x in self.value]\n\ndef eval_slice(self):\n    return list(self.value)\n\nclass ByteSlice(object):\n\n    __slots__ = ["buffer"]\n\n    def __init__(self, buffer):\n        self.buffer = buffer\n\n    def __len__(self):\n        return len(self.buffer)\n\n    def __iter__(self):\n        return (BYTES[x] for x in self.buffer)\n\n    def __getitem__(self, index):\n        if isinstance(index, slice):\n            return ByteSlice(self.buffer[index])\n        return BYTES[self.buffer[index]]\n\n    def __eq__(self, other):\n        if isinstance(other, ByteSlice):\n            return self.buffer == other.buffer\n        return list(self) == other\n\n    def __bytes__(self):\n        return bytes(self.buffer)\n\n    def __repr__(self):\n        return "ByteSlice({!r})".format(bytes(self.buffer))\n\nclass MatchError(Exception):\n\n    def __init__(self, message, pos, stream):\n        Exception.__init__(self)\n        self.message = message\n        self.pos = pos\n        self.stream = stream\n\nclass Grammar(object):\n\n    def run(self, rule, stream, runtime={}, memo=None, profile=None, rope=False):\n        runtime = Runtime(self, dict(runtime, **{\n            "label": Counter(),\n            "indentprefix": "    ",\n            "list": list,\n            "dict": dict,\n            "add": lambda x, y: x.append(y),\n            "get": lambda x, y: x[y],\n            "set": lambda x, y, z: x.__setitem__(y, z),\n            "len": len,\n            "repr": repr,\n            "join": join,\n        }), profile=profile)\n        result = self.match(rule, stream, memo, profile).eval(runtime)\n        return result if rope else materialize(result)\n\n    memo_limit = None\n\n    removed = {}\n\n    def match(self, rule, stream, memo=None, profile=None):\n        if rule not in self.rules:\n            raise unknown_rule(self, rule)\n        return VM(\n            self.code,\n            self.rules,\n            self.memo_limit,\n            self.__class__.__name__\n        ).run(rule, stream, memo, profile)\n\nclass FunctionGrammar(Grammar):\n\n    def match(self, rule, stream, memo=None, profile=None):\n        if rule not in self.rules:\n            raise unknown_rule(self, rule)\n        if profile is not None:\n            raise ValueError("profiling needs the vm backend")\n        self.memo = {}\n        self.pos_rest = tuple()\n        self.latest_fail_message, self.latest_fail_pos = (None, tuple())\n        ok, pos, action = self.rules[rule](self, stream, 0)\n        if not ok:\n            raise MatchError(\n                self.latest_fail_message[0].format(*self.latest_fail_message[1:]),\n                self.latest_fail_pos[-1],\n                stream\n            )\n        return action\n\n    def match_string(self, stream, pos, action, string):\n        index = mismatch(stream, pos, string)\n        if index is None:\n            return (True, pos+len(string), value_action(string[-1]))\n        return (self.fail(pos+index, ("expected {}", string[index])), pos, action)\n\n    def match_star(self, stream, pos, char_class):\n        object_description, keys, pattern = char_class\n        end = match_star(stream, pos, keys, pattern)\n        self.fail(end, ("expected {}", object_description))\n        return (True, end, SemanticAction(stream[pos:end], eval_slice))\n\n    def fail(self, pos, fail_message):\n        fail_pos = self.pos_rest+(pos,)\n        if fail_pos >= self.latest_fail_pos:\n            self.latest_fail_message = fail_message\n            self.latest_fail_pos = fail_pos\n        return False\n\ndef unknown_rule(grammar, rule):\n    if rule in grammar.removed:\n        return KeyError("{}.{} was {}".format(\n            grammar.__class__.__name__,\n            rule,\n            grammar.removed[rule]\n        ))\n    return KeyError(rule)\n\nclass Runtime(object):\n\n    def __init__(self, grammar, values, parent=None, profile=None):\n        self.grammar = grammar\n        self.values = dict(values, run=self.run)\n        self.parent = parent\n        self.profile = profile\n        self.depth = 0 if parent is None else parent.depth+1\n\n    def set(self, key, value):\n        if self.depth >= RUNTIME_MAX_DEPTH:\n            return Runtime(self.grammar, dict(self.flatten(), **{key: value}), profile=self.profile)\n        return Runtime(self.grammar, {key: value}, self, self.profile)\n\n    def flatten(self):\n        if self.parent is None:\n            return dict(self.values)\n        values = self.parent.flatten()\n        values.update(self.values)\n        return values\n\n    def __getitem__(self, key):\n        runtime = self\n        while key not in runtime.values:\n            runtime = runtime.parent\n            if runtime is None:\n                raise KeyError(key)\n        return runtime.values[key]\n\n    def run(self, rule, stream):\n        return self.grammar.match(rule, stream, profile=self.profile).eval(self)\n\nclass Counter(object):\n\n    def __init__(self):\n        self.value = 0\n\n    def __call__(self):\n        result = self.value\n        self.value += 1\n        return result\n\ndef mismatch(stream, pos, string):\n    if stream[pos:pos+len(string)] == string:\n        return None\n    for index, item in enumerate(string):\n        if pos+index >= len(stream) or stream[pos+index] != item:\n            return index\n\ndef char_eq(x):\n    return (x, lambda item: item == x, (x, x))\n\ndef char_range(x, y):\n    return ("range {!r}-{!r}".format(x, y), lambda item: x <= item <= y, (x, y))\n\nCHAR_ANY = ("any", lambda item: True, None)\n\ndef char_class(description, keys):\n    return (\n        description,\n        frozenset(keys),\n        re.compile("[{}]*".format("".join(re.escape(key) for key in keys)))\n    )\n\ndef match_star(stream, pos, keys, pattern):\n    if isinstance(stream, str):\n        return pattern.match(stream, pos).end()\n    if isinstance(stream, InputWindow):\n        return stream.match_star(pattern, pos)\n    while pos < len(stream) and not isinstance(stream[pos], list) and stream[pos] in keys:\n        pos += 1\n    return pos\n\ndef splice(depth, item):\n    if depth == 0:\n        return [item]\n    else:\n        return concat([splice(depth-1, subitem) for subitem in item])\n\ndef concat(lists):\n    return [x for xs in lists for x in xs]\n\ndef join(items, delimiter=""):\n    parts = []\n    rope = False\n    binary = False\n    for item in items:\n        if isinstance(item, list):\n            item = join(item, delimiter)\n        if item.__class__ is str:\n            pass\n        elif isinstance(item, Text):\n            rope = True\n        elif isinstance(item, ByteSlice):\n            item, binary = (item.buffer, True)\n        elif isinstance(item, BYTES_TYPES):\n            binary = True\n        else:\n            item = str(item)\n        if parts and delimiter:\n            parts.append(delimiter)\n        parts.append(item)\n    if rope:\n        return Text(parts)\n    if binary:\n        return join_bytes(parts)\n    return "".join(parts)\n\ndef join_bytes(parts):\n    if len(parts) == 1:\n        return parts[0]\n    return b"".join(\n        part.encode("latin-1") if isinstance(part, str) else part\n        for part in parts\n    )\n\ndef indent(text, prefix="    "):\n    return Text([text], prefix)\n\nclass Text(object):\n\n    __slots__ = ["parts", "prefix"]\n\n    def __init__(self, parts, prefix=None):\n        self.parts = parts\n        self.prefix = prefix\n\n    def write(self, writer):\n        if self.prefix is not None:\n            writer.indent(self.prefix)\n        for part in self.parts:\n            if isinstance(part, Text):\n                part.write(writer)\n            else:\n                writer.write(part)\n        if self.prefix is not None:\n            writer.dedent()\n\n    def __str__(self):\n        chunks = []\n        write_text(self, chunks.append)\n        return "".join(chunks)\n\n    def __repr__(self):\n        return repr(str(self))\n\nclass Writer(object):\n\n    def __init__(self, output):\n        self.output = output\n        self.chunks = []\n        self.prefixes = []\n        self.pending = 0\n\n    def indent(self, prefix):\n        self.prefixes.append(prefix)\n        self.pending = min(self.pending, len(self.prefixes)-1)\n\n    def dedent(self):\n        self.prefixes.pop()\n        self.pending = min(self.pending, len(self.prefixes))\n\n    def write(self, text):\n        start = 0\n        while start < len(text):\n            if self.pending < len(self.prefixes):\n                self.chunks.extend(self.prefixes[self.pending:])\n                self.pending = len(self.prefixes)\n            end = text.find("\\n", start)+1 or len(text)\n            self.chunks.append(text[start:end])\n            if text[end-1] == "\\n":\n                self.pending = 0\n            start = end\n        if len(self.chunks) > WRITER_BUFFER_SIZE:\n            self.flush()\n\n    def flush(self):\n        self.output("".join(self.chunks))\n        self.chunks = []\n\ndef materialize(text):\n    if isinstance(text, Text):\n        return str(text)\n    return text\n\ndef write_text(text, output):\n    if isinstance(text, Text):\n        writer = Writer(output)\n        text.write(writer)\n        writer.flush()\n    else:\n        output(str(text))\n\ndef compile_chain(grammars, source, memo=None, profile=None, rope=False):\n    import os\n    import sys\n    import pprint\n    for grammar, rule in grammars:\n        try:\n            if isinstance(grammar, type) and issubclass(grammar, Grammar):\n                source = grammar().run(rule, source, memo=memo, profile=profile, rope=rope)\n            else:\n                source = grammar().run(rule, source)\n            memo = None\n        except MatchError as e:\n            marker = "<ERROR POSITION>"\n            if os.isatty(sys.stderr.fileno()):\n                marker = f"\\033[0;31m{marker}\\033[0m"\n            stream, pos = (e.stream, e.pos)\n            if isinstance(stream, InputWindow):\n                stream, pos = (stream.buffer, max(0, pos-stream.offset))\n            elif isinstance(stream, BYTES_TYPES):\n                stream = bytes(stream).decode("latin-1")\n            if isinstance(stream, str):\n                stream_string = stream[:pos] + marker + stream[pos:]\n            else:\n                stream_string = pprint.pformat(stream)\n            sys.exit("ERROR: {}\\nPOSITION: {}\\nSTREAM:\\n{}".format(\n                e.message,\n                e.pos,\n                indent(stream_string)\n            ))\n    return source\n\ndef load_compiled(source, filename="<rlmeta>", cache_dir=None, namespace=None):\n    import hashlib\n    import importlib.util\n    import marshal\n    import os\n    if namespace is None:\n        namespace = {"__name__": filename}\n    if cache_dir is None:\n        code = compile(source, filename, "exec")\n    else:\n        key = hashlib.sha256(importlib.util.MAGIC_NUMBER)\n        key.update(b"\\0"+filename.encode("utf-8"))\n        key.update(b"\\0"+source.encode("utf-8"))\n        path = os.path.join(cache_dir, key.hexdigest()+".marshal")\n        try:\n            with open(path, "rb") as f:\n                code = marshal.load(f)\n        except (OSError, EOFError, ValueError, TypeError):\n            code = compile(source, filename, "exec")\n            os.makedirs(cache_dir, exist_ok=True)\n            with open(path+".tmp", "wb") as f:\n                marshal.dump(code, f)\n            os.replace(path+".tmp", path)\n    exec(code, namespace)\n    return namespace\n'
+import mmap
+import re
+import time
+
+MEMO_EVICT_SIZE = 10000
+
+RUNTIME_MAX_DEPTH = 8
+
+WRITER_BUFFER_SIZE = 4096
+
+INPUT_CHUNK_SIZE = 65536
+
 class VM:
 
-    def __init__(self, code, rules):
+    def __init__(self, code, rules, memo_limit=None, name="VM"):
         self.code = code
         self.rules = rules
+        self.memo_limit = memo_limit
+        self.name = name
 
-    def run(self, start_rule, stream):
-        self.action = SemanticAction(None)
-        self.pc = self.rules[start_rule]
+    def run(self, start_rule, stream, memo=None, profile=None):
+        self.action = NONE_ACTION
+        self.pc, _ = self.rules[start_rule]
         self.call_backtrack_stack = []
         self.stream, self.stream_rest = (stream, None)
         self.pos, self.pos_rest = (0, tuple())
         self.scope, self.scope_rest = (None, None)
         self.latest_fail_message, self.latest_fail_pos = (None, tuple())
-        self.memo = {}
+        self.memo_stride = len(self.code)+1
+        code = self.code
+        if isinstance(stream, InputWindow):
+            code = stream.attach(code)
+        elif isinstance(stream, BYTES_TYPES):
+            code = bytes_code(code)
+        if memo is None:
+            self.memo = {}
+            self.memo_evict_size = MEMO_EVICT_SIZE
+            if self.memo_limit is not None:
+                self.memo_evict_size = min(self.memo_evict_size, self.memo_limit)
+        else:
+            self.memo = memo
+            self.memo_evict_size = float("inf")
+            code = memo.attach(self, code)
+        if profile is not None:
+            code = profile.attach(self, code, start_rule)
         while True:
-            result = self.pop_arg()(self)
+            fn, arg = code[self.pc]
+            self.pc += 1
+            result = fn(self, arg)
             if result:
                 return result
 
-    def pop_arg(self):
-        code = self.code[self.pc]
-        self.pc += 1
-        return code
+class IncrementalMemo(dict):
+
+    def __init__(self):
+        dict.__init__(self)
+        self.code = None
+        self.reaches = {}
+        self.fails = {}
+        self.calls = []
+        self.reach = 0
+
+    def attach(self, vm, code):
+        if code is not self.code:
+            self.clear()
+            self.reaches.clear()
+            self.fails.clear()
+            self.code = code
+            self.stride = vm.memo_stride
+            self.reaching_code = [
+                (REACH_(fn, len if fn is MATCH_STRING else lambda arg: 1), arg)
+                if fn in STREAM_OPS else (fn, arg)
+                for fn, arg in code
+            ]
+        self.vm = vm
+        self.calls.clear()
+        self.reach = 0
+        return self.reaching_code
+
+    def __contains__(self, key):
+        if dict.__contains__(self, key):
+            self.reach = max(self.reach, self.reaches[key])
+            fail_pos, fail_message = self.fails[key]
+            if fail_pos >= self.vm.latest_fail_pos:
+                self.vm.latest_fail_pos, self.vm.latest_fail_message = (fail_pos, fail_message)
+            return True
+        self.calls.append((self.reach, self.vm.latest_fail_pos, self.vm.latest_fail_message))
+        self.reach = key//self.stride
+        self.vm.latest_fail_pos = tuple()
+        return False
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.reaches[key] = self.reach
+        self.fails[key] = (self.vm.latest_fail_pos, self.vm.latest_fail_message)
+        reach, fail_pos, fail_message = self.calls.pop()
+        self.reach = max(reach, self.reach)
+        if fail_pos > self.vm.latest_fail_pos:
+            self.vm.latest_fail_pos, self.vm.latest_fail_message = (fail_pos, fail_message)
+
+    def edit(self, offset, removed, inserted):
+        end = offset+removed
+        shift = len(inserted)-removed
+        entries = [
+            (
+                key,
+                value,
+                self.reaches.get(key, key//self.stride+1),
+                self.fails.get(key, (tuple(), None))
+            )
+            for key, value in self.items()
+        ]
+        self.clear()
+        self.reaches.clear()
+        self.fails.clear()
+        for key, value, reach, (fail_pos, fail_message) in entries:
+            if key//self.stride >= end:
+                key += shift*self.stride
+                reach += shift
+                if isinstance(value, tuple) and value[0] is not None:
+                    value = (value[0], value[1]+shift)
+                if fail_pos:
+                    fail_pos = (fail_pos[0]+shift,)+fail_pos[1:]
+            elif reach > offset:
+                continue
+            dict.__setitem__(self, key, value)
+            self.reaches[key] = reach
+            self.fails[key] = (fail_pos, fail_message)
+
+def REACH_(fn, extent):
+    def reach(vm, arg):
+        if vm.pos_rest:
+            return fn(vm, arg)
+        memo = vm.memo
+        memo.reach = max(memo.reach, vm.pos+extent(arg))
+        result = fn(vm, arg)
+        if fn is MATCH_STAR:
+            memo.reach = max(memo.reach, vm.pos+1)
+        return result
+    return reach
+
+class InputWindow(object):
+
+    def __init__(self, file, chunk_size=INPUT_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.offset = 0
+        self.eof = False
+        self.code = None
+
+    def attach(self, code):
+        if code is not self.code:
+            self.code = code
+            self.filling_code = [
+                (FILL_(fn, len if fn is MATCH_STRING else lambda arg: 1), arg)
+                if fn in STREAM_OPS else (fn, arg)
+                for fn, arg in code
+            ]
+        return self.filling_code
+
+    def fill(self, end):
+        while len(self) < end and not self.eof:
+            self.read()
+
+    def read(self):
+        chunk = self.file.read(self.chunk_size)
+        if chunk:
+            self.buffer += chunk
+        else:
+            self.eof = True
+
+    def release(self, pos):
+        if pos-self.offset >= self.chunk_size:
+            self.buffer = self.buffer[pos-self.offset:]
+            self.offset = pos
+
+    def match_star(self, pattern, pos):
+        end = pos
+        while True:
+            end = pattern.match(self.buffer, end-self.offset).end()+self.offset
+            if end < len(self) or self.eof:
+                return end
+            self.read()
+
+    def __len__(self):
+        return self.offset+len(self.buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop = (index.start, index.stop)
+        else:
+            start, stop = (index, None)
+        if start < self.offset:
+            raise IndexError("position {} is no longer buffered".format(start))
+        if stop is None:
+            return self.buffer[start-self.offset]
+        return self.buffer[start-self.offset:stop-self.offset]
+
+def FILL_(fn, extent):
+    def fill(vm, arg):
+        if not vm.pos_rest:
+            end = vm.pos+extent(arg)
+            if end > len(vm.stream) and not vm.stream.eof:
+                RELEASE_(vm)
+                vm.stream.fill(end)
+        return fn(vm, arg)
+    return fill
+
+def RELEASE_(vm):
+    floor = vm.pos
+    for entry in vm.call_backtrack_stack:
+        if len(entry) == 8 and entry[1] is vm.stream:
+            floor = entry[4]
+            break
+    vm.stream.release(floor)
+
+class Profile(object):
 
-def PUSH_SCOPE(vm):
+    def __init__(self):
+        self.rules = {}
+        self.opcodes = {}
+        self.stacks = {}
+        self.backtrack_sites = {}
+        self.frames = []
+        self.codes = {}
+
+    def attach(self, vm, code, start_rule):
+        if id(code) not in self.codes:
+            names = {
+                pc: "{}.{}".format(vm.name, rule)
+                for rule, (pc, _) in vm.rules.items()
+            }
+            sites = backtrack_sites(vm.code, names)
+            self.codes[id(code)] = (code, [
+                (self.profiled(original, fn, names, sites), arg)
+                for (original, _), (fn, arg) in zip(vm.code, code)
+            ])
+        self.count("{}.{}".format(vm.name, start_rule), "calls")
+        self.enter("{}.{}".format(vm.name, start_rule), -1)
+        return self.codes[id(code)][1]
+
+    def profiled(self, original, fn, names, sites):
+        name = original.__name__
+        def op(vm, arg):
+            self.opcodes[name] = self.opcodes.get(name, 0) + 1
+            depth = len(vm.call_backtrack_stack)
+            top_pos = vm.pos_rest[0] if vm.pos_rest else vm.pos
+            callee, pos = (None, vm.pos)
+            if original is CALL:
+                callee = arg
+            elif original is MATCH_CALL_RULE:
+                if (pos < len(vm.stream) and
+                        not isinstance(vm.stream[pos], list) and
+                        vm.stream[pos] in vm.rules):
+                    callee, pos = (vm.rules[vm.stream[pos]], pos+1)
+            hit = (
+                callee is not None and callee[1] and
+                dict.__contains__(vm.memo, pos*vm.memo_stride+callee[0])
+            )
+            try:
+                result = fn(vm, arg)
+            except MatchError:
+                self.leave(-1)
+                raise
+            if hit:
+                self.count(names[callee[0]], "calls", "memo_hits")
+            elif callee is not None and len(vm.call_backtrack_stack) > depth:
+                if callee[1]:
+                    self.count(names[callee[0]], "calls", "memo_misses")
+                else:
+                    self.count(names[callee[0]], "calls")
+                self.enter(names[callee[0]], depth)
+            if (len(vm.call_backtrack_stack) < depth and
+                    original is not RETURN and
+                    original is not COMMIT):
+                self.count(self.frames[-1][0], "backtracks")
+                if vm.pc in sites:
+                    self.backtracked(
+                        sites[vm.pc],
+                        top_pos-(vm.pos_rest[0] if vm.pos_rest else vm.pos)
+                    )
+            self.leave(-1 if result else len(vm.call_backtrack_stack))
+            return result
+        return op
+
+    def enter(self, name, depth):
+        path = name if depth < 0 else "{};{}".format(self.frames[-1][4], name)
+        self.frames.append([name, depth, time.perf_counter(), 0, path])
+
+    def leave(self, depth):
+        while self.frames and self.frames[-1][1] >= depth:
+            name, _, start, children, path = self.frames.pop()
+            elapsed = time.perf_counter()-start
+            self.stats(name)["total_seconds"] += elapsed
+            self.stats(name)["self_seconds"] += elapsed-children
+            self.stacks[path] = self.stacks.get(path, 0)+elapsed-children
+            if self.frames:
+                self.frames[-1][3] += elapsed
+
+    def count(self, name, *counters):
+        for counter in counters:
+            self.stats(name)[counter] += 1
+
+    def stats(self, name):
+        if name not in self.rules:
+            self.rules[name] = dict.fromkeys(PROFILE_COUNTERS, 0)
+        return self.rules[name]
+
+    def backtracked(self, site, wasted):
+        if site not in self.backtrack_sites:
+            self.backtrack_sites[site] = [0, 0, 0]
+        counts = self.backtrack_sites[site]
+        counts[0] += 1
+        counts[1] += wasted
+        counts[2] = max(counts[2], wasted)
+
+    def report(self):
+        lines = ["{:<32} {:>8} {:>10} {:>12} {:>10} {:>10} {:>10}".format(
+            "rule", "calls", "memo hits", "memo misses", "backtracks", "total", "self"
+        )]
+        for name, counts in sorted(
+            self.rules.items(),
+            key=lambda item: -item[1]["self_seconds"]
+        ):
+            lines.append("{:<32} {:>8} {:>10} {:>12} {:>10} {:>9.3f}s {:>9.3f}s".format(
+                name,
+                counts["calls"],
+                counts["memo_hits"],
+                counts["memo_misses"],
+                counts["backtracks"],
+                counts["total_seconds"],
+                counts["self_seconds"]
+            ))
+        lines.append("")
+        lines.append("{:<32} {:>12}".format("opcode", "count"))
+        for name, count in sorted(self.opcodes.items(), key=lambda item: -item[1]):
+            lines.append("{:<32} {:>12}".format(name, count))
+        return "\n".join(lines)+"\n"
+
+    def backtrack_report(self, sources=[]):
+        lines = rule_lines(sources)
+        report = ["{:<24} {:<48} {:>8} {:>10} {:>8}".format(
+            "line", "site", "fails", "wasted", "max"
+        )]
+        for (rule, site), (fails, wasted, longest) in sorted(
+            self.backtrack_sites.items(),
+            key=lambda item: (-item[1][1], -item[1][0])
+        ):
+            report.append("{:<24} {:<48} {:>8} {:>10} {:>8}".format(
+                lines.get(rule, rule),
+                "{} {}".format(rule, site),
+                fails,
+                wasted,
+                longest
+            ))
+        return "\n".join(report)+"\n"
+
+    def collapsed_stacks(self):
+        return "".join(
+            "{} {}\n".format(path, round(seconds*1000000))
+            for path, seconds in sorted(self.stacks.items())
+        )
+
+def backtrack_sites(code, names):
+    starts = sorted(names)
+    alternatives = {}
+    ordinals = {}
+    sites = {}
+    for pc, (fn, arg) in enumerate(code):
+        if fn is not BACKTRACK:
+            continue
+        rule = names[max(start for start in starts if start <= pc)]
+        if pc > 0 and code[pc-1][0] is LIST_START:
+            kind = "star"
+        elif code[arg-1] == (FAIL, "no match"):
+            kind = "not"
+        elif pc in alternatives or code[pc-1][0] is LOOKAHEAD and pc-1 in alternatives:
+            ordinal, alternative = alternatives.get(pc) or alternatives[pc-1]
+            alternatives[arg] = (ordinal, alternative+1)
+            sites[arg] = (rule, "or #{} alternative {}".format(ordinal, alternative+1))
+            continue
+        else:
+            kind = "or"
+        ordinals[(rule, kind)] = ordinals.get((rule, kind), 0) + 1
+        if kind == "or":
+            alternatives[arg] = (ordinals[(rule, kind)], 1)
+            sites[arg] = (rule, "or #{} alternative 1".format(ordinals[(rule, kind)]))
+        else:
+            sites[arg] = (rule, "{} #{}".format(kind, ordinals[(rule, kind)]))
+    return sites
+
+def rule_lines(sources):
+    lines = {}
+    for path, source in sources:
+        grammar = None
+        for match in re.finditer(r"(@\w+\s+)?(\w+)\s*([{=])", source):
+            name = match.group(2)
+            if match.group(3) == "{":
+                grammar = name
+            elif grammar is not None:
+                lines.setdefault(
+                    "{}.{}".format(grammar, name),
+                    "{}:{}".format(path, source.count("\n", 0, match.start(2))+1)
+                )
+    return lines
+
+PROFILE_COUNTERS = [
+    "calls",
+    "memo_hits",
+    "memo_misses",
+    "backtracks",
+    "total_seconds",
+    "self_seconds",
+]
+
+def PUSH_SCOPE(vm, arg):
     vm.scope_rest = (vm.scope, vm.scope_rest)
     vm.scope = {}
 
-def POP_SCOPE(vm):
+def POP_SCOPE(vm, arg):
     vm.scope, vm.scope_rest = vm.scope_rest
 
-def BACKTRACK(vm):
+def BACKTRACK(vm, pc):
     vm.call_backtrack_stack.append((
-        vm.pop_arg(), vm.stream, vm.stream_rest, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest
+        pc, vm.stream, vm.stream_rest, vm.memo, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest
     ))
 
-def COMMIT(vm):
+def COMMIT(vm, pc):
     vm.call_backtrack_stack.pop()
-    vm.pc = vm.pop_arg()
+    vm.pc = pc
+
+def CUT(vm, arg):
+    call_backtrack_stack = vm.call_backtrack_stack
+    index = len(call_backtrack_stack)-1
+    while index >= 0 and len(call_backtrack_stack[index]) == 8:
+        call_backtrack_stack[index] = CUT_ENTRY
+        index -= 1
 
-def CALL(vm):
-    CALL_(vm, vm.pop_arg())
+# Cut entries keep COMMIT pops balanced, but FAIL_, EVICT_, and RELEASE_
+# skip them like calls without memo.
+CUT_ENTRY = (None, None, None)
 
-def CALL_(vm, pc):
-    key = (pc, vm.pos_rest+(vm.pos,))
+def CALL(vm, arg):
+    pc, memoize = arg
+    if not memoize:
+        vm.call_backtrack_stack.append((vm.pc, None, None))
+        vm.pc = pc
+        return
+    key = vm.pos*vm.memo_stride+pc
     if key in vm.memo:
+        if vm.memo_limit is not None:
+            dict.__setitem__(vm.memo, key, dict.pop(vm.memo, key))
         if vm.memo[key][0] is None:
             FAIL_(vm, vm.memo[key][1])
         else:
-            vm.action, vm.stream, vm.stream_rest, vm.pos, vm.pos_rest = vm.memo[key]
+            vm.action, vm.pos = vm.memo[key]
     else:
-        vm.call_backtrack_stack.append((vm.pc, key))
+        vm.call_backtrack_stack.append((vm.pc, vm.memo, key))
         vm.pc = pc
 
-def RETURN(vm):
+def RETURN(vm, arg):
     if not vm.call_backtrack_stack:
         return vm.action
-    vm.pc, key = vm.call_backtrack_stack.pop()
-    vm.memo[key] = (vm.action, vm.stream, vm.stream_rest, vm.pos, vm.pos_rest)
+    vm.pc, memo, key = vm.call_backtrack_stack.pop()
+    if memo is not None:
+        memo[key] = (vm.action, vm.pos)
+        if len(memo) > vm.memo_evict_size:
+            EVICT_(vm, memo)
 
-def MATCH(vm):
-    object_description = vm.pop_arg()
-    fn = vm.pop_arg()
+def EVICT_(vm, memo):
+    floor = vm.pos
+    for entry in vm.call_backtrack_stack:
+        if len(entry) == 8 and entry[3] is memo:
+            floor = entry[4]
+            break
+    floor_key = floor*vm.memo_stride
+    for key in [key for key in memo if key < floor_key]:
+        del memo[key]
+    vm.memo_evict_size = 2*len(memo)+MEMO_EVICT_SIZE
+    if vm.memo_limit is not None:
+        for key in list(memo)[:len(memo)-vm.memo_limit//2]:
+            del memo[key]
+        vm.memo_evict_size = min(vm.memo_evict_size, vm.memo_limit)
+
+def LOOKAHEAD(vm, arg):
+    keys, pc = arg
+    if (vm.pos >= len(vm.stream) or
+            isinstance(vm.stream[vm.pos], list) or
+            vm.stream[vm.pos] not in keys):
+        vm.pc = pc
+
+def MATCH(vm, arg):
+    object_description, fn, _ = arg
     MATCH_(vm, fn, ("expected {}", object_description))
 
 def MATCH_(vm, fn, message):
     if vm.pos >= len(vm.stream) or not fn(vm.stream[vm.pos]):
         FAIL_(vm, message)
     else:
-        vm.action = SemanticAction(vm.stream[vm.pos])
+        vm.action = value_action(vm.stream[vm.pos])
         vm.pos += 1
         return True
 
-def MATCH_CALL_RULE(vm):
+def MATCH_STRING(vm, string):
+    index = mismatch(vm.stream, vm.pos, string)
+    if index is None:
+        vm.action = value_action(string[-1])
+        vm.pos += len(string)
+    else:
+        vm.pos += index
+        FAIL_(vm, ("expected {}", string[index]))
+
+def MATCH_SET(vm, arg):
+    object_description, keys = arg
+    if (vm.pos >= len(vm.stream) or
+            isinstance(vm.stream[vm.pos], list) or
+            vm.stream[vm.pos] not in keys):
+        FAIL_(vm, ("expected {}", object_description))
+    else:
+        vm.action = value_action(vm.stream[vm.pos])
+        vm.pos += 1
+
+def MATCH_STAR(vm, arg):
+    object_description, keys, pattern = arg
+    start, vm.pos = (vm.pos, match_star(vm.stream, vm.pos, keys, pattern))
+    vm.action = SemanticAction(vm.stream[start:vm.pos], eval_slice)
+    LATEST_FAIL_(vm, ("expected {}", object_description))
+
+def MATCH_CALL_RULE(vm, arg):
     if MATCH_(vm, lambda x: x in vm.rules, ("expected rule name",)):
-        CALL_(vm, vm.rules[vm.action.value])
+        CALL(vm, vm.rules[vm.action.value])
 
-def LIST_START(vm):
+def LIST_START(vm, arg):
     vm.scope_rest = (vm.scope, vm.scope_rest)
     vm.scope = []
 
-def LIST_APPEND(vm):
+def LIST_APPEND(vm, arg):
     vm.scope.append(vm.action)
 
-def LIST_END(vm):
-    vm.action = SemanticAction(vm.scope, lambda self: [x.eval(self.runtime) for x in self.value])
+def LIST_END(vm, arg):
+    vm.action = SemanticAction(vm.scope, eval_list)
     vm.scope, vm.scope_rest = vm.scope_rest
 
-def BIND(vm):
-    vm.scope[vm.pop_arg()] = vm.action
+def BIND(vm, name):
+    vm.scope[name] = vm.action
 
-def ACTION(vm):
-    vm.action = SemanticAction(vm.scope, vm.pop_arg())
+def ACTION(vm, fn):
+    vm.action = SemanticAction(vm.scope, fn)
 
-def PUSH_STREAM(vm):
+def PUSH_STREAM(vm, arg):
     if vm.pos >= len(vm.stream) or not isinstance(vm.stream[vm.pos], list):
         FAIL_(vm, ("expected list",))
     else:
-        vm.stream_rest = (vm.stream, vm.stream_rest)
+        vm.stream_rest = (vm.stream, vm.memo, vm.stream_rest)
         vm.pos_rest = vm.pos_rest + (vm.pos,)
+        key = (vm.pos+1)*vm.memo_stride-1
+        memo = vm.memo.get(key)
+        if memo is None:
+            memo = {}
+            dict.__setitem__(vm.memo, key, memo)
         vm.stream = vm.stream[vm.pos]
+        vm.memo = memo
         vm.pos = 0
 
-def POP_STREAM(vm):
+def POP_STREAM(vm, arg):
     if vm.pos < len(vm.stream):
         FAIL_(vm, ("expected end of list",))
     else:
-        vm.stream, vm.stream_rest = vm.stream_rest
+        vm.stream, vm.memo, vm.stream_rest = vm.stream_rest
         vm.pos, vm.pos_rest = vm.pos_rest[-1], vm.pos_rest[:-1]
         vm.pos += 1
 
-def FAIL(vm):
-    FAIL_(vm, (vm.pop_arg(),))
+def MATCH_BYTE(vm, arg):
+    object_description, fn = arg
+    if vm.pos >= len(vm.stream) or not fn(vm.stream[vm.pos]):
+        FAIL_(vm, ("expected {}", object_description))
+    else:
+        vm.action = BYTE_ACTIONS[vm.stream[vm.pos]]
+        vm.pos += 1
+
+def MATCH_BYTES(vm, arg):
+    string, encoded = arg
+    index = mismatch(vm.stream, vm.pos, encoded)
+    if index is None:
+        vm.action = BYTE_ACTIONS[encoded[-1]]
+        vm.pos += len(encoded)
+    else:
+        vm.pos += index
+        FAIL_(vm, ("expected {}", string[index]))
+
+def MATCH_BYTE_SET(vm, arg):
+    object_description, keys = arg
+    if vm.pos >= len(vm.stream) or vm.stream[vm.pos] not in keys:
+        FAIL_(vm, ("expected {}", object_description))
+    else:
+        vm.action = BYTE_ACTIONS[vm.stream[vm.pos]]
+        vm.pos += 1
+
+def MATCH_BYTE_STAR(vm, arg):
+    object_description, keys, pattern = arg
+    start, vm.pos = (vm.pos, pattern.match(vm.stream, vm.pos).end())
+    vm.action = ValueAction(ByteSlice(vm.stream[start:vm.pos]))
+    LATEST_FAIL_(vm, ("expected {}", object_description))
+
+def FAIL(vm, message):
+    FAIL_(vm, (message,))
 
 def FAIL_(vm, fail_message):
-    fail_pos = vm.pos_rest+(vm.pos,)
-    if fail_pos >= vm.latest_fail_pos:
-        vm.latest_fail_message = fail_message
-        vm.latest_fail_pos = fail_pos
+    LATEST_FAIL_(vm, fail_message)
     call_backtrack_entry = tuple()
     while vm.call_backtrack_stack:
         call_backtrack_entry = vm.call_backtrack_stack.pop()
-        if len(call_backtrack_entry) == 7:
+        if len(call_backtrack_entry) == 8:
             break
         else:
-            vm.memo[call_backtrack_entry[1]] = (None, fail_message)
-    if len(call_backtrack_entry) != 7:
+            _, memo, key = call_backtrack_entry
+            if memo is not None:
+                memo[key] = (None, fail_message)
+    if len(call_backtrack_entry) != 8:
         raise MatchError(
             vm.latest_fail_message[0].format(*vm.latest_fail_message[1:]),
             vm.latest_fail_pos[-1],
             vm.stream
         )
-    (vm.pc, vm.stream, vm.stream_rest, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest) = call_backtrack_entry
+    (vm.pc, vm.stream, vm.stream_rest, vm.memo, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest) = call_backtrack_entry
+
+def LATEST_FAIL_(vm, fail_message):
+    fail_pos = vm.pos_rest+(vm.pos,)
+    if fail_pos >= vm.latest_fail_pos:
+        vm.latest_fail_message = fail_message
+        vm.latest_fail_pos = fail_pos
+
+STREAM_OPS = {
+    LOOKAHEAD,
+    MATCH,
+    MATCH_STRING,
+    MATCH_SET,
+    MATCH_STAR,
+    MATCH_CALL_RULE,
+    PUSH_STREAM,
+}
+
+BYTES_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+BYTES_CODES = {}
+
+def bytes_code(code):
+    if id(code) not in BYTES_CODES:
+        BYTES_CODES[id(code)] = (code, [
+            BYTES_OPS[fn](arg) if fn in BYTES_OPS else (fn, arg)
+            for fn, arg in code
+        ])
+    return BYTES_CODES[id(code)][1]
+
+def byte_predicate(bounds):
+    if bounds is None:
+        return lambda x: True
+    low, high = (ord(bounds[0]), ord(bounds[1]))
+    return lambda x: low <= x <= high
+
+def byte_keys(keys):
+    return frozenset(
+        ord(key) for key in keys
+        if isinstance(key, str) and len(key) == 1 and ord(key) < 256
+    )
+
+def byte_class(keys):
+    if not keys:
+        return re.compile(b"")
+    return re.compile(b"[" + b"".join(re.escape(bytes([key])) for key in sorted(keys)) + b"]*")
+
+def byte_string(string):
+    if all(ord(char) < 256 for char in string):
+        return string.encode("latin-1")
+    return tuple(ord(char) for char in string)
+
+BYTES_OPS = {
+    MATCH: lambda arg: (MATCH_BYTE, (arg[0], byte_predicate(arg[2]))),
+    MATCH_STRING: lambda arg: (MATCH_BYTES, (arg, byte_string(arg))),
+    MATCH_SET: lambda arg: (MATCH_BYTE_SET, (arg[0], byte_keys(arg[1]))),
+    MATCH_STAR: lambda arg: (MATCH_BYTE_STAR, (
+        arg[0], byte_keys(arg[1]), byte_class(byte_keys(arg[1]))
+    )),
+    LOOKAHEAD: lambda arg: (LOOKAHEAD, (byte_keys(arg[0]), arg[1])),
+}
 
 class SemanticAction(object):
 
+    __slots__ = ["value", "fn", "runtime"]
+
     def __init__(self, value, fn=lambda self: self.value):
         self.value = value
         self.fn = fn
@@ -154,6 +708,64 @@ class SemanticAction(object):
         else:
             return self.runtime[name]
 
+class ValueAction(object):
+
+    __slots__ = ["value"]
+
+    def __init__(self, value):
+        self.value = value
+
+    def eval(self, runtime):
+        return self.value
+
+NONE_ACTION = ValueAction(None)
+
+CHARACTER_ACTIONS = {chr(x): ValueAction(chr(x)) for x in range(256)}
+
+BYTES = [bytes([x]) for x in range(256)]
+
+BYTE_ACTIONS = [ValueAction(x) for x in BYTES]
+
+def value_action(value):
+    if value.__class__ is str and value in CHARACTER_ACTIONS:
+        return CHARACTER_ACTIONS[value]
+    return ValueAction(value)
+
+def eval_list(self):
+    return [x.eval(self.runtime) for x in self.value]
+
+def eval_slice(self):
+    return list(self.value)
+
+class ByteSlice(object):
+
+    __slots__ = ["buffer"]
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __iter__(self):
+        return (BYTES[x] for x in self.buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ByteSlice(self.buffer[index])
+        return BYTES[self.buffer[index]]
+
+    def __eq__(self, other):
+        if isinstance(other, ByteSlice):
+            return self.buffer == other.buffer
+        return list(self) == other
+
+    def __bytes__(self):
+        return bytes(self.buffer)
+
+    def __repr__(self):
+        return "ByteSlice({!r})".format(bytes(self.buffer))
+
 class MatchError(Exception):
 
     def __init__(self, message, pos, stream):
@@ -164,8 +776,8 @@ class MatchError(Exception):
 
 class Grammar(object):
 
-    def run(self, rule, stream, runtime={}):
-        return Runtime(self, dict(runtime, **{
+    def run(self, rule, stream, runtime={}, memo=None, profile=None, rope=False):
+        runtime = Runtime(self, dict(runtime, **{
             "label": Counter(),
             "indentprefix": "    ",
             "list": list,
@@ -176,19 +788,102 @@ class Grammar(object):
             "len": len,
             "repr": repr,
             "join": join,
-        })).run(rule, stream)
+        }), profile=profile)
+        result = self.match(rule, stream, memo, profile).eval(runtime)
+        return result if rope else materialize(result)
+
+    memo_limit = None
+
+    removed = {}
+
+    def match(self, rule, stream, memo=None, profile=None):
+        if rule not in self.rules:
+            raise unknown_rule(self, rule)
+        return VM(
+            self.code,
+            self.rules,
+            self.memo_limit,
+            self.__class__.__name__
+        ).run(rule, stream, memo, profile)
+
+class FunctionGrammar(Grammar):
+
+    def match(self, rule, stream, memo=None, profile=None):
+        if rule not in self.rules:
+            raise unknown_rule(self, rule)
+        if profile is not None:
+            raise ValueError("profiling needs the vm backend")
+        self.memo = {}
+        self.pos_rest = tuple()
+        self.latest_fail_message, self.latest_fail_pos = (None, tuple())
+        ok, pos, action = self.rules[rule](self, stream, 0)
+        if not ok:
+            raise MatchError(
+                self.latest_fail_message[0].format(*self.latest_fail_message[1:]),
+                self.latest_fail_pos[-1],
+                stream
+            )
+        return action
 
-class Runtime(dict):
+    def match_string(self, stream, pos, action, string):
+        index = mismatch(stream, pos, string)
+        if index is None:
+            return (True, pos+len(string), value_action(string[-1]))
+        return (self.fail(pos+index, ("expected {}", string[index])), pos, action)
 
-    def __init__(self, grammar, values):
-        dict.__init__(self, dict(values, run=self.run))
+    def match_star(self, stream, pos, char_class):
+        object_description, keys, pattern = char_class
+        end = match_star(stream, pos, keys, pattern)
+        self.fail(end, ("expected {}", object_description))
+        return (True, end, SemanticAction(stream[pos:end], eval_slice))
+
+    def fail(self, pos, fail_message):
+        fail_pos = self.pos_rest+(pos,)
+        if fail_pos >= self.latest_fail_pos:
+            self.latest_fail_message = fail_message
+            self.latest_fail_pos = fail_pos
+        return False
+
+def unknown_rule(grammar, rule):
+    if rule in grammar.removed:
+        return KeyError("{}.{} was {}".format(
+            grammar.__class__.__name__,
+            rule,
+            grammar.removed[rule]
+        ))
+    return KeyError(rule)
+
+class Runtime(object):
+
+    def __init__(self, grammar, values, parent=None, profile=None):
         self.grammar = grammar
+        self.values = dict(values, run=self.run)
+        self.parent = parent
+        self.profile = profile
+        self.depth = 0 if parent is None else parent.depth+1
 
     def set(self, key, value):
-        return Runtime(self.grammar, dict(self, **{key: value}))
+        if self.depth >= RUNTIME_MAX_DEPTH:
+            return Runtime(self.grammar, dict(self.flatten(), **{key: value}), profile=self.profile)
+        return Runtime(self.grammar, {key: value}, self, self.profile)
+
+    def flatten(self):
+        if self.parent is None:
+            return dict(self.values)
+        values = self.parent.flatten()
+        values.update(self.values)
+        return values
+
+    def __getitem__(self, key):
+        runtime = self
+        while key not in runtime.values:
+            runtime = runtime.parent
+            if runtime is None:
+                raise KeyError(key)
+        return runtime.values[key]
 
     def run(self, rule, stream):
-        return VM(self.grammar.code, self.grammar.rules).run(rule, stream).eval(self)
+        return self.grammar.match(rule, stream, profile=self.profile).eval(self)
 
 class Counter(object):
 
@@ -200,6 +895,37 @@ class Counter(object):
         self.value += 1
         return result
 
+def mismatch(stream, pos, string):
+    if stream[pos:pos+len(string)] == string:
+        return None
+    for index, item in enumerate(string):
+        if pos+index >= len(stream) or stream[pos+index] != item:
+            return index
+
+def char_eq(x):
+    return (x, lambda item: item == x, (x, x))
+
+def char_range(x, y):
+    return ("range {!r}-{!r}".format(x, y), lambda item: x <= item <= y, (x, y))
+
+CHAR_ANY = ("any", lambda item: True, None)
+
+def char_class(description, keys):
+    return (
+        description,
+        frozenset(keys),
+        re.compile("[{}]*".format("".join(re.escape(key) for key in keys)))
+    )
+
+def match_star(stream, pos, keys, pattern):
+    if isinstance(stream, str):
+        return pattern.match(stream, pos).end()
+    if isinstance(stream, InputWindow):
+        return stream.match_star(pattern, pos)
+    while pos < len(stream) and not isinstance(stream[pos], list) and stream[pos] in keys:
+        pos += 1
+    return pos
+
 def splice(depth, item):
     if depth == 0:
         return [item]
@@ -210,1447 +936,2128 @@ def concat(lists):
     return [x for xs in lists for x in xs]
 
 def join(items, delimiter=""):
-    return delimiter.join(
-        join(item, delimiter) if isinstance(item, list) else str(item)
-        for item in items
+    parts = []
+    rope = False
+    binary = False
+    for item in items:
+        if isinstance(item, list):
+            item = join(item, delimiter)
+        if item.__class__ is str:
+            pass
+        elif isinstance(item, Text):
+            rope = True
+        elif isinstance(item, ByteSlice):
+            item, binary = (item.buffer, True)
+        elif isinstance(item, BYTES_TYPES):
+            binary = True
+        else:
+            item = str(item)
+        if parts and delimiter:
+            parts.append(delimiter)
+        parts.append(item)
+    if rope:
+        return Text(parts)
+    if binary:
+        return join_bytes(parts)
+    return "".join(parts)
+
+def join_bytes(parts):
+    if len(parts) == 1:
+        return parts[0]
+    return b"".join(
+        part.encode("latin-1") if isinstance(part, str) else part
+        for part in parts
     )
 
 def indent(text, prefix="    "):
-    return "".join(prefix+line for line in text.splitlines(True))
+    return Text([text], prefix)
+
+class Text(object):
+
+    __slots__ = ["parts", "prefix"]
+
+    def __init__(self, parts, prefix=None):
+        self.parts = parts
+        self.prefix = prefix
+
+    def write(self, writer):
+        if self.prefix is not None:
+            writer.indent(self.prefix)
+        for part in self.parts:
+            if isinstance(part, Text):
+                part.write(writer)
+            else:
+                writer.write(part)
+        if self.prefix is not None:
+            writer.dedent()
+
+    def __str__(self):
+        chunks = []
+        write_text(self, chunks.append)
+        return "".join(chunks)
+
+    def __repr__(self):
+        return repr(str(self))
+
+class Writer(object):
+
+    def __init__(self, output):
+        self.output = output
+        self.chunks = []
+        self.prefixes = []
+        self.pending = 0
+
+    def indent(self, prefix):
+        self.prefixes.append(prefix)
+        self.pending = min(self.pending, len(self.prefixes)-1)
+
+    def dedent(self):
+        self.prefixes.pop()
+        self.pending = min(self.pending, len(self.prefixes))
+
+    def write(self, text):
+        start = 0
+        while start < len(text):
+            if self.pending < len(self.prefixes):
+                self.chunks.extend(self.prefixes[self.pending:])
+                self.pending = len(self.prefixes)
+            end = text.find("\n", start)+1 or len(text)
+            self.chunks.append(text[start:end])
+            if text[end-1] == "\n":
+                self.pending = 0
+            start = end
+        if len(self.chunks) > WRITER_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.output("".join(self.chunks))
+        self.chunks = []
+
+def materialize(text):
+    if isinstance(text, Text):
+        return str(text)
+    return text
+
+def write_text(text, output):
+    if isinstance(text, Text):
+        writer = Writer(output)
+        text.write(writer)
+        writer.flush()
+    else:
+        output(str(text))
 
-def compile_chain(grammars, source):
+def compile_chain(grammars, source, memo=None, profile=None, rope=False):
     import os
     import sys
     import pprint
     for grammar, rule in grammars:
         try:
-            source = grammar().run(rule, source)
+            if isinstance(grammar, type) and issubclass(grammar, Grammar):
+                source = grammar().run(rule, source, memo=memo, profile=profile, rope=rope)
+            else:
+                source = grammar().run(rule, source)
+            memo = None
         except MatchError as e:
             marker = "<ERROR POSITION>"
             if os.isatty(sys.stderr.fileno()):
                 marker = f"\033[0;31m{marker}\033[0m"
-            if isinstance(e.stream, str):
-                stream_string = e.stream[:e.pos] + marker + e.stream[e.pos:]
+            stream, pos = (e.stream, e.pos)
+            if isinstance(stream, InputWindow):
+                stream, pos = (stream.buffer, max(0, pos-stream.offset))
+            elif isinstance(stream, BYTES_TYPES):
+                stream = bytes(stream).decode("latin-1")
+            if isinstance(stream, str):
+                stream_string = stream[:pos] + marker + stream[pos:]
             else:
-                stream_string = pprint.pformat(e.stream)
+                stream_string = pprint.pformat(stream)
             sys.exit("ERROR: {}\nPOSITION: {}\nSTREAM:\n{}".format(
                 e.message,
                 e.pos,
                 indent(stream_string)
             ))
     return source
+
+def load_compiled(source, filename="<rlmeta>", cache_dir=None, namespace=None):
+    import hashlib
+    import importlib.util
+    import marshal
+    import os
+    if namespace is None:
+        namespace = {"__name__": filename}
+    if cache_dir is None:
+        code = compile(source, filename, "exec")
+    else:
+        key = hashlib.sha256(importlib.util.MAGIC_NUMBER)
+        key.update(b"\0"+filename.encode("utf-8"))
+        key.update(b"\0"+source.encode("utf-8"))
+        path = os.path.join(cache_dir, key.hexdigest()+".marshal")
+        try:
+            with open(path, "rb") as f:
+                code = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            code = compile(source, filename, "exec")
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path+".tmp", "wb") as f:
+                marshal.dump(code, f)
+            os.replace(path+".tmp", path)
+    exec(code, namespace)
+    return namespace
 class Parser(Grammar):
     rules = {
-        'file': 0,
-        'grammar': 31,
-        'rule': 61,
-        'choice': 79,
-        'sequence': 117,
-        'expr': 137,
-        'expr1': 163,
-        'expr2': 232,
-        'matchChar': 377,
-        'maybeAction': 386,
-        'actionExpr': 403,
-        'hostExpr': 463,
-        'hostListItem': 575,
-        'formatExpr': 598,
-        'var': 632,
-        'string': 654,
-        'char': 687,
-        'innerChar': 711,
-        'escape': 728,
-        'name': 769,
-        'nameStart': 791,
-        'nameChar': 806,
-        'space': 830
+        'file': (0, False),
+        'grammar': (23, True),
+        'rule': (44, True),
+        'memo': (58, False),
+        'choice': (77, True),
+        'sequence': (105, True),
+        'expr': (118, True),
+        'expr1': (134, False),
+        'expr2': (177, True),
+        'matchChar': (261, False),
+        'maybeAction': (267, False),
+        'actionExpr': (279, True),
+        'hostExpr': (309, True),
+        'hostListItem': (377, True),
+        'formatExpr': (388, True),
+        'var': (413, False),
+        'string': (428, True),
+        'char': (447, True),
+        'innerChar': (459, True),
+        'escape': (470, False),
+        'name': (496, False),
+        'nameStart': (507, False),
+        'nameChar': (509, False),
+        'space': (511, False)
     }
+    removed = {}
     code = [
-        PUSH_SCOPE,
-        LIST_START,
-        BACKTRACK,
-        13,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        CALL,
-        31,
-        POP_SCOPE,
-        LIST_APPEND,
-        COMMIT,
-        2,
-        LIST_END,
-        BIND,
-        'xs',
-        CALL,
-        830,
-        BACKTRACK,
-        27,
-        MATCH,
-        'any',
-        lambda x: True,
-        COMMIT,
-        25,
-        FAIL,
-        'no match',
-        ACTION,
-        lambda self: self.lookup('xs'),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        769,
-        BIND,
-        'x',
-        CALL,
-        830,
-        MATCH,
-        '{',
-        lambda x: x == '{',
-        LIST_START,
-        BACKTRACK,
-        49,
-        CALL,
-        61,
-        LIST_APPEND,
-        COMMIT,
-        42,
-        LIST_END,
-        BIND,
-        'ys',
-        CALL,
-        830,
-        MATCH,
-        '}',
-        lambda x: x == '}',
-        ACTION,
-        lambda self: concat([splice(0, 'Grammar'), splice(0, self.lookup('x')), splice(1, self.lookup('ys'))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        769,
-        BIND,
-        'x',
-        CALL,
-        830,
-        MATCH,
-        '=',
-        lambda x: x == '=',
-        CALL,
-        79,
-        BIND,
-        'y',
-        ACTION,
-        lambda self: concat([splice(0, 'Rule'), splice(0, self.lookup('x')), splice(0, self.lookup('y'))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        BACKTRACK,
-        91,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '|',
-        lambda x: x == '|',
-        POP_SCOPE,
-        COMMIT,
-        91,
-        CALL,
-        117,
-        BIND,
-        'x',
-        LIST_START,
-        BACKTRACK,
-        110,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '|',
-        lambda x: x == '|',
-        CALL,
-        117,
-        POP_SCOPE,
-        LIST_APPEND,
-        COMMIT,
-        96,
-        LIST_END,
-        BIND,
-        'xs',
-        ACTION,
-        lambda self: concat([splice(0, 'Or'), splice(0, self.lookup('x')), splice(1, self.lookup('xs'))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        LIST_START,
-        BACKTRACK,
-        126,
-        CALL,
-        137,
-        LIST_APPEND,
-        COMMIT,
-        119,
-        LIST_END,
-        BIND,
-        'xs',
-        CALL,
-        386,
-        BIND,
-        'ys',
-        ACTION,
-        lambda self: concat([splice(0, 'Scope'), splice(0, concat([splice(0, 'And'), splice(1, self.lookup('xs')), splice(1, self.lookup('ys'))]))]),
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        158,
-        PUSH_SCOPE,
-        CALL,
-        163,
-        BIND,
-        'x',
-        CALL,
-        830,
-        MATCH,
-        ':',
-        lambda x: x == ':',
-        CALL,
-        769,
-        BIND,
-        'y',
-        ACTION,
-        lambda self: concat([splice(0, 'Bind'), splice(0, self.lookup('y')), splice(0, self.lookup('x'))]),
-        POP_SCOPE,
-        COMMIT,
-        162,
-        PUSH_SCOPE,
-        CALL,
-        163,
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        180,
-        PUSH_SCOPE,
-        CALL,
-        232,
-        BIND,
-        'x',
-        CALL,
-        830,
-        MATCH,
-        '*',
-        lambda x: x == '*',
-        ACTION,
-        lambda self: concat([splice(0, 'Star'), splice(0, self.lookup('x'))]),
-        POP_SCOPE,
-        COMMIT,
-        231,
-        BACKTRACK,
-        197,
-        PUSH_SCOPE,
-        CALL,
-        232,
-        BIND,
-        'x',
-        CALL,
-        830,
-        MATCH,
-        '?',
-        lambda x: x == '?',
-        ACTION,
-        lambda self: concat([splice(0, 'Or'), splice(0, self.lookup('x')), splice(0, concat([splice(0, 'And')]))]),
-        POP_SCOPE,
-        COMMIT,
-        231,
-        BACKTRACK,
-        214,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '!',
-        lambda x: x == '!',
-        CALL,
-        232,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: concat([splice(0, 'Not'), splice(0, self.lookup('x'))]),
-        POP_SCOPE,
-        COMMIT,
-        231,
-        BACKTRACK,
-        227,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '%',
-        lambda x: x == '%',
-        ACTION,
-        lambda self: concat([splice(0, 'MatchCallRule')]),
-        POP_SCOPE,
-        COMMIT,
-        231,
-        PUSH_SCOPE,
-        CALL,
-        232,
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        257,
-        PUSH_SCOPE,
-        CALL,
-        769,
-        BIND,
-        'x',
-        BACKTRACK,
-        252,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '=',
-        lambda x: x == '=',
-        POP_SCOPE,
-        COMMIT,
-        250,
-        FAIL,
-        'no match',
-        ACTION,
-        lambda self: concat([splice(0, 'MatchRule'), splice(0, self.lookup('x'))]),
-        POP_SCOPE,
-        COMMIT,
-        376,
-        BACKTRACK,
-        278,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        CALL,
-        687,
-        BIND,
-        'x',
-        MATCH,
-        '-',
-        lambda x: x == '-',
-        CALL,
-        687,
-        BIND,
-        'y',
-        ACTION,
-        lambda self: concat([splice(0, 'MatchObject'), splice(0, concat([splice(0, 'Range'), splice(0, self.lookup('x')), splice(0, self.lookup('y'))]))]),
-        POP_SCOPE,
-        COMMIT,
-        376,
-        BACKTRACK,
-        316,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        "'",
-        lambda x: x == "'",
-        LIST_START,
-        BACKTRACK,
-        305,
-        PUSH_SCOPE,
-        BACKTRACK,
-        299,
-        MATCH,
-        "'",
-        lambda x: x == "'",
-        COMMIT,
-        297,
-        FAIL,
-        'no match',
-        CALL,
-        377,
-        POP_SCOPE,
-        LIST_APPEND,
-        COMMIT,
-        287,
-        LIST_END,
-        BIND,
-        'xs',
-        MATCH,
-        "'",
-        lambda x: x == "'",
-        ACTION,
-        lambda self: concat([splice(0, 'And'), splice(1, self.lookup('xs'))]),
-        POP_SCOPE,
-        COMMIT,
-        376,
-        BACKTRACK,
-        329,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '.',
-        lambda x: x == '.',
-        ACTION,
-        lambda self: concat([splice(0, 'MatchObject'), splice(0, concat([splice(0, 'Any')]))]),
-        POP_SCOPE,
-        COMMIT,
-        376,
-        BACKTRACK,
-        351,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '(',
-        lambda x: x == '(',
-        CALL,
-        79,
-        BIND,
-        'x',
-        CALL,
-        830,
-        MATCH,
-        ')',
-        lambda x: x == ')',
-        ACTION,
-        lambda self: self.lookup('x'),
-        POP_SCOPE,
-        COMMIT,
-        376,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '[',
-        lambda x: x == '[',
-        LIST_START,
-        BACKTRACK,
-        365,
-        CALL,
-        137,
-        LIST_APPEND,
-        COMMIT,
-        358,
-        LIST_END,
-        BIND,
-        'xs',
-        CALL,
-        830,
-        MATCH,
-        ']',
-        lambda x: x == ']',
-        ACTION,
-        lambda self: concat([splice(0, 'MatchList'), splice(0, concat([splice(0, 'And'), splice(1, self.lookup('xs'))]))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        711,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: concat([splice(0, 'MatchObject'), splice(0, concat([splice(0, 'Eq'), splice(0, self.lookup('x'))]))]),
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        398,
-        PUSH_SCOPE,
-        CALL,
-        403,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: concat([splice(0, concat([splice(0, 'Action'), splice(0, self.lookup('x'))]))]),
-        POP_SCOPE,
-        COMMIT,
-        402,
-        PUSH_SCOPE,
-        ACTION,
-        lambda self: concat([]),
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        446,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '-',
-        lambda x: x == '-',
-        MATCH,
-        '>',
-        lambda x: x == '>',
-        CALL,
-        463,
-        BIND,
-        'x',
-        BACKTRACK,
-        431,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        ':',
-        lambda x: x == ':',
-        CALL,
-        769,
-        POP_SCOPE,
-        COMMIT,
-        435,
-        PUSH_SCOPE,
-        ACTION,
-        lambda self: '',
-        POP_SCOPE,
-        BIND,
-        'y',
-        CALL,
-        403,
-        BIND,
-        'z',
-        ACTION,
-        lambda self: concat([splice(0, 'Set'), splice(0, self.lookup('y')), splice(0, self.lookup('x')), splice(0, self.lookup('z'))]),
-        POP_SCOPE,
-        COMMIT,
-        462,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '-',
-        lambda x: x == '-',
-        MATCH,
-        '>',
-        lambda x: x == '>',
-        CALL,
-        463,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.lookup('x'),
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        477,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        CALL,
-        654,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: concat([splice(0, 'String'), splice(0, self.lookup('x'))]),
-        POP_SCOPE,
-        COMMIT,
-        574,
-        BACKTRACK,
-        506,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '[',
-        lambda x: x == '[',
-        LIST_START,
-        BACKTRACK,
-        493,
-        CALL,
-        575,
-        LIST_APPEND,
-        COMMIT,
-        486,
-        LIST_END,
-        BIND,
-        'xs',
-        CALL,
-        830,
-        MATCH,
-        ']',
-        lambda x: x == ']',
-        ACTION,
-        lambda self: concat([splice(0, 'List'), splice(1, self.lookup('xs'))]),
-        POP_SCOPE,
-        COMMIT,
-        574,
-        BACKTRACK,
-        535,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '{',
-        lambda x: x == '{',
-        LIST_START,
-        BACKTRACK,
-        522,
-        CALL,
-        598,
-        LIST_APPEND,
-        COMMIT,
-        515,
-        LIST_END,
-        BIND,
-        'xs',
-        CALL,
-        830,
-        MATCH,
-        '}',
-        lambda x: x == '}',
-        ACTION,
-        lambda self: concat([splice(0, 'Format'), splice(1, self.lookup('xs'))]),
-        POP_SCOPE,
-        COMMIT,
-        574,
-        BACKTRACK,
-        568,
-        PUSH_SCOPE,
-        CALL,
-        632,
-        BIND,
-        'x',
-        CALL,
-        830,
-        MATCH,
-        '(',
-        lambda x: x == '(',
-        LIST_START,
-        BACKTRACK,
-        555,
-        CALL,
-        463,
-        LIST_APPEND,
-        COMMIT,
-        548,
-        LIST_END,
-        BIND,
-        'ys',
-        CALL,
-        830,
-        MATCH,
-        ')',
-        lambda x: x == ')',
-        ACTION,
-        lambda self: concat([splice(0, 'Call'), splice(0, self.lookup('x')), splice(1, self.lookup('ys'))]),
-        POP_SCOPE,
-        COMMIT,
-        574,
-        PUSH_SCOPE,
-        CALL,
-        632,
-        BIND,
-        'x',
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        LIST_START,
-        BACKTRACK,
-        587,
-        MATCH,
-        '~',
-        lambda x: x == '~',
-        LIST_APPEND,
-        COMMIT,
-        579,
-        LIST_END,
-        BIND,
-        'ys',
-        CALL,
-        463,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: concat([splice(0, 'ListItem'), splice(0, self.lookup('len')(self.lookup('ys'))), splice(0, self.lookup('x'))]),
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        627,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '>',
-        lambda x: x == '>',
-        LIST_START,
-        BACKTRACK,
-        614,
-        CALL,
-        598,
-        LIST_APPEND,
-        COMMIT,
-        607,
-        LIST_END,
-        BIND,
-        'xs',
-        CALL,
-        830,
-        MATCH,
-        '<',
-        lambda x: x == '<',
-        ACTION,
-        lambda self: concat([splice(0, 'Indent'), splice(0, concat([splice(0, 'Format'), splice(1, self.lookup('xs'))]))]),
-        POP_SCOPE,
-        COMMIT,
-        631,
-        PUSH_SCOPE,
-        CALL,
-        463,
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        769,
-        BIND,
-        'x',
-        BACKTRACK,
-        650,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        MATCH,
-        '=',
-        lambda x: x == '=',
-        POP_SCOPE,
-        COMMIT,
-        648,
-        FAIL,
-        'no match',
-        ACTION,
-        lambda self: concat([splice(0, 'Lookup'), splice(0, self.lookup('x'))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        '"',
-        lambda x: x == '"',
-        LIST_START,
-        BACKTRACK,
-        677,
-        PUSH_SCOPE,
-        BACKTRACK,
-        671,
-        MATCH,
-        '"',
-        lambda x: x == '"',
-        COMMIT,
-        669,
-        FAIL,
-        'no match',
-        CALL,
-        711,
-        POP_SCOPE,
-        LIST_APPEND,
-        COMMIT,
-        659,
-        LIST_END,
-        BIND,
-        'xs',
-        MATCH,
-        '"',
-        lambda x: x == '"',
-        ACTION,
-        lambda self: join([self.lookup('xs')]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        "'",
-        lambda x: x == "'",
-        BACKTRACK,
-        700,
-        MATCH,
-        "'",
-        lambda x: x == "'",
-        COMMIT,
-        698,
-        FAIL,
-        'no match',
-        CALL,
-        711,
-        BIND,
-        'x',
-        MATCH,
-        "'",
-        lambda x: x == "'",
-        ACTION,
-        lambda self: self.lookup('x'),
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        722,
-        PUSH_SCOPE,
-        MATCH,
-        '\\',
-        lambda x: x == '\\',
-        CALL,
-        728,
-        POP_SCOPE,
-        COMMIT,
-        727,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        739,
-        PUSH_SCOPE,
-        MATCH,
-        '\\',
-        lambda x: x == '\\',
-        ACTION,
-        lambda self: '\\',
-        POP_SCOPE,
-        COMMIT,
-        768,
-        BACKTRACK,
-        750,
-        PUSH_SCOPE,
-        MATCH,
-        "'",
-        lambda x: x == "'",
-        ACTION,
-        lambda self: "'",
-        POP_SCOPE,
-        COMMIT,
-        768,
-        BACKTRACK,
-        761,
-        PUSH_SCOPE,
-        MATCH,
-        '"',
-        lambda x: x == '"',
-        ACTION,
-        lambda self: '"',
-        POP_SCOPE,
-        COMMIT,
-        768,
-        PUSH_SCOPE,
-        MATCH,
-        'n',
-        lambda x: x == 'n',
-        ACTION,
-        lambda self: '\n',
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        830,
-        CALL,
-        791,
-        BIND,
-        'x',
-        LIST_START,
-        BACKTRACK,
-        784,
-        CALL,
-        806,
-        LIST_APPEND,
-        COMMIT,
-        777,
-        LIST_END,
-        BIND,
-        'xs',
-        ACTION,
-        lambda self: join([self.lookup('x'), self.lookup('xs')]),
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        800,
-        PUSH_SCOPE,
-        MATCH,
-        "range 'a'-'z'",
-        lambda x: 'a' <= x <= 'z',
-        POP_SCOPE,
-        COMMIT,
-        805,
-        PUSH_SCOPE,
-        MATCH,
-        "range 'A'-'Z'",
-        lambda x: 'A' <= x <= 'Z',
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        815,
-        PUSH_SCOPE,
-        MATCH,
-        "range 'a'-'z'",
-        lambda x: 'a' <= x <= 'z',
-        POP_SCOPE,
-        COMMIT,
-        829,
-        BACKTRACK,
-        824,
-        PUSH_SCOPE,
-        MATCH,
-        "range 'A'-'Z'",
-        lambda x: 'A' <= x <= 'Z',
-        POP_SCOPE,
-        COMMIT,
-        829,
-        PUSH_SCOPE,
-        MATCH,
-        "range '0'-'9'",
-        lambda x: '0' <= x <= '9',
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        LIST_START,
-        BACKTRACK,
-        851,
-        BACKTRACK,
-        843,
-        PUSH_SCOPE,
-        MATCH,
-        ' ',
-        lambda x: x == ' ',
-        POP_SCOPE,
-        COMMIT,
-        848,
-        PUSH_SCOPE,
-        MATCH,
-        '\n',
-        lambda x: x == '\n',
-        POP_SCOPE,
-        LIST_APPEND,
-        COMMIT,
-        832,
-        LIST_END,
-        POP_SCOPE,
-        RETURN
+        (PUSH_SCOPE, None),
+        (LIST_START, None),
+        (BACKTRACK, 11),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (CALL, (23, True)),
+        (POP_SCOPE, None),
+        (LIST_APPEND, None),
+        (COMMIT, 2),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (BACKTRACK, 20),
+        (MATCH, CHAR_ANY),
+        (COMMIT, 19),
+        (FAIL, 'no match'),
+        (ACTION, lambda self: self.lookup('xs')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (496, False)),
+        (BIND, 'x'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('{')),
+        (LIST_START, None),
+        (BACKTRACK, 35),
+        (CALL, (44, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 31),
+        (LIST_END, None),
+        (BIND, 'ys'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('}')),
+        (ACTION, lambda self: concat([splice(0, 'Grammar'), splice(0, self.lookup('x')), splice(1, self.lookup('ys'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (58, False)),
+        (BIND, 'x'),
+        (CALL, (496, False)),
+        (BIND, 'y'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('=')),
+        (CALL, (77, True)),
+        (BIND, 'z'),
+        (ACTION, lambda self: concat([splice(0, 'Rule'), splice(0, self.lookup('y')), splice(0, self.lookup('x')), splice(0, self.lookup('z'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (LOOKAHEAD, (frozenset(['\n', ' ', '@']), 73)),
+        (BACKTRACK, 73),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (LOOKAHEAD, (frozenset(['@']), 69)),
+        (BACKTRACK, 69),
+        (MATCH_STRING, '@memo'),
+        (ACTION, lambda self: 'Memo'),
+        (COMMIT, 71),
+        (MATCH_STRING, '@nomemo'),
+        (ACTION, lambda self: 'NoMemo'),
+        (POP_SCOPE, None),
+        (COMMIT, 76),
+        (PUSH_SCOPE, None),
+        (ACTION, lambda self: 'Auto'),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (LOOKAHEAD, (frozenset(['\n', ' ', '|']), 87)),
+        (BACKTRACK, 87),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('|')),
+        (POP_SCOPE, None),
+        (COMMIT, 87),
+        (CALL, (105, True)),
+        (BIND, 'x'),
+        (LIST_START, None),
+        (BACKTRACK, 100),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('|')),
+        (CALL, (105, True)),
+        (POP_SCOPE, None),
+        (LIST_APPEND, None),
+        (COMMIT, 90),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (ACTION, lambda self: concat([splice(0, 'Or'), splice(0, self.lookup('x')), splice(1, self.lookup('xs'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (LIST_START, None),
+        (BACKTRACK, 111),
+        (CALL, (118, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 107),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (CALL, (267, False)),
+        (BIND, 'ys'),
+        (ACTION, lambda self: concat([splice(0, 'Scope'), splice(0, concat([splice(0, 'And'), splice(1, self.lookup('xs')), splice(1, self.lookup('ys'))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (134, False)),
+        (BIND, 'x'),
+        (LOOKAHEAD, (frozenset(['\n', ' ', ':']), 131)),
+        (BACKTRACK, 131),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq(':')),
+        (CALL, (496, False)),
+        (BIND, 'y'),
+        (ACTION, lambda self: concat([splice(0, 'Bind'), splice(0, self.lookup('y')), splice(0, self.lookup('x'))])),
+        (COMMIT, 132),
+        (ACTION, lambda self: self.lookup('x')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (LOOKAHEAD, (frozenset(['\n', ' ', "'", '(', '.', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', '[', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']), 151)),
+        (BACKTRACK, 151),
+        (PUSH_SCOPE, None),
+        (CALL, (177, True)),
+        (BIND, 'x'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (LOOKAHEAD, (frozenset(['*']), 147)),
+        (BACKTRACK, 147),
+        (MATCH, char_eq('*')),
+        (ACTION, lambda self: concat([splice(0, 'Star'), splice(0, self.lookup('x'))])),
+        (COMMIT, 149),
+        (MATCH, char_eq('?')),
+        (ACTION, lambda self: concat([splice(0, 'Or'), splice(0, self.lookup('x')), splice(0, concat([splice(0, 'And')]))])),
+        (POP_SCOPE, None),
+        (COMMIT, 176),
+        (LOOKAHEAD, (frozenset(['\n', ' ', '!', '%', '^']), 173)),
+        (BACKTRACK, 173),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (LOOKAHEAD, (frozenset(['!']), 164)),
+        (BACKTRACK, 164),
+        (MATCH, char_eq('!')),
+        (CALL, (177, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, 'Not'), splice(0, self.lookup('x'))])),
+        (COMMIT, 171),
+        (LOOKAHEAD, (frozenset(['%']), 169)),
+        (BACKTRACK, 169),
+        (MATCH, char_eq('%')),
+        (ACTION, lambda self: concat([splice(0, 'MatchCallRule')])),
+        (COMMIT, 171),
+        (MATCH, char_eq('^')),
+        (ACTION, lambda self: concat([splice(0, 'Cut')])),
+        (POP_SCOPE, None),
+        (COMMIT, 176),
+        (PUSH_SCOPE, None),
+        (CALL, (177, True)),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (LOOKAHEAD, (frozenset(['\n', ' ', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']), 194)),
+        (BACKTRACK, 194),
+        (PUSH_SCOPE, None),
+        (CALL, (496, False)),
+        (BIND, 'x'),
+        (BACKTRACK, 191),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('=')),
+        (POP_SCOPE, None),
+        (COMMIT, 190),
+        (FAIL, 'no match'),
+        (ACTION, lambda self: concat([splice(0, 'MatchRule'), splice(0, self.lookup('x'))])),
+        (POP_SCOPE, None),
+        (COMMIT, 260),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (LOOKAHEAD, (frozenset(["'"]), 207)),
+        (BACKTRACK, 207),
+        (CALL, (447, True)),
+        (BIND, 'x'),
+        (MATCH, char_eq('-')),
+        (CALL, (447, True)),
+        (BIND, 'y'),
+        (ACTION, lambda self: concat([splice(0, 'MatchObject'), splice(0, concat([splice(0, 'Range'), splice(0, self.lookup('x')), splice(0, self.lookup('y'))]))])),
+        (COMMIT, 259),
+        (LOOKAHEAD, (frozenset(["'"]), 230)),
+        (BACKTRACK, 230),
+        (MATCH, char_eq("'")),
+        (LIST_START, None),
+        (BACKTRACK, 225),
+        (PUSH_SCOPE, None),
+        (BACKTRACK, 217),
+        (MATCH, char_eq("'")),
+        (COMMIT, 216),
+        (FAIL, 'no match'),
+        (PUSH_SCOPE, None),
+        (CALL, (459, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, 'MatchObject'), splice(0, concat([splice(0, 'Eq'), splice(0, self.lookup('x'))]))])),
+        (POP_SCOPE, None),
+        (POP_SCOPE, None),
+        (LIST_APPEND, None),
+        (COMMIT, 211),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (MATCH, char_eq("'")),
+        (ACTION, lambda self: concat([splice(0, 'And'), splice(1, self.lookup('xs'))])),
+        (COMMIT, 259),
+        (LOOKAHEAD, (frozenset(['.']), 235)),
+        (BACKTRACK, 235),
+        (MATCH, char_eq('.')),
+        (ACTION, lambda self: concat([splice(0, 'MatchObject'), splice(0, concat([splice(0, 'Any')]))])),
+        (COMMIT, 259),
+        (LOOKAHEAD, (frozenset(['(']), 246)),
+        (BACKTRACK, 246),
+        (MATCH, char_eq('(')),
+        (CALL, (77, True)),
+        (BIND, 'x'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq(')')),
+        (ACTION, lambda self: self.lookup('x')),
+        (COMMIT, 259),
+        (MATCH, char_eq('[')),
+        (LIST_START, None),
+        (BACKTRACK, 252),
+        (CALL, (118, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 248),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq(']')),
+        (ACTION, lambda self: concat([splice(0, 'MatchList'), splice(0, concat([splice(0, 'And'), splice(1, self.lookup('xs'))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (459, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, 'MatchObject'), splice(0, concat([splice(0, 'Eq'), splice(0, self.lookup('x'))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (LOOKAHEAD, (frozenset(['\n', ' ', '-']), 275)),
+        (BACKTRACK, 275),
+        (PUSH_SCOPE, None),
+        (CALL, (279, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Action'), splice(0, self.lookup('x'))]))])),
+        (POP_SCOPE, None),
+        (COMMIT, 278),
+        (PUSH_SCOPE, None),
+        (ACTION, lambda self: concat([])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH_STRING, '->'),
+        (CALL, (309, True)),
+        (BIND, 'x'),
+        (LOOKAHEAD, (frozenset(['\n', ' ', '-', ':']), 306)),
+        (BACKTRACK, 306),
+        (LOOKAHEAD, (frozenset(['\n', ' ', ':']), 298)),
+        (BACKTRACK, 298),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq(':')),
+        (CALL, (496, False)),
+        (POP_SCOPE, None),
+        (COMMIT, 301),
+        (PUSH_SCOPE, None),
+        (ACTION, lambda self: ''),
+        (POP_SCOPE, None),
+        (BIND, 'y'),
+        (CALL, (279, True)),
+        (BIND, 'z'),
+        (ACTION, lambda self: concat([splice(0, 'Set'), splice(0, self.lookup('y')), splice(0, self.lookup('x')), splice(0, self.lookup('z'))])),
+        (COMMIT, 307),
+        (ACTION, lambda self: self.lookup('x')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (LOOKAHEAD, (frozenset(['\n', ' ', '"', '[', '{']), 352)),
+        (BACKTRACK, 352),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (LOOKAHEAD, (frozenset(['"']), 321)),
+        (BACKTRACK, 321),
+        (CALL, (428, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, 'String'), splice(0, self.lookup('x'))])),
+        (COMMIT, 350),
+        (LOOKAHEAD, (frozenset(['[']), 337)),
+        (BACKTRACK, 337),
+        (MATCH, char_eq('[')),
+        (LIST_START, None),
+        (BACKTRACK, 329),
+        (CALL, (377, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 325),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq(']')),
+        (ACTION, lambda self: concat([splice(0, 'List'), splice(1, self.lookup('xs'))])),
+        (COMMIT, 350),
+        (MATCH, char_eq('{')),
+        (LIST_START, None),
+        (BACKTRACK, 343),
+        (CALL, (388, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 339),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('}')),
+        (ACTION, lambda self: concat([splice(0, 'Format'), splice(1, self.lookup('xs'))])),
+        (POP_SCOPE, None),
+        (COMMIT, 376),
+        (PUSH_SCOPE, None),
+        (CALL, (413, False)),
+        (BIND, 'x'),
+        (LOOKAHEAD, (frozenset(['\n', ' ', '(']), 374)),
+        (BACKTRACK, 374),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('(')),
+        (LIST_START, None),
+        (BACKTRACK, 366),
+        (CALL, (309, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 362),
+        (LIST_END, None),
+        (BIND, 'ys'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq(')')),
+        (ACTION, lambda self: concat([splice(0, 'Call'), splice(0, self.lookup('x')), splice(1, self.lookup('ys'))])),
+        (COMMIT, 375),
+        (ACTION, lambda self: self.lookup('x')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH_STAR, char_class('~', ['~'])),
+        (BIND, 'ys'),
+        (CALL, (309, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, 'ListItem'), splice(0, self.lookup('len')(self.lookup('ys'))), splice(0, self.lookup('x'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (LOOKAHEAD, (frozenset(['\n', ' ', '>']), 409)),
+        (BACKTRACK, 409),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('>')),
+        (LIST_START, None),
+        (BACKTRACK, 400),
+        (CALL, (388, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 396),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('<')),
+        (ACTION, lambda self: concat([splice(0, 'Indent'), splice(0, concat([splice(0, 'Format'), splice(1, self.lookup('xs'))]))])),
+        (POP_SCOPE, None),
+        (COMMIT, 412),
+        (PUSH_SCOPE, None),
+        (CALL, (309, True)),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (496, False)),
+        (BIND, 'x'),
+        (BACKTRACK, 425),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH, char_eq('=')),
+        (POP_SCOPE, None),
+        (COMMIT, 424),
+        (FAIL, 'no match'),
+        (ACTION, lambda self: concat([splice(0, 'Lookup'), splice(0, self.lookup('x'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, char_eq('"')),
+        (LIST_START, None),
+        (BACKTRACK, 441),
+        (PUSH_SCOPE, None),
+        (BACKTRACK, 437),
+        (MATCH, char_eq('"')),
+        (COMMIT, 436),
+        (FAIL, 'no match'),
+        (CALL, (459, True)),
+        (POP_SCOPE, None),
+        (LIST_APPEND, None),
+        (COMMIT, 431),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (MATCH, char_eq('"')),
+        (ACTION, lambda self: join([self.lookup('xs')])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, char_eq("'")),
+        (BACKTRACK, 453),
+        (MATCH, char_eq("'")),
+        (COMMIT, 452),
+        (FAIL, 'no match'),
+        (CALL, (459, True)),
+        (BIND, 'x'),
+        (MATCH, char_eq("'")),
+        (ACTION, lambda self: self.lookup('x')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (LOOKAHEAD, (frozenset(['\\']), 466)),
+        (BACKTRACK, 466),
+        (PUSH_SCOPE, None),
+        (MATCH, char_eq('\\')),
+        (CALL, (470, False)),
+        (POP_SCOPE, None),
+        (COMMIT, 469),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (LOOKAHEAD, (frozenset(['\\']), 477)),
+        (BACKTRACK, 477),
+        (PUSH_SCOPE, None),
+        (MATCH, char_eq('\\')),
+        (ACTION, lambda self: '\\'),
+        (POP_SCOPE, None),
+        (COMMIT, 495),
+        (LOOKAHEAD, (frozenset(["'"]), 484)),
+        (BACKTRACK, 484),
+        (PUSH_SCOPE, None),
+        (MATCH, char_eq("'")),
+        (ACTION, lambda self: "'"),
+        (POP_SCOPE, None),
+        (COMMIT, 495),
+        (LOOKAHEAD, (frozenset(['"']), 491)),
+        (BACKTRACK, 491),
+        (PUSH_SCOPE, None),
+        (MATCH, char_eq('"')),
+        (ACTION, lambda self: '"'),
+        (POP_SCOPE, None),
+        (COMMIT, 495),
+        (PUSH_SCOPE, None),
+        (MATCH, char_eq('n')),
+        (ACTION, lambda self: '\n'),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (MATCH_SET, ("range 'A'-'Z'", frozenset(['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']))),
+        (BIND, 'x'),
+        (MATCH_STAR, char_class("range '0'-'9'", ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z'])),
+        (BIND, 'xs'),
+        (ACTION, lambda self: join([self.lookup('x'), self.lookup('xs')])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (MATCH_SET, ("range 'A'-'Z'", frozenset(['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']))),
+        (RETURN, None),
+        (MATCH_SET, ("range '0'-'9'", frozenset(['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']))),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH_STAR, char_class('\n', ['\n', ' '])),
+        (POP_SCOPE, None),
+        (RETURN, None),
     ]
 class CodeGenerator(Grammar):
     rules = {
-        'Grammar': 0,
-        'Rule': 21,
-        'Or': 35,
-        'Scope': 56,
-        'And': 65,
-        'Bind': 81,
-        'Star': 95,
-        'Not': 104,
-        'MatchCallRule': 113,
-        'MatchRule': 118,
-        'MatchObject': 128,
-        'MatchList': 138,
-        'Action': 147,
-        'asts': 157,
-        'ast': 182
+        'Grammar': (0, False),
+        'Rule': (13, False),
+        'Or': (23, True),
+        'Lookahead': (34, False),
+        'Scope': (42, False),
+        'And': (48, False),
+        'Bind': (59, False),
+        'Star': (67, False),
+        'Not': (73, False),
+        'Cut': (79, False),
+        'MatchCallRule': (83, False),
+        'MatchRule': (87, False),
+        'MatchObject': (93, False),
+        'MatchString': (99, False),
+        'MatchSet': (105, False),
+        'MatchStar': (113, False),
+        'MatchList': (121, False),
+        'Action': (127, False),
+        'Removed': (133, False),
+        'asts': (141, False),
+        'ast': (156, True)
     }
+    removed = {}
     code = [
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        LIST_START,
-        BACKTRACK,
-        14,
-        CALL,
-        182,
-        LIST_APPEND,
-        COMMIT,
-        7,
-        LIST_END,
-        BIND,
-        'ys',
-        ACTION,
-        lambda self: concat([splice(0, 'Grammar'), splice(0, self.lookup('x')), splice(2, self.lookup('ys'))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        CALL,
-        182,
-        BIND,
-        'y',
-        ACTION,
-        lambda self: concat([splice(0, concat([splice(0, 'Rule'), splice(0, self.lookup('x'))])), splice(1, self.lookup('y')), splice(0, concat([splice(0, 'OpCode'), splice(0, 'RETURN')]))]),
-        POP_SCOPE,
-        RETURN,
-        BACKTRACK,
-        51,
-        PUSH_SCOPE,
-        CALL,
-        182,
-        BIND,
-        'x',
-        CALL,
-        35,
-        BIND,
-        'y',
-        ACTION,
-        lambda self: self.bind('a', self.lookup('label')(), lambda: self.bind('b', self.lookup('label')(), lambda: concat([splice(0, concat([splice(0, 'OpCode'), splice(0, 'BACKTRACK')])), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('a'))])), splice(1, self.lookup('x')), splice(0, concat([splice(0, 'OpCode'), splice(0, 'COMMIT')])), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('b'))])), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('a'))])), splice(1, self.lookup('y')), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('b'))]))]))),
-        POP_SCOPE,
-        COMMIT,
-        55,
-        PUSH_SCOPE,
-        CALL,
-        182,
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        182,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: concat([splice(0, concat([splice(0, 'OpCode'), splice(0, 'PUSH_SCOPE')])), splice(1, self.lookup('x')), splice(0, concat([splice(0, 'OpCode'), splice(0, 'POP_SCOPE')]))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        LIST_START,
-        BACKTRACK,
-        74,
-        CALL,
-        182,
-        LIST_APPEND,
-        COMMIT,
-        67,
-        LIST_END,
-        BIND,
-        'xs',
-        ACTION,
-        lambda self: concat([splice(2, self.lookup('xs'))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        CALL,
-        182,
-        BIND,
-        'y',
-        ACTION,
-        lambda self: concat([splice(1, self.lookup('y')), splice(0, concat([splice(0, 'OpCode'), splice(0, 'BIND')])), splice(0, concat([splice(0, 'Value'), splice(0, self.lookup('x'))]))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        182,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.bind('a', self.lookup('label')(), lambda: self.bind('b', self.lookup('label')(), lambda: concat([splice(0, concat([splice(0, 'OpCode'), splice(0, 'LIST_START')])), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('a'))])), splice(0, concat([splice(0, 'OpCode'), splice(0, 'BACKTRACK')])), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('b'))])), splice(1, self.lookup('x')), splice(0, concat([splice(0, 'OpCode'), splice(0, 'LIST_APPEND')])), splice(0, concat([splice(0, 'OpCode'), splice(0, 'COMMIT')])), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('a'))])), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('b'))])), splice(0, concat([splice(0, 'OpCode'), splice(0, 'LIST_END')]))]))),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        182,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.bind('a', self.lookup('label')(), lambda: self.bind('b', self.lookup('label')(), lambda: concat([splice(0, concat([splice(0, 'OpCode'), splice(0, 'BACKTRACK')])), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('b'))])), splice(1, self.lookup('x')), splice(0, concat([splice(0, 'OpCode'), splice(0, 'COMMIT')])), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('a'))])), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('a'))])), splice(0, concat([splice(0, 'OpCode'), splice(0, 'FAIL')])), splice(0, concat([splice(0, 'Value'), splice(0, 'no match')])), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('b'))]))]))),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        ACTION,
-        lambda self: concat([splice(0, concat([splice(0, 'OpCode'), splice(0, 'MATCH_CALL_RULE')]))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: concat([splice(0, concat([splice(0, 'OpCode'), splice(0, 'CALL')])), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('x'))]))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: concat([splice(0, concat([splice(0, 'OpCode'), splice(0, 'MATCH')])), splice(0, self.lookup('x'))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        182,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: concat([splice(0, concat([splice(0, 'OpCode'), splice(0, 'PUSH_STREAM')])), splice(1, self.lookup('x')), splice(0, concat([splice(0, 'OpCode'), splice(0, 'POP_STREAM')]))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: concat([splice(0, concat([splice(0, 'OpCode'), splice(0, 'ACTION')])), splice(0, concat([splice(0, 'Action'), splice(0, self.lookup('x'))]))]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        LIST_START,
-        BACKTRACK,
-        166,
-        CALL,
-        182,
-        LIST_APPEND,
-        COMMIT,
-        159,
-        LIST_END,
-        BIND,
-        'xs',
-        BACKTRACK,
-        178,
-        MATCH,
-        'any',
-        lambda x: True,
-        COMMIT,
-        176,
-        FAIL,
-        'no match',
-        ACTION,
-        lambda self: self.lookup('xs'),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        PUSH_STREAM,
-        MATCH_CALL_RULE,
-        BIND,
-        'x',
-        POP_STREAM,
-        ACTION,
-        lambda self: self.lookup('x'),
-        POP_SCOPE,
-        RETURN
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (LIST_START, None),
+        (BACKTRACK, 8),
+        (CALL, (156, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 4),
+        (LIST_END, None),
+        (BIND, 'ys'),
+        (ACTION, lambda self: concat([splice(0, 'Grammar'), splice(0, self.lookup('x')), splice(2, self.lookup('ys'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (CALL, (156, True)),
+        (BIND, 'z'),
+        (ACTION, lambda self: self.bind('rule', self.lookup('x'), lambda: self.bind('callsite', 'Calls', lambda: concat([splice(0, concat([splice(0, 'Rule'), splice(0, self.lookup('x')), splice(0, self.lookup('y'))])), splice(1, self.lookup('z')), splice(0, concat([splice(0, 'Instruction'), splice(0, 'RETURN')]))])))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (156, True)),
+        (BIND, 'x'),
+        (BACKTRACK, 31),
+        (CALL, (23, True)),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.bind('a', self.lookup('label')(), lambda: self.bind('b', self.lookup('label')(), lambda: self.bind('rest', self.lookup('y'), lambda: self.bind('callsite', 'BacktrackCalls', lambda: self.bind('guard', self.lookup('list')(), lambda: self.bind('skip', self.lookup('a'), lambda: self.bind('body', self.lookup('x'), lambda: concat([splice(1, self.lookup('guard')), splice(0, concat([splice(0, 'Instruction'), splice(0, 'BACKTRACK'), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('a'))]))])), splice(1, self.lookup('body')), splice(0, concat([splice(0, 'Instruction'), splice(0, 'COMMIT'), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('b'))]))])), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('a'))])), splice(1, self.lookup('rest')), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('b'))]))]))))))))),
+        (COMMIT, 32),
+        (ACTION, lambda self: self.lookup('x')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (CALL, (156, True)),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.bind('', self.lookup('add')(self.lookup('guard'), concat([splice(0, 'Instruction'), splice(0, 'LOOKAHEAD'), splice(0, concat([splice(0, 'Guard'), splice(0, self.lookup('x')), splice(0, self.lookup('skip'))]))])), lambda: self.lookup('y'))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (156, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Instruction'), splice(0, 'PUSH_SCOPE')])), splice(1, self.lookup('x')), splice(0, concat([splice(0, 'Instruction'), splice(0, 'POP_SCOPE')]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (LIST_START, None),
+        (BACKTRACK, 54),
+        (CALL, (156, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 50),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (ACTION, lambda self: concat([splice(2, self.lookup('xs'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (CALL, (156, True)),
+        (BIND, 'y'),
+        (ACTION, lambda self: concat([splice(1, self.lookup('y')), splice(0, concat([splice(0, 'Instruction'), splice(0, 'BIND'), splice(0, concat([splice(0, 'Value'), splice(0, self.lookup('x'))]))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (156, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.bind('a', self.lookup('label')(), lambda: self.bind('b', self.lookup('label')(), lambda: self.bind('callsite', 'BacktrackCalls', lambda: concat([splice(0, concat([splice(0, 'Costly'), splice(0, self.lookup('rule'))])), splice(0, concat([splice(0, 'Instruction'), splice(0, 'LIST_START')])), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('a'))])), splice(0, concat([splice(0, 'Instruction'), splice(0, 'BACKTRACK'), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('b'))]))])), splice(1, self.lookup('x')), splice(0, concat([splice(0, 'Instruction'), splice(0, 'LIST_APPEND')])), splice(0, concat([splice(0, 'Instruction'), splice(0, 'COMMIT'), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('a'))]))])), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('b'))])), splice(0, concat([splice(0, 'Instruction'), splice(0, 'LIST_END')]))]))))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (156, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.bind('a', self.lookup('label')(), lambda: self.bind('b', self.lookup('label')(), lambda: self.bind('callsite', 'BacktrackCalls', lambda: concat([splice(0, concat([splice(0, 'Instruction'), splice(0, 'BACKTRACK'), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('b'))]))])), splice(1, self.lookup('x')), splice(0, concat([splice(0, 'Instruction'), splice(0, 'COMMIT'), splice(0, concat([splice(0, 'Target'), splice(0, self.lookup('a'))]))])), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('a'))])), splice(0, concat([splice(0, 'Instruction'), splice(0, 'FAIL'), splice(0, concat([splice(0, 'Value'), splice(0, 'no match')]))])), splice(0, concat([splice(0, 'Label'), splice(0, self.lookup('b'))]))]))))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Instruction'), splice(0, 'CUT')]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Costly'), splice(0, self.lookup('rule'))])), splice(0, concat([splice(0, 'Instruction'), splice(0, 'MATCH_CALL_RULE')]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, self.lookup('callsite')), splice(0, self.lookup('rule')), splice(0, self.lookup('x'))])), splice(0, concat([splice(0, 'Instruction'), splice(0, 'CALL'), splice(0, concat([splice(0, 'Callee'), splice(0, self.lookup('x'))]))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Instruction'), splice(0, 'MATCH'), splice(0, self.lookup('x'))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Instruction'), splice(0, 'MATCH_STRING'), splice(0, concat([splice(0, 'Value'), splice(0, self.lookup('x'))]))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Instruction'), splice(0, 'MATCH_SET'), splice(0, concat([splice(0, 'Keys'), splice(0, self.lookup('x')), splice(0, self.lookup('y'))]))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Instruction'), splice(0, 'MATCH_STAR'), splice(0, concat([splice(0, 'CharClass'), splice(0, self.lookup('x')), splice(0, self.lookup('y'))]))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (156, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Instruction'), splice(0, 'PUSH_STREAM')])), splice(1, self.lookup('x')), splice(0, concat([splice(0, 'Instruction'), splice(0, 'POP_STREAM')]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Instruction'), splice(0, 'ACTION'), splice(0, concat([splice(0, 'Action'), splice(0, self.lookup('x'))]))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: concat([splice(0, concat([splice(0, 'Removed'), splice(0, self.lookup('x')), splice(0, self.lookup('y'))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (LIST_START, None),
+        (BACKTRACK, 147),
+        (CALL, (156, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 143),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (BACKTRACK, 153),
+        (MATCH, CHAR_ANY),
+        (COMMIT, 152),
+        (FAIL, 'no match'),
+        (ACTION, lambda self: self.lookup('xs')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (PUSH_STREAM, None),
+        (MATCH_CALL_RULE, None),
+        (BIND, 'x'),
+        (POP_STREAM, None),
+        (ACTION, lambda self: self.lookup('x')),
+        (POP_SCOPE, None),
+        (RETURN, None),
     ]
 class Assembler(Grammar):
     rules = {
-        'Grammar': 0,
-        'Rule': 21,
-        'Label': 31,
-        'Target': 41,
-        'Patch': 51,
-        'OpCode': 66,
-        'Value': 76,
-        'Eq': 86,
-        'Range': 96,
-        'Any': 111,
-        'Action': 116,
-        'Set': 125,
-        'String': 143,
-        'List': 153,
-        'ListItem': 162,
-        'Format': 176,
-        'Indent': 185,
-        'Call': 194,
-        'Lookup': 207,
-        'asts': 217,
-        'astList': 242,
-        'ast': 258
+        'Grammar': (0, False),
+        'Rule': (13, False),
+        'Costly': (21, False),
+        'Calls': (27, False),
+        'BacktrackCalls': (35, False),
+        'Backtracked': (43, False),
+        'Auto': (49, False),
+        'Memo': (55, False),
+        'NoMemo': (61, False),
+        'Entry': (67, False),
+        'Removed': (73, False),
+        'Label': (81, False),
+        'Instruction': (87, False),
+        'Target': (98, False),
+        'Patch': (104, False),
+        'Callee': (112, False),
+        'CalleePatch': (118, False),
+        'Value': (126, False),
+        'Keys': (132, False),
+        'Guard': (140, False),
+        'Eq': (148, False),
+        'Range': (154, False),
+        'Any': (162, False),
+        'CharClass': (166, False),
+        'Action': (174, False),
+        'Set': (180, False),
+        'String': (190, False),
+        'List': (196, False),
+        'ListItem': (202, False),
+        'Format': (210, False),
+        'Indent': (216, False),
+        'Call': (222, False),
+        'Lookup': (230, False),
+        'asts': (236, False),
+        'astList': (251, False),
+        'ast': (262, True)
     }
+    removed = {}
     code = [
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        LIST_START,
-        BACKTRACK,
-        14,
-        CALL,
-        258,
-        LIST_APPEND,
-        COMMIT,
-        7,
-        LIST_END,
-        BIND,
-        'ys',
-        ACTION,
-        lambda self: self.bind('rules', self.lookup('list')(), lambda: self.bind('code', self.lookup('list')(), lambda: self.bind('labels', self.lookup('dict')(), lambda: self.bind('patches', self.lookup('list')(), lambda: self.bind('', self.lookup('ys'), lambda: self.bind('', self.lookup('run')('asts', self.lookup('patches')), lambda: join(['class ', self.lookup('x'), '(Grammar):\n', indent(join(['rules = {\n', indent(join([self.lookup('join')(self.lookup('rules'), ',\n')]), self.lookup('indentprefix')), '\n}\n', 'code = [\n', indent(join([self.lookup('join')(self.lookup('code'), ',\n')]), self.lookup('indentprefix')), '\n]\n']), self.lookup('indentprefix'))]))))))),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.bind('', self.lookup('add')(self.lookup('rules'), join([self.lookup('repr')(self.lookup('x')), ': ', self.lookup('len')(self.lookup('code'))])), lambda: self.lookup('set')(self.lookup('labels'), self.lookup('x'), self.lookup('len')(self.lookup('code')))),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.lookup('set')(self.lookup('labels'), self.lookup('x'), self.lookup('len')(self.lookup('code'))),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.bind('', self.lookup('add')(self.lookup('patches'), concat([splice(0, 'Patch'), splice(0, self.lookup('len')(self.lookup('code'))), splice(0, self.lookup('x'))])), lambda: self.lookup('add')(self.lookup('code'), 'placeholder')),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'y',
-        ACTION,
-        lambda self: self.lookup('set')(self.lookup('code'), self.lookup('x'), self.lookup('get')(self.lookup('labels'), self.lookup('y'))),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.lookup('add')(self.lookup('code'), self.lookup('x')),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.lookup('add')(self.lookup('code'), self.lookup('repr')(self.lookup('x'))),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.bind('', self.lookup('add')(self.lookup('code'), self.lookup('repr')(self.lookup('x'))), lambda: self.lookup('add')(self.lookup('code'), join(['lambda x: x == ', self.lookup('repr')(self.lookup('x'))]))),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'y',
-        ACTION,
-        lambda self: self.bind('', self.lookup('add')(self.lookup('code'), self.lookup('repr')(join(['range ', self.lookup('repr')(self.lookup('x')), '-', self.lookup('repr')(self.lookup('y'))]))), lambda: self.lookup('add')(self.lookup('code'), join(['lambda x: ', self.lookup('repr')(self.lookup('x')), ' <= x <= ', self.lookup('repr')(self.lookup('y'))]))),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        ACTION,
-        lambda self: self.bind('', self.lookup('add')(self.lookup('code'), self.lookup('repr')('any')), lambda: self.lookup('add')(self.lookup('code'), 'lambda x: True')),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        258,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.lookup('add')(self.lookup('code'), join(['lambda self: ', self.lookup('x')])),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        CALL,
-        258,
-        BIND,
-        'y',
-        CALL,
-        258,
-        BIND,
-        'z',
-        ACTION,
-        lambda self: join(['self.bind(', self.lookup('repr')(self.lookup('x')), ', ', self.lookup('y'), ', lambda: ', self.lookup('z'), ')']),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: self.lookup('repr')(self.lookup('x')),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        242,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: join(['concat([', self.lookup('x'), '])']),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        CALL,
-        258,
-        BIND,
-        'y',
-        ACTION,
-        lambda self: join(['splice(', self.lookup('repr')(self.lookup('x')), ', ', self.lookup('y'), ')']),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        242,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: join(['join([', self.lookup('x'), '])']),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        258,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: join(['indent(', self.lookup('x'), ', ', "self.lookup('indentprefix'))"]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        CALL,
-        258,
-        BIND,
-        'x',
-        CALL,
-        242,
-        BIND,
-        'y',
-        ACTION,
-        lambda self: join([self.lookup('x'), '(', self.lookup('y'), ')']),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        MATCH,
-        'any',
-        lambda x: True,
-        BIND,
-        'x',
-        ACTION,
-        lambda self: join(['self.lookup(', self.lookup('repr')(self.lookup('x')), ')']),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        LIST_START,
-        BACKTRACK,
-        226,
-        CALL,
-        258,
-        LIST_APPEND,
-        COMMIT,
-        219,
-        LIST_END,
-        BIND,
-        'xs',
-        BACKTRACK,
-        238,
-        MATCH,
-        'any',
-        lambda x: True,
-        COMMIT,
-        236,
-        FAIL,
-        'no match',
-        ACTION,
-        lambda self: join([self.lookup('xs')]),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        LIST_START,
-        BACKTRACK,
-        251,
-        CALL,
-        258,
-        LIST_APPEND,
-        COMMIT,
-        244,
-        LIST_END,
-        BIND,
-        'xs',
-        ACTION,
-        lambda self: self.lookup('join')(self.lookup('xs'), ', '),
-        POP_SCOPE,
-        RETURN,
-        PUSH_SCOPE,
-        PUSH_STREAM,
-        MATCH_CALL_RULE,
-        BIND,
-        'x',
-        POP_STREAM,
-        ACTION,
-        lambda self: self.lookup('x'),
-        POP_SCOPE,
-        RETURN
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (LIST_START, None),
+        (BACKTRACK, 8),
+        (CALL, (262, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 4),
+        (LIST_END, None),
+        (BIND, 'ys'),
+        (ACTION, lambda self: self.bind('rules', self.lookup('list')(), lambda: self.bind('code', self.lookup('list')(), lambda: self.bind('labels', self.lookup('dict')(), lambda: self.bind('patches', self.lookup('list')(), lambda: self.bind('costly', self.lookup('dict')(), lambda: self.bind('memo', self.lookup('dict')(), lambda: self.bind('backtracks', self.lookup('list')(), lambda: self.bind('policies', self.lookup('list')(), lambda: self.bind('entries', self.lookup('list')(), lambda: self.bind('removed', self.lookup('list')(), lambda: self.bind('', self.lookup('ys'), lambda: self.bind('', self.lookup('run')('asts', self.lookup('backtracks')), lambda: self.bind('', self.lookup('run')('asts', self.lookup('policies')), lambda: self.bind('', self.lookup('run')('asts', self.lookup('entries')), lambda: self.bind('', self.lookup('run')('asts', self.lookup('patches')), lambda: join(['class ', self.lookup('x'), '(Grammar):\n', indent(join(['rules = {\n', indent(join([self.lookup('join')(self.lookup('rules'), ',\n')]), self.lookup('indentprefix')), '\n}\n', 'removed = {', self.lookup('join')(self.lookup('removed'), ', '), '}\n', 'code = [\n', indent(join([self.lookup('join')(self.lookup('code'))]), self.lookup('indentprefix')), ']\n']), self.lookup('indentprefix'))]))))))))))))))))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.bind('', self.lookup('set')(self.lookup('labels'), self.lookup('x'), self.lookup('len')(self.lookup('code'))), lambda: self.bind('', self.lookup('set')(self.lookup('costly'), self.lookup('x'), 'False'), lambda: self.bind('', self.lookup('set')(self.lookup('memo'), self.lookup('x'), 'False'), lambda: self.bind('', self.lookup('add')(self.lookup('policies'), concat([splice(0, self.lookup('y')), splice(0, self.lookup('x'))])), lambda: self.lookup('add')(self.lookup('entries'), concat([splice(0, 'Entry'), splice(0, self.lookup('x'))]))))))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('set')(self.lookup('costly'), self.lookup('x'), 'True')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.lookup('set')(self.lookup('costly'), self.lookup('x'), 'True')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.bind('', self.lookup('set')(self.lookup('costly'), self.lookup('x'), 'True'), lambda: self.lookup('add')(self.lookup('backtracks'), concat([splice(0, 'Backtracked'), splice(0, self.lookup('y'))])))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('set')(self.lookup('memo'), self.lookup('x'), self.lookup('get')(self.lookup('costly'), self.lookup('x')))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('set')(self.lookup('memo'), self.lookup('x'), 'True')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('set')(self.lookup('memo'), self.lookup('x'), 'False')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('rules'), join([self.lookup('repr')(self.lookup('x')), ': ', '(', self.lookup('get')(self.lookup('labels'), self.lookup('x')), ', ', self.lookup('get')(self.lookup('memo'), self.lookup('x')), ')']))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('removed'), join([self.lookup('repr')(self.lookup('x')), ': ', self.lookup('repr')(self.lookup('y'))]))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('set')(self.lookup('labels'), self.lookup('x'), self.lookup('len')(self.lookup('code')))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (BACKTRACK, 95),
+        (CALL, (262, True)),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.bind('operand', self.lookup('list')(), lambda: self.bind('', self.lookup('add')(self.lookup('code'), concat([splice(0, '('), splice(0, self.lookup('x')), splice(0, ', '), splice(0, self.lookup('operand')), splice(0, '),\n')])), lambda: self.lookup('y')))),
+        (COMMIT, 96),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('code'), join(['(', self.lookup('x'), ', None),\n']))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('patches'), concat([splice(0, 'Patch'), splice(0, self.lookup('operand')), splice(0, self.lookup('x'))]))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('x'), self.lookup('get')(self.lookup('labels'), self.lookup('y')))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('patches'), concat([splice(0, 'CalleePatch'), splice(0, self.lookup('operand')), splice(0, self.lookup('x'))]))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('x'), join(['(', self.lookup('get')(self.lookup('labels'), self.lookup('y')), ', ', self.lookup('get')(self.lookup('memo'), self.lookup('y')), ')']))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('operand'), self.lookup('repr')(self.lookup('x')))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('operand'), join(['(', self.lookup('repr')(self.lookup('y')), ', frozenset(', self.lookup('repr')(self.lookup('x')), '))']))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.bind('target', self.lookup('list')(), lambda: self.bind('', self.lookup('add')(self.lookup('operand'), join(['(frozenset(', self.lookup('repr')(self.lookup('x')), '), '])), lambda: self.bind('', self.lookup('add')(self.lookup('operand'), self.lookup('target')), lambda: self.bind('', self.lookup('add')(self.lookup('operand'), ')'), lambda: self.lookup('add')(self.lookup('patches'), concat([splice(0, 'Patch'), splice(0, self.lookup('target')), splice(0, self.lookup('y'))]))))))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('operand'), join(['char_eq(', self.lookup('repr')(self.lookup('x')), ')']))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('operand'), join(['char_range(', self.lookup('repr')(self.lookup('x')), ', ', self.lookup('repr')(self.lookup('y')), ')']))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('operand'), 'CHAR_ANY')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('operand'), join(['char_class(', self.lookup('repr')(self.lookup('y')), ', ', self.lookup('repr')(self.lookup('x')), ')']))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (262, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('add')(self.lookup('operand'), join(['lambda self: ', self.lookup('x')]))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (CALL, (262, True)),
+        (BIND, 'y'),
+        (CALL, (262, True)),
+        (BIND, 'z'),
+        (ACTION, lambda self: join(['self.bind(', self.lookup('repr')(self.lookup('x')), ', ', self.lookup('y'), ', lambda: ', self.lookup('z'), ')'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('repr')(self.lookup('x'))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (251, False)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['concat([', self.lookup('x'), '])'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (CALL, (262, True)),
+        (BIND, 'y'),
+        (ACTION, lambda self: join(['splice(', self.lookup('repr')(self.lookup('x')), ', ', self.lookup('y'), ')'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (251, False)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['join([', self.lookup('x'), '])'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (262, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['indent(', self.lookup('x'), ', ', "self.lookup('indentprefix'))"])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (262, True)),
+        (BIND, 'x'),
+        (CALL, (251, False)),
+        (BIND, 'y'),
+        (ACTION, lambda self: join([self.lookup('x'), '(', self.lookup('y'), ')'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['self.lookup(', self.lookup('repr')(self.lookup('x')), ')'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (LIST_START, None),
+        (BACKTRACK, 242),
+        (CALL, (262, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 238),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (BACKTRACK, 248),
+        (MATCH, CHAR_ANY),
+        (COMMIT, 247),
+        (FAIL, 'no match'),
+        (ACTION, lambda self: join([self.lookup('xs')])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (LIST_START, None),
+        (BACKTRACK, 257),
+        (CALL, (262, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 253),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (ACTION, lambda self: self.lookup('join')(self.lookup('xs'), ', ')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (PUSH_STREAM, None),
+        (MATCH_CALL_RULE, None),
+        (BIND, 'x'),
+        (POP_STREAM, None),
+        (ACTION, lambda self: self.lookup('x')),
+        (POP_SCOPE, None),
+        (RETURN, None),
     ]
-if __name__ == "__main__":
+class FunctionGenerator(Grammar):
+    rules = {
+        'Grammar': (0, False),
+        'Rule': (13, False),
+        'Memo': (21, False),
+        'NoMemo': (27, False),
+        'Auto': (33, False),
+        'Removed': (41, False),
+        'Or': (49, False),
+        'alternative': (66, False),
+        'Lookahead': (72, False),
+        'Scope': (91, False),
+        'And': (97, False),
+        'step': (119, False),
+        'Bind': (125, False),
+        'Star': (133, False),
+        'Not': (139, False),
+        'Cut': (145, False),
+        'MatchCallRule': (149, False),
+        'MatchRule': (153, False),
+        'MatchObject': (159, False),
+        'matchObject': (165, False),
+        'Eq': (173, False),
+        'Range': (179, False),
+        'Any': (187, False),
+        'MatchString': (191, False),
+        'MatchSet': (197, False),
+        'MatchStar': (216, False),
+        'MatchList': (224, False),
+        'Action': (230, False),
+        'Set': (236, False),
+        'String': (246, False),
+        'List': (252, False),
+        'ListItem': (258, False),
+        'Format': (266, False),
+        'Indent': (272, False),
+        'Call': (278, False),
+        'Lookup': (286, False),
+        'repr': (292, False),
+        'asts': (298, False),
+        'astList': (313, False),
+        'ast': (324, True)
+    }
+    removed = {}
+    code = [
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (LIST_START, None),
+        (BACKTRACK, 8),
+        (CALL, (324, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 4),
+        (LIST_END, None),
+        (BIND, 'ys'),
+        (ACTION, lambda self: self.bind('rules', self.lookup('list')(), lambda: self.bind('constants', self.lookup('list')(), lambda: self.bind('removed', self.lookup('list')(), lambda: self.bind('methods', self.lookup('ys'), lambda: join(['class ', self.lookup('x'), '(FunctionGrammar):\n', indent(join([self.lookup('constants'), self.lookup('methods'), 'rules = {\n', indent(join([self.lookup('join')(self.lookup('rules'), ',\n')]), self.lookup('indentprefix')), '\n}\n', 'removed = {', self.lookup('join')(self.lookup('removed'), ', '), '}\n']), self.lookup('indentprefix'))])))))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH_CALL_RULE, None),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.bind('', self.lookup('add')(self.lookup('rules'), join([self.lookup('repr')(self.lookup('x')), ': rule_', self.lookup('x')])), lambda: self.bind('rule', self.lookup('x'), lambda: self.lookup('y')))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['def rule_', self.lookup('rule'), '(self, stream, pos):\n', indent(join(['key = (', self.lookup('repr')(self.lookup('rule')), ', id(stream), pos)\n', 'if key in self.memo:\n', indent(join(['return self.memo[key]\n']), self.lookup('indentprefix')), 'scope = None\n', 'action = NONE_ACTION\n', 'cut = 0\n', self.lookup('x'), 'self.memo[key] = (ok, pos, action)\n', 'return self.memo[key]\n']), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['def rule_', self.lookup('rule'), '(self, stream, pos):\n', indent(join(['scope = None\n', 'action = NONE_ACTION\n', 'cut = 0\n', self.lookup('x'), 'return ok, pos, action\n']), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['def rule_', self.lookup('rule'), '(self, stream, pos):\n', indent(join(['key = (', self.lookup('repr')(self.lookup('rule')), ', id(stream), pos)\n', 'if key in self.memo:\n', indent(join(['return self.memo[key]\n']), self.lookup('indentprefix')), 'scope = None\n', 'action = NONE_ACTION\n', 'cut = 0\n', self.lookup('x'), 'self.memo[key] = (ok, pos, action)\n', 'return self.memo[key]\n']), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.bind('', self.lookup('add')(self.lookup('removed'), join([self.lookup('repr')(self.lookup('x')), ': ', self.lookup('repr')(self.lookup('y'))])), lambda: '')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (LIST_START, None),
+        (BACKTRACK, 61),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['if not ok and cut == cut', self.lookup('a'), ':\n', indent(join(['pos = backtrack', self.lookup('a'), '\n', self.lookup('x')]), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (LIST_APPEND, None),
+        (COMMIT, 53),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (ACTION, lambda self: self.bind('a', self.lookup('label')(), lambda: join(['backtrack', self.lookup('a'), ' = pos\n', 'cut', self.lookup('a'), ' = cut\n', self.lookup('x'), self.lookup('xs')]))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['if not ok and cut == cut', self.lookup('a'), ':\n', indent(join(['pos = backtrack', self.lookup('a'), '\n', self.lookup('x')]), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (PUSH_STREAM, None),
+        (LIST_START, None),
+        (BACKTRACK, 83),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('repr')(self.lookup('x'))),
+        (POP_SCOPE, None),
+        (LIST_APPEND, None),
+        (COMMIT, 75),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (POP_STREAM, None),
+        (CALL, (324, True)),
+        (BIND, 'y'),
+        (ACTION, lambda self: join(['if (pos < len(stream) and not isinstance(stream[pos], list) and\n', '        stream[pos] in {', self.lookup('join')(self.lookup('xs'), ', '), '}):\n', indent(join([self.lookup('y')]), self.lookup('indentprefix')), 'else:\n', indent(join(['ok = False\n']), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.bind('a', self.lookup('label')(), lambda: join(['scope', self.lookup('a'), ' = scope\n', 'scope = {}\n', self.lookup('x'), 'scope = scope', self.lookup('a'), '\n']))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (BACKTRACK, 115),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (LIST_START, None),
+        (BACKTRACK, 110),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['if ok:\n', indent(join([self.lookup('x')]), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (LIST_APPEND, None),
+        (COMMIT, 102),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (ACTION, lambda self: join([self.lookup('x'), self.lookup('xs')])),
+        (POP_SCOPE, None),
+        (COMMIT, 118),
+        (PUSH_SCOPE, None),
+        (ACTION, lambda self: join(['ok = True\n'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['if ok:\n', indent(join([self.lookup('x')]), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (CALL, (324, True)),
+        (BIND, 'y'),
+        (ACTION, lambda self: join([self.lookup('y'), 'if ok:\n', indent(join(['scope[', self.lookup('repr')(self.lookup('x')), '] = action\n']), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.bind('a', self.lookup('label')(), lambda: join(['xs', self.lookup('a'), ' = []\n', 'while True:\n', indent(join(['backtrack', self.lookup('a'), ' = pos\n', 'cut', self.lookup('a'), ' = cut\n', self.lookup('x'), 'if not ok:\n', indent(join(['pos = backtrack', self.lookup('a'), '\n', 'ok = cut == cut', self.lookup('a'), '\n', 'break\n']), self.lookup('indentprefix')), 'xs', self.lookup('a'), '.append(action)\n']), self.lookup('indentprefix')), 'if ok:\n', indent(join(['action = SemanticAction(xs', self.lookup('a'), ', eval_list)\n']), self.lookup('indentprefix'))]))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.bind('a', self.lookup('label')(), lambda: join(['backtrack', self.lookup('a'), ' = pos\n', 'cut', self.lookup('a'), ' = cut\n', self.lookup('x'), 'if ok:\n', indent(join(["ok = self.fail(pos, ('no match',))\n"]), self.lookup('indentprefix')), 'else:\n', indent(join(['ok = cut == cut', self.lookup('a'), '\n']), self.lookup('indentprefix')), 'pos = backtrack', self.lookup('a'), '\n']))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (ACTION, lambda self: join(['cut += 1\n', 'ok = True\n'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (ACTION, lambda self: join(['if pos < len(stream) and stream[pos] in self.rules:\n', indent(join(['ok, pos, action = self.rules[stream[pos]](self, stream, pos+1)\n']), self.lookup('indentprefix')), 'else:\n', indent(join(["ok = self.fail(pos, ('expected rule name',))\n"]), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['ok, pos, action = self.rule_', self.lookup('x'), '(stream, pos)\n'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('run')('matchObject', self.lookup('x'))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: join(['if pos < len(stream) and ', self.lookup('x'), ':\n', indent(join(['action = value_action(stream[pos])\n', 'pos += 1\n', 'ok = True\n']), self.lookup('indentprefix')), 'else:\n', indent(join(["ok = self.fail(pos, ('expected {}', ", self.lookup('repr')(self.lookup('y')), '))\n']), self.lookup('indentprefix'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: concat([splice(0, join(['stream[pos] == ', self.lookup('repr')(self.lookup('x'))])), splice(0, self.lookup('x'))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: concat([splice(0, join([self.lookup('repr')(self.lookup('x')), ' <= stream[pos] <= ', self.lookup('repr')(self.lookup('y'))])), splice(0, join(['range ', self.lookup('repr')(self.lookup('x')), '-', self.lookup('repr')(self.lookup('y'))]))])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (ACTION, lambda self: concat([splice(0, 'True'), splice(0, 'any')])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['ok, pos, action = self.match_string(stream, pos, action, ', self.lookup('repr')(self.lookup('x')), ')\n'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (PUSH_STREAM, None),
+        (LIST_START, None),
+        (BACKTRACK, 208),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('repr')(self.lookup('x'))),
+        (POP_SCOPE, None),
+        (LIST_APPEND, None),
+        (COMMIT, 200),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (POP_STREAM, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.lookup('run')('matchObject', concat([splice(0, join(['not isinstance(stream[pos], list) and ', 'stream[pos] in {', self.lookup('join')(self.lookup('xs'), ', '), '}'])), splice(0, self.lookup('y'))]))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (MATCH, CHAR_ANY),
+        (BIND, 'y'),
+        (ACTION, lambda self: self.bind('a', self.lookup('label')(), lambda: self.bind('', self.lookup('add')(self.lookup('constants'), join(['char_class', self.lookup('a'), ' = char_class(', self.lookup('repr')(self.lookup('y')), ', ', self.lookup('repr')(self.lookup('x')), ')\n'])), lambda: join(['ok, pos, action = self.match_star(stream, pos, self.char_class', self.lookup('a'), ')\n'])))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.bind('a', self.lookup('label')(), lambda: join(['if pos < len(stream) and isinstance(stream[pos], list):\n', indent(join(['stream', self.lookup('a'), ', pos', self.lookup('a'), ' = stream, pos\n', 'self.pos_rest += (pos,)\n', 'stream, pos = stream[pos], 0\n', self.lookup('x'), 'if ok and pos < len(stream):\n', indent(join(["ok = self.fail(pos, ('expected end of list',))\n"]), self.lookup('indentprefix')), 'self.pos_rest = self.pos_rest[:-1]\n', 'stream, pos = stream', self.lookup('a'), ', pos', self.lookup('a'), '+1\n']), self.lookup('indentprefix')), 'else:\n', indent(join(["ok = self.fail(pos, ('expected list',))\n"]), self.lookup('indentprefix'))]))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['action = SemanticAction(scope, lambda self: ', self.lookup('x'), ')\n', 'ok = True\n'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (CALL, (324, True)),
+        (BIND, 'y'),
+        (CALL, (324, True)),
+        (BIND, 'z'),
+        (ACTION, lambda self: join(['self.bind(', self.lookup('repr')(self.lookup('x')), ', ', self.lookup('y'), ', lambda: ', self.lookup('z'), ')'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('repr')(self.lookup('x'))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (313, False)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['concat([', self.lookup('x'), '])'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (CALL, (324, True)),
+        (BIND, 'y'),
+        (ACTION, lambda self: join(['splice(', self.lookup('repr')(self.lookup('x')), ', ', self.lookup('y'), ')'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (313, False)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['join([', self.lookup('x'), '])'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['indent(', self.lookup('x'), ', ', "self.lookup('indentprefix'))"])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (CALL, (324, True)),
+        (BIND, 'x'),
+        (CALL, (313, False)),
+        (BIND, 'y'),
+        (ACTION, lambda self: join([self.lookup('x'), '(', self.lookup('y'), ')'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: join(['self.lookup(', self.lookup('repr')(self.lookup('x')), ')'])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (MATCH, CHAR_ANY),
+        (BIND, 'x'),
+        (ACTION, lambda self: self.lookup('repr')(self.lookup('x'))),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (LIST_START, None),
+        (BACKTRACK, 304),
+        (CALL, (324, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 300),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (BACKTRACK, 310),
+        (MATCH, CHAR_ANY),
+        (COMMIT, 309),
+        (FAIL, 'no match'),
+        (ACTION, lambda self: join([self.lookup('xs')])),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (LIST_START, None),
+        (BACKTRACK, 319),
+        (CALL, (324, True)),
+        (LIST_APPEND, None),
+        (COMMIT, 315),
+        (LIST_END, None),
+        (BIND, 'xs'),
+        (ACTION, lambda self: self.lookup('join')(self.lookup('xs'), ', ')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+        (PUSH_SCOPE, None),
+        (PUSH_STREAM, None),
+        (MATCH_CALL_RULE, None),
+        (BIND, 'x'),
+        (POP_STREAM, None),
+        (ACTION, lambda self: self.lookup('x')),
+        (POP_SCOPE, None),
+        (RETURN, None),
+    ]
+INLINE_MAX_SIZE = 8
+
+class Lookahead(object):
+
+    def run(self, rule, grammars):
+        return [self.grammar(grammar) for grammar in grammars]
+
+    def grammar(self, grammar):
+        self.firsts = {rule[1]: (frozenset(), False) for rule in grammar[2:]}
+        changed = True
+        while changed:
+            changed = False
+            for rule in grammar[2:]:
+                first = self.first(rule[-1])
+                if first != self.firsts[rule[1]]:
+                    self.firsts[rule[1]] = first
+                    changed = True
+        return grammar[:2] + [
+            rule[:-1] + [self.annotate(rule[-1])]
+            for rule in grammar[2:]
+        ]
+
+    def annotate(self, node):
+        if node[0] == "Or":
+            return (
+                node[:1] +
+                [self.lookahead(x) for x in node[1:-1]] +
+                [self.annotate(x) for x in node[-1:]]
+            )
+        elif node[0] in ["Scope", "And", "Star", "Not", "MatchList"]:
+            return node[:1] + [self.annotate(x) for x in node[1:]]
+        elif node[0] == "Bind":
+            return node[:2] + [self.annotate(node[2])]
+        else:
+            return node
+
+    def lookahead(self, node):
+        keys, nullable = self.first(node)
+        if nullable or not keys:
+            return self.annotate(node)
+        return ["Lookahead", sorted(keys), self.annotate(node)]
+
+    def first(self, node):
+        return getattr(self, "first_"+node[0])(*node[1:])
+
+    def first_Or(self, *xs):
+        keys, nullable = (frozenset(), False)
+        for x in xs:
+            x_keys, x_nullable = self.first(x)
+            keys = union(keys, x_keys)
+            nullable = nullable or x_nullable
+        return (keys, nullable)
+
+    def first_Scope(self, x):
+        return self.first(x)
+
+    def first_And(self, *xs):
+        keys = frozenset()
+        for x in xs:
+            x_keys, x_nullable = self.first(x)
+            keys = union(keys, x_keys)
+            if not x_nullable:
+                return (keys, False)
+        return (keys, True)
+
+    def first_Bind(self, name, x):
+        return self.first(x)
+
+    def first_Star(self, x):
+        return (self.first(x)[0], True)
+
+    def first_Not(self, x):
+        return (frozenset(), True)
+
+    def first_Cut(self):
+        return (None, True)
+
+    def first_MatchCallRule(self):
+        return (None, False)
+
+    def first_MatchRule(self, name):
+        return self.firsts.get(name, (None, True))
+
+    def first_MatchObject(self, x):
+        return (object_keys(x), False)
+
+    def first_MatchString(self, x):
+        return (frozenset([x[0]]), False)
+
+    def first_MatchSet(self, x, y):
+        return (frozenset(x), False)
+
+    def first_MatchStar(self, x, y):
+        return (frozenset(x), True)
+
+    def first_MatchList(self, x):
+        return (None, False)
+
+    def first_Action(self, x):
+        return (frozenset(), True)
+
+class Fuse(object):
+
+    def run(self, rule, grammars):
+        return [self.grammar(grammar) for grammar in grammars]
+
+    def grammar(self, grammar):
+        self.sets = {}
+        while True:
+            rules = [rule[:-1] + [self.fuse(rule[-1])] for rule in grammar[2:]]
+            sets = {
+                rule[1]: self.match_set(rule[-1])
+                for rule in rules
+                if self.match_set(rule[-1]) is not None
+            }
+            if sets == self.sets:
+                return grammar[:2] + rules
+            self.sets = sets
+
+    def fuse(self, node):
+        if node[0] == "Or":
+            xs = [self.fuse(x) for x in node[1:]]
+            sets = [self.match_set(x) for x in xs]
+            if len(xs) > 1 and None not in sets:
+                return [
+                    "MatchSet",
+                    sorted(frozenset().union(*[keys for keys, _ in sets])),
+                    sets[-1][1]
+                ]
+            return node[:1] + xs
+        elif node[0] == "And":
+            xs = []
+            for x in [self.fuse(x) for x in node[1:]]:
+                if xs and self.match_string(xs[-1]) and self.match_string(x):
+                    xs[-1] = ["MatchString", self.match_string(xs[-1])+self.match_string(x)]
+                else:
+                    xs.append(x)
+            if len(xs) == 1 and xs[0][0] == "MatchString":
+                return xs[0]
+            return node[:1] + xs
+        elif node[0] == "Star":
+            x = self.fuse(node[1])
+            if self.match_set(x) is not None:
+                keys, description = self.match_set(x)
+                return ["MatchStar", sorted(keys), description]
+            return node[:1] + [x]
+        elif node[0] in ["Scope", "Not", "MatchList"]:
+            return node[:1] + [self.fuse(x) for x in node[1:]]
+        elif node[0] == "Bind":
+            return node[:2] + [self.fuse(node[2])]
+        else:
+            return node
+
+    def match_string(self, node):
+        if node[0] == "MatchObject" and node[1][0] == "Eq":
+            return node[1][1]
+        elif node[0] == "MatchString":
+            return node[1]
+
+    def match_set(self, node):
+        while node[0] in ["Scope", "And"] and len(node) == 2:
+            node = node[1]
+        if node[0] == "MatchSet":
+            return (frozenset(node[1]), node[2])
+        elif node[0] == "MatchRule" and node[1] in self.sets:
+            return self.sets[node[1]]
+        elif node[0] == "MatchObject" and object_keys(node[1]) is not None:
+            if node[1][0] == "Eq":
+                return (object_keys(node[1]), node[1][1])
+            else:
+                return (object_keys(node[1]), "range {!r}-{!r}".format(*node[1][1:]))
+
+class LeftFactor(object):
+
+    def run(self, rule, grammars):
+        return [self.grammar(grammar) for grammar in grammars]
+
+    def grammar(self, grammar):
+        self.names = 0
+        return grammar[:2] + [
+            rule[:-1] + [self.factor(rule[-1])]
+            for rule in grammar[2:]
+        ]
+
+    def factor(self, node):
+        if node[0] == "Or":
+            return self.factor_or([self.factor(x) for x in node[1:]])
+        elif node[0] in ["Scope", "And", "Star", "Not", "MatchList"]:
+            return node[:1] + [self.factor(x) for x in node[1:]]
+        elif node[0] == "Bind":
+            return node[:2] + [self.factor(node[2])]
+        else:
+            return node
+
+    def factor_or(self, xs):
+        groups = []
+        for x in xs:
+            if groups and self.head(x) is not None and self.head(x) == self.head(groups[-1][0]):
+                groups[-1].append(x)
+            else:
+                groups.append([x])
+        alternatives = []
+        for group in groups:
+            factored = self.factor_group(group) if len(group) > 1 else None
+            if factored is None:
+                alternatives.extend(group)
+            else:
+                alternatives.append(factored)
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return ["Or"] + alternatives
+
+    def head(self, node):
+        items = self.items(node)
+        if items:
+            return (node[0], self.unbind(items[0]))
+
+    def items(self, node):
+        if node[0] == "Scope" and node[1][0] == "And":
+            return node[1][1:]
+        elif node[0] == "And":
+            return node[1:]
+
+    def unbind(self, node):
+        if node[0] == "Bind":
+            return node[2]
+        return node
+
+    def factor_group(self, group):
+        sequences = [self.items(x) for x in group]
+        prefix = []
+        while all(len(sequence) > len(prefix) for sequence in sequences):
+            item = self.common([sequence[len(prefix)] for sequence in sequences], sequences)
+            if item is None:
+                break
+            prefix.append(item)
+        if not prefix:
+            return None
+        suffixes = [["And"] + sequence[len(prefix):] for sequence in sequences]
+        values = [self.sets_action(suffix) for suffix in suffixes]
+        if None in values:
+            return None
+        if False in values:
+            if prefix[-1][0] != "Bind":
+                self.names += 1
+                prefix[-1] = ["Bind", "_{}".format(self.names), prefix[-1]]
+            suffixes = [
+                suffix if value else suffix + [["Action", ["Lookup", prefix[-1][1]]]]
+                for suffix, value in zip(suffixes, values)
+            ]
+        for index, suffix in enumerate(suffixes):
+            for later in suffixes[index+1:]:
+                stale = self.find(suffix, "Bind") - self.find(later, "Bind")
+                if stale & self.find(later, "Lookup"):
+                    return None
+        x = ["And"] + prefix + [self.factor_or(suffixes)]
+        if group[0][0] == "Scope":
+            return ["Scope", x]
+        return x
+
+    def common(self, items, sequences):
+        x = self.unbind(items[0])
+        if x[0] == "Action" or self.cuts(x):
+            return None
+        if any(self.unbind(item) != x for item in items):
+            return None
+        names = {item[1] for item in items if item[0] == "Bind"}
+        if len(names) > 1:
+            return None
+        if not names:
+            return x
+        name = names.pop()
+        for item, sequence in zip(items, sequences):
+            if item[0] != "Bind" and name in self.find(["And"] + sequence, "Lookup"):
+                return None
+        return ["Bind", name, x]
+
+    def sets_action(self, node):
+        if node[0] in ["Cut", "Not"]:
+            return False
+        elif node[0] in ["Scope", "Bind", "MatchList"]:
+            return self.sets_action(node[-1])
+        elif node[0] == "And":
+            values = [self.sets_action(x) for x in node[1:]]
+            if True in values:
+                return True
+            elif None in values:
+                return None
+            return False
+        elif node[0] == "Or":
+            values = {self.sets_action(x) for x in node[1:]}
+            return values.pop() if len(values) == 1 else None
+        return True
+
+    def cuts(self, node):
+        return isinstance(node, list) and (
+            node[:1] == ["Cut"] or any(self.cuts(x) for x in node[1:])
+        )
+
+    def find(self, node, name):
+        if not isinstance(node, list) or node[:1] == ["Scope"]:
+            return set()
+        found = {node[1]} if node[:1] == [name] else set()
+        for x in node[1:]:
+            found |= self.find(x, name)
+        return found
+
+class Inline(object):
+
+    def __init__(self, entries=[]):
+        self.roots = set(entries)
+
+    def run(self, rule, grammars):
+        return [self.grammar(grammar) for grammar in grammars]
+
+    def grammar(self, grammar):
+        calls = {rule[1]: self.find(rule[-1], "MatchRule") for rule in grammar[2:]}
+        self.bodies = {
+            rule[1]: rule[-1]
+            for rule in grammar[2:]
+            if self.inlinable(rule) and rule[1] not in self.reachable(calls, calls[rule[1]])
+        }
+        self.inlined = {name: [] for name in self.bodies}
+        rules = [rule[:-1] + [self.inline(rule[-1], rule[1])] for rule in grammar[2:]]
+        entries = self.entries(grammar)
+        if entries is None:
+            return grammar[:2] + rules
+        calls = {rule[1]: self.find(rule[-1], "MatchRule") for rule in rules}
+        live = self.reachable(calls, entries)
+        return grammar[:2] + [rule for rule in rules if rule[1] in live] + [
+            ["Removed", rule[1], self.reason(rule[1], entries)]
+            for rule in rules
+            if rule[1] not in live
+        ]
+
+    def inlinable(self, rule):
+        return (
+            rule[2] != "Memo" and
+            self.size(rule[-1]) <= INLINE_MAX_SIZE and
+            not any(
+                x[0] in ["Cut", "Star", "MatchCallRule"]
+                for x in self.walk(rule[-1])
+            )
+        )
+
+    def inline(self, node, caller):
+        if node[0] == "MatchRule" and node[1] in self.bodies:
+            if caller not in self.inlined[node[1]]:
+                self.inlined[node[1]].append(caller)
+            return self.inline(self.bodies[node[1]], caller)
+        elif node[0] in ["Or", "Scope", "And", "Star", "Not", "MatchList"]:
+            return node[:1] + [self.inline(x, caller) for x in node[1:]]
+        elif node[0] in ["Bind", "Lookahead"]:
+            return node[:2] + [self.inline(node[2], caller)]
+        else:
+            return node
+
+    def entries(self, grammar):
+        entries = {rule[1] for rule in grammar[2:] if rule[1] in self.roots}
+        if not entries:
+            return None
+        for node in self.walk(grammar, skip=None):
+            if node[0] == "MatchCallRule":
+                return None
+            elif node[0] == "Call" and node[1] == ["Lookup", "run"]:
+                if node[2:3] == [] or node[2][0] != "String":
+                    return None
+                entries.add(node[2][1])
+        return entries
+
+    def reason(self, name, entries):
+        if self.inlined.get(name):
+            return "inlined into {}".format(", ".join(self.inlined[name]))
+        return "unreachable from {}".format(", ".join(sorted(entries)))
+
+    def reachable(self, calls, names):
+        reachable = set()
+        names = list(names)
+        while names:
+            name = names.pop()
+            if name not in reachable:
+                reachable.add(name)
+                names.extend(calls.get(name, []))
+        return reachable
+
+    def size(self, node):
+        if node[0] == "Action":
+            return 1
+        return 1 + sum(
+            self.size(x)
+            for x in node[1:]
+            if isinstance(x, list) and x and isinstance(x[0], str)
+        )
+
+    def find(self, node, name):
+        return {x[1] for x in self.walk(node) if x[0] == name}
+
+    def walk(self, node, skip="Action"):
+        nodes = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list) and node and isinstance(node[0], str):
+                nodes.append(node)
+                if node[0] != skip:
+                    stack.extend(node[1:])
+        return nodes
+
+def object_keys(x):
+    if x[0] == "Eq":
+        return frozenset([x[1]])
+    elif x[0] == "Range" and ord(x[2])-ord(x[1]) < 256:
+        return frozenset(chr(i) for i in range(ord(x[1]), ord(x[2])+1))
+
+def union(keys, other_keys):
+    if keys is None or other_keys is None:
+        return None
+    return keys | other_keys
+BACKENDS = {
+    "vm": [(CodeGenerator, "asts"), (Assembler, "asts")],
+    "pyfunc": [(FunctionGenerator, "asts")],
+}
+
+def compile_grammar(backend, source, write, profile=None, left_factor=True, inline=True, entries=[]):
+    write_text(compile_chain(
+        [(Parser, "file")] +
+        ([(LeftFactor, "asts")] if left_factor else []) +
+        [(Fuse, "asts"), (Lookahead, "asts")] +
+        ([(lambda: Inline(entries), "asts")] if inline else []) +
+        BACKENDS[backend],
+        source,
+        profile=profile,
+        rope=True
+    ), write)
+
+def compile_grammar_to_string(backend, source, left_factor=True, inline=True, entries=[]):
+    chunks = []
+    compile_grammar(backend, source, chunks.append, left_factor=left_factor, inline=inline, entries=entries)
+    return "".join(chunks)
+
+def main(args, stdin, write):
+    import concurrent.futures
     import sys
     def read(path):
         if path == "-":
-            return sys.stdin.read()
+            return stdin.read()
         with open(path) as f:
             return f.read()
-    args = sys.argv[1:] or ["--compile", "-"]
+    backend = "vm"
+    jobs = 1
+    left_factor = True
+    inline = True
+    entries = []
+    profile = None
+    profile_outputs = []
+    outputs = []
+    args = list(args) or ["--compile", "-"]
     while args:
         command = args.pop(0)
         if command == "--support":
-            sys.stdout.write(SUPPORT)
+            outputs.append(SUPPORT)
         elif command == "--copy":
-            sys.stdout.write(read(args.pop(0)))
+            outputs.append(read(args.pop(0)))
         elif command == "--embed":
-            sys.stdout.write("{} = {}\n".format(
+            outputs.append("{} = {}\n".format(
                 args.pop(0),
                 repr(read(args.pop(0)))
             ))
+        elif command == "--backend":
+            backend = args.pop(0)
+            if backend not in BACKENDS:
+                sys.exit("ERROR: Unknown backend '{}'".format(backend))
+        elif command == "--jobs":
+            jobs = int(args.pop(0))
+        elif command == "--no-left-factor":
+            left_factor = False
+        elif command == "--no-inline":
+            inline = False
+        elif command == "--entry":
+            entries.append(args.pop(0))
+        elif command in ["--profile", "--profile-stacks", "--profile-backtracks"]:
+            profile = profile or Profile()
+            profile_outputs.append((command, args.pop(0)))
         elif command == "--compile":
-            sys.stdout.write(compile_chain(
-                [(Parser, "file"), (CodeGenerator, "asts"), (Assembler, "asts")],
-                read(args.pop(0))
-            ))
+            path = args.pop(0)
+            source = read(path)
+            outputs.append((backend, source))
         else:
             sys.exit("ERROR: Unknown command '{}'".format(command))
+    compiles = [output for output in outputs if isinstance(output, tuple)]
+    if jobs > 1 and len(compiles) > 1 and profile is None:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            compiled = executor.map(
+                compile_grammar_to_string,
+                *zip(*compiles),
+                [left_factor]*len(compiles),
+                [inline]*len(compiles),
+                [entries]*len(compiles)
+            )
+            for output in outputs:
+                write(next(compiled) if isinstance(output, tuple) else output)
+    else:
+        for output in outputs:
+            if isinstance(output, tuple):
+                compile_grammar(*output, write, profile, left_factor, inline, entries)
+            else:
+                write(output)
+    for command, path in profile_outputs:
+        if command == "--profile":
+            content = profile.report()
+        elif command == "--profile-backtracks":
+            content = profile.backtrack_report(compiler_sources())
+        else:
+            content = profile.collapsed_stacks()
+        if path == "-":
+            sys.stderr.write(content)
+        else:
+            with open(path, "w") as f:
+                f.write(content)
+
+def compiler_sources():
+    import glob
+    import os
+    sources = []
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for path in sorted(glob.glob(os.path.join(directory, "src", "*.rlmeta"))):
+        with open(path) as f:
+            sources.append((os.path.relpath(path), f.read()))
+    return sources
+
+if __name__ == "__main__":
+    import sys
+    main(sys.argv[1:], sys.stdin, sys.stdout.write)
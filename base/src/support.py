@@ -1,140 +1,694 @@
+import mmap
+import re
+import time
+
+MEMO_EVICT_SIZE = 10000
+
+RUNTIME_MAX_DEPTH = 8
+
+WRITER_BUFFER_SIZE = 4096
+
+INPUT_CHUNK_SIZE = 65536
+
 class VM:
 
-    def __init__(self, code, rules):
+    def __init__(self, code, rules, memo_limit=None, name="VM"):
         self.code = code
         self.rules = rules
+        self.memo_limit = memo_limit
+        self.name = name
 
-    def run(self, start_rule, stream):
-        self.action = SemanticAction(None)
-        self.pc = self.rules[start_rule]
+    def run(self, start_rule, stream, memo=None, profile=None):
+        self.action = NONE_ACTION
+        self.pc, _ = self.rules[start_rule]
         self.call_backtrack_stack = []
         self.stream, self.stream_rest = (stream, None)
         self.pos, self.pos_rest = (0, tuple())
         self.scope, self.scope_rest = (None, None)
         self.latest_fail_message, self.latest_fail_pos = (None, tuple())
-        self.memo = {}
+        self.memo_stride = len(self.code)+1
+        code = self.code
+        if isinstance(stream, InputWindow):
+            code = stream.attach(code)
+        elif isinstance(stream, BYTES_TYPES):
+            code = bytes_code(code)
+        if memo is None:
+            self.memo = {}
+            self.memo_evict_size = MEMO_EVICT_SIZE
+            if self.memo_limit is not None:
+                self.memo_evict_size = min(self.memo_evict_size, self.memo_limit)
+        else:
+            self.memo = memo
+            self.memo_evict_size = float("inf")
+            code = memo.attach(self, code)
+        if profile is not None:
+            code = profile.attach(self, code, start_rule)
         while True:
-            result = self.pop_arg()(self)
+            fn, arg = code[self.pc]
+            self.pc += 1
+            result = fn(self, arg)
             if result:
                 return result
 
-    def pop_arg(self):
-        code = self.code[self.pc]
-        self.pc += 1
-        return code
+class IncrementalMemo(dict):
+
+    def __init__(self):
+        dict.__init__(self)
+        self.code = None
+        self.reaches = {}
+        self.fails = {}
+        self.calls = []
+        self.reach = 0
+
+    def attach(self, vm, code):
+        if code is not self.code:
+            self.clear()
+            self.reaches.clear()
+            self.fails.clear()
+            self.code = code
+            self.stride = vm.memo_stride
+            self.reaching_code = [
+                (REACH_(fn, len if fn is MATCH_STRING else lambda arg: 1), arg)
+                if fn in STREAM_OPS else (fn, arg)
+                for fn, arg in code
+            ]
+        self.vm = vm
+        self.calls.clear()
+        self.reach = 0
+        return self.reaching_code
+
+    def __contains__(self, key):
+        if dict.__contains__(self, key):
+            self.reach = max(self.reach, self.reaches[key])
+            fail_pos, fail_message = self.fails[key]
+            if fail_pos >= self.vm.latest_fail_pos:
+                self.vm.latest_fail_pos, self.vm.latest_fail_message = (fail_pos, fail_message)
+            return True
+        self.calls.append((self.reach, self.vm.latest_fail_pos, self.vm.latest_fail_message))
+        self.reach = key//self.stride
+        self.vm.latest_fail_pos = tuple()
+        return False
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.reaches[key] = self.reach
+        self.fails[key] = (self.vm.latest_fail_pos, self.vm.latest_fail_message)
+        reach, fail_pos, fail_message = self.calls.pop()
+        self.reach = max(reach, self.reach)
+        if fail_pos > self.vm.latest_fail_pos:
+            self.vm.latest_fail_pos, self.vm.latest_fail_message = (fail_pos, fail_message)
+
+    def edit(self, offset, removed, inserted):
+        end = offset+removed
+        shift = len(inserted)-removed
+        entries = [
+            (
+                key,
+                value,
+                self.reaches.get(key, key//self.stride+1),
+                self.fails.get(key, (tuple(), None))
+            )
+            for key, value in self.items()
+        ]
+        self.clear()
+        self.reaches.clear()
+        self.fails.clear()
+        for key, value, reach, (fail_pos, fail_message) in entries:
+            if key//self.stride >= end:
+                key += shift*self.stride
+                reach += shift
+                if isinstance(value, tuple) and value[0] is not None:
+                    value = (value[0], value[1]+shift)
+                if fail_pos:
+                    fail_pos = (fail_pos[0]+shift,)+fail_pos[1:]
+            elif reach > offset:
+                continue
+            dict.__setitem__(self, key, value)
+            self.reaches[key] = reach
+            self.fails[key] = (fail_pos, fail_message)
+
+def REACH_(fn, extent):
+    def reach(vm, arg):
+        if vm.pos_rest:
+            return fn(vm, arg)
+        memo = vm.memo
+        memo.reach = max(memo.reach, vm.pos+extent(arg))
+        result = fn(vm, arg)
+        if fn is MATCH_STAR:
+            memo.reach = max(memo.reach, vm.pos+1)
+        return result
+    return reach
+
+class InputWindow(object):
+
+    def __init__(self, file, chunk_size=INPUT_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.offset = 0
+        self.eof = False
+        self.code = None
+
+    def attach(self, code):
+        if code is not self.code:
+            self.code = code
+            self.filling_code = [
+                (FILL_(fn, len if fn is MATCH_STRING else lambda arg: 1), arg)
+                if fn in STREAM_OPS else (fn, arg)
+                for fn, arg in code
+            ]
+        return self.filling_code
+
+    def fill(self, end):
+        while len(self) < end and not self.eof:
+            self.read()
+
+    def read(self):
+        chunk = self.file.read(self.chunk_size)
+        if chunk:
+            self.buffer += chunk
+        else:
+            self.eof = True
+
+    def release(self, pos):
+        if pos-self.offset >= self.chunk_size:
+            self.buffer = self.buffer[pos-self.offset:]
+            self.offset = pos
+
+    def match_star(self, pattern, pos):
+        end = pos
+        while True:
+            end = pattern.match(self.buffer, end-self.offset).end()+self.offset
+            if end < len(self) or self.eof:
+                return end
+            self.read()
+
+    def __len__(self):
+        return self.offset+len(self.buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop = (index.start, index.stop)
+        else:
+            start, stop = (index, None)
+        if start < self.offset:
+            raise IndexError("position {} is no longer buffered".format(start))
+        if stop is None:
+            return self.buffer[start-self.offset]
+        return self.buffer[start-self.offset:stop-self.offset]
+
+def FILL_(fn, extent):
+    def fill(vm, arg):
+        if not vm.pos_rest:
+            end = vm.pos+extent(arg)
+            if end > len(vm.stream) and not vm.stream.eof:
+                RELEASE_(vm)
+                vm.stream.fill(end)
+        return fn(vm, arg)
+    return fill
+
+def RELEASE_(vm):
+    floor = vm.pos
+    for entry in vm.call_backtrack_stack:
+        if len(entry) == 8 and entry[1] is vm.stream:
+            floor = entry[4]
+            break
+    vm.stream.release(floor)
+
+class Profile(object):
+
+    def __init__(self):
+        self.rules = {}
+        self.opcodes = {}
+        self.stacks = {}
+        self.backtrack_sites = {}
+        self.frames = []
+        self.codes = {}
+
+    def attach(self, vm, code, start_rule):
+        if id(code) not in self.codes:
+            names = {
+                pc: "{}.{}".format(vm.name, rule)
+                for rule, (pc, _) in vm.rules.items()
+            }
+            sites = backtrack_sites(vm.code, names)
+            self.codes[id(code)] = (code, [
+                (self.profiled(original, fn, names, sites), arg)
+                for (original, _), (fn, arg) in zip(vm.code, code)
+            ])
+        self.count("{}.{}".format(vm.name, start_rule), "calls")
+        self.enter("{}.{}".format(vm.name, start_rule), -1)
+        return self.codes[id(code)][1]
+
+    def profiled(self, original, fn, names, sites):
+        name = original.__name__
+        def op(vm, arg):
+            self.opcodes[name] = self.opcodes.get(name, 0) + 1
+            depth = len(vm.call_backtrack_stack)
+            top_pos = vm.pos_rest[0] if vm.pos_rest else vm.pos
+            callee, pos = (None, vm.pos)
+            if original is CALL:
+                callee = arg
+            elif original is MATCH_CALL_RULE:
+                if (pos < len(vm.stream) and
+                        not isinstance(vm.stream[pos], list) and
+                        vm.stream[pos] in vm.rules):
+                    callee, pos = (vm.rules[vm.stream[pos]], pos+1)
+            hit = (
+                callee is not None and callee[1] and
+                dict.__contains__(vm.memo, pos*vm.memo_stride+callee[0])
+            )
+            try:
+                result = fn(vm, arg)
+            except MatchError:
+                self.leave(-1)
+                raise
+            if hit:
+                self.count(names[callee[0]], "calls", "memo_hits")
+            elif callee is not None and len(vm.call_backtrack_stack) > depth:
+                if callee[1]:
+                    self.count(names[callee[0]], "calls", "memo_misses")
+                else:
+                    self.count(names[callee[0]], "calls")
+                self.enter(names[callee[0]], depth)
+            if (len(vm.call_backtrack_stack) < depth and
+                    original is not RETURN and
+                    original is not COMMIT):
+                self.count(self.frames[-1][0], "backtracks")
+                if vm.pc in sites:
+                    self.backtracked(
+                        sites[vm.pc],
+                        top_pos-(vm.pos_rest[0] if vm.pos_rest else vm.pos)
+                    )
+            self.leave(-1 if result else len(vm.call_backtrack_stack))
+            return result
+        return op
+
+    def enter(self, name, depth):
+        path = name if depth < 0 else "{};{}".format(self.frames[-1][4], name)
+        self.frames.append([name, depth, time.perf_counter(), 0, path])
+
+    def leave(self, depth):
+        while self.frames and self.frames[-1][1] >= depth:
+            name, _, start, children, path = self.frames.pop()
+            elapsed = time.perf_counter()-start
+            self.stats(name)["total_seconds"] += elapsed
+            self.stats(name)["self_seconds"] += elapsed-children
+            self.stacks[path] = self.stacks.get(path, 0)+elapsed-children
+            if self.frames:
+                self.frames[-1][3] += elapsed
+
+    def count(self, name, *counters):
+        for counter in counters:
+            self.stats(name)[counter] += 1
+
+    def stats(self, name):
+        if name not in self.rules:
+            self.rules[name] = dict.fromkeys(PROFILE_COUNTERS, 0)
+        return self.rules[name]
+
+    def backtracked(self, site, wasted):
+        if site not in self.backtrack_sites:
+            self.backtrack_sites[site] = [0, 0, 0]
+        counts = self.backtrack_sites[site]
+        counts[0] += 1
+        counts[1] += wasted
+        counts[2] = max(counts[2], wasted)
 
-def PUSH_SCOPE(vm):
+    def report(self):
+        lines = ["{:<32} {:>8} {:>10} {:>12} {:>10} {:>10} {:>10}".format(
+            "rule", "calls", "memo hits", "memo misses", "backtracks", "total", "self"
+        )]
+        for name, counts in sorted(
+            self.rules.items(),
+            key=lambda item: -item[1]["self_seconds"]
+        ):
+            lines.append("{:<32} {:>8} {:>10} {:>12} {:>10} {:>9.3f}s {:>9.3f}s".format(
+                name,
+                counts["calls"],
+                counts["memo_hits"],
+                counts["memo_misses"],
+                counts["backtracks"],
+                counts["total_seconds"],
+                counts["self_seconds"]
+            ))
+        lines.append("")
+        lines.append("{:<32} {:>12}".format("opcode", "count"))
+        for name, count in sorted(self.opcodes.items(), key=lambda item: -item[1]):
+            lines.append("{:<32} {:>12}".format(name, count))
+        return "\n".join(lines)+"\n"
+
+    def backtrack_report(self, sources=[]):
+        lines = rule_lines(sources)
+        report = ["{:<24} {:<48} {:>8} {:>10} {:>8}".format(
+            "line", "site", "fails", "wasted", "max"
+        )]
+        for (rule, site), (fails, wasted, longest) in sorted(
+            self.backtrack_sites.items(),
+            key=lambda item: (-item[1][1], -item[1][0])
+        ):
+            report.append("{:<24} {:<48} {:>8} {:>10} {:>8}".format(
+                lines.get(rule, rule),
+                "{} {}".format(rule, site),
+                fails,
+                wasted,
+                longest
+            ))
+        return "\n".join(report)+"\n"
+
+    def collapsed_stacks(self):
+        return "".join(
+            "{} {}\n".format(path, round(seconds*1000000))
+            for path, seconds in sorted(self.stacks.items())
+        )
+
+def backtrack_sites(code, names):
+    starts = sorted(names)
+    alternatives = {}
+    ordinals = {}
+    sites = {}
+    for pc, (fn, arg) in enumerate(code):
+        if fn is not BACKTRACK:
+            continue
+        rule = names[max(start for start in starts if start <= pc)]
+        if pc > 0 and code[pc-1][0] is LIST_START:
+            kind = "star"
+        elif code[arg-1] == (FAIL, "no match"):
+            kind = "not"
+        elif pc in alternatives or code[pc-1][0] is LOOKAHEAD and pc-1 in alternatives:
+            ordinal, alternative = alternatives.get(pc) or alternatives[pc-1]
+            alternatives[arg] = (ordinal, alternative+1)
+            sites[arg] = (rule, "or #{} alternative {}".format(ordinal, alternative+1))
+            continue
+        else:
+            kind = "or"
+        ordinals[(rule, kind)] = ordinals.get((rule, kind), 0) + 1
+        if kind == "or":
+            alternatives[arg] = (ordinals[(rule, kind)], 1)
+            sites[arg] = (rule, "or #{} alternative 1".format(ordinals[(rule, kind)]))
+        else:
+            sites[arg] = (rule, "{} #{}".format(kind, ordinals[(rule, kind)]))
+    return sites
+
+def rule_lines(sources):
+    lines = {}
+    for path, source in sources:
+        grammar = None
+        for match in re.finditer(r"(@\w+\s+)?(\w+)\s*([{=])", source):
+            name = match.group(2)
+            if match.group(3) == "{":
+                grammar = name
+            elif grammar is not None:
+                lines.setdefault(
+                    "{}.{}".format(grammar, name),
+                    "{}:{}".format(path, source.count("\n", 0, match.start(2))+1)
+                )
+    return lines
+
+PROFILE_COUNTERS = [
+    "calls",
+    "memo_hits",
+    "memo_misses",
+    "backtracks",
+    "total_seconds",
+    "self_seconds",
+]
+
+def PUSH_SCOPE(vm, arg):
     vm.scope_rest = (vm.scope, vm.scope_rest)
     vm.scope = {}
 
-def POP_SCOPE(vm):
+def POP_SCOPE(vm, arg):
     vm.scope, vm.scope_rest = vm.scope_rest
 
-def BACKTRACK(vm):
+def BACKTRACK(vm, pc):
     vm.call_backtrack_stack.append((
-        vm.pop_arg(), vm.stream, vm.stream_rest, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest
+        pc, vm.stream, vm.stream_rest, vm.memo, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest
     ))
 
-def COMMIT(vm):
+def COMMIT(vm, pc):
     vm.call_backtrack_stack.pop()
-    vm.pc = vm.pop_arg()
+    vm.pc = pc
+
+def CUT(vm, arg):
+    call_backtrack_stack = vm.call_backtrack_stack
+    index = len(call_backtrack_stack)-1
+    while index >= 0 and len(call_backtrack_stack[index]) == 8:
+        call_backtrack_stack[index] = CUT_ENTRY
+        index -= 1
 
-def CALL(vm):
-    CALL_(vm, vm.pop_arg())
+# Cut entries keep COMMIT pops balanced, but FAIL_, EVICT_, and RELEASE_
+# skip them like calls without memo.
+CUT_ENTRY = (None, None, None)
 
-def CALL_(vm, pc):
-    key = (pc, vm.pos_rest+(vm.pos,))
+def CALL(vm, arg):
+    pc, memoize = arg
+    if not memoize:
+        vm.call_backtrack_stack.append((vm.pc, None, None))
+        vm.pc = pc
+        return
+    key = vm.pos*vm.memo_stride+pc
     if key in vm.memo:
+        if vm.memo_limit is not None:
+            dict.__setitem__(vm.memo, key, dict.pop(vm.memo, key))
         if vm.memo[key][0] is None:
             FAIL_(vm, vm.memo[key][1])
         else:
-            vm.action, vm.stream, vm.stream_rest, vm.pos, vm.pos_rest = vm.memo[key]
+            vm.action, vm.pos = vm.memo[key]
     else:
-        vm.call_backtrack_stack.append((vm.pc, key))
+        vm.call_backtrack_stack.append((vm.pc, vm.memo, key))
         vm.pc = pc
 
-def RETURN(vm):
+def RETURN(vm, arg):
     if not vm.call_backtrack_stack:
         return vm.action
-    vm.pc, key = vm.call_backtrack_stack.pop()
-    vm.memo[key] = (vm.action, vm.stream, vm.stream_rest, vm.pos, vm.pos_rest)
+    vm.pc, memo, key = vm.call_backtrack_stack.pop()
+    if memo is not None:
+        memo[key] = (vm.action, vm.pos)
+        if len(memo) > vm.memo_evict_size:
+            EVICT_(vm, memo)
+
+def EVICT_(vm, memo):
+    floor = vm.pos
+    for entry in vm.call_backtrack_stack:
+        if len(entry) == 8 and entry[3] is memo:
+            floor = entry[4]
+            break
+    floor_key = floor*vm.memo_stride
+    for key in [key for key in memo if key < floor_key]:
+        del memo[key]
+    vm.memo_evict_size = 2*len(memo)+MEMO_EVICT_SIZE
+    if vm.memo_limit is not None:
+        for key in list(memo)[:len(memo)-vm.memo_limit//2]:
+            del memo[key]
+        vm.memo_evict_size = min(vm.memo_evict_size, vm.memo_limit)
 
-def MATCH(vm):
-    object_description = vm.pop_arg()
-    fn = vm.pop_arg()
+def LOOKAHEAD(vm, arg):
+    keys, pc = arg
+    if (vm.pos >= len(vm.stream) or
+            isinstance(vm.stream[vm.pos], list) or
+            vm.stream[vm.pos] not in keys):
+        vm.pc = pc
+
+def MATCH(vm, arg):
+    object_description, fn, _ = arg
     MATCH_(vm, fn, ("expected {}", object_description))
 
 def MATCH_(vm, fn, message):
     if vm.pos >= len(vm.stream) or not fn(vm.stream[vm.pos]):
         FAIL_(vm, message)
     else:
-        vm.action = SemanticAction(vm.stream[vm.pos])
+        vm.action = value_action(vm.stream[vm.pos])
         vm.pos += 1
         return True
 
-def MATCH_CALL_RULE(vm):
+def MATCH_STRING(vm, string):
+    index = mismatch(vm.stream, vm.pos, string)
+    if index is None:
+        vm.action = value_action(string[-1])
+        vm.pos += len(string)
+    else:
+        vm.pos += index
+        FAIL_(vm, ("expected {}", string[index]))
+
+def MATCH_SET(vm, arg):
+    object_description, keys = arg
+    if (vm.pos >= len(vm.stream) or
+            isinstance(vm.stream[vm.pos], list) or
+            vm.stream[vm.pos] not in keys):
+        FAIL_(vm, ("expected {}", object_description))
+    else:
+        vm.action = value_action(vm.stream[vm.pos])
+        vm.pos += 1
+
+def MATCH_STAR(vm, arg):
+    object_description, keys, pattern = arg
+    start, vm.pos = (vm.pos, match_star(vm.stream, vm.pos, keys, pattern))
+    vm.action = SemanticAction(vm.stream[start:vm.pos], eval_slice)
+    LATEST_FAIL_(vm, ("expected {}", object_description))
+
+def MATCH_CALL_RULE(vm, arg):
     if MATCH_(vm, lambda x: x in vm.rules, ("expected rule name",)):
-        CALL_(vm, vm.rules[vm.action.value])
+        CALL(vm, vm.rules[vm.action.value])
 
-def LIST_START(vm):
+def LIST_START(vm, arg):
     vm.scope_rest = (vm.scope, vm.scope_rest)
     vm.scope = []
 
-def LIST_APPEND(vm):
+def LIST_APPEND(vm, arg):
     vm.scope.append(vm.action)
 
-def LIST_END(vm):
-    vm.action = SemanticAction(vm.scope, lambda self: [x.eval(self.runtime) for x in self.value])
+def LIST_END(vm, arg):
+    vm.action = SemanticAction(vm.scope, eval_list)
     vm.scope, vm.scope_rest = vm.scope_rest
 
-def BIND(vm):
-    vm.scope[vm.pop_arg()] = vm.action
+def BIND(vm, name):
+    vm.scope[name] = vm.action
 
-def ACTION(vm):
-    vm.action = SemanticAction(vm.scope, vm.pop_arg())
+def ACTION(vm, fn):
+    vm.action = SemanticAction(vm.scope, fn)
 
-def PUSH_STREAM(vm):
+def PUSH_STREAM(vm, arg):
     if vm.pos >= len(vm.stream) or not isinstance(vm.stream[vm.pos], list):
         FAIL_(vm, ("expected list",))
     else:
-        vm.stream_rest = (vm.stream, vm.stream_rest)
+        vm.stream_rest = (vm.stream, vm.memo, vm.stream_rest)
         vm.pos_rest = vm.pos_rest + (vm.pos,)
+        key = (vm.pos+1)*vm.memo_stride-1
+        memo = vm.memo.get(key)
+        if memo is None:
+            memo = {}
+            dict.__setitem__(vm.memo, key, memo)
         vm.stream = vm.stream[vm.pos]
+        vm.memo = memo
         vm.pos = 0
 
-def POP_STREAM(vm):
+def POP_STREAM(vm, arg):
     if vm.pos < len(vm.stream):
         FAIL_(vm, ("expected end of list",))
     else:
-        vm.stream, vm.stream_rest = vm.stream_rest
+        vm.stream, vm.memo, vm.stream_rest = vm.stream_rest
         vm.pos, vm.pos_rest = vm.pos_rest[-1], vm.pos_rest[:-1]
         vm.pos += 1
 
-def FAIL(vm):
-    FAIL_(vm, (vm.pop_arg(),))
+def MATCH_BYTE(vm, arg):
+    object_description, fn = arg
+    if vm.pos >= len(vm.stream) or not fn(vm.stream[vm.pos]):
+        FAIL_(vm, ("expected {}", object_description))
+    else:
+        vm.action = BYTE_ACTIONS[vm.stream[vm.pos]]
+        vm.pos += 1
+
+def MATCH_BYTES(vm, arg):
+    string, encoded = arg
+    index = mismatch(vm.stream, vm.pos, encoded)
+    if index is None:
+        vm.action = BYTE_ACTIONS[encoded[-1]]
+        vm.pos += len(encoded)
+    else:
+        vm.pos += index
+        FAIL_(vm, ("expected {}", string[index]))
+
+def MATCH_BYTE_SET(vm, arg):
+    object_description, keys = arg
+    if vm.pos >= len(vm.stream) or vm.stream[vm.pos] not in keys:
+        FAIL_(vm, ("expected {}", object_description))
+    else:
+        vm.action = BYTE_ACTIONS[vm.stream[vm.pos]]
+        vm.pos += 1
+
+def MATCH_BYTE_STAR(vm, arg):
+    object_description, keys, pattern = arg
+    start, vm.pos = (vm.pos, pattern.match(vm.stream, vm.pos).end())
+    vm.action = ValueAction(ByteSlice(vm.stream[start:vm.pos]))
+    LATEST_FAIL_(vm, ("expected {}", object_description))
+
+def FAIL(vm, message):
+    FAIL_(vm, (message,))
 
 def FAIL_(vm, fail_message):
-    fail_pos = vm.pos_rest+(vm.pos,)
-    if fail_pos >= vm.latest_fail_pos:
-        vm.latest_fail_message = fail_message
-        vm.latest_fail_pos = fail_pos
+    LATEST_FAIL_(vm, fail_message)
     call_backtrack_entry = tuple()
     while vm.call_backtrack_stack:
         call_backtrack_entry = vm.call_backtrack_stack.pop()
-        if len(call_backtrack_entry) == 7:
+        if len(call_backtrack_entry) == 8:
             break
         else:
-            vm.memo[call_backtrack_entry[1]] = (None, fail_message)
-    if len(call_backtrack_entry) != 7:
+            _, memo, key = call_backtrack_entry
+            if memo is not None:
+                memo[key] = (None, fail_message)
+    if len(call_backtrack_entry) != 8:
         raise MatchError(
             vm.latest_fail_message[0].format(*vm.latest_fail_message[1:]),
             vm.latest_fail_pos[-1],
             vm.stream
         )
-    (vm.pc, vm.stream, vm.stream_rest, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest) = call_backtrack_entry
+    (vm.pc, vm.stream, vm.stream_rest, vm.memo, vm.pos, vm.pos_rest, vm.scope, vm.scope_rest) = call_backtrack_entry
+
+def LATEST_FAIL_(vm, fail_message):
+    fail_pos = vm.pos_rest+(vm.pos,)
+    if fail_pos >= vm.latest_fail_pos:
+        vm.latest_fail_message = fail_message
+        vm.latest_fail_pos = fail_pos
+
+STREAM_OPS = {
+    LOOKAHEAD,
+    MATCH,
+    MATCH_STRING,
+    MATCH_SET,
+    MATCH_STAR,
+    MATCH_CALL_RULE,
+    PUSH_STREAM,
+}
+
+BYTES_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+BYTES_CODES = {}
+
+def bytes_code(code):
+    if id(code) not in BYTES_CODES:
+        BYTES_CODES[id(code)] = (code, [
+            BYTES_OPS[fn](arg) if fn in BYTES_OPS else (fn, arg)
+            for fn, arg in code
+        ])
+    return BYTES_CODES[id(code)][1]
+
+def byte_predicate(bounds):
+    if bounds is None:
+        return lambda x: True
+    low, high = (ord(bounds[0]), ord(bounds[1]))
+    return lambda x: low <= x <= high
+
+def byte_keys(keys):
+    return frozenset(
+        ord(key) for key in keys
+        if isinstance(key, str) and len(key) == 1 and ord(key) < 256
+    )
+
+def byte_class(keys):
+    if not keys:
+        return re.compile(b"")
+    return re.compile(b"[" + b"".join(re.escape(bytes([key])) for key in sorted(keys)) + b"]*")
+
+def byte_string(string):
+    if all(ord(char) < 256 for char in string):
+        return string.encode("latin-1")
+    return tuple(ord(char) for char in string)
+
+BYTES_OPS = {
+    MATCH: lambda arg: (MATCH_BYTE, (arg[0], byte_predicate(arg[2]))),
+    MATCH_STRING: lambda arg: (MATCH_BYTES, (arg, byte_string(arg))),
+    MATCH_SET: lambda arg: (MATCH_BYTE_SET, (arg[0], byte_keys(arg[1]))),
+    MATCH_STAR: lambda arg: (MATCH_BYTE_STAR, (
+        arg[0], byte_keys(arg[1]), byte_class(byte_keys(arg[1]))
+    )),
+    LOOKAHEAD: lambda arg: (LOOKAHEAD, (byte_keys(arg[0]), arg[1])),
+}
 
 class SemanticAction(object):
 
+    __slots__ = ["value", "fn", "runtime"]
+
     def __init__(self, value, fn=lambda self: self.value):
         self.value = value
         self.fn = fn
@@ -153,6 +707,64 @@ class SemanticAction(object):
         else:
             return self.runtime[name]
 
+class ValueAction(object):
+
+    __slots__ = ["value"]
+
+    def __init__(self, value):
+        self.value = value
+
+    def eval(self, runtime):
+        return self.value
+
+NONE_ACTION = ValueAction(None)
+
+CHARACTER_ACTIONS = {chr(x): ValueAction(chr(x)) for x in range(256)}
+
+BYTES = [bytes([x]) for x in range(256)]
+
+BYTE_ACTIONS = [ValueAction(x) for x in BYTES]
+
+def value_action(value):
+    if value.__class__ is str and value in CHARACTER_ACTIONS:
+        return CHARACTER_ACTIONS[value]
+    return ValueAction(value)
+
+def eval_list(self):
+    return [x.eval(self.runtime) for x in self.value]
+
+def eval_slice(self):
+    return list(self.value)
+
+class ByteSlice(object):
+
+    __slots__ = ["buffer"]
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __iter__(self):
+        return (BYTES[x] for x in self.buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ByteSlice(self.buffer[index])
+        return BYTES[self.buffer[index]]
+
+    def __eq__(self, other):
+        if isinstance(other, ByteSlice):
+            return self.buffer == other.buffer
+        return list(self) == other
+
+    def __bytes__(self):
+        return bytes(self.buffer)
+
+    def __repr__(self):
+        return "ByteSlice({!r})".format(bytes(self.buffer))
+
 class MatchError(Exception):
 
     def __init__(self, message, pos, stream):
@@ -163,8 +775,8 @@ class MatchError(Exception):
 
 class Grammar(object):
 
-    def run(self, rule, stream, runtime={}):
-        return Runtime(self, dict(runtime, **{
+    def run(self, rule, stream, runtime={}, memo=None, profile=None, rope=False):
+        runtime = Runtime(self, dict(runtime, **{
             "label": Counter(),
             "indentprefix": "    ",
             "list": list,
@@ -175,19 +787,102 @@ class Grammar(object):
             "len": len,
             "repr": repr,
             "join": join,
-        })).run(rule, stream)
+        }), profile=profile)
+        result = self.match(rule, stream, memo, profile).eval(runtime)
+        return result if rope else materialize(result)
+
+    memo_limit = None
+
+    removed = {}
 
-class Runtime(dict):
+    def match(self, rule, stream, memo=None, profile=None):
+        if rule not in self.rules:
+            raise unknown_rule(self, rule)
+        return VM(
+            self.code,
+            self.rules,
+            self.memo_limit,
+            self.__class__.__name__
+        ).run(rule, stream, memo, profile)
 
-    def __init__(self, grammar, values):
-        dict.__init__(self, dict(values, run=self.run))
+class FunctionGrammar(Grammar):
+
+    def match(self, rule, stream, memo=None, profile=None):
+        if rule not in self.rules:
+            raise unknown_rule(self, rule)
+        if profile is not None:
+            raise ValueError("profiling needs the vm backend")
+        self.memo = {}
+        self.pos_rest = tuple()
+        self.latest_fail_message, self.latest_fail_pos = (None, tuple())
+        ok, pos, action = self.rules[rule](self, stream, 0)
+        if not ok:
+            raise MatchError(
+                self.latest_fail_message[0].format(*self.latest_fail_message[1:]),
+                self.latest_fail_pos[-1],
+                stream
+            )
+        return action
+
+    def match_string(self, stream, pos, action, string):
+        index = mismatch(stream, pos, string)
+        if index is None:
+            return (True, pos+len(string), value_action(string[-1]))
+        return (self.fail(pos+index, ("expected {}", string[index])), pos, action)
+
+    def match_star(self, stream, pos, char_class):
+        object_description, keys, pattern = char_class
+        end = match_star(stream, pos, keys, pattern)
+        self.fail(end, ("expected {}", object_description))
+        return (True, end, SemanticAction(stream[pos:end], eval_slice))
+
+    def fail(self, pos, fail_message):
+        fail_pos = self.pos_rest+(pos,)
+        if fail_pos >= self.latest_fail_pos:
+            self.latest_fail_message = fail_message
+            self.latest_fail_pos = fail_pos
+        return False
+
+def unknown_rule(grammar, rule):
+    if rule in grammar.removed:
+        return KeyError("{}.{} was {}".format(
+            grammar.__class__.__name__,
+            rule,
+            grammar.removed[rule]
+        ))
+    return KeyError(rule)
+
+class Runtime(object):
+
+    def __init__(self, grammar, values, parent=None, profile=None):
         self.grammar = grammar
+        self.values = dict(values, run=self.run)
+        self.parent = parent
+        self.profile = profile
+        self.depth = 0 if parent is None else parent.depth+1
 
     def set(self, key, value):
-        return Runtime(self.grammar, dict(self, **{key: value}))
+        if self.depth >= RUNTIME_MAX_DEPTH:
+            return Runtime(self.grammar, dict(self.flatten(), **{key: value}), profile=self.profile)
+        return Runtime(self.grammar, {key: value}, self, self.profile)
+
+    def flatten(self):
+        if self.parent is None:
+            return dict(self.values)
+        values = self.parent.flatten()
+        values.update(self.values)
+        return values
+
+    def __getitem__(self, key):
+        runtime = self
+        while key not in runtime.values:
+            runtime = runtime.parent
+            if runtime is None:
+                raise KeyError(key)
+        return runtime.values[key]
 
     def run(self, rule, stream):
-        return VM(self.grammar.code, self.grammar.rules).run(rule, stream).eval(self)
+        return self.grammar.match(rule, stream, profile=self.profile).eval(self)
 
 class Counter(object):
 
@@ -199,6 +894,37 @@ class Counter(object):
         self.value += 1
         return result
 
+def mismatch(stream, pos, string):
+    if stream[pos:pos+len(string)] == string:
+        return None
+    for index, item in enumerate(string):
+        if pos+index >= len(stream) or stream[pos+index] != item:
+            return index
+
+def char_eq(x):
+    return (x, lambda item: item == x, (x, x))
+
+def char_range(x, y):
+    return ("range {!r}-{!r}".format(x, y), lambda item: x <= item <= y, (x, y))
+
+CHAR_ANY = ("any", lambda item: True, None)
+
+def char_class(description, keys):
+    return (
+        description,
+        frozenset(keys),
+        re.compile("[{}]*".format("".join(re.escape(key) for key in keys)))
+    )
+
+def match_star(stream, pos, keys, pattern):
+    if isinstance(stream, str):
+        return pattern.match(stream, pos).end()
+    if isinstance(stream, InputWindow):
+        return stream.match_star(pattern, pos)
+    while pos < len(stream) and not isinstance(stream[pos], list) and stream[pos] in keys:
+        pos += 1
+    return pos
+
 def splice(depth, item):
     if depth == 0:
         return [item]
@@ -209,32 +935,169 @@ def concat(lists):
     return [x for xs in lists for x in xs]
 
 def join(items, delimiter=""):
-    return delimiter.join(
-        join(item, delimiter) if isinstance(item, list) else str(item)
-        for item in items
+    parts = []
+    rope = False
+    binary = False
+    for item in items:
+        if isinstance(item, list):
+            item = join(item, delimiter)
+        if item.__class__ is str:
+            pass
+        elif isinstance(item, Text):
+            rope = True
+        elif isinstance(item, ByteSlice):
+            item, binary = (item.buffer, True)
+        elif isinstance(item, BYTES_TYPES):
+            binary = True
+        else:
+            item = str(item)
+        if parts and delimiter:
+            parts.append(delimiter)
+        parts.append(item)
+    if rope:
+        return Text(parts)
+    if binary:
+        return join_bytes(parts)
+    return "".join(parts)
+
+def join_bytes(parts):
+    if len(parts) == 1:
+        return parts[0]
+    return b"".join(
+        part.encode("latin-1") if isinstance(part, str) else part
+        for part in parts
     )
 
 def indent(text, prefix="    "):
-    return "".join(prefix+line for line in text.splitlines(True))
+    return Text([text], prefix)
+
+class Text(object):
+
+    __slots__ = ["parts", "prefix"]
 
-def compile_chain(grammars, source):
+    def __init__(self, parts, prefix=None):
+        self.parts = parts
+        self.prefix = prefix
+
+    def write(self, writer):
+        if self.prefix is not None:
+            writer.indent(self.prefix)
+        for part in self.parts:
+            if isinstance(part, Text):
+                part.write(writer)
+            else:
+                writer.write(part)
+        if self.prefix is not None:
+            writer.dedent()
+
+    def __str__(self):
+        chunks = []
+        write_text(self, chunks.append)
+        return "".join(chunks)
+
+    def __repr__(self):
+        return repr(str(self))
+
+class Writer(object):
+
+    def __init__(self, output):
+        self.output = output
+        self.chunks = []
+        self.prefixes = []
+        self.pending = 0
+
+    def indent(self, prefix):
+        self.prefixes.append(prefix)
+        self.pending = min(self.pending, len(self.prefixes)-1)
+
+    def dedent(self):
+        self.prefixes.pop()
+        self.pending = min(self.pending, len(self.prefixes))
+
+    def write(self, text):
+        start = 0
+        while start < len(text):
+            if self.pending < len(self.prefixes):
+                self.chunks.extend(self.prefixes[self.pending:])
+                self.pending = len(self.prefixes)
+            end = text.find("\n", start)+1 or len(text)
+            self.chunks.append(text[start:end])
+            if text[end-1] == "\n":
+                self.pending = 0
+            start = end
+        if len(self.chunks) > WRITER_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.output("".join(self.chunks))
+        self.chunks = []
+
+def materialize(text):
+    if isinstance(text, Text):
+        return str(text)
+    return text
+
+def write_text(text, output):
+    if isinstance(text, Text):
+        writer = Writer(output)
+        text.write(writer)
+        writer.flush()
+    else:
+        output(str(text))
+
+def compile_chain(grammars, source, memo=None, profile=None, rope=False):
     import os
     import sys
     import pprint
     for grammar, rule in grammars:
         try:
-            source = grammar().run(rule, source)
+            if isinstance(grammar, type) and issubclass(grammar, Grammar):
+                source = grammar().run(rule, source, memo=memo, profile=profile, rope=rope)
+            else:
+                source = grammar().run(rule, source)
+            memo = None
         except MatchError as e:
             marker = "<ERROR POSITION>"
             if os.isatty(sys.stderr.fileno()):
                 marker = f"\033[0;31m{marker}\033[0m"
-            if isinstance(e.stream, str):
-                stream_string = e.stream[:e.pos] + marker + e.stream[e.pos:]
+            stream, pos = (e.stream, e.pos)
+            if isinstance(stream, InputWindow):
+                stream, pos = (stream.buffer, max(0, pos-stream.offset))
+            elif isinstance(stream, BYTES_TYPES):
+                stream = bytes(stream).decode("latin-1")
+            if isinstance(stream, str):
+                stream_string = stream[:pos] + marker + stream[pos:]
             else:
-                stream_string = pprint.pformat(e.stream)
+                stream_string = pprint.pformat(stream)
             sys.exit("ERROR: {}\nPOSITION: {}\nSTREAM:\n{}".format(
                 e.message,
                 e.pos,
                 indent(stream_string)
             ))
     return source
+
+def load_compiled(source, filename="<rlmeta>", cache_dir=None, namespace=None):
+    import hashlib
+    import importlib.util
+    import marshal
+    import os
+    if namespace is None:
+        namespace = {"__name__": filename}
+    if cache_dir is None:
+        code = compile(source, filename, "exec")
+    else:
+        key = hashlib.sha256(importlib.util.MAGIC_NUMBER)
+        key.update(b"\0"+filename.encode("utf-8"))
+        key.update(b"\0"+source.encode("utf-8"))
+        path = os.path.join(cache_dir, key.hexdigest()+".marshal")
+        try:
+            with open(path, "rb") as f:
+                code = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            code = compile(source, filename, "exec")
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path+".tmp", "wb") as f:
+                marshal.dump(code, f)
+            os.replace(path+".tmp", path)
+    exec(code, namespace)
+    return namespace
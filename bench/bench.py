@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+
+"""
+Benchmarks the compiler pipelines in base and simpler_base.
+
+For every scale, a synthetic grammar is generated by repeating the
+target's own parser.rlmeta that many times. It is then compiled one pass
+at a time with the target's rlmeta.py, followed by writing out the
+generated text, and the following is reported per pass:
+
+* wall time (best of --repeat runs)
+* opcodes executed (base only)
+* memo hits and misses (base only)
+* peak memory allocated (measured with tracemalloc)
+
+Usage:
+
+    python bench/bench.py [--scales 1,10,100,1000] [--repeat N]
+                          [--targets base,simpler_base] [--json PATH]
+"""
+
+import argparse
+import collections
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="1,10,100")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--targets", default="base,simpler_base")
+    parser.add_argument("--json", metavar="PATH")
+    args = parser.parse_args()
+    results = []
+    for target in args.targets.split(","):
+        rlmeta = load(target)
+        for scale in [int(x) for x in args.scales.split(",")]:
+            result = bench(target, rlmeta, scale, args.repeat)
+            report(result)
+            results.append(result)
+    if args.json:
+        write_json(args.json, {
+            "python": platform.python_version(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        })
+
+def bench(target, rlmeta, scale, repeat):
+    source = synthetic_grammar(target, scale)
+    passes = PASSES[target](rlmeta)
+    seconds = [min(timings) for timings in zip(*[
+        time_passes(passes, source)
+        for _ in range(repeat)
+    ])]
+    peaks = measure_passes(passes, source)
+    counts = COUNTERS[target](rlmeta, passes, source)
+    return {
+        "target": target,
+        "scale": scale,
+        "input_bytes": len(source),
+        "total_seconds": sum(seconds),
+        "passes": [
+            dict({
+                "name": name,
+                "seconds": seconds[index],
+                "peak_bytes": peaks[index],
+            }, **counts[index])
+            for index, (name, _) in enumerate(passes)
+        ],
+    }
+
+def synthetic_grammar(target, scale):
+    source = read(os.path.join(ROOT, target, "src", "parser.rlmeta"))
+    return "\n".join(
+        source.replace("Parser {", "Parser{} {{".format(index), 1)
+        for index in range(scale)
+    )
+
+def time_passes(passes, source):
+    timings = []
+    for _, run in passes:
+        start = time.perf_counter()
+        source = run(source)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def measure_passes(passes, source):
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _, run in passes:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            source = run(source)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+def base_passes(rlmeta):
+    return [
+        (grammar.__name__, lambda source, grammar=grammar, rule=rule: (
+            grammar().run(rule, source, rope=True)
+            if issubclass(grammar, rlmeta.Grammar)
+            else grammar().run(rule, source)
+        ))
+        for grammar, rule in [
+            (rlmeta.Parser, "file"),
+            (rlmeta.LeftFactor, "asts"),
+            (rlmeta.Fuse, "asts"),
+            (rlmeta.Lookahead, "asts"),
+            (rlmeta.Inline, "asts"),
+            (rlmeta.CodeGenerator, "asts"),
+            (rlmeta.Assembler, "asts"),
+        ]
+    ] + [("Output", output(rlmeta))]
+
+def base_counts(rlmeta, passes, source):
+    """
+    Runs the passes once more with every opcode wrapped in a counter.
+
+    MATCH_CALL_RULE calls CALL directly, so the module level CALL is
+    wrapped as well to count its memo lookups.
+    """
+    counts = collections.Counter()
+    call = rlmeta.CALL
+    def counting_call(vm, arg):
+        pc, memoize = arg
+        if memoize:
+            if vm.pos*vm.memo_stride+pc in vm.memo:
+                counts["memo_hits"] += 1
+            else:
+                counts["memo_misses"] += 1
+        return call(vm, arg)
+    def counting(fn):
+        def opcode(vm, arg):
+            counts["opcodes"] += 1
+            return fn(vm, arg)
+        return opcode
+    grammars = [
+        grammar for grammar in vars(rlmeta).values()
+        if isinstance(grammar, type) and "code" in vars(grammar)
+    ]
+    codes = {grammar: grammar.code for grammar in grammars}
+    rlmeta.CALL = counting_call
+    for grammar in grammars:
+        grammar.code = [
+            (counting(counting_call if fn is call else fn), arg)
+            for fn, arg in grammar.code
+        ]
+    try:
+        result = []
+        for _, run in passes:
+            counts.clear()
+            source = run(source)
+            result.append({
+                "opcodes": counts["opcodes"],
+                "memo_hits": counts["memo_hits"],
+                "memo_misses": counts["memo_misses"],
+            })
+        return result
+    finally:
+        rlmeta.CALL = call
+        for grammar in grammars:
+            grammar.code = codes[grammar]
+
+def simpler_base_passes(rlmeta):
+    def run(rule):
+        def run_rule(source):
+            stream = rlmeta.Stream(source)
+            result = rlmeta.rules[rule].run(stream)
+            if result is None:
+                raise rlmeta.MatchError(*stream.latest_error)
+            return result.eval(rlmeta.Runtime())
+        return run_rule
+    return [
+        (rule, run(rule))
+        for rule in [
+            "Parser.file",
+            "LeftFactor.asts",
+            "Fuse.asts",
+            "Lookahead.asts",
+            "Inline.asts",
+            "CodeGenerator.asts",
+        ]
+    ] + [("Output", output(rlmeta))]
+
+def output(rlmeta):
+    def write(text):
+        chunks = []
+        rlmeta.write_text(text, chunks.append)
+        return "".join(chunks)
+    return write
+
+def simpler_base_counts(rlmeta, passes, source):
+    return [
+        {"opcodes": None, "memo_hits": None, "memo_misses": None}
+        for _ in passes
+    ]
+
+PASSES = {
+    "base": base_passes,
+    "simpler_base": simpler_base_passes,
+}
+
+COUNTERS = {
+    "base": base_counts,
+    "simpler_base": simpler_base_counts,
+}
+
+def load(target):
+    spec = importlib.util.spec_from_file_location(
+        "rlmeta_{}".format(target),
+        os.path.join(ROOT, target, "rlmeta.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def report(result):
+    log("{} x{} ({} bytes): {:.3f}s".format(
+        result["target"],
+        result["scale"],
+        result["input_bytes"],
+        result["total_seconds"]
+    ))
+    for item in result["passes"]:
+        log("  {:<20} {:>8.3f}s {:>10.1f}MB{}".format(
+            item["name"],
+            item["seconds"],
+            item["peak_bytes"]/1024/1024,
+            "" if item["opcodes"] is None else " {:>12} opcodes {:>10} memo hits {:>10} memo misses".format(
+                item["opcodes"],
+                item["memo_hits"],
+                item["memo_misses"]
+            )
+        ))
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+def log(message):
+    sys.stdout.write("{}\n".format(message))
+    sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
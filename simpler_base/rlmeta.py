@@ -1,6 +1,15 @@
-SUPPORT = 'rules = {}\n\nclass Stream:\n\n    def __init__(self, items):\n        self.items = items\n        self.index = 0\n        self.latest_error = None\n        self.scope = None\n\n    def operator_or(self, matchers):\n        for matcher in matchers:\n            backtrack_index = self.index\n            try:\n                return matcher.run(self)\n            except MatchError:\n                self.index = backtrack_index\n        self.error("no or match")\n\n    def operator_and(self, matchers):\n        result = self.action()\n        for matcher in matchers:\n            result = matcher.run(self)\n        return result\n\n    def operator_star(self, matcher):\n        results = []\n        while True:\n            backtrack_index = self.index\n            try:\n                results.append(matcher.run(self))\n            except MatchError:\n                self.index = backtrack_index\n                return self.action(lambda self: [x.eval(self.runtime) for x in results])\n\n    def operator_not(self, matcher):\n        backtrack_index = self.index\n        try:\n            matcher.run(self)\n        except MatchError:\n            return self.action()\n        finally:\n            self.index = backtrack_index\n        self.error("not matched")\n\n    def action(self, fn=lambda self: None):\n        return SemanticAction(self.scope, fn)\n\n    def with_scope(self, matcher):\n        current_scope = self.scope\n        self.scope = {}\n        try:\n            return matcher.run(self)\n        finally:\n            self.scope = current_scope\n\n    def bind(self, name, semantic_action):\n        self.scope[name] = semantic_action\n        return semantic_action\n\n    def match_list(self, matcher):\n        if self.index < len(self.items):\n            items, index = self.items, self.index\n            try:\n                self.items = self.items[self.index]\n                self.index = 0\n                result = matcher.run(self)\n                index += 1\n            finally:\n                self.items, self.index = items, index\n            return result\n        self.error("no list found")\n\n    def match_call_rule(self, namespace):\n        name = namespace + "." + self.items[self.index]\n        if name in rules:\n            rule = rules[name]\n            self.index += 1\n            return rule.run(self)\n        else:\n            self.error("unknown rule")\n\n    def match(self, fn, description):\n        if self.index < len(self.items):\n            item = self.items[self.index]\n            if fn(item):\n                self.index += 1\n                return self.action(lambda self: item)\n        self.error(f"expected {description}")\n\n    def error(self, name):\n        if not self.latest_error or self.index > self.latest_error[2]:\n            self.latest_error = (name, self.items, self.index)\n        raise MatchError(*self.latest_error)\n\nclass MatchError(Exception):\n\n    def __init__(self, name, items, index):\n        Exception.__init__(self, name)\n        self.items = items\n        self.index = index\n\nclass SemanticAction:\n\n    def __init__(self, scope, fn):\n        self.scope = scope\n        self.fn = fn\n\n    def eval(self, runtime):\n        self.runtime = runtime\n        return self.fn(self)\n\n    def bind(self, name, value, continuation):\n        self.runtime = self.runtime.bind(name, value)\n        return continuation()\n\n    def lookup(self, name):\n        if name in self.scope:\n            return self.scope[name].eval(self.runtime)\n        else:\n            return self.runtime.lookup(name)\n\nclass Runtime:\n\n    def __init__(self, extra={"len": len, "repr": repr}):\n        self.vars = extra\n\n    def bind(self, name, value):\n        return Runtime(dict(self.vars, **{name: value}))\n\n    def lookup(self, name):\n        if name in self.vars:\n            return self.vars[name]\n        else:\n            return getattr(self, name)\n\n    def append(self, list, thing):\n        list.append(thing)\n\n    def join(self, items, delimiter=""):\n        return delimiter.join(\n            self.join(item, delimiter) if isinstance(item, list) else str(item)\n            for item in items\n        )\n\n    def indent(self, text, prefix="    "):\n        return "".join(prefix+line for line in text.splitlines(True))\n\n    def splice(self, depth, item):\n        if depth == 0:\n            return [item]\n        else:\n            return self.concat([self.splice(depth-1, subitem) for subitem in item])\n\n    def concat(self, lists):\n        return [x for xs in lists for x in xs]\n\ndef compile_chain(grammars, source):\n    import os\n    import sys\n    import pprint\n    runtime = Runtime()\n    for rule in grammars:\n        try:\n            source = rules[rule].run(Stream(source)).eval(runtime)\n        except MatchError as e:\n            marker = "<ERROR POSITION>"\n            if os.isatty(sys.stderr.fileno()):\n                marker = f"\\033[0;31m{marker}\\033[0m"\n            if isinstance(e.items, str):\n                stream_string = e.items[:e.index] + marker + e.items[e.index:]\n            else:\n                stream_string = pprint.pformat(e.items)\n            sys.exit("ERROR: {}\\nPOSITION: {}\\nSTREAM:\\n{}".format(\n                str(e),\n                e.index,\n                runtime.indent(stream_string)\n            ))\n    return source\n'
+SUPPORT = 'import re\nimport time\n\nRUNTIME_MAX_DEPTH = 8\n\nWRITER_BUFFER_SIZE = 4096\n\nrules = {}\n\nremoved = {}\n\nclass Stream:\n\n    def __init__(self, items):\n        self.items = items\n        self.index = 0\n        self.latest_error = None\n        self.scope = None\n\n    def operator_or(self, matchers):\n        for matcher in matchers:\n            backtrack_index = self.index\n            result = matcher.run(self)\n            if result is not None:\n                return result\n            self.index = backtrack_index\n        return self.error("no or match")\n\n    def lookahead(self):\n        if self.index < len(self.items) and not isinstance(self.items[self.index], list):\n            return self.items[self.index]\n\n    def operator_and(self, matchers):\n        result = NONE_ACTION\n        for matcher in matchers:\n            result = matcher.run(self)\n            if result is None:\n                return None\n        return result\n\n    def operator_star(self, matcher):\n        results = []\n        while True:\n            backtrack_index = self.index\n            result = matcher.run(self)\n            if result is None:\n                self.index = backtrack_index\n                return ListAction(results)\n            results.append(result)\n\n    def operator_not(self, matcher):\n        backtrack_index = self.index\n        result = matcher.run(self)\n        self.index = backtrack_index\n        if result is None:\n            return NONE_ACTION\n        return self.error("not matched")\n\n    def action(self, fn=lambda self: None):\n        return SemanticAction(self.scope, fn)\n\n    def with_scope(self, matcher):\n        current_scope = self.scope\n        self.scope = {}\n        result = matcher.run(self)\n        self.scope = current_scope\n        return result\n\n    def bind(self, name, semantic_action):\n        if semantic_action is not None:\n            self.scope[name] = semantic_action\n        return semantic_action\n\n    def match_list(self, matcher):\n        if self.index < len(self.items):\n            items, index = self.items, self.index\n            self.items = self.items[self.index]\n            self.index = 0\n            result = matcher.run(self)\n            if result is not None:\n                index += 1\n            self.items, self.index = items, index\n            return result\n        return self.error("no list found")\n\n    def match_call_rule(self, namespace):\n        name = namespace + "." + self.items[self.index]\n        if name in rules:\n            rule = rules[name]\n            self.index += 1\n            return rule.run(self)\n        else:\n            return self.error("unknown rule")\n\n    def match(self, fn, description):\n        if self.index < len(self.items):\n            item = self.items[self.index]\n            if fn(item):\n                self.index += 1\n                return value_action(item)\n        return self.error(f"expected {description}")\n\n    def match_string(self, string):\n        if self.items[self.index:self.index+len(string)] == string:\n            self.index += len(string)\n            return value_action(string[-1])\n        for item in string:\n            if self.index >= len(self.items) or self.items[self.index] != item:\n                return self.error(f"expected {item!r}")\n            self.index += 1\n        return value_action(string[-1])\n\n    def match_star(self, char_class):\n        description, keys, pattern = char_class\n        start = self.index\n        if isinstance(self.items, str):\n            self.index = pattern.match(self.items, self.index).end()\n        else:\n            while (self.index < len(self.items) and\n                    not isinstance(self.items[self.index], list) and\n                    self.items[self.index] in keys):\n                self.index += 1\n        items = self.items[start:self.index]\n        self.error(f"expected {description}")\n        return self.action(lambda self: list(items))\n\n    def needs_error(self):\n        return not self.latest_error or self.index > self.latest_error[2]\n\n    def error(self, name):\n        if self.needs_error():\n            self.latest_error = (name, self.items, self.index)\n\nclass MatchError(Exception):\n\n    def __init__(self, name, items, index):\n        Exception.__init__(self, name)\n        self.items = items\n        self.index = index\n\nclass SemanticAction:\n\n    __slots__ = ["scope", "fn", "runtime"]\n\n    def __init__(self, scope, fn):\n        self.scope = scope\n        self.fn = fn\n\n    def eval(self, runtime):\n        self.runtime = runtime\n        return self.fn(self)\n\n    def bind(self, name, value, continuation):\n        self.runtime = self.runtime.bind(name, value)\n        return continuation()\n\n    def lookup(self, name):\n        if name in self.scope:\n            return self.scope[name].eval(self.runtime)\n        else:\n            return self.runtime.lookup(name)\n\nclass ValueAction:\n\n    __slots__ = ["value"]\n\n    def __init__(self, value):\n        self.value = value\n\n    def eval(self, runtime):\n        return self.value\n\nclass ListAction:\n\n    __slots__ = ["actions"]\n\n    def __init__(self, actions):\n        self.actions = actions\n\n    def eval(self, runtime):\n        return [x.eval(runtime) for x in self.actions]\n\nNONE_ACTION = ValueAction(None)\n\nCHARACTER_ACTIONS = {chr(x): ValueAction(chr(x)) for x in range(256)}\n\ndef value_action(value):\n    if value.__class__ is str and value in CHARACTER_ACTIONS:\n        return CHARACTER_ACTIONS[value]\n    return ValueAction(value)\n\nclass Runtime:\n\n    def __init__(self, extra={"len": len, "repr": repr}, parent=None):\n        self.vars = extra\n        self.parent = parent\n        self.depth = 0 if parent is None else parent.depth+1\n\n    def bind(self, name, value):\n        if self.depth >= RUNTIME_MAX_DEPTH:\n            return Runtime(dict(self.flatten(), **{name: value}))\n        return Runtime({name: value}, self)\n\n    def flatten(self):\n        if self.parent is None:\n            return dict(self.vars)\n        vars = self.parent.flatten()\n        vars.update(self.vars)\n        return vars\n\n    def lookup(self, name):\n        runtime = self\n        while runtime is not None:\n            if name in runtime.vars:\n                return runtime.vars[name]\n            runtime = runtime.parent\n        return getattr(self, name)\n\n    def append(self, list, thing):\n        list.append(thing)\n\n    def join(self, items, delimiter=""):\n        parts = []\n        rope = False\n        for item in items:\n            if isinstance(item, list):\n                item = self.join(item, delimiter)\n            if isinstance(item, Text):\n                rope = True\n            else:\n                item = str(item)\n            if parts and delimiter:\n                parts.append(delimiter)\n            parts.append(item)\n        if rope:\n            return Text(parts)\n        return "".join(parts)\n\n    def indent(self, text, prefix="    "):\n        return Text([text], prefix)\n\n    def splice(self, depth, item):\n        if depth == 0:\n            return [item]\n        else:\n            return self.concat([self.splice(depth-1, subitem) for subitem in item])\n\n    def concat(self, lists):\n        return [x for xs in lists for x in xs]\n\ndef char_class(description, keys):\n    return (\n        description,\n        frozenset(keys),\n        re.compile("[{}]*".format("".join(re.escape(key) for key in keys)))\n    )\n\nclass Profile:\n\n    def __init__(self):\n        self.rules = {}\n        self.operators = {}\n        self.stacks = {}\n        self.backtrack_sites = {}\n        self.frames = []\n        self.installed = {}\n\n    def install(self):\n        self.installed = dict(rules)\n        for name, matcher in self.installed.items():\n            rules[name] = ProfiledMatcher(self, name, matcher)\n\n    def uninstall(self):\n        rules.update(self.installed)\n        self.installed = {}\n\n    def stream(self, items):\n        stream = Stream(items)\n        for name in STREAM_OPERATORS:\n            setattr(stream, name, self.counted(name, getattr(stream, name)))\n        stream.operator_or = self.counted("operator_or", self.measured_or(stream))\n        return stream\n\n    def measured_or(self, stream):\n        def operator_or(matchers):\n            rule = self.frames[-1][0] if self.frames else "?"\n            site = matchers[0].__class__.__name__\n            for alternative, matcher in enumerate(matchers):\n                backtrack_index = stream.index\n                result = matcher.run(stream)\n                if result is not None:\n                    return result\n                if alternative < len(matchers)-1:\n                    self.backtracked(\n                        (rule, site, alternative+1),\n                        stream.index-backtrack_index\n                    )\n                stream.index = backtrack_index\n            return stream.error("no or match")\n        return operator_or\n\n    def backtracked(self, site, wasted):\n        if site not in self.backtrack_sites:\n            self.backtrack_sites[site] = [0, 0, 0]\n        counts = self.backtrack_sites[site]\n        counts[0] += 1\n        counts[1] += wasted\n        counts[2] = max(counts[2], wasted)\n\n    def counted(self, name, fn):\n        def operator(*args):\n            self.operators[name] = self.operators.get(name, 0) + 1\n            return fn(*args)\n        return operator\n\n    def enter(self, name):\n        self.stats(name)["calls"] += 1\n        path = name if not self.frames else "{};{}".format(self.frames[-1][3], name)\n        self.frames.append([name, time.perf_counter(), 0, path])\n\n    def leave(self, failed):\n        name, start, children, path = self.frames.pop()\n        elapsed = time.perf_counter()-start\n        self.stats(name)["total_seconds"] += elapsed\n        self.stats(name)["self_seconds"] += elapsed-children\n        if failed:\n            self.stats(name)["backtracks"] += 1\n        self.stacks[path] = self.stacks.get(path, 0)+elapsed-children\n        if self.frames:\n            self.frames[-1][2] += elapsed\n\n    def stats(self, name):\n        if name not in self.rules:\n            self.rules[name] = dict.fromkeys(PROFILE_COUNTERS, 0)\n        return self.rules[name]\n\n    def report(self):\n        lines = ["{:<32} {:>8} {:>10} {:>10} {:>10}".format(\n            "rule", "calls", "backtracks", "total", "self"\n        )]\n        for name, counts in sorted(\n            self.rules.items(),\n            key=lambda item: -item[1]["self_seconds"]\n        ):\n            lines.append("{:<32} {:>8} {:>10} {:>9.3f}s {:>9.3f}s".format(\n                name,\n                counts["calls"],\n                counts["backtracks"],\n                counts["total_seconds"],\n                counts["self_seconds"]\n            ))\n        lines.append("")\n        lines.append("{:<32} {:>12}".format("operator", "count"))\n        for name, count in sorted(self.operators.items(), key=lambda item: -item[1]):\n            lines.append("{:<32} {:>12}".format(name, count))\n        return "\\n".join(lines)+"\\n"\n\n    def backtrack_report(self, sources=[]):\n        lines = rule_lines(sources)\n        ordinals = {}\n        for rule, site, _ in sorted(\n            self.backtrack_sites,\n            key=lambda key: (key[0], int(key[1].rsplit("_", 1)[1]))\n        ):\n            if (rule, site) not in ordinals:\n                ordinals[(rule, site)] = len([\n                    key for key in ordinals if key[0] == rule\n                ])+1\n        report = ["{:<24} {:<48} {:>8} {:>10} {:>8}".format(\n            "line", "site", "fails", "wasted", "max"\n        )]\n        for (rule, site, alternative), (fails, wasted, longest) in sorted(\n            self.backtrack_sites.items(),\n            key=lambda item: (-item[1][1], -item[1][0])\n        ):\n            report.append("{:<24} {:<48} {:>8} {:>10} {:>8}".format(\n                lines.get(rule, rule),\n                "{} or #{} alternative {}".format(\n                    rule,\n                    ordinals[(rule, site)],\n                    alternative\n                ),\n                fails,\n                wasted,\n                longest\n            ))\n        return "\\n".join(report)+"\\n"\n\n    def collapsed_stacks(self):\n        return "".join(\n            "{} {}\\n".format(path, round(seconds*1000000))\n            for path, seconds in sorted(self.stacks.items())\n        )\n\ndef rule_lines(sources):\n    lines = {}\n    for path, source in sources:\n        grammar = None\n        for match in re.finditer(r"(\\w+)\\s*([{=])", source):\n            name = match.group(1)\n            if match.group(2) == "{":\n                grammar = name\n            elif grammar is not None:\n                lines.setdefault(\n                    "{}.{}".format(grammar, name),\n                    "{}:{}".format(path, source.count("\\n", 0, match.start(1))+1)\n                )\n    return lines\n\nclass ProfiledMatcher:\n\n    def __init__(self, profile, name, matcher):\n        self.profile = profile\n        self.name = name\n        self.matcher = matcher\n\n    def run(self, stream):\n        self.profile.enter(self.name)\n        result = self.matcher.run(stream)\n        self.profile.leave(result is None)\n        return result\n\nPROFILE_COUNTERS = [\n    "calls",\n    "backtracks",\n    "total_seconds",\n    "self_seconds",\n]\n\nSTREAM_OPERATORS = [\n    "operator_and",\n    "operator_star",\n    "operator_not",\n    "lookahead",\n    "action",\n    "with_scope",\n    "bind",\n    "match_list",\n    "match_call_rule",\n    "match",\n    "match_string",\n    "match_star",\n]\n\nclass Text:\n\n    __slots__ = ["parts", "prefix"]\n\n    def __init__(self, parts, prefix=None):\n        self.parts = parts\n        self.prefix = prefix\n\n    def write(self, writer):\n        if self.prefix is not None:\n            writer.indent(self.prefix)\n        for part in self.parts:\n            if isinstance(part, Text):\n                part.write(writer)\n            else:\n                writer.write(part)\n        if self.prefix is not None:\n            writer.dedent()\n\n    def __str__(self):\n        chunks = []\n        write_text(self, chunks.append)\n        return "".join(chunks)\n\n    def __repr__(self):\n        return repr(str(self))\n\nclass Writer:\n\n    def __init__(self, output):\n        self.output = output\n        self.chunks = []\n        self.prefixes = []\n        self.pending = 0\n\n    def indent(self, prefix):\n        self.prefixes.append(prefix)\n        self.pending = min(self.pending, len(self.prefixes)-1)\n\n    def dedent(self):\n        self.prefixes.pop()\n        self.pending = min(self.pending, len(self.prefixes))\n\n    def write(self, text):\n        start = 0\n        while start < len(text):\n            if self.pending < len(self.prefixes):\n                self.chunks.extend(self.prefixes[self.pending:])\n                self.pending = len(self.prefixes)\n            end = text.find("\\n", start)+1 or len(text)\n            self.chunks.append(text[start:end])\n            if text[end-1] == "\\n":\n                self.pending = 0\n            start = end\n        if len(self.chunks) > WRITER_BUFFER_SIZE:\n            self.flush()\n\n    def flush(self):\n        self.output("".join(self.chunks))\n        self.chunks = []\n\ndef materialize(text):\n    if isinstance(text, Text):\n        return str(text)\n    return text\n\ndef write_text(text, output):\n    if isinstance(text, Text):\n        writer = Writer(output)\n        text.write(writer)\n        writer.flush()\n    else:\n        output(str(text))\n\ndef unknown_rule(rule):\n    if rule in removed:\n        return KeyError("{} was {}".format(rule, removed[rule]))\n    return KeyError(rule)\n\ndef compile_chain(grammars, source, profile=None, rope=False):\n    import os\n    import sys\n    import pprint\n    runtime = Runtime()\n    if profile is not None:\n        profile.install()\n    try:\n        for rule in grammars:\n            if isinstance(rule, tuple):\n                rule, matcher = rule\n                if profile is not None:\n                    matcher = ProfiledMatcher(profile, rule, matcher)\n            elif rule in rules:\n                matcher = rules[rule]\n            else:\n                raise unknown_rule(rule)\n            try:\n                stream = Stream(source) if profile is None else profile.stream(source)\n                result = matcher.run(stream)\n                if result is None:\n                    raise MatchError(*stream.latest_error)\n                source = result.eval(runtime)\n            except MatchError as e:\n                marker = "<ERROR POSITION>"\n                if os.isatty(sys.stderr.fileno()):\n                    marker = f"\\033[0;31m{marker}\\033[0m"\n                if isinstance(e.items, str):\n                    stream_string = e.items[:e.index] + marker + e.items[e.index:]\n                else:\n                    stream_string = pprint.pformat(e.items)\n                sys.exit("ERROR: {}\\nPOSITION: {}\\nSTREAM:\\n{}".format(\n                    str(e),\n                    e.index,\n                    runtime.indent(stream_string)\n                ))\n    finally:\n        if profile is not None:\n            profile.uninstall()\n    return source if rope else materialize(source)\n\ndef load_compiled(source, filename="<rlmeta>", cache_dir=None, namespace=None):\n    import hashlib\n    import importlib.util\n    import marshal\n    import os\n    if namespace is None:\n        namespace = {"__name__": filename}\n    if cache_dir is None:\n        code = compile(source, filename, "exec")\n    else:\n        key = hashlib.sha256(importlib.util.MAGIC_NUMBER)\n        key.update(b"\\0"+filename.encode("utf-8"))\n        key.update(b"\\0"+source.encode("utf-8"))\n        path = os.path.join(cache_dir, key.hexdigest()+".marshal")\n        try:\n            with open(path, "rb") as f:\n                code = marshal.load(f)\n        except (OSError, EOFError, ValueError, TypeError):\n            code = compile(source, filename, "exec")\n            os.makedirs(cache_dir, exist_ok=True)\n            with open(path+".tmp", "wb") as f:\n                marshal.dump(code, f)\n            os.replace(path+".tmp", path)\n    exec(code, namespace)\n    return namespace\n'
+import re
+import time
+
+RUNTIME_MAX_DEPTH = 8
+
+WRITER_BUFFER_SIZE = 4096
+
 rules = {}
 
+removed = {}
+
 class Stream:
 
     def __init__(self, items):
@@ -12,37 +21,41 @@ class Stream:
     def operator_or(self, matchers):
         for matcher in matchers:
             backtrack_index = self.index
-            try:
-                return matcher.run(self)
-            except MatchError:
-                self.index = backtrack_index
-        self.error("no or match")
+            result = matcher.run(self)
+            if result is not None:
+                return result
+            self.index = backtrack_index
+        return self.error("no or match")
+
+    def lookahead(self):
+        if self.index < len(self.items) and not isinstance(self.items[self.index], list):
+            return self.items[self.index]
 
     def operator_and(self, matchers):
-        result = self.action()
+        result = NONE_ACTION
         for matcher in matchers:
             result = matcher.run(self)
+            if result is None:
+                return None
         return result
 
     def operator_star(self, matcher):
         results = []
         while True:
             backtrack_index = self.index
-            try:
-                results.append(matcher.run(self))
-            except MatchError:
+            result = matcher.run(self)
+            if result is None:
                 self.index = backtrack_index
-                return self.action(lambda self: [x.eval(self.runtime) for x in results])
+                return ListAction(results)
+            results.append(result)
 
     def operator_not(self, matcher):
         backtrack_index = self.index
-        try:
-            matcher.run(self)
-        except MatchError:
-            return self.action()
-        finally:
-            self.index = backtrack_index
-        self.error("not matched")
+        result = matcher.run(self)
+        self.index = backtrack_index
+        if result is None:
+            return NONE_ACTION
+        return self.error("not matched")
 
     def action(self, fn=lambda self: None):
         return SemanticAction(self.scope, fn)
@@ -50,27 +63,26 @@ class Stream:
     def with_scope(self, matcher):
         current_scope = self.scope
         self.scope = {}
-        try:
-            return matcher.run(self)
-        finally:
-            self.scope = current_scope
+        result = matcher.run(self)
+        self.scope = current_scope
+        return result
 
     def bind(self, name, semantic_action):
-        self.scope[name] = semantic_action
+        if semantic_action is not None:
+            self.scope[name] = semantic_action
         return semantic_action
 
     def match_list(self, matcher):
         if self.index < len(self.items):
             items, index = self.items, self.index
-            try:
-                self.items = self.items[self.index]
-                self.index = 0
-                result = matcher.run(self)
+            self.items = self.items[self.index]
+            self.index = 0
+            result = matcher.run(self)
+            if result is not None:
                 index += 1
-            finally:
-                self.items, self.index = items, index
+            self.items, self.index = items, index
             return result
-        self.error("no list found")
+        return self.error("no list found")
 
     def match_call_rule(self, namespace):
         name = namespace + "." + self.items[self.index]
@@ -79,20 +91,46 @@ class Stream:
             self.index += 1
             return rule.run(self)
         else:
-            self.error("unknown rule")
+            return self.error("unknown rule")
 
     def match(self, fn, description):
         if self.index < len(self.items):
             item = self.items[self.index]
             if fn(item):
                 self.index += 1
-                return self.action(lambda self: item)
+                return value_action(item)
+        return self.error(f"expected {description}")
+
+    def match_string(self, string):
+        if self.items[self.index:self.index+len(string)] == string:
+            self.index += len(string)
+            return value_action(string[-1])
+        for item in string:
+            if self.index >= len(self.items) or self.items[self.index] != item:
+                return self.error(f"expected {item!r}")
+            self.index += 1
+        return value_action(string[-1])
+
+    def match_star(self, char_class):
+        description, keys, pattern = char_class
+        start = self.index
+        if isinstance(self.items, str):
+            self.index = pattern.match(self.items, self.index).end()
+        else:
+            while (self.index < len(self.items) and
+                    not isinstance(self.items[self.index], list) and
+                    self.items[self.index] in keys):
+                self.index += 1
+        items = self.items[start:self.index]
         self.error(f"expected {description}")
+        return self.action(lambda self: list(items))
+
+    def needs_error(self):
+        return not self.latest_error or self.index > self.latest_error[2]
 
     def error(self, name):
-        if not self.latest_error or self.index > self.latest_error[2]:
+        if self.needs_error():
             self.latest_error = (name, self.items, self.index)
-        raise MatchError(*self.latest_error)
 
 class MatchError(Exception):
 
@@ -103,6 +141,8 @@ class MatchError(Exception):
 
 class SemanticAction:
 
+    __slots__ = ["scope", "fn", "runtime"]
+
     def __init__(self, scope, fn):
         self.scope = scope
         self.fn = fn
@@ -121,31 +161,84 @@ class SemanticAction:
         else:
             return self.runtime.lookup(name)
 
+class ValueAction:
+
+    __slots__ = ["value"]
+
+    def __init__(self, value):
+        self.value = value
+
+    def eval(self, runtime):
+        return self.value
+
+class ListAction:
+
+    __slots__ = ["actions"]
+
+    def __init__(self, actions):
+        self.actions = actions
+
+    def eval(self, runtime):
+        return [x.eval(runtime) for x in self.actions]
+
+NONE_ACTION = ValueAction(None)
+
+CHARACTER_ACTIONS = {chr(x): ValueAction(chr(x)) for x in range(256)}
+
+def value_action(value):
+    if value.__class__ is str and value in CHARACTER_ACTIONS:
+        return CHARACTER_ACTIONS[value]
+    return ValueAction(value)
+
 class Runtime:
 
-    def __init__(self, extra={"len": len, "repr": repr}):
+    def __init__(self, extra={"len": len, "repr": repr}, parent=None):
         self.vars = extra
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth+1
 
     def bind(self, name, value):
-        return Runtime(dict(self.vars, **{name: value}))
+        if self.depth >= RUNTIME_MAX_DEPTH:
+            return Runtime(dict(self.flatten(), **{name: value}))
+        return Runtime({name: value}, self)
+
+    def flatten(self):
+        if self.parent is None:
+            return dict(self.vars)
+        vars = self.parent.flatten()
+        vars.update(self.vars)
+        return vars
 
     def lookup(self, name):
-        if name in self.vars:
-            return self.vars[name]
-        else:
-            return getattr(self, name)
+        runtime = self
+        while runtime is not None:
+            if name in runtime.vars:
+                return runtime.vars[name]
+            runtime = runtime.parent
+        return getattr(self, name)
 
     def append(self, list, thing):
         list.append(thing)
 
     def join(self, items, delimiter=""):
-        return delimiter.join(
-            self.join(item, delimiter) if isinstance(item, list) else str(item)
-            for item in items
-        )
+        parts = []
+        rope = False
+        for item in items:
+            if isinstance(item, list):
+                item = self.join(item, delimiter)
+            if isinstance(item, Text):
+                rope = True
+            else:
+                item = str(item)
+            if parts and delimiter:
+                parts.append(delimiter)
+            parts.append(item)
+        if rope:
+            return Text(parts)
+        return "".join(parts)
 
     def indent(self, text, prefix="    "):
-        return "".join(prefix+line for line in text.splitlines(True))
+        return Text([text], prefix)
 
     def splice(self, depth, item):
         if depth == 0:
@@ -156,28 +249,345 @@ class Runtime:
     def concat(self, lists):
         return [x for xs in lists for x in xs]
 
-def compile_chain(grammars, source):
+def char_class(description, keys):
+    return (
+        description,
+        frozenset(keys),
+        re.compile("[{}]*".format("".join(re.escape(key) for key in keys)))
+    )
+
+class Profile:
+
+    def __init__(self):
+        self.rules = {}
+        self.operators = {}
+        self.stacks = {}
+        self.backtrack_sites = {}
+        self.frames = []
+        self.installed = {}
+
+    def install(self):
+        self.installed = dict(rules)
+        for name, matcher in self.installed.items():
+            rules[name] = ProfiledMatcher(self, name, matcher)
+
+    def uninstall(self):
+        rules.update(self.installed)
+        self.installed = {}
+
+    def stream(self, items):
+        stream = Stream(items)
+        for name in STREAM_OPERATORS:
+            setattr(stream, name, self.counted(name, getattr(stream, name)))
+        stream.operator_or = self.counted("operator_or", self.measured_or(stream))
+        return stream
+
+    def measured_or(self, stream):
+        def operator_or(matchers):
+            rule = self.frames[-1][0] if self.frames else "?"
+            site = matchers[0].__class__.__name__
+            for alternative, matcher in enumerate(matchers):
+                backtrack_index = stream.index
+                result = matcher.run(stream)
+                if result is not None:
+                    return result
+                if alternative < len(matchers)-1:
+                    self.backtracked(
+                        (rule, site, alternative+1),
+                        stream.index-backtrack_index
+                    )
+                stream.index = backtrack_index
+            return stream.error("no or match")
+        return operator_or
+
+    def backtracked(self, site, wasted):
+        if site not in self.backtrack_sites:
+            self.backtrack_sites[site] = [0, 0, 0]
+        counts = self.backtrack_sites[site]
+        counts[0] += 1
+        counts[1] += wasted
+        counts[2] = max(counts[2], wasted)
+
+    def counted(self, name, fn):
+        def operator(*args):
+            self.operators[name] = self.operators.get(name, 0) + 1
+            return fn(*args)
+        return operator
+
+    def enter(self, name):
+        self.stats(name)["calls"] += 1
+        path = name if not self.frames else "{};{}".format(self.frames[-1][3], name)
+        self.frames.append([name, time.perf_counter(), 0, path])
+
+    def leave(self, failed):
+        name, start, children, path = self.frames.pop()
+        elapsed = time.perf_counter()-start
+        self.stats(name)["total_seconds"] += elapsed
+        self.stats(name)["self_seconds"] += elapsed-children
+        if failed:
+            self.stats(name)["backtracks"] += 1
+        self.stacks[path] = self.stacks.get(path, 0)+elapsed-children
+        if self.frames:
+            self.frames[-1][2] += elapsed
+
+    def stats(self, name):
+        if name not in self.rules:
+            self.rules[name] = dict.fromkeys(PROFILE_COUNTERS, 0)
+        return self.rules[name]
+
+    def report(self):
+        lines = ["{:<32} {:>8} {:>10} {:>10} {:>10}".format(
+            "rule", "calls", "backtracks", "total", "self"
+        )]
+        for name, counts in sorted(
+            self.rules.items(),
+            key=lambda item: -item[1]["self_seconds"]
+        ):
+            lines.append("{:<32} {:>8} {:>10} {:>9.3f}s {:>9.3f}s".format(
+                name,
+                counts["calls"],
+                counts["backtracks"],
+                counts["total_seconds"],
+                counts["self_seconds"]
+            ))
+        lines.append("")
+        lines.append("{:<32} {:>12}".format("operator", "count"))
+        for name, count in sorted(self.operators.items(), key=lambda item: -item[1]):
+            lines.append("{:<32} {:>12}".format(name, count))
+        return "\n".join(lines)+"\n"
+
+    def backtrack_report(self, sources=[]):
+        lines = rule_lines(sources)
+        ordinals = {}
+        for rule, site, _ in sorted(
+            self.backtrack_sites,
+            key=lambda key: (key[0], int(key[1].rsplit("_", 1)[1]))
+        ):
+            if (rule, site) not in ordinals:
+                ordinals[(rule, site)] = len([
+                    key for key in ordinals if key[0] == rule
+                ])+1
+        report = ["{:<24} {:<48} {:>8} {:>10} {:>8}".format(
+            "line", "site", "fails", "wasted", "max"
+        )]
+        for (rule, site, alternative), (fails, wasted, longest) in sorted(
+            self.backtrack_sites.items(),
+            key=lambda item: (-item[1][1], -item[1][0])
+        ):
+            report.append("{:<24} {:<48} {:>8} {:>10} {:>8}".format(
+                lines.get(rule, rule),
+                "{} or #{} alternative {}".format(
+                    rule,
+                    ordinals[(rule, site)],
+                    alternative
+                ),
+                fails,
+                wasted,
+                longest
+            ))
+        return "\n".join(report)+"\n"
+
+    def collapsed_stacks(self):
+        return "".join(
+            "{} {}\n".format(path, round(seconds*1000000))
+            for path, seconds in sorted(self.stacks.items())
+        )
+
+def rule_lines(sources):
+    lines = {}
+    for path, source in sources:
+        grammar = None
+        for match in re.finditer(r"(\w+)\s*([{=])", source):
+            name = match.group(1)
+            if match.group(2) == "{":
+                grammar = name
+            elif grammar is not None:
+                lines.setdefault(
+                    "{}.{}".format(grammar, name),
+                    "{}:{}".format(path, source.count("\n", 0, match.start(1))+1)
+                )
+    return lines
+
+class ProfiledMatcher:
+
+    def __init__(self, profile, name, matcher):
+        self.profile = profile
+        self.name = name
+        self.matcher = matcher
+
+    def run(self, stream):
+        self.profile.enter(self.name)
+        result = self.matcher.run(stream)
+        self.profile.leave(result is None)
+        return result
+
+PROFILE_COUNTERS = [
+    "calls",
+    "backtracks",
+    "total_seconds",
+    "self_seconds",
+]
+
+STREAM_OPERATORS = [
+    "operator_and",
+    "operator_star",
+    "operator_not",
+    "lookahead",
+    "action",
+    "with_scope",
+    "bind",
+    "match_list",
+    "match_call_rule",
+    "match",
+    "match_string",
+    "match_star",
+]
+
+class Text:
+
+    __slots__ = ["parts", "prefix"]
+
+    def __init__(self, parts, prefix=None):
+        self.parts = parts
+        self.prefix = prefix
+
+    def write(self, writer):
+        if self.prefix is not None:
+            writer.indent(self.prefix)
+        for part in self.parts:
+            if isinstance(part, Text):
+                part.write(writer)
+            else:
+                writer.write(part)
+        if self.prefix is not None:
+            writer.dedent()
+
+    def __str__(self):
+        chunks = []
+        write_text(self, chunks.append)
+        return "".join(chunks)
+
+    def __repr__(self):
+        return repr(str(self))
+
+class Writer:
+
+    def __init__(self, output):
+        self.output = output
+        self.chunks = []
+        self.prefixes = []
+        self.pending = 0
+
+    def indent(self, prefix):
+        self.prefixes.append(prefix)
+        self.pending = min(self.pending, len(self.prefixes)-1)
+
+    def dedent(self):
+        self.prefixes.pop()
+        self.pending = min(self.pending, len(self.prefixes))
+
+    def write(self, text):
+        start = 0
+        while start < len(text):
+            if self.pending < len(self.prefixes):
+                self.chunks.extend(self.prefixes[self.pending:])
+                self.pending = len(self.prefixes)
+            end = text.find("\n", start)+1 or len(text)
+            self.chunks.append(text[start:end])
+            if text[end-1] == "\n":
+                self.pending = 0
+            start = end
+        if len(self.chunks) > WRITER_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.output("".join(self.chunks))
+        self.chunks = []
+
+def materialize(text):
+    if isinstance(text, Text):
+        return str(text)
+    return text
+
+def write_text(text, output):
+    if isinstance(text, Text):
+        writer = Writer(output)
+        text.write(writer)
+        writer.flush()
+    else:
+        output(str(text))
+
+def unknown_rule(rule):
+    if rule in removed:
+        return KeyError("{} was {}".format(rule, removed[rule]))
+    return KeyError(rule)
+
+def compile_chain(grammars, source, profile=None, rope=False):
     import os
     import sys
     import pprint
     runtime = Runtime()
-    for rule in grammars:
-        try:
-            source = rules[rule].run(Stream(source)).eval(runtime)
-        except MatchError as e:
-            marker = "<ERROR POSITION>"
-            if os.isatty(sys.stderr.fileno()):
-                marker = f"\033[0;31m{marker}\033[0m"
-            if isinstance(e.items, str):
-                stream_string = e.items[:e.index] + marker + e.items[e.index:]
+    if profile is not None:
+        profile.install()
+    try:
+        for rule in grammars:
+            if isinstance(rule, tuple):
+                rule, matcher = rule
+                if profile is not None:
+                    matcher = ProfiledMatcher(profile, rule, matcher)
+            elif rule in rules:
+                matcher = rules[rule]
             else:
-                stream_string = pprint.pformat(e.items)
-            sys.exit("ERROR: {}\nPOSITION: {}\nSTREAM:\n{}".format(
-                str(e),
-                e.index,
-                runtime.indent(stream_string)
-            ))
-    return source
+                raise unknown_rule(rule)
+            try:
+                stream = Stream(source) if profile is None else profile.stream(source)
+                result = matcher.run(stream)
+                if result is None:
+                    raise MatchError(*stream.latest_error)
+                source = result.eval(runtime)
+            except MatchError as e:
+                marker = "<ERROR POSITION>"
+                if os.isatty(sys.stderr.fileno()):
+                    marker = f"\033[0;31m{marker}\033[0m"
+                if isinstance(e.items, str):
+                    stream_string = e.items[:e.index] + marker + e.items[e.index:]
+                else:
+                    stream_string = pprint.pformat(e.items)
+                sys.exit("ERROR: {}\nPOSITION: {}\nSTREAM:\n{}".format(
+                    str(e),
+                    e.index,
+                    runtime.indent(stream_string)
+                ))
+    finally:
+        if profile is not None:
+            profile.uninstall()
+    return source if rope else materialize(source)
+
+def load_compiled(source, filename="<rlmeta>", cache_dir=None, namespace=None):
+    import hashlib
+    import importlib.util
+    import marshal
+    import os
+    if namespace is None:
+        namespace = {"__name__": filename}
+    if cache_dir is None:
+        code = compile(source, filename, "exec")
+    else:
+        key = hashlib.sha256(importlib.util.MAGIC_NUMBER)
+        key.update(b"\0"+filename.encode("utf-8"))
+        key.update(b"\0"+source.encode("utf-8"))
+        path = os.path.join(cache_dir, key.hexdigest()+".marshal")
+        try:
+            with open(path, "rb") as f:
+                code = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            code = compile(source, filename, "exec")
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path+".tmp", "wb") as f:
+                marshal.dump(code, f)
+            os.replace(path+".tmp", path)
+    exec(code, namespace)
+    return namespace
 class Matcher_Parser_0:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
@@ -195,269 +605,237 @@ class Matcher_Parser_3:
         return stream.with_scope(Matcher_Parser_2())
 class Matcher_Parser_4:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_3()
-        ])
+        return stream.operator_star(Matcher_Parser_3())
 class Matcher_Parser_5:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_4())
+        return stream.bind('xs', Matcher_Parser_4().run(stream))
 class Matcher_Parser_6:
     def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_5().run(stream))
+        return rules['Parser.space'].run(stream)
 class Matcher_Parser_7:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match(lambda item: True, 'any')
 class Matcher_Parser_8:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.operator_not(Matcher_Parser_7())
 class Matcher_Parser_9:
-    def run(self, stream):
-        return stream.operator_not(Matcher_Parser_8())
-class Matcher_Parser_10:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('xs'))
-class Matcher_Parser_11:
+class Matcher_Parser_10:
     def run(self, stream):
         return stream.operator_and([
+            Matcher_Parser_5(),
             Matcher_Parser_6(),
-            Matcher_Parser_7(),
-            Matcher_Parser_9(),
-            Matcher_Parser_10()
+            Matcher_Parser_8(),
+            Matcher_Parser_9()
         ])
+class Matcher_Parser_11:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_10())
 class Matcher_Parser_12:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_11())
+        return rules['Parser.name'].run(stream)
 class Matcher_Parser_13:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_12()
-        ])
+        return stream.bind('x', Matcher_Parser_12().run(stream))
 class Matcher_Parser_14:
     def run(self, stream):
-        return rules['Parser.name'].run(stream)
+        return rules['Parser.space'].run(stream)
 class Matcher_Parser_15:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_14().run(stream))
+        return stream.match(lambda item: item == '{', "'{'")
 class Matcher_Parser_16:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.operator_and([
+            Matcher_Parser_15()
+        ])
 class Matcher_Parser_17:
     def run(self, stream):
-        return stream.match(lambda item: item == '{', "'{'")
+        return rules['Parser.rule'].run(stream)
 class Matcher_Parser_18:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_17()
-        ])
+        return stream.operator_star(Matcher_Parser_17())
 class Matcher_Parser_19:
     def run(self, stream):
-        return rules['Parser.rule'].run(stream)
+        return stream.bind('ys', Matcher_Parser_18().run(stream))
 class Matcher_Parser_20:
-    def run(self, stream):
-        return stream.operator_star(Matcher_Parser_19())
-class Matcher_Parser_21:
-    def run(self, stream):
-        return stream.bind('ys', Matcher_Parser_20().run(stream))
-class Matcher_Parser_22:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_23:
+class Matcher_Parser_21:
     def run(self, stream):
         return stream.match(lambda item: item == '}', "'}'")
-class Matcher_Parser_24:
+class Matcher_Parser_22:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_23()
+            Matcher_Parser_21()
         ])
-class Matcher_Parser_25:
+class Matcher_Parser_23:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'Namespace'),
             self.lookup('splice')(0, self.lookup('x')),
             self.lookup('splice')(1, self.lookup('ys'))
         ]))
-class Matcher_Parser_26:
+class Matcher_Parser_24:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_15(),
+            Matcher_Parser_13(),
+            Matcher_Parser_14(),
             Matcher_Parser_16(),
-            Matcher_Parser_18(),
-            Matcher_Parser_21(),
+            Matcher_Parser_19(),
+            Matcher_Parser_20(),
             Matcher_Parser_22(),
-            Matcher_Parser_24(),
-            Matcher_Parser_25()
+            Matcher_Parser_23()
         ])
-class Matcher_Parser_27:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_26())
-class Matcher_Parser_28:
+class Matcher_Parser_25:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_27()
-        ])
-class Matcher_Parser_29:
+        return stream.with_scope(Matcher_Parser_24())
+class Matcher_Parser_26:
     def run(self, stream):
         return rules['Parser.name'].run(stream)
-class Matcher_Parser_30:
+class Matcher_Parser_27:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_29().run(stream))
-class Matcher_Parser_31:
+        return stream.bind('x', Matcher_Parser_26().run(stream))
+class Matcher_Parser_28:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_32:
+class Matcher_Parser_29:
     def run(self, stream):
         return stream.match(lambda item: item == '=', "'='")
-class Matcher_Parser_33:
+class Matcher_Parser_30:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_32()
+            Matcher_Parser_29()
         ])
-class Matcher_Parser_34:
+class Matcher_Parser_31:
     def run(self, stream):
         return rules['Parser.choice'].run(stream)
-class Matcher_Parser_35:
+class Matcher_Parser_32:
     def run(self, stream):
-        return stream.bind('y', Matcher_Parser_34().run(stream))
-class Matcher_Parser_36:
+        return stream.bind('y', Matcher_Parser_31().run(stream))
+class Matcher_Parser_33:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'Rule'),
             self.lookup('splice')(0, self.lookup('x')),
             self.lookup('splice')(0, self.lookup('y'))
         ]))
-class Matcher_Parser_37:
+class Matcher_Parser_34:
     def run(self, stream):
         return stream.operator_and([
+            Matcher_Parser_27(),
+            Matcher_Parser_28(),
             Matcher_Parser_30(),
-            Matcher_Parser_31(),
-            Matcher_Parser_33(),
-            Matcher_Parser_35(),
-            Matcher_Parser_36()
+            Matcher_Parser_32(),
+            Matcher_Parser_33()
         ])
+class Matcher_Parser_35:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_34())
+class Matcher_Parser_36:
+    def run(self, stream):
+        return rules['Parser.space'].run(stream)
+class Matcher_Parser_37:
+    def run(self, stream):
+        return stream.match(lambda item: item == '|', "'|'")
 class Matcher_Parser_38:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_37())
+        return stream.operator_and([
+            Matcher_Parser_37()
+        ])
 class Matcher_Parser_39:
     def run(self, stream):
-        return stream.operator_or([
+        return stream.operator_and([
+            Matcher_Parser_36(),
             Matcher_Parser_38()
         ])
 class Matcher_Parser_40:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.with_scope(Matcher_Parser_39())
 class Matcher_Parser_41:
     def run(self, stream):
-        return stream.match(lambda item: item == '|', "'|'")
+        return Matcher_Parser_40().run(stream) if stream.lookahead() in {'\n', ' ', '|'} or stream.needs_error() else None
 class Matcher_Parser_42:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_41()
+        
         ])
 class Matcher_Parser_43:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_40(),
+        return stream.operator_or([
+            Matcher_Parser_41(),
             Matcher_Parser_42()
         ])
 class Matcher_Parser_44:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_43())
+        return rules['Parser.sequence'].run(stream)
 class Matcher_Parser_45:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_44()
-        ])
+        return stream.bind('x', Matcher_Parser_44().run(stream))
 class Matcher_Parser_46:
     def run(self, stream):
-        return stream.operator_and([
-        
-        ])
+        return rules['Parser.space'].run(stream)
 class Matcher_Parser_47:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_45(),
-            Matcher_Parser_46()
-        ])
+        return stream.match(lambda item: item == '|', "'|'")
 class Matcher_Parser_48:
     def run(self, stream):
-        return rules['Parser.sequence'].run(stream)
+        return stream.operator_and([
+            Matcher_Parser_47()
+        ])
 class Matcher_Parser_49:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_48().run(stream))
+        return rules['Parser.sequence'].run(stream)
 class Matcher_Parser_50:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.operator_and([
+            Matcher_Parser_46(),
+            Matcher_Parser_48(),
+            Matcher_Parser_49()
+        ])
 class Matcher_Parser_51:
     def run(self, stream):
-        return stream.match(lambda item: item == '|', "'|'")
+        return stream.with_scope(Matcher_Parser_50())
 class Matcher_Parser_52:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_51()
-        ])
+        return stream.operator_star(Matcher_Parser_51())
 class Matcher_Parser_53:
     def run(self, stream):
-        return rules['Parser.sequence'].run(stream)
+        return stream.bind('xs', Matcher_Parser_52().run(stream))
 class Matcher_Parser_54:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_50(),
-            Matcher_Parser_52(),
-            Matcher_Parser_53()
-        ])
-class Matcher_Parser_55:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_54())
-class Matcher_Parser_56:
-    def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_55()
-        ])
-class Matcher_Parser_57:
-    def run(self, stream):
-        return stream.operator_star(Matcher_Parser_56())
-class Matcher_Parser_58:
-    def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_57().run(stream))
-class Matcher_Parser_59:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'Or'),
             self.lookup('splice')(0, self.lookup('x')),
             self.lookup('splice')(1, self.lookup('xs'))
         ]))
-class Matcher_Parser_60:
+class Matcher_Parser_55:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_47(),
-            Matcher_Parser_49(),
-            Matcher_Parser_58(),
-            Matcher_Parser_59()
+            Matcher_Parser_43(),
+            Matcher_Parser_45(),
+            Matcher_Parser_53(),
+            Matcher_Parser_54()
         ])
-class Matcher_Parser_61:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_60())
-class Matcher_Parser_62:
+class Matcher_Parser_56:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_61()
-        ])
-class Matcher_Parser_63:
+        return stream.with_scope(Matcher_Parser_55())
+class Matcher_Parser_57:
     def run(self, stream):
         return rules['Parser.expr'].run(stream)
-class Matcher_Parser_64:
+class Matcher_Parser_58:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_63())
-class Matcher_Parser_65:
+        return stream.operator_star(Matcher_Parser_57())
+class Matcher_Parser_59:
     def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_64().run(stream))
-class Matcher_Parser_66:
+        return stream.bind('xs', Matcher_Parser_58().run(stream))
+class Matcher_Parser_60:
     def run(self, stream):
         return rules['Parser.maybeAction'].run(stream)
-class Matcher_Parser_67:
+class Matcher_Parser_61:
     def run(self, stream):
-        return stream.bind('ys', Matcher_Parser_66().run(stream))
-class Matcher_Parser_68:
+        return stream.bind('ys', Matcher_Parser_60().run(stream))
+class Matcher_Parser_62:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'Scope'),
@@ -467,95 +845,93 @@ class Matcher_Parser_68:
                 self.lookup('splice')(1, self.lookup('ys'))
             ]))
         ]))
-class Matcher_Parser_69:
+class Matcher_Parser_63:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_65(),
-            Matcher_Parser_67(),
-            Matcher_Parser_68()
+            Matcher_Parser_59(),
+            Matcher_Parser_61(),
+            Matcher_Parser_62()
         ])
-class Matcher_Parser_70:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_69())
-class Matcher_Parser_71:
+class Matcher_Parser_64:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_70()
-        ])
-class Matcher_Parser_72:
+        return stream.with_scope(Matcher_Parser_63())
+class Matcher_Parser_65:
     def run(self, stream):
         return rules['Parser.expr1'].run(stream)
-class Matcher_Parser_73:
+class Matcher_Parser_66:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_72().run(stream))
-class Matcher_Parser_74:
+        return stream.bind('x', Matcher_Parser_65().run(stream))
+class Matcher_Parser_67:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_75:
+class Matcher_Parser_68:
     def run(self, stream):
         return stream.match(lambda item: item == ':', "':'")
-class Matcher_Parser_76:
+class Matcher_Parser_69:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_75()
+            Matcher_Parser_68()
         ])
-class Matcher_Parser_77:
+class Matcher_Parser_70:
     def run(self, stream):
         return rules['Parser.name'].run(stream)
-class Matcher_Parser_78:
+class Matcher_Parser_71:
     def run(self, stream):
-        return stream.bind('y', Matcher_Parser_77().run(stream))
-class Matcher_Parser_79:
+        return stream.bind('y', Matcher_Parser_70().run(stream))
+class Matcher_Parser_72:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'Bind'),
             self.lookup('splice')(0, self.lookup('y')),
             self.lookup('splice')(0, self.lookup('x'))
         ]))
-class Matcher_Parser_80:
+class Matcher_Parser_73:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_73(),
-            Matcher_Parser_74(),
-            Matcher_Parser_76(),
-            Matcher_Parser_78(),
-            Matcher_Parser_79()
+            Matcher_Parser_66(),
+            Matcher_Parser_67(),
+            Matcher_Parser_69(),
+            Matcher_Parser_71(),
+            Matcher_Parser_72()
         ])
-class Matcher_Parser_81:
+class Matcher_Parser_74:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_80())
-class Matcher_Parser_82:
+        return stream.with_scope(Matcher_Parser_73())
+class Matcher_Parser_75:
+    def run(self, stream):
+        return Matcher_Parser_74().run(stream) if stream.lookahead() in {'\n', ' ', '!', '%', "'", '(', '.', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z'} or stream.needs_error() else None
+class Matcher_Parser_76:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_83:
+class Matcher_Parser_77:
     def run(self, stream):
         return stream.match(lambda item: item == '[', "'['")
-class Matcher_Parser_84:
+class Matcher_Parser_78:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_83()
+            Matcher_Parser_77()
         ])
-class Matcher_Parser_85:
+class Matcher_Parser_79:
     def run(self, stream):
         return rules['Parser.expr'].run(stream)
-class Matcher_Parser_86:
+class Matcher_Parser_80:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_85())
-class Matcher_Parser_87:
+        return stream.operator_star(Matcher_Parser_79())
+class Matcher_Parser_81:
     def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_86().run(stream))
-class Matcher_Parser_88:
+        return stream.bind('xs', Matcher_Parser_80().run(stream))
+class Matcher_Parser_82:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_89:
+class Matcher_Parser_83:
     def run(self, stream):
         return stream.match(lambda item: item == ']', "']'")
-class Matcher_Parser_90:
+class Matcher_Parser_84:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_89()
+            Matcher_Parser_83()
         ])
-class Matcher_Parser_91:
+class Matcher_Parser_85:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'MatchList'),
@@ -564,49 +940,75 @@ class Matcher_Parser_91:
                 self.lookup('splice')(1, self.lookup('xs'))
             ]))
         ]))
-class Matcher_Parser_92:
+class Matcher_Parser_86:
     def run(self, stream):
         return stream.operator_and([
+            Matcher_Parser_76(),
+            Matcher_Parser_78(),
+            Matcher_Parser_81(),
             Matcher_Parser_82(),
             Matcher_Parser_84(),
-            Matcher_Parser_87(),
+            Matcher_Parser_85()
+        ])
+class Matcher_Parser_87:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_86())
+class Matcher_Parser_88:
+    def run(self, stream):
+        return Matcher_Parser_87().run(stream) if stream.lookahead() in {'\n', ' ', '['} or stream.needs_error() else None
+class Matcher_Parser_89:
+    def run(self, stream):
+        return rules['Parser.expr1'].run(stream)
+class Matcher_Parser_90:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_Parser_89()
+        ])
+class Matcher_Parser_91:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_90())
+class Matcher_Parser_92:
+    def run(self, stream):
+        return stream.operator_or([
+            Matcher_Parser_75(),
             Matcher_Parser_88(),
-            Matcher_Parser_90(),
             Matcher_Parser_91()
         ])
 class Matcher_Parser_93:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_92())
+        return rules['Parser.expr2'].run(stream)
 class Matcher_Parser_94:
     def run(self, stream):
-        return rules['Parser.expr1'].run(stream)
+        return stream.bind('x', Matcher_Parser_93().run(stream))
 class Matcher_Parser_95:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_94()
-        ])
+        return rules['Parser.space'].run(stream)
 class Matcher_Parser_96:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_95())
+        return stream.match(lambda item: item == '*', "'*'")
 class Matcher_Parser_97:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_81(),
-            Matcher_Parser_93(),
+        return stream.operator_and([
             Matcher_Parser_96()
         ])
 class Matcher_Parser_98:
     def run(self, stream):
-        return rules['Parser.expr2'].run(stream)
+        return stream.action(lambda self: self.lookup('concat')([
+            self.lookup('splice')(0, 'Star'),
+            self.lookup('splice')(0, self.lookup('x'))
+        ]))
 class Matcher_Parser_99:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_98().run(stream))
+        return stream.operator_and([
+            Matcher_Parser_97(),
+            Matcher_Parser_98()
+        ])
 class Matcher_Parser_100:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return Matcher_Parser_99().run(stream) if stream.lookahead() in {'*'} or stream.needs_error() else None
 class Matcher_Parser_101:
     def run(self, stream):
-        return stream.match(lambda item: item == '*', "'*'")
+        return stream.match(lambda item: item == '?', "'?'")
 class Matcher_Parser_102:
     def run(self, stream):
         return stream.operator_and([
@@ -615,211 +1017,197 @@ class Matcher_Parser_102:
 class Matcher_Parser_103:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
-            self.lookup('splice')(0, 'Star'),
-            self.lookup('splice')(0, self.lookup('x'))
+            self.lookup('splice')(0, 'Or'),
+            self.lookup('splice')(0, self.lookup('x')),
+            self.lookup('splice')(0, self.lookup('concat')([
+                self.lookup('splice')(0, 'And')
+            ]))
         ]))
 class Matcher_Parser_104:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_99(),
-            Matcher_Parser_100(),
             Matcher_Parser_102(),
             Matcher_Parser_103()
         ])
 class Matcher_Parser_105:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_104())
+        return stream.operator_or([
+            Matcher_Parser_100(),
+            Matcher_Parser_104()
+        ])
 class Matcher_Parser_106:
     def run(self, stream):
-        return rules['Parser.expr2'].run(stream)
+        return stream.operator_and([
+            Matcher_Parser_94(),
+            Matcher_Parser_95(),
+            Matcher_Parser_105()
+        ])
 class Matcher_Parser_107:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_106().run(stream))
+        return stream.with_scope(Matcher_Parser_106())
 class Matcher_Parser_108:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return Matcher_Parser_107().run(stream) if stream.lookahead() in {'\n', ' ', "'", '(', '.', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z'} or stream.needs_error() else None
 class Matcher_Parser_109:
     def run(self, stream):
-        return stream.match(lambda item: item == '?', "'?'")
+        return rules['Parser.space'].run(stream)
 class Matcher_Parser_110:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_109()
-        ])
+        return stream.match(lambda item: item == '!', "'!'")
 class Matcher_Parser_111:
-    def run(self, stream):
-        return stream.action(lambda self: self.lookup('concat')([
-            self.lookup('splice')(0, 'Or'),
-            self.lookup('splice')(0, self.lookup('x')),
-            self.lookup('splice')(0, self.lookup('concat')([
-                self.lookup('splice')(0, 'And')
-            ]))
-        ]))
-class Matcher_Parser_112:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_107(),
-            Matcher_Parser_108(),
-            Matcher_Parser_110(),
-            Matcher_Parser_111()
+            Matcher_Parser_110()
         ])
+class Matcher_Parser_112:
+    def run(self, stream):
+        return rules['Parser.expr2'].run(stream)
 class Matcher_Parser_113:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_112())
+        return stream.bind('x', Matcher_Parser_112().run(stream))
 class Matcher_Parser_114:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.action(lambda self: self.lookup('concat')([
+            self.lookup('splice')(0, 'Not'),
+            self.lookup('splice')(0, self.lookup('x'))
+        ]))
 class Matcher_Parser_115:
-    def run(self, stream):
-        return stream.match(lambda item: item == '!', "'!'")
-class Matcher_Parser_116:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_115()
+            Matcher_Parser_111(),
+            Matcher_Parser_113(),
+            Matcher_Parser_114()
         ])
+class Matcher_Parser_116:
+    def run(self, stream):
+        return Matcher_Parser_115().run(stream) if stream.lookahead() in {'!'} or stream.needs_error() else None
 class Matcher_Parser_117:
     def run(self, stream):
-        return rules['Parser.expr2'].run(stream)
+        return stream.match(lambda item: item == '%', "'%'")
 class Matcher_Parser_118:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_117().run(stream))
+        return stream.operator_and([
+            Matcher_Parser_117()
+        ])
 class Matcher_Parser_119:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
-            self.lookup('splice')(0, 'Not'),
-            self.lookup('splice')(0, self.lookup('x'))
+            self.lookup('splice')(0, 'MatchCallRule')
         ]))
 class Matcher_Parser_120:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_114(),
-            Matcher_Parser_116(),
             Matcher_Parser_118(),
             Matcher_Parser_119()
         ])
 class Matcher_Parser_121:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_120())
+        return stream.operator_or([
+            Matcher_Parser_116(),
+            Matcher_Parser_120()
+        ])
 class Matcher_Parser_122:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.operator_and([
+            Matcher_Parser_109(),
+            Matcher_Parser_121()
+        ])
 class Matcher_Parser_123:
     def run(self, stream):
-        return stream.match(lambda item: item == '%', "'%'")
+        return stream.with_scope(Matcher_Parser_122())
 class Matcher_Parser_124:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_123()
-        ])
+        return Matcher_Parser_123().run(stream) if stream.lookahead() in {'\n', ' ', '!', '%'} or stream.needs_error() else None
 class Matcher_Parser_125:
     def run(self, stream):
-        return stream.action(lambda self: self.lookup('concat')([
-            self.lookup('splice')(0, 'MatchCallRule')
-        ]))
+        return rules['Parser.expr2'].run(stream)
 class Matcher_Parser_126:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_122(),
-            Matcher_Parser_124(),
             Matcher_Parser_125()
         ])
 class Matcher_Parser_127:
     def run(self, stream):
         return stream.with_scope(Matcher_Parser_126())
 class Matcher_Parser_128:
-    def run(self, stream):
-        return rules['Parser.expr2'].run(stream)
-class Matcher_Parser_129:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_128()
-        ])
-class Matcher_Parser_130:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_129())
-class Matcher_Parser_131:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_105(),
-            Matcher_Parser_113(),
-            Matcher_Parser_121(),
-            Matcher_Parser_127(),
-            Matcher_Parser_130()
+            Matcher_Parser_108(),
+            Matcher_Parser_124(),
+            Matcher_Parser_127()
         ])
-class Matcher_Parser_132:
+class Matcher_Parser_129:
     def run(self, stream):
         return rules['Parser.name'].run(stream)
-class Matcher_Parser_133:
+class Matcher_Parser_130:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_132().run(stream))
-class Matcher_Parser_134:
+        return stream.bind('x', Matcher_Parser_129().run(stream))
+class Matcher_Parser_131:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_135:
+class Matcher_Parser_132:
     def run(self, stream):
         return stream.match(lambda item: item == '=', "'='")
-class Matcher_Parser_136:
+class Matcher_Parser_133:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_135()
+            Matcher_Parser_132()
         ])
-class Matcher_Parser_137:
+class Matcher_Parser_134:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_134(),
-            Matcher_Parser_136()
+            Matcher_Parser_131(),
+            Matcher_Parser_133()
         ])
-class Matcher_Parser_138:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_137())
-class Matcher_Parser_139:
+class Matcher_Parser_135:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_138()
-        ])
-class Matcher_Parser_140:
+        return stream.with_scope(Matcher_Parser_134())
+class Matcher_Parser_136:
     def run(self, stream):
-        return stream.operator_not(Matcher_Parser_139())
-class Matcher_Parser_141:
+        return stream.operator_not(Matcher_Parser_135())
+class Matcher_Parser_137:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'MatchRule'),
             self.lookup('splice')(0, self.lookup('x'))
         ]))
-class Matcher_Parser_142:
+class Matcher_Parser_138:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_133(),
-            Matcher_Parser_140(),
-            Matcher_Parser_141()
+            Matcher_Parser_130(),
+            Matcher_Parser_136(),
+            Matcher_Parser_137()
         ])
-class Matcher_Parser_143:
+class Matcher_Parser_139:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_142())
-class Matcher_Parser_144:
+        return stream.with_scope(Matcher_Parser_138())
+class Matcher_Parser_140:
+    def run(self, stream):
+        return Matcher_Parser_139().run(stream) if stream.lookahead() in {'\n', ' ', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z'} or stream.needs_error() else None
+class Matcher_Parser_141:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_145:
+class Matcher_Parser_142:
     def run(self, stream):
         return rules['Parser.char'].run(stream)
-class Matcher_Parser_146:
+class Matcher_Parser_143:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_145().run(stream))
-class Matcher_Parser_147:
+        return stream.bind('x', Matcher_Parser_142().run(stream))
+class Matcher_Parser_144:
     def run(self, stream):
         return stream.match(lambda item: item == '-', "'-'")
-class Matcher_Parser_148:
+class Matcher_Parser_145:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_147()
+            Matcher_Parser_144()
         ])
-class Matcher_Parser_149:
+class Matcher_Parser_146:
     def run(self, stream):
         return rules['Parser.char'].run(stream)
-class Matcher_Parser_150:
+class Matcher_Parser_147:
     def run(self, stream):
-        return stream.bind('y', Matcher_Parser_149().run(stream))
-class Matcher_Parser_151:
+        return stream.bind('y', Matcher_Parser_146().run(stream))
+class Matcher_Parser_148:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'MatchObject'),
@@ -829,47 +1217,64 @@ class Matcher_Parser_151:
                 self.lookup('splice')(0, self.lookup('y'))
             ]))
         ]))
+class Matcher_Parser_149:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_Parser_143(),
+            Matcher_Parser_145(),
+            Matcher_Parser_147(),
+            Matcher_Parser_148()
+        ])
+class Matcher_Parser_150:
+    def run(self, stream):
+        return Matcher_Parser_149().run(stream) if stream.lookahead() in {"'"} or stream.needs_error() else None
+class Matcher_Parser_151:
+    def run(self, stream):
+        return stream.match(lambda item: item == "'", '"\'"')
 class Matcher_Parser_152:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_144(),
-            Matcher_Parser_146(),
-            Matcher_Parser_148(),
-            Matcher_Parser_150(),
             Matcher_Parser_151()
         ])
 class Matcher_Parser_153:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_152())
+        return stream.match(lambda item: item == "'", '"\'"')
 class Matcher_Parser_154:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.operator_and([
+            Matcher_Parser_153()
+        ])
 class Matcher_Parser_155:
     def run(self, stream):
-        return stream.match(lambda item: item == "'", '"\'"')
+        return stream.operator_not(Matcher_Parser_154())
 class Matcher_Parser_156:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_155()
-        ])
+        return rules['Parser.innerChar'].run(stream)
 class Matcher_Parser_157:
     def run(self, stream):
-        return stream.match(lambda item: item == "'", '"\'"')
+        return stream.bind('x', Matcher_Parser_156().run(stream))
 class Matcher_Parser_158:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_157()
-        ])
+        return stream.action(lambda self: self.lookup('concat')([
+            self.lookup('splice')(0, 'MatchObject'),
+            self.lookup('splice')(0, self.lookup('concat')([
+                self.lookup('splice')(0, 'Eq'),
+                self.lookup('splice')(0, self.lookup('x'))
+            ]))
+        ]))
 class Matcher_Parser_159:
     def run(self, stream):
-        return stream.operator_not(Matcher_Parser_158())
+        return stream.operator_and([
+            Matcher_Parser_157(),
+            Matcher_Parser_158()
+        ])
 class Matcher_Parser_160:
     def run(self, stream):
-        return rules['Parser.matchChar'].run(stream)
+        return stream.with_scope(Matcher_Parser_159())
 class Matcher_Parser_161:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_159(),
+            Matcher_Parser_155(),
             Matcher_Parser_160()
         ])
 class Matcher_Parser_162:
@@ -877,53 +1282,44 @@ class Matcher_Parser_162:
         return stream.with_scope(Matcher_Parser_161())
 class Matcher_Parser_163:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_162()
-        ])
+        return stream.operator_star(Matcher_Parser_162())
 class Matcher_Parser_164:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_163())
+        return stream.bind('xs', Matcher_Parser_163().run(stream))
 class Matcher_Parser_165:
-    def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_164().run(stream))
-class Matcher_Parser_166:
     def run(self, stream):
         return stream.match(lambda item: item == "'", '"\'"')
-class Matcher_Parser_167:
+class Matcher_Parser_166:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_166()
+            Matcher_Parser_165()
         ])
-class Matcher_Parser_168:
+class Matcher_Parser_167:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'And'),
             self.lookup('splice')(1, self.lookup('xs'))
         ]))
-class Matcher_Parser_169:
+class Matcher_Parser_168:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_154(),
-            Matcher_Parser_156(),
-            Matcher_Parser_165(),
-            Matcher_Parser_167(),
-            Matcher_Parser_168()
+            Matcher_Parser_152(),
+            Matcher_Parser_164(),
+            Matcher_Parser_166(),
+            Matcher_Parser_167()
         ])
-class Matcher_Parser_170:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_169())
-class Matcher_Parser_171:
+class Matcher_Parser_169:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
-class Matcher_Parser_172:
+        return Matcher_Parser_168().run(stream) if stream.lookahead() in {"'"} or stream.needs_error() else None
+class Matcher_Parser_170:
     def run(self, stream):
         return stream.match(lambda item: item == '.', "'.'")
-class Matcher_Parser_173:
+class Matcher_Parser_171:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_172()
+            Matcher_Parser_170()
         ])
-class Matcher_Parser_174:
+class Matcher_Parser_172:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'MatchObject'),
@@ -931,76 +1327,82 @@ class Matcher_Parser_174:
                 self.lookup('splice')(0, 'Any')
             ]))
         ]))
-class Matcher_Parser_175:
+class Matcher_Parser_173:
     def run(self, stream):
         return stream.operator_and([
             Matcher_Parser_171(),
-            Matcher_Parser_173(),
-            Matcher_Parser_174()
+            Matcher_Parser_172()
         ])
-class Matcher_Parser_176:
+class Matcher_Parser_174:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_175())
-class Matcher_Parser_177:
-    def run(self, stream):
-        return rules['Parser.space'].run(stream)
-class Matcher_Parser_178:
+        return Matcher_Parser_173().run(stream) if stream.lookahead() in {'.'} or stream.needs_error() else None
+class Matcher_Parser_175:
     def run(self, stream):
         return stream.match(lambda item: item == '(', "'('")
-class Matcher_Parser_179:
+class Matcher_Parser_176:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_178()
+            Matcher_Parser_175()
         ])
-class Matcher_Parser_180:
+class Matcher_Parser_177:
     def run(self, stream):
         return rules['Parser.choice'].run(stream)
-class Matcher_Parser_181:
+class Matcher_Parser_178:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_180().run(stream))
-class Matcher_Parser_182:
+        return stream.bind('x', Matcher_Parser_177().run(stream))
+class Matcher_Parser_179:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_183:
+class Matcher_Parser_180:
     def run(self, stream):
         return stream.match(lambda item: item == ')', "')'")
-class Matcher_Parser_184:
+class Matcher_Parser_181:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_183()
+            Matcher_Parser_180()
         ])
-class Matcher_Parser_185:
+class Matcher_Parser_182:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('x'))
-class Matcher_Parser_186:
+class Matcher_Parser_183:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_177(),
+            Matcher_Parser_176(),
+            Matcher_Parser_178(),
             Matcher_Parser_179(),
             Matcher_Parser_181(),
-            Matcher_Parser_182(),
-            Matcher_Parser_184(),
-            Matcher_Parser_185()
+            Matcher_Parser_182()
         ])
-class Matcher_Parser_187:
+class Matcher_Parser_184:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_186())
-class Matcher_Parser_188:
+        return stream.operator_or([
+            Matcher_Parser_150(),
+            Matcher_Parser_169(),
+            Matcher_Parser_174(),
+            Matcher_Parser_183()
+        ])
+class Matcher_Parser_185:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_Parser_141(),
+            Matcher_Parser_184()
+        ])
+class Matcher_Parser_186:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_185())
+class Matcher_Parser_187:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_143(),
-            Matcher_Parser_153(),
-            Matcher_Parser_170(),
-            Matcher_Parser_176(),
-            Matcher_Parser_187()
+            Matcher_Parser_140(),
+            Matcher_Parser_186()
         ])
-class Matcher_Parser_189:
+class Matcher_Parser_188:
     def run(self, stream):
         return rules['Parser.innerChar'].run(stream)
-class Matcher_Parser_190:
+class Matcher_Parser_189:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_189().run(stream))
-class Matcher_Parser_191:
+        return stream.bind('x', Matcher_Parser_188().run(stream))
+class Matcher_Parser_190:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'MatchObject'),
@@ -1009,27 +1411,22 @@ class Matcher_Parser_191:
                 self.lookup('splice')(0, self.lookup('x'))
             ]))
         ]))
-class Matcher_Parser_192:
+class Matcher_Parser_191:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_190(),
-            Matcher_Parser_191()
+            Matcher_Parser_189(),
+            Matcher_Parser_190()
         ])
+class Matcher_Parser_192:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_191())
 class Matcher_Parser_193:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_192())
+        return rules['Parser.actionExpr'].run(stream)
 class Matcher_Parser_194:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_193()
-        ])
+        return stream.bind('x', Matcher_Parser_193().run(stream))
 class Matcher_Parser_195:
-    def run(self, stream):
-        return rules['Parser.actionExpr'].run(stream)
-class Matcher_Parser_196:
-    def run(self, stream):
-        return stream.bind('x', Matcher_Parser_195().run(stream))
-class Matcher_Parser_197:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, self.lookup('concat')([
@@ -1037,106 +1434,103 @@ class Matcher_Parser_197:
                 self.lookup('splice')(0, self.lookup('x'))
             ]))
         ]))
-class Matcher_Parser_198:
+class Matcher_Parser_196:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_196(),
-            Matcher_Parser_197()
+            Matcher_Parser_194(),
+            Matcher_Parser_195()
         ])
-class Matcher_Parser_199:
+class Matcher_Parser_197:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_198())
-class Matcher_Parser_200:
+        return stream.with_scope(Matcher_Parser_196())
+class Matcher_Parser_198:
+    def run(self, stream):
+        return Matcher_Parser_197().run(stream) if stream.lookahead() in {'\n', ' ', '-'} or stream.needs_error() else None
+class Matcher_Parser_199:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
         
         ]))
-class Matcher_Parser_201:
+class Matcher_Parser_200:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_200()
+            Matcher_Parser_199()
         ])
-class Matcher_Parser_202:
+class Matcher_Parser_201:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_201())
-class Matcher_Parser_203:
+        return stream.with_scope(Matcher_Parser_200())
+class Matcher_Parser_202:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_199(),
-            Matcher_Parser_202()
+            Matcher_Parser_198(),
+            Matcher_Parser_201()
         ])
-class Matcher_Parser_204:
+class Matcher_Parser_203:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
+class Matcher_Parser_204:
+    def run(self, stream):
+        return stream.match_string('->')
 class Matcher_Parser_205:
     def run(self, stream):
-        return stream.match(lambda item: item == '-', "'-'")
+        return rules['Parser.hostExpr'].run(stream)
 class Matcher_Parser_206:
     def run(self, stream):
-        return stream.match(lambda item: item == '>', "'>'")
+        return stream.bind('x', Matcher_Parser_205().run(stream))
 class Matcher_Parser_207:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_205(),
-            Matcher_Parser_206()
-        ])
+        return rules['Parser.space'].run(stream)
 class Matcher_Parser_208:
     def run(self, stream):
-        return rules['Parser.hostExpr'].run(stream)
+        return stream.match(lambda item: item == ':', "':'")
 class Matcher_Parser_209:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_208().run(stream))
+        return stream.operator_and([
+            Matcher_Parser_208()
+        ])
 class Matcher_Parser_210:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return rules['Parser.name'].run(stream)
 class Matcher_Parser_211:
-    def run(self, stream):
-        return stream.match(lambda item: item == ':', "':'")
-class Matcher_Parser_212:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_211()
+            Matcher_Parser_207(),
+            Matcher_Parser_209(),
+            Matcher_Parser_210()
         ])
+class Matcher_Parser_212:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_211())
 class Matcher_Parser_213:
     def run(self, stream):
-        return rules['Parser.name'].run(stream)
+        return Matcher_Parser_212().run(stream) if stream.lookahead() in {'\n', ' ', ':'} or stream.needs_error() else None
 class Matcher_Parser_214:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_210(),
-            Matcher_Parser_212(),
-            Matcher_Parser_213()
-        ])
+        return stream.action(lambda self: '')
 class Matcher_Parser_215:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_214())
+        return stream.operator_and([
+            Matcher_Parser_214()
+        ])
 class Matcher_Parser_216:
     def run(self, stream):
-        return stream.action(lambda self: '')
+        return stream.with_scope(Matcher_Parser_215())
 class Matcher_Parser_217:
     def run(self, stream):
-        return stream.operator_and([
+        return stream.operator_or([
+            Matcher_Parser_213(),
             Matcher_Parser_216()
         ])
 class Matcher_Parser_218:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_217())
+        return stream.bind('y', Matcher_Parser_217().run(stream))
 class Matcher_Parser_219:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_215(),
-            Matcher_Parser_218()
-        ])
+        return rules['Parser.actionExpr'].run(stream)
 class Matcher_Parser_220:
     def run(self, stream):
-        return stream.bind('y', Matcher_Parser_219().run(stream))
+        return stream.bind('z', Matcher_Parser_219().run(stream))
 class Matcher_Parser_221:
-    def run(self, stream):
-        return rules['Parser.actionExpr'].run(stream)
-class Matcher_Parser_222:
-    def run(self, stream):
-        return stream.bind('z', Matcher_Parser_221().run(stream))
-class Matcher_Parser_223:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'Set'),
@@ -1144,280 +1538,276 @@ class Matcher_Parser_223:
             self.lookup('splice')(0, self.lookup('x')),
             self.lookup('splice')(0, self.lookup('z'))
         ]))
-class Matcher_Parser_224:
+class Matcher_Parser_222:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_204(),
-            Matcher_Parser_207(),
-            Matcher_Parser_209(),
+            Matcher_Parser_218(),
             Matcher_Parser_220(),
-            Matcher_Parser_222(),
-            Matcher_Parser_223()
+            Matcher_Parser_221()
         ])
+class Matcher_Parser_223:
+    def run(self, stream):
+        return Matcher_Parser_222().run(stream) if stream.lookahead() in {'\n', ' ', '-', ':'} or stream.needs_error() else None
+class Matcher_Parser_224:
+    def run(self, stream):
+        return stream.action(lambda self: self.lookup('x'))
 class Matcher_Parser_225:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_224())
+        return stream.operator_and([
+            Matcher_Parser_224()
+        ])
 class Matcher_Parser_226:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.operator_or([
+            Matcher_Parser_223(),
+            Matcher_Parser_225()
+        ])
 class Matcher_Parser_227:
     def run(self, stream):
-        return stream.match(lambda item: item == '-', "'-'")
+        return stream.operator_and([
+            Matcher_Parser_203(),
+            Matcher_Parser_204(),
+            Matcher_Parser_206(),
+            Matcher_Parser_226()
+        ])
 class Matcher_Parser_228:
     def run(self, stream):
-        return stream.match(lambda item: item == '>', "'>'")
+        return stream.with_scope(Matcher_Parser_227())
 class Matcher_Parser_229:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_227(),
-            Matcher_Parser_228()
-        ])
+        return rules['Parser.space'].run(stream)
 class Matcher_Parser_230:
     def run(self, stream):
-        return rules['Parser.hostExpr'].run(stream)
+        return rules['Parser.string'].run(stream)
 class Matcher_Parser_231:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_226(),
-            Matcher_Parser_229(),
-            Matcher_Parser_230()
-        ])
+        return stream.bind('x', Matcher_Parser_230().run(stream))
 class Matcher_Parser_232:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_231())
+        return stream.action(lambda self: self.lookup('concat')([
+            self.lookup('splice')(0, 'String'),
+            self.lookup('splice')(0, self.lookup('x'))
+        ]))
 class Matcher_Parser_233:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_225(),
+        return stream.operator_and([
+            Matcher_Parser_231(),
             Matcher_Parser_232()
         ])
 class Matcher_Parser_234:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return Matcher_Parser_233().run(stream) if stream.lookahead() in {'"'} or stream.needs_error() else None
 class Matcher_Parser_235:
     def run(self, stream):
-        return rules['Parser.string'].run(stream)
+        return stream.match(lambda item: item == '[', "'['")
 class Matcher_Parser_236:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_235().run(stream))
+        return stream.operator_and([
+            Matcher_Parser_235()
+        ])
 class Matcher_Parser_237:
     def run(self, stream):
-        return stream.action(lambda self: self.lookup('concat')([
-            self.lookup('splice')(0, 'String'),
-            self.lookup('splice')(0, self.lookup('x'))
-        ]))
+        return rules['Parser.hostListItem'].run(stream)
 class Matcher_Parser_238:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_234(),
-            Matcher_Parser_236(),
-            Matcher_Parser_237()
-        ])
+        return stream.operator_star(Matcher_Parser_237())
 class Matcher_Parser_239:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_238())
+        return stream.bind('xs', Matcher_Parser_238().run(stream))
 class Matcher_Parser_240:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
 class Matcher_Parser_241:
     def run(self, stream):
-        return stream.match(lambda item: item == '[', "'['")
+        return stream.match(lambda item: item == ']', "']'")
 class Matcher_Parser_242:
     def run(self, stream):
         return stream.operator_and([
             Matcher_Parser_241()
         ])
 class Matcher_Parser_243:
-    def run(self, stream):
-        return rules['Parser.hostListItem'].run(stream)
-class Matcher_Parser_244:
-    def run(self, stream):
-        return stream.operator_star(Matcher_Parser_243())
-class Matcher_Parser_245:
-    def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_244().run(stream))
-class Matcher_Parser_246:
-    def run(self, stream):
-        return rules['Parser.space'].run(stream)
-class Matcher_Parser_247:
-    def run(self, stream):
-        return stream.match(lambda item: item == ']', "']'")
-class Matcher_Parser_248:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_247()
-        ])
-class Matcher_Parser_249:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'List'),
             self.lookup('splice')(1, self.lookup('xs'))
         ]))
-class Matcher_Parser_250:
+class Matcher_Parser_244:
     def run(self, stream):
         return stream.operator_and([
+            Matcher_Parser_236(),
+            Matcher_Parser_239(),
             Matcher_Parser_240(),
             Matcher_Parser_242(),
-            Matcher_Parser_245(),
-            Matcher_Parser_246(),
-            Matcher_Parser_248(),
-            Matcher_Parser_249()
+            Matcher_Parser_243()
         ])
-class Matcher_Parser_251:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_250())
-class Matcher_Parser_252:
+class Matcher_Parser_245:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
-class Matcher_Parser_253:
+        return Matcher_Parser_244().run(stream) if stream.lookahead() in {'['} or stream.needs_error() else None
+class Matcher_Parser_246:
     def run(self, stream):
         return stream.match(lambda item: item == '{', "'{'")
-class Matcher_Parser_254:
+class Matcher_Parser_247:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_253()
+            Matcher_Parser_246()
         ])
-class Matcher_Parser_255:
+class Matcher_Parser_248:
     def run(self, stream):
         return rules['Parser.hostExpr'].run(stream)
-class Matcher_Parser_256:
+class Matcher_Parser_249:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_255())
-class Matcher_Parser_257:
+        return stream.operator_star(Matcher_Parser_248())
+class Matcher_Parser_250:
     def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_256().run(stream))
-class Matcher_Parser_258:
+        return stream.bind('xs', Matcher_Parser_249().run(stream))
+class Matcher_Parser_251:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_259:
+class Matcher_Parser_252:
     def run(self, stream):
         return stream.match(lambda item: item == '}', "'}'")
-class Matcher_Parser_260:
+class Matcher_Parser_253:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_259()
+            Matcher_Parser_252()
         ])
-class Matcher_Parser_261:
+class Matcher_Parser_254:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'Format'),
             self.lookup('splice')(1, self.lookup('xs'))
         ]))
-class Matcher_Parser_262:
+class Matcher_Parser_255:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_252(),
-            Matcher_Parser_254(),
-            Matcher_Parser_257(),
-            Matcher_Parser_258(),
-            Matcher_Parser_260(),
-            Matcher_Parser_261()
+            Matcher_Parser_247(),
+            Matcher_Parser_250(),
+            Matcher_Parser_251(),
+            Matcher_Parser_253(),
+            Matcher_Parser_254()
         ])
-class Matcher_Parser_263:
+class Matcher_Parser_256:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_262())
-class Matcher_Parser_264:
+        return stream.operator_or([
+            Matcher_Parser_234(),
+            Matcher_Parser_245(),
+            Matcher_Parser_255()
+        ])
+class Matcher_Parser_257:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_Parser_229(),
+            Matcher_Parser_256()
+        ])
+class Matcher_Parser_258:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_257())
+class Matcher_Parser_259:
+    def run(self, stream):
+        return Matcher_Parser_258().run(stream) if stream.lookahead() in {'\n', ' ', '"', '[', '{'} or stream.needs_error() else None
+class Matcher_Parser_260:
     def run(self, stream):
         return rules['Parser.var'].run(stream)
-class Matcher_Parser_265:
+class Matcher_Parser_261:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_264().run(stream))
-class Matcher_Parser_266:
+        return stream.bind('x', Matcher_Parser_260().run(stream))
+class Matcher_Parser_262:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_267:
+class Matcher_Parser_263:
     def run(self, stream):
         return stream.match(lambda item: item == '(', "'('")
-class Matcher_Parser_268:
+class Matcher_Parser_264:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_267()
+            Matcher_Parser_263()
         ])
-class Matcher_Parser_269:
+class Matcher_Parser_265:
     def run(self, stream):
         return rules['Parser.hostExpr'].run(stream)
-class Matcher_Parser_270:
+class Matcher_Parser_266:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_269())
-class Matcher_Parser_271:
+        return stream.operator_star(Matcher_Parser_265())
+class Matcher_Parser_267:
     def run(self, stream):
-        return stream.bind('ys', Matcher_Parser_270().run(stream))
-class Matcher_Parser_272:
+        return stream.bind('ys', Matcher_Parser_266().run(stream))
+class Matcher_Parser_268:
     def run(self, stream):
         return rules['Parser.space'].run(stream)
-class Matcher_Parser_273:
+class Matcher_Parser_269:
     def run(self, stream):
         return stream.match(lambda item: item == ')', "')'")
-class Matcher_Parser_274:
+class Matcher_Parser_270:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_273()
+            Matcher_Parser_269()
         ])
-class Matcher_Parser_275:
+class Matcher_Parser_271:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'Call'),
             self.lookup('splice')(0, self.lookup('x')),
             self.lookup('splice')(1, self.lookup('ys'))
         ]))
-class Matcher_Parser_276:
+class Matcher_Parser_272:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_265(),
-            Matcher_Parser_266(),
+            Matcher_Parser_262(),
+            Matcher_Parser_264(),
+            Matcher_Parser_267(),
             Matcher_Parser_268(),
-            Matcher_Parser_271(),
-            Matcher_Parser_272(),
-            Matcher_Parser_274(),
-            Matcher_Parser_275()
+            Matcher_Parser_270(),
+            Matcher_Parser_271()
         ])
-class Matcher_Parser_277:
+class Matcher_Parser_273:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_276())
-class Matcher_Parser_278:
+        return Matcher_Parser_272().run(stream) if stream.lookahead() in {'\n', ' ', '('} or stream.needs_error() else None
+class Matcher_Parser_274:
     def run(self, stream):
-        return rules['Parser.var'].run(stream)
-class Matcher_Parser_279:
+        return stream.action(lambda self: self.lookup('x'))
+class Matcher_Parser_275:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_278()
+            Matcher_Parser_274()
         ])
-class Matcher_Parser_280:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_279())
-class Matcher_Parser_281:
+class Matcher_Parser_276:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_239(),
-            Matcher_Parser_251(),
-            Matcher_Parser_263(),
-            Matcher_Parser_277(),
-            Matcher_Parser_280()
+            Matcher_Parser_273(),
+            Matcher_Parser_275()
         ])
-class Matcher_Parser_282:
+class Matcher_Parser_277:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
-class Matcher_Parser_283:
+        return stream.operator_and([
+            Matcher_Parser_261(),
+            Matcher_Parser_276()
+        ])
+class Matcher_Parser_278:
     def run(self, stream):
-        return stream.match(lambda item: item == '~', "'~'")
-class Matcher_Parser_284:
+        return stream.with_scope(Matcher_Parser_277())
+class Matcher_Parser_279:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_283()
+        return stream.operator_or([
+            Matcher_Parser_259(),
+            Matcher_Parser_278()
         ])
-class Matcher_Parser_285:
+class Matcher_Parser_280:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_284())
-class Matcher_Parser_286:
+        return rules['Parser.space'].run(stream)
+CharClass_Parser_281 = char_class("'~'", ['~'])
+class Matcher_Parser_281:
     def run(self, stream):
-        return stream.bind('ys', Matcher_Parser_285().run(stream))
-class Matcher_Parser_287:
+        return stream.match_star(CharClass_Parser_281)
+class Matcher_Parser_282:
+    def run(self, stream):
+        return stream.bind('ys', Matcher_Parser_281().run(stream))
+class Matcher_Parser_283:
     def run(self, stream):
         return rules['Parser.hostExpr'].run(stream)
-class Matcher_Parser_288:
+class Matcher_Parser_284:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_287().run(stream))
-class Matcher_Parser_289:
+        return stream.bind('x', Matcher_Parser_283().run(stream))
+class Matcher_Parser_285:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
             self.lookup('splice')(0, 'ListItem'),
@@ -1426,102 +1816,117 @@ class Matcher_Parser_289:
             )),
             self.lookup('splice')(0, self.lookup('x'))
         ]))
-class Matcher_Parser_290:
+class Matcher_Parser_286:
     def run(self, stream):
         return stream.operator_and([
+            Matcher_Parser_280(),
             Matcher_Parser_282(),
-            Matcher_Parser_286(),
-            Matcher_Parser_288(),
-            Matcher_Parser_289()
+            Matcher_Parser_284(),
+            Matcher_Parser_285()
         ])
+class Matcher_Parser_287:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_286())
+class Matcher_Parser_288:
+    def run(self, stream):
+        return rules['Parser.name'].run(stream)
+class Matcher_Parser_289:
+    def run(self, stream):
+        return stream.bind('x', Matcher_Parser_288().run(stream))
+class Matcher_Parser_290:
+    def run(self, stream):
+        return rules['Parser.space'].run(stream)
 class Matcher_Parser_291:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_290())
+        return stream.match(lambda item: item == '=', "'='")
 class Matcher_Parser_292:
     def run(self, stream):
-        return stream.operator_or([
+        return stream.operator_and([
             Matcher_Parser_291()
         ])
 class Matcher_Parser_293:
     def run(self, stream):
-        return rules['Parser.name'].run(stream)
+        return stream.operator_and([
+            Matcher_Parser_290(),
+            Matcher_Parser_292()
+        ])
 class Matcher_Parser_294:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_293().run(stream))
+        return stream.with_scope(Matcher_Parser_293())
 class Matcher_Parser_295:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.operator_not(Matcher_Parser_294())
 class Matcher_Parser_296:
     def run(self, stream):
-        return stream.match(lambda item: item == '=', "'='")
+        return stream.action(lambda self: self.lookup('concat')([
+            self.lookup('splice')(0, 'Lookup'),
+            self.lookup('splice')(0, self.lookup('x'))
+        ]))
 class Matcher_Parser_297:
     def run(self, stream):
         return stream.operator_and([
+            Matcher_Parser_289(),
+            Matcher_Parser_295(),
             Matcher_Parser_296()
         ])
 class Matcher_Parser_298:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_295(),
-            Matcher_Parser_297()
-        ])
+        return stream.with_scope(Matcher_Parser_297())
 class Matcher_Parser_299:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_298())
+        return stream.match(lambda item: item == '"', '\'"\'')
 class Matcher_Parser_300:
     def run(self, stream):
-        return stream.operator_or([
+        return stream.operator_and([
             Matcher_Parser_299()
         ])
 class Matcher_Parser_301:
     def run(self, stream):
-        return stream.operator_not(Matcher_Parser_300())
+        return stream.match(lambda item: item == '"', '\'"\'')
 class Matcher_Parser_302:
-    def run(self, stream):
-        return stream.action(lambda self: self.lookup('concat')([
-            self.lookup('splice')(0, 'Lookup'),
-            self.lookup('splice')(0, self.lookup('x'))
-        ]))
-class Matcher_Parser_303:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_294(),
-            Matcher_Parser_301(),
-            Matcher_Parser_302()
+            Matcher_Parser_301()
         ])
+class Matcher_Parser_303:
+    def run(self, stream):
+        return stream.operator_not(Matcher_Parser_302())
 class Matcher_Parser_304:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_303())
+        return rules['Parser.innerChar'].run(stream)
 class Matcher_Parser_305:
     def run(self, stream):
-        return stream.operator_or([
+        return stream.operator_and([
+            Matcher_Parser_303(),
             Matcher_Parser_304()
         ])
 class Matcher_Parser_306:
     def run(self, stream):
-        return stream.match(lambda item: item == '"', '\'"\'')
+        return stream.with_scope(Matcher_Parser_305())
 class Matcher_Parser_307:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_306()
-        ])
+        return stream.operator_star(Matcher_Parser_306())
 class Matcher_Parser_308:
     def run(self, stream):
-        return stream.match(lambda item: item == '"', '\'"\'')
+        return stream.bind('xs', Matcher_Parser_307().run(stream))
 class Matcher_Parser_309:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_308()
-        ])
+        return stream.match(lambda item: item == '"', '\'"\'')
 class Matcher_Parser_310:
     def run(self, stream):
-        return stream.operator_not(Matcher_Parser_309())
+        return stream.operator_and([
+            Matcher_Parser_309()
+        ])
 class Matcher_Parser_311:
     def run(self, stream):
-        return rules['Parser.innerChar'].run(stream)
+        return stream.action(lambda self: self.lookup('join')([
+            self.lookup('xs')
+        ]))
 class Matcher_Parser_312:
     def run(self, stream):
         return stream.operator_and([
+            Matcher_Parser_300(),
+            Matcher_Parser_308(),
             Matcher_Parser_310(),
             Matcher_Parser_311()
         ])
@@ -1530,87 +1935,81 @@ class Matcher_Parser_313:
         return stream.with_scope(Matcher_Parser_312())
 class Matcher_Parser_314:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_313()
-        ])
+        return stream.match(lambda item: item == "'", '"\'"')
 class Matcher_Parser_315:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_314())
+        return stream.operator_and([
+            Matcher_Parser_314()
+        ])
 class Matcher_Parser_316:
     def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_315().run(stream))
+        return stream.match(lambda item: item == "'", '"\'"')
 class Matcher_Parser_317:
-    def run(self, stream):
-        return stream.match(lambda item: item == '"', '\'"\'')
-class Matcher_Parser_318:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_317()
+            Matcher_Parser_316()
         ])
+class Matcher_Parser_318:
+    def run(self, stream):
+        return stream.operator_not(Matcher_Parser_317())
 class Matcher_Parser_319:
     def run(self, stream):
-        return stream.action(lambda self: self.lookup('join')([
-            self.lookup('xs')
-        ]))
+        return rules['Parser.innerChar'].run(stream)
 class Matcher_Parser_320:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_307(),
-            Matcher_Parser_316(),
-            Matcher_Parser_318(),
-            Matcher_Parser_319()
-        ])
+        return stream.bind('x', Matcher_Parser_319().run(stream))
 class Matcher_Parser_321:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_320())
+        return stream.match(lambda item: item == "'", '"\'"')
 class Matcher_Parser_322:
     def run(self, stream):
-        return stream.operator_or([
+        return stream.operator_and([
             Matcher_Parser_321()
         ])
 class Matcher_Parser_323:
     def run(self, stream):
-        return stream.match(lambda item: item == "'", '"\'"')
+        return stream.action(lambda self: self.lookup('x'))
 class Matcher_Parser_324:
     def run(self, stream):
         return stream.operator_and([
+            Matcher_Parser_315(),
+            Matcher_Parser_318(),
+            Matcher_Parser_320(),
+            Matcher_Parser_322(),
             Matcher_Parser_323()
         ])
 class Matcher_Parser_325:
     def run(self, stream):
-        return stream.match(lambda item: item == "'", '"\'"')
+        return stream.with_scope(Matcher_Parser_324())
 class Matcher_Parser_326:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_325()
-        ])
+        return stream.match(lambda item: item == '\\', "'\\\\'")
 class Matcher_Parser_327:
     def run(self, stream):
-        return stream.operator_not(Matcher_Parser_326())
+        return stream.operator_and([
+            Matcher_Parser_326()
+        ])
 class Matcher_Parser_328:
     def run(self, stream):
-        return rules['Parser.innerChar'].run(stream)
+        return rules['Parser.escape'].run(stream)
 class Matcher_Parser_329:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_328().run(stream))
+        return stream.operator_and([
+            Matcher_Parser_327(),
+            Matcher_Parser_328()
+        ])
 class Matcher_Parser_330:
     def run(self, stream):
-        return stream.match(lambda item: item == "'", '"\'"')
+        return stream.with_scope(Matcher_Parser_329())
 class Matcher_Parser_331:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_330()
-        ])
+        return Matcher_Parser_330().run(stream) if stream.lookahead() in {'\\'} or stream.needs_error() else None
 class Matcher_Parser_332:
     def run(self, stream):
-        return stream.action(lambda self: self.lookup('x'))
+        return stream.match(lambda item: True, 'any')
 class Matcher_Parser_333:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_324(),
-            Matcher_Parser_327(),
-            Matcher_Parser_329(),
-            Matcher_Parser_331(),
             Matcher_Parser_332()
         ])
 class Matcher_Parser_334:
@@ -1619,6 +2018,7 @@ class Matcher_Parser_334:
 class Matcher_Parser_335:
     def run(self, stream):
         return stream.operator_or([
+            Matcher_Parser_331(),
             Matcher_Parser_334()
         ])
 class Matcher_Parser_336:
@@ -1631,7 +2031,7 @@ class Matcher_Parser_337:
         ])
 class Matcher_Parser_338:
     def run(self, stream):
-        return rules['Parser.escape'].run(stream)
+        return stream.action(lambda self: '\\')
 class Matcher_Parser_339:
     def run(self, stream):
         return stream.operator_and([
@@ -1643,382 +2043,233 @@ class Matcher_Parser_340:
         return stream.with_scope(Matcher_Parser_339())
 class Matcher_Parser_341:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return Matcher_Parser_340().run(stream) if stream.lookahead() in {'\\'} or stream.needs_error() else None
 class Matcher_Parser_342:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_341()
-        ])
+        return stream.match(lambda item: item == "'", '"\'"')
 class Matcher_Parser_343:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_342())
+        return stream.operator_and([
+            Matcher_Parser_342()
+        ])
 class Matcher_Parser_344:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_340(),
-            Matcher_Parser_343()
-        ])
+        return stream.action(lambda self: "'")
 class Matcher_Parser_345:
-    def run(self, stream):
-        return stream.match(lambda item: item == '\\', "'\\\\'")
-class Matcher_Parser_346:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_345()
+            Matcher_Parser_343(),
+            Matcher_Parser_344()
         ])
+class Matcher_Parser_346:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_345())
 class Matcher_Parser_347:
     def run(self, stream):
-        return stream.action(lambda self: '\\')
+        return Matcher_Parser_346().run(stream) if stream.lookahead() in {"'"} or stream.needs_error() else None
 class Matcher_Parser_348:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_346(),
-            Matcher_Parser_347()
-        ])
+        return stream.match(lambda item: item == '"', '\'"\'')
 class Matcher_Parser_349:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_348())
+        return stream.operator_and([
+            Matcher_Parser_348()
+        ])
 class Matcher_Parser_350:
     def run(self, stream):
-        return stream.match(lambda item: item == "'", '"\'"')
+        return stream.action(lambda self: '"')
 class Matcher_Parser_351:
     def run(self, stream):
         return stream.operator_and([
+            Matcher_Parser_349(),
             Matcher_Parser_350()
         ])
 class Matcher_Parser_352:
     def run(self, stream):
-        return stream.action(lambda self: "'")
+        return stream.with_scope(Matcher_Parser_351())
 class Matcher_Parser_353:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_351(),
-            Matcher_Parser_352()
-        ])
+        return Matcher_Parser_352().run(stream) if stream.lookahead() in {'"'} or stream.needs_error() else None
 class Matcher_Parser_354:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_353())
+        return stream.match(lambda item: item == 'n', "'n'")
 class Matcher_Parser_355:
-    def run(self, stream):
-        return stream.match(lambda item: item == '"', '\'"\'')
-class Matcher_Parser_356:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_355()
+            Matcher_Parser_354()
         ])
-class Matcher_Parser_357:
+class Matcher_Parser_356:
     def run(self, stream):
-        return stream.action(lambda self: '"')
-class Matcher_Parser_358:
+        return stream.action(lambda self: '\n')
+class Matcher_Parser_357:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_356(),
-            Matcher_Parser_357()
+            Matcher_Parser_355(),
+            Matcher_Parser_356()
         ])
+class Matcher_Parser_358:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_357())
 class Matcher_Parser_359:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_358())
+        return stream.operator_or([
+            Matcher_Parser_341(),
+            Matcher_Parser_347(),
+            Matcher_Parser_353(),
+            Matcher_Parser_358()
+        ])
 class Matcher_Parser_360:
     def run(self, stream):
-        return stream.match(lambda item: item == 'n', "'n'")
+        return rules['Parser.space'].run(stream)
 class Matcher_Parser_361:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_360()
-        ])
+        return stream.match(lambda item: not isinstance(item, list) and item in {'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z'}, "'a'-'z'")
 class Matcher_Parser_362:
     def run(self, stream):
-        return stream.action(lambda self: '\n')
+        return stream.bind('x', Matcher_Parser_361().run(stream))
+CharClass_Parser_363 = char_class("'a'-'z'", ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z'])
 class Matcher_Parser_363:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_361(),
-            Matcher_Parser_362()
-        ])
+        return stream.match_star(CharClass_Parser_363)
 class Matcher_Parser_364:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_363())
+        return stream.bind('xs', Matcher_Parser_363().run(stream))
 class Matcher_Parser_365:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_349(),
-            Matcher_Parser_354(),
-            Matcher_Parser_359(),
-            Matcher_Parser_364()
-        ])
+        return stream.action(lambda self: self.lookup('join')([
+            self.lookup('x'),
+            self.lookup('xs')
+        ]))
 class Matcher_Parser_366:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.operator_and([
+            Matcher_Parser_360(),
+            Matcher_Parser_362(),
+            Matcher_Parser_364(),
+            Matcher_Parser_365()
+        ])
 class Matcher_Parser_367:
     def run(self, stream):
-        return rules['Parser.nameStart'].run(stream)
+        return stream.with_scope(Matcher_Parser_366())
 class Matcher_Parser_368:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_367().run(stream))
+        return stream.match(lambda item: not isinstance(item, list) and item in {'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z'}, "'a'-'z'")
 class Matcher_Parser_369:
     def run(self, stream):
-        return rules['Parser.nameChar'].run(stream)
+        return stream.match(lambda item: not isinstance(item, list) and item in {'0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z'}, "'a'-'z'")
+CharClass_Parser_370 = char_class("' '", ['\n', ' '])
 class Matcher_Parser_370:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_369())
+        return stream.match_star(CharClass_Parser_370)
 class Matcher_Parser_371:
-    def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_370().run(stream))
-class Matcher_Parser_372:
-    def run(self, stream):
-        return stream.action(lambda self: self.lookup('join')([
-            self.lookup('x'),
-            self.lookup('xs')
-        ]))
-class Matcher_Parser_373:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_366(),
-            Matcher_Parser_368(),
-            Matcher_Parser_371(),
-            Matcher_Parser_372()
+            Matcher_Parser_370()
         ])
-class Matcher_Parser_374:
+class Matcher_Parser_372:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_373())
-class Matcher_Parser_375:
+        return stream.with_scope(Matcher_Parser_371())
+rules['Parser.file'] = Matcher_Parser_11()
+rules['Parser.namespace'] = Matcher_Parser_25()
+rules['Parser.rule'] = Matcher_Parser_35()
+rules['Parser.choice'] = Matcher_Parser_56()
+rules['Parser.sequence'] = Matcher_Parser_64()
+rules['Parser.expr'] = Matcher_Parser_92()
+rules['Parser.expr1'] = Matcher_Parser_128()
+rules['Parser.expr2'] = Matcher_Parser_187()
+rules['Parser.matchChar'] = Matcher_Parser_192()
+rules['Parser.maybeAction'] = Matcher_Parser_202()
+rules['Parser.actionExpr'] = Matcher_Parser_228()
+rules['Parser.hostExpr'] = Matcher_Parser_279()
+rules['Parser.hostListItem'] = Matcher_Parser_287()
+rules['Parser.var'] = Matcher_Parser_298()
+rules['Parser.string'] = Matcher_Parser_313()
+rules['Parser.char'] = Matcher_Parser_325()
+rules['Parser.innerChar'] = Matcher_Parser_335()
+rules['Parser.escape'] = Matcher_Parser_359()
+rules['Parser.name'] = Matcher_Parser_367()
+rules['Parser.nameStart'] = Matcher_Parser_368()
+rules['Parser.nameChar'] = Matcher_Parser_369()
+rules['Parser.space'] = Matcher_Parser_372()
+class Matcher_CodeGenerator_0:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_374()
-        ])
-class Matcher_Parser_376:
+        return rules['CodeGenerator.ast'].run(stream)
+class Matcher_CodeGenerator_1:
     def run(self, stream):
-        return stream.match(lambda item: 'a' <= item <= 'z', "'a'-'z'")
-class Matcher_Parser_377:
+        return stream.operator_star(Matcher_CodeGenerator_0())
+class Matcher_CodeGenerator_2:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_376()
-        ])
-class Matcher_Parser_378:
+        return stream.bind('xs', Matcher_CodeGenerator_1().run(stream))
+class Matcher_CodeGenerator_3:
+    def run(self, stream):
+        return stream.match(lambda item: True, 'any')
+class Matcher_CodeGenerator_4:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_377())
-class Matcher_Parser_379:
+        return stream.operator_not(Matcher_CodeGenerator_3())
+class Matcher_CodeGenerator_5:
     def run(self, stream):
-        return stream.match(lambda item: 'A' <= item <= 'Z', "'A'-'Z'")
-class Matcher_Parser_380:
+        return stream.action(lambda self: self.lookup('join')([
+            self.lookup('xs')
+        ]))
+class Matcher_CodeGenerator_6:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_379()
+            Matcher_CodeGenerator_2(),
+            Matcher_CodeGenerator_4(),
+            Matcher_CodeGenerator_5()
         ])
-class Matcher_Parser_381:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_380())
-class Matcher_Parser_382:
+class Matcher_CodeGenerator_7:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_378(),
-            Matcher_Parser_381()
-        ])
-class Matcher_Parser_383:
+        return stream.with_scope(Matcher_CodeGenerator_6())
+class Matcher_CodeGenerator_8:
     def run(self, stream):
-        return stream.match(lambda item: 'a' <= item <= 'z', "'a'-'z'")
-class Matcher_Parser_384:
+        return stream.match_call_rule('CodeGenerator')
+class Matcher_CodeGenerator_9:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_383()
-        ])
-class Matcher_Parser_385:
+        return stream.bind('x', Matcher_CodeGenerator_8().run(stream))
+class Matcher_CodeGenerator_10:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_384())
-class Matcher_Parser_386:
+        return stream.match(lambda item: True, 'any')
+class Matcher_CodeGenerator_11:
     def run(self, stream):
-        return stream.match(lambda item: 'A' <= item <= 'Z', "'A'-'Z'")
-class Matcher_Parser_387:
+        return stream.operator_not(Matcher_CodeGenerator_10())
+class Matcher_CodeGenerator_12:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_386()
+            Matcher_CodeGenerator_9(),
+            Matcher_CodeGenerator_11()
         ])
-class Matcher_Parser_388:
+class Matcher_CodeGenerator_13:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_387())
-class Matcher_Parser_389:
+        return stream.match_list(Matcher_CodeGenerator_12())
+class Matcher_CodeGenerator_14:
     def run(self, stream):
-        return stream.match(lambda item: '0' <= item <= '9', "'0'-'9'")
-class Matcher_Parser_390:
+        return stream.action(lambda self: self.lookup('x'))
+class Matcher_CodeGenerator_15:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_389()
+            Matcher_CodeGenerator_13(),
+            Matcher_CodeGenerator_14()
         ])
-class Matcher_Parser_391:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_390())
-class Matcher_Parser_392:
+class Matcher_CodeGenerator_16:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_385(),
-            Matcher_Parser_388(),
-            Matcher_Parser_391()
-        ])
-class Matcher_Parser_393:
+        return stream.with_scope(Matcher_CodeGenerator_15())
+class Matcher_CodeGenerator_17:
     def run(self, stream):
-        return stream.match(lambda item: item == ' ', "' '")
-class Matcher_Parser_394:
+        return stream.match(lambda item: True, 'any')
+class Matcher_CodeGenerator_18:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_393()
-        ])
-class Matcher_Parser_395:
+        return stream.bind('x', Matcher_CodeGenerator_17().run(stream))
+class Matcher_CodeGenerator_19:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_394()
-        ])
-class Matcher_Parser_396:
+        return rules['CodeGenerator.ast'].run(stream)
+class Matcher_CodeGenerator_20:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_395())
-class Matcher_Parser_397:
+        return stream.operator_star(Matcher_CodeGenerator_19())
+class Matcher_CodeGenerator_21:
     def run(self, stream):
-        return stream.match(lambda item: item == '\n', "'\\n'")
-class Matcher_Parser_398:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_397()
-        ])
-class Matcher_Parser_399:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_398()
-        ])
-class Matcher_Parser_400:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_399())
-class Matcher_Parser_401:
-    def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_396(),
-            Matcher_Parser_400()
-        ])
-class Matcher_Parser_402:
-    def run(self, stream):
-        return stream.operator_star(Matcher_Parser_401())
-class Matcher_Parser_403:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_402()
-        ])
-class Matcher_Parser_404:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_403())
-class Matcher_Parser_405:
-    def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_404()
-        ])
-rules['Parser.file'] = Matcher_Parser_13()
-rules['Parser.namespace'] = Matcher_Parser_28()
-rules['Parser.rule'] = Matcher_Parser_39()
-rules['Parser.choice'] = Matcher_Parser_62()
-rules['Parser.sequence'] = Matcher_Parser_71()
-rules['Parser.expr'] = Matcher_Parser_97()
-rules['Parser.expr1'] = Matcher_Parser_131()
-rules['Parser.expr2'] = Matcher_Parser_188()
-rules['Parser.matchChar'] = Matcher_Parser_194()
-rules['Parser.maybeAction'] = Matcher_Parser_203()
-rules['Parser.actionExpr'] = Matcher_Parser_233()
-rules['Parser.hostExpr'] = Matcher_Parser_281()
-rules['Parser.hostListItem'] = Matcher_Parser_292()
-rules['Parser.var'] = Matcher_Parser_305()
-rules['Parser.string'] = Matcher_Parser_322()
-rules['Parser.char'] = Matcher_Parser_335()
-rules['Parser.innerChar'] = Matcher_Parser_344()
-rules['Parser.escape'] = Matcher_Parser_365()
-rules['Parser.name'] = Matcher_Parser_375()
-rules['Parser.nameStart'] = Matcher_Parser_382()
-rules['Parser.nameChar'] = Matcher_Parser_392()
-rules['Parser.space'] = Matcher_Parser_405()
-class Matcher_CodeGenerator_0:
-    def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_1:
-    def run(self, stream):
-        return stream.operator_star(Matcher_CodeGenerator_0())
-class Matcher_CodeGenerator_2:
-    def run(self, stream):
-        return stream.bind('xs', Matcher_CodeGenerator_1().run(stream))
-class Matcher_CodeGenerator_3:
-    def run(self, stream):
-        return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_4:
-    def run(self, stream):
-        return stream.operator_not(Matcher_CodeGenerator_3())
-class Matcher_CodeGenerator_5:
-    def run(self, stream):
-        return stream.action(lambda self: self.lookup('join')([
-            self.lookup('xs')
-        ]))
-class Matcher_CodeGenerator_6:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_2(),
-            Matcher_CodeGenerator_4(),
-            Matcher_CodeGenerator_5()
-        ])
-class Matcher_CodeGenerator_7:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_6())
-class Matcher_CodeGenerator_8:
-    def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_7()
-        ])
-class Matcher_CodeGenerator_9:
-    def run(self, stream):
-        return stream.match_call_rule('CodeGenerator')
-class Matcher_CodeGenerator_10:
-    def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_9().run(stream))
-class Matcher_CodeGenerator_11:
-    def run(self, stream):
-        return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_12:
-    def run(self, stream):
-        return stream.operator_not(Matcher_CodeGenerator_11())
-class Matcher_CodeGenerator_13:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_10(),
-            Matcher_CodeGenerator_12()
-        ])
-class Matcher_CodeGenerator_14:
-    def run(self, stream):
-        return stream.match_list(Matcher_CodeGenerator_13())
-class Matcher_CodeGenerator_15:
-    def run(self, stream):
-        return stream.action(lambda self: self.lookup('x'))
-class Matcher_CodeGenerator_16:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_14(),
-            Matcher_CodeGenerator_15()
-        ])
-class Matcher_CodeGenerator_17:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_16())
-class Matcher_CodeGenerator_18:
-    def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_17()
-        ])
-class Matcher_CodeGenerator_19:
-    def run(self, stream):
-        return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_20:
-    def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_19().run(stream))
-class Matcher_CodeGenerator_21:
-    def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_22:
-    def run(self, stream):
-        return stream.operator_star(Matcher_CodeGenerator_21())
-class Matcher_CodeGenerator_23:
-    def run(self, stream):
-        return stream.bind('ys', Matcher_CodeGenerator_22().run(stream))
-class Matcher_CodeGenerator_24:
+        return stream.bind('ys', Matcher_CodeGenerator_20().run(stream))
+class Matcher_CodeGenerator_22:
     def run(self, stream):
         return stream.action(lambda self: self.bind('namespace', self.lookup('x'), lambda: self.bind('ids', self.lookup('concat')([
         
@@ -2028,34 +2279,29 @@ class Matcher_CodeGenerator_24:
             self.lookup('matchers'),
             self.lookup('ys')
         ])))))
-class Matcher_CodeGenerator_25:
+class Matcher_CodeGenerator_23:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_20(),
-            Matcher_CodeGenerator_23(),
-            Matcher_CodeGenerator_24()
+            Matcher_CodeGenerator_18(),
+            Matcher_CodeGenerator_21(),
+            Matcher_CodeGenerator_22()
         ])
-class Matcher_CodeGenerator_26:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_25())
-class Matcher_CodeGenerator_27:
+class Matcher_CodeGenerator_24:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_26()
-        ])
-class Matcher_CodeGenerator_28:
+        return stream.with_scope(Matcher_CodeGenerator_23())
+class Matcher_CodeGenerator_25:
     def run(self, stream):
         return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_29:
+class Matcher_CodeGenerator_26:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_28().run(stream))
-class Matcher_CodeGenerator_30:
+        return stream.bind('x', Matcher_CodeGenerator_25().run(stream))
+class Matcher_CodeGenerator_27:
     def run(self, stream):
         return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_31:
+class Matcher_CodeGenerator_28:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_30().run(stream))
-class Matcher_CodeGenerator_32:
+        return stream.bind('y', Matcher_CodeGenerator_27().run(stream))
+class Matcher_CodeGenerator_29:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             "rules['",
@@ -2066,297 +2312,305 @@ class Matcher_CodeGenerator_32:
             self.lookup('y'),
             '\n'
         ]))
-class Matcher_CodeGenerator_33:
+class Matcher_CodeGenerator_30:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_29(),
-            Matcher_CodeGenerator_31(),
-            Matcher_CodeGenerator_32()
+            Matcher_CodeGenerator_26(),
+            Matcher_CodeGenerator_28(),
+            Matcher_CodeGenerator_29()
         ])
+class Matcher_CodeGenerator_31:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_30())
+class Matcher_CodeGenerator_32:
+    def run(self, stream):
+        return stream.match(lambda item: True, 'any')
+class Matcher_CodeGenerator_33:
+    def run(self, stream):
+        return stream.bind('x', Matcher_CodeGenerator_32().run(stream))
 class Matcher_CodeGenerator_34:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_33())
+        return rules['CodeGenerator.repr'].run(stream)
 class Matcher_CodeGenerator_35:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_34()
-        ])
+        return stream.bind('y', Matcher_CodeGenerator_34().run(stream))
 class Matcher_CodeGenerator_36:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.action(lambda self: self.lookup('join')([
+            "removed['",
+            self.lookup('namespace'),
+            '.',
+            self.lookup('x'),
+            "'] = ",
+            self.lookup('y'),
+            '\n'
+        ]))
 class Matcher_CodeGenerator_37:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_36().run(stream))
+        return stream.operator_and([
+            Matcher_CodeGenerator_33(),
+            Matcher_CodeGenerator_35(),
+            Matcher_CodeGenerator_36()
+        ])
 class Matcher_CodeGenerator_38:
     def run(self, stream):
-        return rules['CodeGenerator.astList'].run(stream)
+        return stream.with_scope(Matcher_CodeGenerator_37())
 class Matcher_CodeGenerator_39:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_38().run(stream))
+        return rules['CodeGenerator.matcher'].run(stream)
 class Matcher_CodeGenerator_40:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.operator_or([',
-            self.lookup('x'),
-            '])'
-        ]), lambda: self.lookup('m')))
+        return stream.bind('m', Matcher_CodeGenerator_39().run(stream))
 class Matcher_CodeGenerator_41:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_37(),
-            Matcher_CodeGenerator_39(),
-            Matcher_CodeGenerator_40()
-        ])
+        return rules['CodeGenerator.astList'].run(stream)
 class Matcher_CodeGenerator_42:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_41())
+        return stream.bind('x', Matcher_CodeGenerator_41().run(stream))
 class Matcher_CodeGenerator_43:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_42()
-        ])
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.operator_or([',
+            self.lookup('x'),
+            '])'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_44:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.operator_and([
+            Matcher_CodeGenerator_40(),
+            Matcher_CodeGenerator_42(),
+            Matcher_CodeGenerator_43()
+        ])
 class Matcher_CodeGenerator_45:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_44().run(stream))
+        return stream.with_scope(Matcher_CodeGenerator_44())
 class Matcher_CodeGenerator_46:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return rules['CodeGenerator.matcher'].run(stream)
 class Matcher_CodeGenerator_47:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_46().run(stream))
+        return stream.bind('m', Matcher_CodeGenerator_46().run(stream))
 class Matcher_CodeGenerator_48:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.with_scope(',
-            self.lookup('x'),
-            ')'
-        ]), lambda: self.lookup('m')))
+        return rules['CodeGenerator.repr'].run(stream)
 class Matcher_CodeGenerator_49:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_45(),
-            Matcher_CodeGenerator_47(),
-            Matcher_CodeGenerator_48()
-        ])
+        return stream.operator_star(Matcher_CodeGenerator_48())
 class Matcher_CodeGenerator_50:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_49())
+        return stream.bind('xs', Matcher_CodeGenerator_49().run(stream))
 class Matcher_CodeGenerator_51:
     def run(self, stream):
-        return stream.operator_or([
+        return stream.operator_and([
             Matcher_CodeGenerator_50()
         ])
 class Matcher_CodeGenerator_52:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.match_list(Matcher_CodeGenerator_51())
 class Matcher_CodeGenerator_53:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_52().run(stream))
+        return rules['CodeGenerator.ast'].run(stream)
 class Matcher_CodeGenerator_54:
     def run(self, stream):
-        return rules['CodeGenerator.astList'].run(stream)
+        return stream.bind('y', Matcher_CodeGenerator_53().run(stream))
 class Matcher_CodeGenerator_55:
-    def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_54().run(stream))
-class Matcher_CodeGenerator_56:
     def run(self, stream):
         return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.operator_and([',
-            self.lookup('x'),
-            '])'
+            self.lookup('y'),
+            '.run(stream) if stream.lookahead() in {',
+            self.lookup('join')(
+                self.lookup('xs'),
+                ', '
+            ),
+            '} or stream.needs_error() else None'
         ]), lambda: self.lookup('m')))
-class Matcher_CodeGenerator_57:
+class Matcher_CodeGenerator_56:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_53(),
-            Matcher_CodeGenerator_55(),
-            Matcher_CodeGenerator_56()
+            Matcher_CodeGenerator_47(),
+            Matcher_CodeGenerator_52(),
+            Matcher_CodeGenerator_54(),
+            Matcher_CodeGenerator_55()
         ])
+class Matcher_CodeGenerator_57:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_56())
 class Matcher_CodeGenerator_58:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_57())
+        return rules['CodeGenerator.matcher'].run(stream)
 class Matcher_CodeGenerator_59:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_58()
-        ])
+        return stream.bind('m', Matcher_CodeGenerator_58().run(stream))
 class Matcher_CodeGenerator_60:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return rules['CodeGenerator.ast'].run(stream)
 class Matcher_CodeGenerator_61:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_60().run(stream))
+        return stream.bind('x', Matcher_CodeGenerator_60().run(stream))
 class Matcher_CodeGenerator_62:
     def run(self, stream):
-        return rules['CodeGenerator.repr'].run(stream)
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.with_scope(',
+            self.lookup('x'),
+            ')'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_63:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_62().run(stream))
+        return stream.operator_and([
+            Matcher_CodeGenerator_59(),
+            Matcher_CodeGenerator_61(),
+            Matcher_CodeGenerator_62()
+        ])
 class Matcher_CodeGenerator_64:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.with_scope(Matcher_CodeGenerator_63())
 class Matcher_CodeGenerator_65:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_64().run(stream))
+        return rules['CodeGenerator.matcher'].run(stream)
 class Matcher_CodeGenerator_66:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.bind(',
-            self.lookup('x'),
-            ', ',
-            self.lookup('y'),
-            '.run(stream))'
-        ]), lambda: self.lookup('m')))
+        return stream.bind('m', Matcher_CodeGenerator_65().run(stream))
 class Matcher_CodeGenerator_67:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_61(),
-            Matcher_CodeGenerator_63(),
-            Matcher_CodeGenerator_65(),
-            Matcher_CodeGenerator_66()
-        ])
+        return rules['CodeGenerator.astList'].run(stream)
 class Matcher_CodeGenerator_68:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_67())
+        return stream.bind('x', Matcher_CodeGenerator_67().run(stream))
 class Matcher_CodeGenerator_69:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_68()
-        ])
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.operator_and([',
+            self.lookup('x'),
+            '])'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_70:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.operator_and([
+            Matcher_CodeGenerator_66(),
+            Matcher_CodeGenerator_68(),
+            Matcher_CodeGenerator_69()
+        ])
 class Matcher_CodeGenerator_71:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_70().run(stream))
+        return stream.with_scope(Matcher_CodeGenerator_70())
 class Matcher_CodeGenerator_72:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return rules['CodeGenerator.matcher'].run(stream)
 class Matcher_CodeGenerator_73:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_72().run(stream))
+        return stream.bind('m', Matcher_CodeGenerator_72().run(stream))
 class Matcher_CodeGenerator_74:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.operator_star(',
-            self.lookup('x'),
-            ')'
-        ]), lambda: self.lookup('m')))
+        return rules['CodeGenerator.repr'].run(stream)
 class Matcher_CodeGenerator_75:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_71(),
-            Matcher_CodeGenerator_73(),
-            Matcher_CodeGenerator_74()
-        ])
+        return stream.bind('x', Matcher_CodeGenerator_74().run(stream))
 class Matcher_CodeGenerator_76:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_75())
+        return rules['CodeGenerator.ast'].run(stream)
 class Matcher_CodeGenerator_77:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_76()
-        ])
+        return stream.bind('y', Matcher_CodeGenerator_76().run(stream))
 class Matcher_CodeGenerator_78:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.bind(',
+            self.lookup('x'),
+            ', ',
+            self.lookup('y'),
+            '.run(stream))'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_79:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_78().run(stream))
+        return stream.operator_and([
+            Matcher_CodeGenerator_73(),
+            Matcher_CodeGenerator_75(),
+            Matcher_CodeGenerator_77(),
+            Matcher_CodeGenerator_78()
+        ])
 class Matcher_CodeGenerator_80:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.with_scope(Matcher_CodeGenerator_79())
 class Matcher_CodeGenerator_81:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_80().run(stream))
+        return rules['CodeGenerator.matcher'].run(stream)
 class Matcher_CodeGenerator_82:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.operator_not(',
-            self.lookup('x'),
-            ')'
-        ]), lambda: self.lookup('m')))
+        return stream.bind('m', Matcher_CodeGenerator_81().run(stream))
 class Matcher_CodeGenerator_83:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_79(),
-            Matcher_CodeGenerator_81(),
-            Matcher_CodeGenerator_82()
-        ])
+        return rules['CodeGenerator.ast'].run(stream)
 class Matcher_CodeGenerator_84:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_83())
+        return stream.bind('x', Matcher_CodeGenerator_83().run(stream))
 class Matcher_CodeGenerator_85:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_84()
-        ])
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.operator_star(',
+            self.lookup('x'),
+            ')'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_86:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.operator_and([
+            Matcher_CodeGenerator_82(),
+            Matcher_CodeGenerator_84(),
+            Matcher_CodeGenerator_85()
+        ])
 class Matcher_CodeGenerator_87:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_86().run(stream))
+        return stream.with_scope(Matcher_CodeGenerator_86())
 class Matcher_CodeGenerator_88:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            "stream.match_call_rule('",
-            self.lookup('namespace'),
-            "')"
-        ]), lambda: self.lookup('m')))
+        return rules['CodeGenerator.matcher'].run(stream)
 class Matcher_CodeGenerator_89:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_87(),
-            Matcher_CodeGenerator_88()
-        ])
+        return stream.bind('m', Matcher_CodeGenerator_88().run(stream))
 class Matcher_CodeGenerator_90:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_89())
+        return rules['CodeGenerator.ast'].run(stream)
 class Matcher_CodeGenerator_91:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_90()
-        ])
+        return stream.bind('x', Matcher_CodeGenerator_90().run(stream))
 class Matcher_CodeGenerator_92:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.operator_not(',
+            self.lookup('x'),
+            ')'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_93:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_92().run(stream))
+        return stream.operator_and([
+            Matcher_CodeGenerator_89(),
+            Matcher_CodeGenerator_91(),
+            Matcher_CodeGenerator_92()
+        ])
 class Matcher_CodeGenerator_94:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.with_scope(Matcher_CodeGenerator_93())
 class Matcher_CodeGenerator_95:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_94().run(stream))
+        return rules['CodeGenerator.matcher'].run(stream)
 class Matcher_CodeGenerator_96:
+    def run(self, stream):
+        return stream.bind('m', Matcher_CodeGenerator_95().run(stream))
+class Matcher_CodeGenerator_97:
     def run(self, stream):
         return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            "rules['",
+            "stream.match_call_rule('",
             self.lookup('namespace'),
-            '.',
-            self.lookup('x'),
-            "'].run(stream)"
+            "')"
         ]), lambda: self.lookup('m')))
-class Matcher_CodeGenerator_97:
+class Matcher_CodeGenerator_98:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_93(),
-            Matcher_CodeGenerator_95(),
-            Matcher_CodeGenerator_96()
+            Matcher_CodeGenerator_96(),
+            Matcher_CodeGenerator_97()
         ])
-class Matcher_CodeGenerator_98:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_97())
 class Matcher_CodeGenerator_99:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_98()
-        ])
+        return stream.with_scope(Matcher_CodeGenerator_98())
 class Matcher_CodeGenerator_100:
     def run(self, stream):
         return rules['CodeGenerator.matcher'].run(stream)
@@ -2365,16 +2619,18 @@ class Matcher_CodeGenerator_101:
         return stream.bind('m', Matcher_CodeGenerator_100().run(stream))
 class Matcher_CodeGenerator_102:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_103:
     def run(self, stream):
         return stream.bind('x', Matcher_CodeGenerator_102().run(stream))
 class Matcher_CodeGenerator_104:
     def run(self, stream):
         return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.match(lambda item: ',
+            "rules['",
+            self.lookup('namespace'),
+            '.',
             self.lookup('x'),
-            ')'
+            "'].run(stream)"
         ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_105:
     def run(self, stream):
@@ -2388,103 +2644,261 @@ class Matcher_CodeGenerator_106:
         return stream.with_scope(Matcher_CodeGenerator_105())
 class Matcher_CodeGenerator_107:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_106()
-        ])
+        return rules['CodeGenerator.matcher'].run(stream)
 class Matcher_CodeGenerator_108:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.bind('m', Matcher_CodeGenerator_107().run(stream))
 class Matcher_CodeGenerator_109:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_108().run(stream))
+        return rules['CodeGenerator.ast'].run(stream)
 class Matcher_CodeGenerator_110:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.bind('x', Matcher_CodeGenerator_109().run(stream))
 class Matcher_CodeGenerator_111:
-    def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_110().run(stream))
-class Matcher_CodeGenerator_112:
     def run(self, stream):
         return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.match_list(',
+            'stream.match(lambda item: ',
             self.lookup('x'),
             ')'
         ]), lambda: self.lookup('m')))
-class Matcher_CodeGenerator_113:
+class Matcher_CodeGenerator_112:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_109(),
-            Matcher_CodeGenerator_111(),
-            Matcher_CodeGenerator_112()
+            Matcher_CodeGenerator_108(),
+            Matcher_CodeGenerator_110(),
+            Matcher_CodeGenerator_111()
         ])
+class Matcher_CodeGenerator_113:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_112())
 class Matcher_CodeGenerator_114:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_113())
+        return rules['CodeGenerator.matcher'].run(stream)
 class Matcher_CodeGenerator_115:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_114()
-        ])
+        return stream.bind('m', Matcher_CodeGenerator_114().run(stream))
 class Matcher_CodeGenerator_116:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return rules['CodeGenerator.repr'].run(stream)
 class Matcher_CodeGenerator_117:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_116().run(stream))
+        return stream.bind('x', Matcher_CodeGenerator_116().run(stream))
 class Matcher_CodeGenerator_118:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.match_string(',
+            self.lookup('x'),
+            ')'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_119:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_118().run(stream))
+        return stream.operator_and([
+            Matcher_CodeGenerator_115(),
+            Matcher_CodeGenerator_117(),
+            Matcher_CodeGenerator_118()
+        ])
 class Matcher_CodeGenerator_120:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_119())
+class Matcher_CodeGenerator_121:
+    def run(self, stream):
+        return rules['CodeGenerator.matcher'].run(stream)
+class Matcher_CodeGenerator_122:
+    def run(self, stream):
+        return stream.bind('m', Matcher_CodeGenerator_121().run(stream))
+class Matcher_CodeGenerator_123:
+    def run(self, stream):
+        return rules['CodeGenerator.repr'].run(stream)
+class Matcher_CodeGenerator_124:
+    def run(self, stream):
+        return stream.operator_star(Matcher_CodeGenerator_123())
+class Matcher_CodeGenerator_125:
+    def run(self, stream):
+        return stream.bind('xs', Matcher_CodeGenerator_124().run(stream))
+class Matcher_CodeGenerator_126:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_125()
+        ])
+class Matcher_CodeGenerator_127:
+    def run(self, stream):
+        return stream.match_list(Matcher_CodeGenerator_126())
+class Matcher_CodeGenerator_128:
+    def run(self, stream):
+        return rules['CodeGenerator.repr'].run(stream)
+class Matcher_CodeGenerator_129:
+    def run(self, stream):
+        return stream.bind('y', Matcher_CodeGenerator_128().run(stream))
+class Matcher_CodeGenerator_130:
     def run(self, stream):
         return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.action(lambda self: ',
+            'stream.match(lambda item: not isinstance(item, list) and ',
+            'item in {',
+            self.lookup('join')(
+                self.lookup('xs'),
+                ', '
+            ),
+            '}, ',
+            self.lookup('y'),
+            ')'
+        ]), lambda: self.lookup('m')))
+class Matcher_CodeGenerator_131:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_122(),
+            Matcher_CodeGenerator_127(),
+            Matcher_CodeGenerator_129(),
+            Matcher_CodeGenerator_130()
+        ])
+class Matcher_CodeGenerator_132:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_131())
+class Matcher_CodeGenerator_133:
+    def run(self, stream):
+        return rules['CodeGenerator.matcher'].run(stream)
+class Matcher_CodeGenerator_134:
+    def run(self, stream):
+        return stream.bind('m', Matcher_CodeGenerator_133().run(stream))
+class Matcher_CodeGenerator_135:
+    def run(self, stream):
+        return rules['CodeGenerator.repr'].run(stream)
+class Matcher_CodeGenerator_136:
+    def run(self, stream):
+        return stream.operator_star(Matcher_CodeGenerator_135())
+class Matcher_CodeGenerator_137:
+    def run(self, stream):
+        return stream.bind('xs', Matcher_CodeGenerator_136().run(stream))
+class Matcher_CodeGenerator_138:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_137()
+        ])
+class Matcher_CodeGenerator_139:
+    def run(self, stream):
+        return stream.match_list(Matcher_CodeGenerator_138())
+class Matcher_CodeGenerator_140:
+    def run(self, stream):
+        return rules['CodeGenerator.repr'].run(stream)
+class Matcher_CodeGenerator_141:
+    def run(self, stream):
+        return stream.bind('y', Matcher_CodeGenerator_140().run(stream))
+class Matcher_CodeGenerator_142:
+    def run(self, stream):
+        return stream.action(lambda self: self.bind('chars', self.lookup('join')([
+            'CharClass_',
+            self.lookup('namespace'),
+            '_',
+            self.lookup('len')(
+                self.lookup('ids')
+            )
+        ]), lambda: self.bind('', self.lookup('append')(
+            self.lookup('matchers'),
+            self.lookup('join')([
+                self.lookup('chars'),
+                ' = char_class(',
+                self.lookup('y'),
+                ', [',
+                self.lookup('join')(
+                    self.lookup('xs'),
+                    ', '
+                ),
+                '])\n'
+            ])
+        ), lambda: self.bind('body', self.lookup('join')([
+            'stream.match_star(',
+            self.lookup('chars'),
+            ')'
+        ]), lambda: self.lookup('m')))))
+class Matcher_CodeGenerator_143:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_134(),
+            Matcher_CodeGenerator_139(),
+            Matcher_CodeGenerator_141(),
+            Matcher_CodeGenerator_142()
+        ])
+class Matcher_CodeGenerator_144:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_143())
+class Matcher_CodeGenerator_145:
+    def run(self, stream):
+        return rules['CodeGenerator.matcher'].run(stream)
+class Matcher_CodeGenerator_146:
+    def run(self, stream):
+        return stream.bind('m', Matcher_CodeGenerator_145().run(stream))
+class Matcher_CodeGenerator_147:
+    def run(self, stream):
+        return rules['CodeGenerator.ast'].run(stream)
+class Matcher_CodeGenerator_148:
+    def run(self, stream):
+        return stream.bind('x', Matcher_CodeGenerator_147().run(stream))
+class Matcher_CodeGenerator_149:
+    def run(self, stream):
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.match_list(',
             self.lookup('x'),
             ')'
         ]), lambda: self.lookup('m')))
-class Matcher_CodeGenerator_121:
+class Matcher_CodeGenerator_150:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_117(),
-            Matcher_CodeGenerator_119(),
-            Matcher_CodeGenerator_120()
+            Matcher_CodeGenerator_146(),
+            Matcher_CodeGenerator_148(),
+            Matcher_CodeGenerator_149()
         ])
-class Matcher_CodeGenerator_122:
+class Matcher_CodeGenerator_151:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_121())
-class Matcher_CodeGenerator_123:
+        return stream.with_scope(Matcher_CodeGenerator_150())
+class Matcher_CodeGenerator_152:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_122()
+        return rules['CodeGenerator.matcher'].run(stream)
+class Matcher_CodeGenerator_153:
+    def run(self, stream):
+        return stream.bind('m', Matcher_CodeGenerator_152().run(stream))
+class Matcher_CodeGenerator_154:
+    def run(self, stream):
+        return rules['CodeGenerator.ast'].run(stream)
+class Matcher_CodeGenerator_155:
+    def run(self, stream):
+        return stream.bind('x', Matcher_CodeGenerator_154().run(stream))
+class Matcher_CodeGenerator_156:
+    def run(self, stream):
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.action(lambda self: ',
+            self.lookup('x'),
+            ')'
+        ]), lambda: self.lookup('m')))
+class Matcher_CodeGenerator_157:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_153(),
+            Matcher_CodeGenerator_155(),
+            Matcher_CodeGenerator_156()
         ])
-class Matcher_CodeGenerator_124:
+class Matcher_CodeGenerator_158:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_157())
+class Matcher_CodeGenerator_159:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             'True',
             ", 'any'"
         ]))
-class Matcher_CodeGenerator_125:
+class Matcher_CodeGenerator_160:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_124()
+            Matcher_CodeGenerator_159()
         ])
-class Matcher_CodeGenerator_126:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_125())
-class Matcher_CodeGenerator_127:
+class Matcher_CodeGenerator_161:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_126()
-        ])
-class Matcher_CodeGenerator_128:
+        return stream.with_scope(Matcher_CodeGenerator_160())
+class Matcher_CodeGenerator_162:
     def run(self, stream):
         return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_129:
+class Matcher_CodeGenerator_163:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_128().run(stream))
-class Matcher_CodeGenerator_130:
+        return stream.bind('x', Matcher_CodeGenerator_162().run(stream))
+class Matcher_CodeGenerator_164:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             'item == ',
@@ -2494,33 +2908,28 @@ class Matcher_CodeGenerator_130:
                 self.lookup('x')
             )
         ]))
-class Matcher_CodeGenerator_131:
+class Matcher_CodeGenerator_165:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_129(),
-            Matcher_CodeGenerator_130()
+            Matcher_CodeGenerator_163(),
+            Matcher_CodeGenerator_164()
         ])
-class Matcher_CodeGenerator_132:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_131())
-class Matcher_CodeGenerator_133:
+class Matcher_CodeGenerator_166:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_132()
-        ])
-class Matcher_CodeGenerator_134:
+        return stream.with_scope(Matcher_CodeGenerator_165())
+class Matcher_CodeGenerator_167:
     def run(self, stream):
         return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_135:
+class Matcher_CodeGenerator_168:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_134().run(stream))
-class Matcher_CodeGenerator_136:
+        return stream.bind('x', Matcher_CodeGenerator_167().run(stream))
+class Matcher_CodeGenerator_169:
     def run(self, stream):
         return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_137:
+class Matcher_CodeGenerator_170:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_136().run(stream))
-class Matcher_CodeGenerator_138:
+        return stream.bind('y', Matcher_CodeGenerator_169().run(stream))
+class Matcher_CodeGenerator_171:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             self.lookup('x'),
@@ -2532,40 +2941,35 @@ class Matcher_CodeGenerator_138:
             self.lookup('y'),
             '"'
         ]))
-class Matcher_CodeGenerator_139:
+class Matcher_CodeGenerator_172:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_135(),
-            Matcher_CodeGenerator_137(),
-            Matcher_CodeGenerator_138()
+            Matcher_CodeGenerator_168(),
+            Matcher_CodeGenerator_170(),
+            Matcher_CodeGenerator_171()
         ])
-class Matcher_CodeGenerator_140:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_139())
-class Matcher_CodeGenerator_141:
+class Matcher_CodeGenerator_173:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_140()
-        ])
-class Matcher_CodeGenerator_142:
+        return stream.with_scope(Matcher_CodeGenerator_172())
+class Matcher_CodeGenerator_174:
     def run(self, stream):
         return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_143:
+class Matcher_CodeGenerator_175:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_142().run(stream))
-class Matcher_CodeGenerator_144:
+        return stream.bind('x', Matcher_CodeGenerator_174().run(stream))
+class Matcher_CodeGenerator_176:
     def run(self, stream):
         return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_145:
+class Matcher_CodeGenerator_177:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_144().run(stream))
-class Matcher_CodeGenerator_146:
+        return stream.bind('y', Matcher_CodeGenerator_176().run(stream))
+class Matcher_CodeGenerator_178:
     def run(self, stream):
         return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_147:
+class Matcher_CodeGenerator_179:
     def run(self, stream):
-        return stream.bind('z', Matcher_CodeGenerator_146().run(stream))
-class Matcher_CodeGenerator_148:
+        return stream.bind('z', Matcher_CodeGenerator_178().run(stream))
+class Matcher_CodeGenerator_180:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             'self.bind(',
@@ -2576,78 +2980,63 @@ class Matcher_CodeGenerator_148:
             self.lookup('z'),
             ')'
         ]))
-class Matcher_CodeGenerator_149:
+class Matcher_CodeGenerator_181:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_143(),
-            Matcher_CodeGenerator_145(),
-            Matcher_CodeGenerator_147(),
-            Matcher_CodeGenerator_148()
+            Matcher_CodeGenerator_175(),
+            Matcher_CodeGenerator_177(),
+            Matcher_CodeGenerator_179(),
+            Matcher_CodeGenerator_180()
         ])
-class Matcher_CodeGenerator_150:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_149())
-class Matcher_CodeGenerator_151:
+class Matcher_CodeGenerator_182:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_150()
-        ])
-class Matcher_CodeGenerator_152:
+        return stream.with_scope(Matcher_CodeGenerator_181())
+class Matcher_CodeGenerator_183:
     def run(self, stream):
         return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_153:
+class Matcher_CodeGenerator_184:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_152()
+            Matcher_CodeGenerator_183()
         ])
-class Matcher_CodeGenerator_154:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_153())
-class Matcher_CodeGenerator_155:
+class Matcher_CodeGenerator_185:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_154()
-        ])
-class Matcher_CodeGenerator_156:
+        return stream.with_scope(Matcher_CodeGenerator_184())
+class Matcher_CodeGenerator_186:
     def run(self, stream):
         return rules['CodeGenerator.astList'].run(stream)
-class Matcher_CodeGenerator_157:
+class Matcher_CodeGenerator_187:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_156().run(stream))
-class Matcher_CodeGenerator_158:
+        return stream.bind('x', Matcher_CodeGenerator_186().run(stream))
+class Matcher_CodeGenerator_188:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             "self.lookup('concat')([",
             self.lookup('x'),
             '])'
         ]))
-class Matcher_CodeGenerator_159:
+class Matcher_CodeGenerator_189:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_157(),
-            Matcher_CodeGenerator_158()
+            Matcher_CodeGenerator_187(),
+            Matcher_CodeGenerator_188()
         ])
-class Matcher_CodeGenerator_160:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_159())
-class Matcher_CodeGenerator_161:
+class Matcher_CodeGenerator_190:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_160()
-        ])
-class Matcher_CodeGenerator_162:
+        return stream.with_scope(Matcher_CodeGenerator_189())
+class Matcher_CodeGenerator_191:
     def run(self, stream):
         return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_163:
+class Matcher_CodeGenerator_192:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_162().run(stream))
-class Matcher_CodeGenerator_164:
+        return stream.bind('x', Matcher_CodeGenerator_191().run(stream))
+class Matcher_CodeGenerator_193:
     def run(self, stream):
         return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_165:
+class Matcher_CodeGenerator_194:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_164().run(stream))
-class Matcher_CodeGenerator_166:
+        return stream.bind('y', Matcher_CodeGenerator_193().run(stream))
+class Matcher_CodeGenerator_195:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             "self.lookup('splice')(",
@@ -2656,61 +3045,51 @@ class Matcher_CodeGenerator_166:
             self.lookup('y'),
             ')'
         ]))
-class Matcher_CodeGenerator_167:
+class Matcher_CodeGenerator_196:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_163(),
-            Matcher_CodeGenerator_165(),
-            Matcher_CodeGenerator_166()
+            Matcher_CodeGenerator_192(),
+            Matcher_CodeGenerator_194(),
+            Matcher_CodeGenerator_195()
         ])
-class Matcher_CodeGenerator_168:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_167())
-class Matcher_CodeGenerator_169:
+class Matcher_CodeGenerator_197:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_168()
-        ])
-class Matcher_CodeGenerator_170:
+        return stream.with_scope(Matcher_CodeGenerator_196())
+class Matcher_CodeGenerator_198:
     def run(self, stream):
         return rules['CodeGenerator.astList'].run(stream)
-class Matcher_CodeGenerator_171:
+class Matcher_CodeGenerator_199:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_170().run(stream))
-class Matcher_CodeGenerator_172:
+        return stream.bind('x', Matcher_CodeGenerator_198().run(stream))
+class Matcher_CodeGenerator_200:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             "self.lookup('join')([",
             self.lookup('x'),
             '])'
         ]))
-class Matcher_CodeGenerator_173:
+class Matcher_CodeGenerator_201:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_171(),
-            Matcher_CodeGenerator_172()
+            Matcher_CodeGenerator_199(),
+            Matcher_CodeGenerator_200()
         ])
-class Matcher_CodeGenerator_174:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_173())
-class Matcher_CodeGenerator_175:
+class Matcher_CodeGenerator_202:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_174()
-        ])
-class Matcher_CodeGenerator_176:
+        return stream.with_scope(Matcher_CodeGenerator_201())
+class Matcher_CodeGenerator_203:
     def run(self, stream):
         return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_177:
+class Matcher_CodeGenerator_204:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_176().run(stream))
-class Matcher_CodeGenerator_178:
+        return stream.bind('x', Matcher_CodeGenerator_203().run(stream))
+class Matcher_CodeGenerator_205:
     def run(self, stream):
         return rules['CodeGenerator.astList'].run(stream)
-class Matcher_CodeGenerator_179:
+class Matcher_CodeGenerator_206:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_178().run(stream))
-class Matcher_CodeGenerator_180:
+        return stream.bind('y', Matcher_CodeGenerator_205().run(stream))
+class Matcher_CodeGenerator_207:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             self.lookup('x'),
@@ -2718,58 +3097,48 @@ class Matcher_CodeGenerator_180:
             self.lookup('y'),
             ')'
         ]))
-class Matcher_CodeGenerator_181:
+class Matcher_CodeGenerator_208:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_177(),
-            Matcher_CodeGenerator_179(),
-            Matcher_CodeGenerator_180()
+            Matcher_CodeGenerator_204(),
+            Matcher_CodeGenerator_206(),
+            Matcher_CodeGenerator_207()
         ])
-class Matcher_CodeGenerator_182:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_181())
-class Matcher_CodeGenerator_183:
+class Matcher_CodeGenerator_209:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_182()
-        ])
-class Matcher_CodeGenerator_184:
+        return stream.with_scope(Matcher_CodeGenerator_208())
+class Matcher_CodeGenerator_210:
     def run(self, stream):
         return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_185:
+class Matcher_CodeGenerator_211:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_184().run(stream))
-class Matcher_CodeGenerator_186:
+        return stream.bind('x', Matcher_CodeGenerator_210().run(stream))
+class Matcher_CodeGenerator_212:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             'self.lookup(',
             self.lookup('x'),
             ')'
         ]))
-class Matcher_CodeGenerator_187:
+class Matcher_CodeGenerator_213:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_185(),
-            Matcher_CodeGenerator_186()
+            Matcher_CodeGenerator_211(),
+            Matcher_CodeGenerator_212()
         ])
-class Matcher_CodeGenerator_188:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_187())
-class Matcher_CodeGenerator_189:
+class Matcher_CodeGenerator_214:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_188()
-        ])
-class Matcher_CodeGenerator_190:
+        return stream.with_scope(Matcher_CodeGenerator_213())
+class Matcher_CodeGenerator_215:
     def run(self, stream):
         return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_191:
+class Matcher_CodeGenerator_216:
     def run(self, stream):
-        return stream.operator_star(Matcher_CodeGenerator_190())
-class Matcher_CodeGenerator_192:
+        return stream.operator_star(Matcher_CodeGenerator_215())
+class Matcher_CodeGenerator_217:
     def run(self, stream):
-        return stream.bind('xs', Matcher_CodeGenerator_191().run(stream))
-class Matcher_CodeGenerator_193:
+        return stream.bind('xs', Matcher_CodeGenerator_216().run(stream))
+class Matcher_CodeGenerator_218:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             '\n',
@@ -2781,21 +3150,16 @@ class Matcher_CodeGenerator_193:
             ),
             '\n'
         ]))
-class Matcher_CodeGenerator_194:
+class Matcher_CodeGenerator_219:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_192(),
-            Matcher_CodeGenerator_193()
+            Matcher_CodeGenerator_217(),
+            Matcher_CodeGenerator_218()
         ])
-class Matcher_CodeGenerator_195:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_194())
-class Matcher_CodeGenerator_196:
+class Matcher_CodeGenerator_220:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_195()
-        ])
-class Matcher_CodeGenerator_197:
+        return stream.with_scope(Matcher_CodeGenerator_219())
+class Matcher_CodeGenerator_221:
     def run(self, stream):
         return stream.action(lambda self: self.bind('id', self.lookup('join')([
             'Matcher_',
@@ -2830,95 +3194,562 @@ class Matcher_CodeGenerator_197:
             self.lookup('id'),
             '()'
         ])))))
-class Matcher_CodeGenerator_198:
+class Matcher_CodeGenerator_222:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_197()
+            Matcher_CodeGenerator_221()
         ])
-class Matcher_CodeGenerator_199:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_198())
-class Matcher_CodeGenerator_200:
+class Matcher_CodeGenerator_223:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_199()
-        ])
-class Matcher_CodeGenerator_201:
+        return stream.with_scope(Matcher_CodeGenerator_222())
+class Matcher_CodeGenerator_224:
     def run(self, stream):
         return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_202:
+class Matcher_CodeGenerator_225:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_201().run(stream))
-class Matcher_CodeGenerator_203:
+        return stream.bind('x', Matcher_CodeGenerator_224().run(stream))
+class Matcher_CodeGenerator_226:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('repr')(
             self.lookup('x')
         ))
-class Matcher_CodeGenerator_204:
+class Matcher_CodeGenerator_227:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_225(),
+            Matcher_CodeGenerator_226()
+        ])
+class Matcher_CodeGenerator_228:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_227())
+rules['CodeGenerator.asts'] = Matcher_CodeGenerator_7()
+rules['CodeGenerator.ast'] = Matcher_CodeGenerator_16()
+rules['CodeGenerator.Namespace'] = Matcher_CodeGenerator_24()
+rules['CodeGenerator.Rule'] = Matcher_CodeGenerator_31()
+rules['CodeGenerator.Removed'] = Matcher_CodeGenerator_38()
+rules['CodeGenerator.Or'] = Matcher_CodeGenerator_45()
+rules['CodeGenerator.Lookahead'] = Matcher_CodeGenerator_57()
+rules['CodeGenerator.Scope'] = Matcher_CodeGenerator_64()
+rules['CodeGenerator.And'] = Matcher_CodeGenerator_71()
+rules['CodeGenerator.Bind'] = Matcher_CodeGenerator_80()
+rules['CodeGenerator.Star'] = Matcher_CodeGenerator_87()
+rules['CodeGenerator.Not'] = Matcher_CodeGenerator_94()
+rules['CodeGenerator.MatchCallRule'] = Matcher_CodeGenerator_99()
+rules['CodeGenerator.MatchRule'] = Matcher_CodeGenerator_106()
+rules['CodeGenerator.MatchObject'] = Matcher_CodeGenerator_113()
+rules['CodeGenerator.MatchString'] = Matcher_CodeGenerator_120()
+rules['CodeGenerator.MatchSet'] = Matcher_CodeGenerator_132()
+rules['CodeGenerator.MatchStar'] = Matcher_CodeGenerator_144()
+rules['CodeGenerator.MatchList'] = Matcher_CodeGenerator_151()
+rules['CodeGenerator.Action'] = Matcher_CodeGenerator_158()
+rules['CodeGenerator.Any'] = Matcher_CodeGenerator_161()
+rules['CodeGenerator.Eq'] = Matcher_CodeGenerator_166()
+rules['CodeGenerator.Range'] = Matcher_CodeGenerator_173()
+rules['CodeGenerator.Set'] = Matcher_CodeGenerator_182()
+rules['CodeGenerator.String'] = Matcher_CodeGenerator_185()
+rules['CodeGenerator.List'] = Matcher_CodeGenerator_190()
+rules['CodeGenerator.ListItem'] = Matcher_CodeGenerator_197()
+rules['CodeGenerator.Format'] = Matcher_CodeGenerator_202()
+rules['CodeGenerator.Call'] = Matcher_CodeGenerator_209()
+rules['CodeGenerator.Lookup'] = Matcher_CodeGenerator_214()
+rules['CodeGenerator.astList'] = Matcher_CodeGenerator_220()
+rules['CodeGenerator.matcher'] = Matcher_CodeGenerator_223()
+rules['CodeGenerator.repr'] = Matcher_CodeGenerator_228()
+INLINE_MAX_SIZE = 8
+
+class Lookahead:
+
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_202(),
-            Matcher_CodeGenerator_203()
-        ])
-class Matcher_CodeGenerator_205:
+        namespaces = [self.namespace(namespace) for namespace in stream.items]
+        return stream.action(lambda self: namespaces)
+
+    def namespace(self, namespace):
+        self.firsts = {rule[1]: (frozenset(), False) for rule in namespace[2:]}
+        changed = True
+        while changed:
+            changed = False
+            for rule in namespace[2:]:
+                first = self.first(rule[-1])
+                if first != self.firsts[rule[1]]:
+                    self.firsts[rule[1]] = first
+                    changed = True
+        return namespace[:2] + [
+            rule[:-1] + [self.annotate(rule[-1])]
+            for rule in namespace[2:]
+        ]
+
+    def annotate(self, node):
+        if node[0] == "Or":
+            return (
+                node[:1] +
+                [self.lookahead(x) for x in node[1:-1]] +
+                [self.annotate(x) for x in node[-1:]]
+            )
+        elif node[0] in ["Scope", "And", "Star", "Not", "MatchList"]:
+            return node[:1] + [self.annotate(x) for x in node[1:]]
+        elif node[0] == "Bind":
+            return node[:2] + [self.annotate(node[2])]
+        else:
+            return node
+
+    def lookahead(self, node):
+        keys, nullable = self.first(node)
+        if nullable or not keys:
+            return self.annotate(node)
+        return ["Lookahead", sorted(keys), self.annotate(node)]
+
+    def first(self, node):
+        return getattr(self, "first_"+node[0])(*node[1:])
+
+    def first_Or(self, *xs):
+        keys, nullable = (frozenset(), False)
+        for x in xs:
+            x_keys, x_nullable = self.first(x)
+            keys = self.union(keys, x_keys)
+            nullable = nullable or x_nullable
+        return (keys, nullable)
+
+    def first_Scope(self, x):
+        return self.first(x)
+
+    def first_And(self, *xs):
+        keys = frozenset()
+        for x in xs:
+            x_keys, x_nullable = self.first(x)
+            keys = self.union(keys, x_keys)
+            if not x_nullable:
+                return (keys, False)
+        return (keys, True)
+
+    def first_Bind(self, name, x):
+        return self.first(x)
+
+    def first_Star(self, x):
+        return (self.first(x)[0], True)
+
+    def first_Not(self, x):
+        return (frozenset(), True)
+
+    def first_MatchCallRule(self):
+        return (None, False)
+
+    def first_MatchRule(self, name):
+        return self.firsts.get(name, (None, True))
+
+    def first_MatchObject(self, x):
+        return (object_keys(x), False)
+
+    def first_MatchString(self, x):
+        return (frozenset([x[0]]), False)
+
+    def first_MatchSet(self, x, y):
+        return (frozenset(x), False)
+
+    def first_MatchStar(self, x, y):
+        return (frozenset(x), True)
+
+    def first_MatchList(self, x):
+        return (None, False)
+
+    def first_Action(self, x):
+        return (frozenset(), True)
+
+    def union(self, keys, other_keys):
+        if keys is None or other_keys is None:
+            return None
+        return keys | other_keys
+
+class Fuse:
+
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_204())
-class Matcher_CodeGenerator_206:
+        namespaces = [self.namespace(namespace) for namespace in stream.items]
+        return stream.action(lambda self: namespaces)
+
+    def namespace(self, namespace):
+        self.sets = {}
+        while True:
+            rules = [rule[:-1] + [self.fuse(rule[-1])] for rule in namespace[2:]]
+            sets = {
+                rule[1]: self.match_set(rule[-1])
+                for rule in rules
+                if self.match_set(rule[-1]) is not None
+            }
+            if sets == self.sets:
+                return namespace[:2] + rules
+            self.sets = sets
+
+    def fuse(self, node):
+        if node[0] == "Or":
+            xs = [self.fuse(x) for x in node[1:]]
+            sets = [self.match_set(x) for x in xs]
+            if len(xs) > 1 and None not in sets:
+                return [
+                    "MatchSet",
+                    sorted(frozenset().union(*[keys for keys, _ in sets])),
+                    sets[0][1]
+                ]
+            return node[:1] + xs
+        elif node[0] == "And":
+            xs = []
+            for x in [self.fuse(x) for x in node[1:]]:
+                if xs and self.match_string(xs[-1]) and self.match_string(x):
+                    xs[-1] = ["MatchString", self.match_string(xs[-1])+self.match_string(x)]
+                else:
+                    xs.append(x)
+            if len(xs) == 1 and xs[0][0] == "MatchString":
+                return xs[0]
+            return node[:1] + xs
+        elif node[0] == "Star":
+            x = self.fuse(node[1])
+            if self.match_set(x) is not None:
+                keys, description = self.match_set(x)
+                return ["MatchStar", sorted(keys), description]
+            return node[:1] + [x]
+        elif node[0] in ["Scope", "Not", "MatchList"]:
+            return node[:1] + [self.fuse(x) for x in node[1:]]
+        elif node[0] == "Bind":
+            return node[:2] + [self.fuse(node[2])]
+        else:
+            return node
+
+    def match_string(self, node):
+        if node[0] == "MatchObject" and node[1][0] == "Eq":
+            return node[1][1]
+        elif node[0] == "MatchString":
+            return node[1]
+
+    def match_set(self, node):
+        while node[0] in ["Scope", "And"] and len(node) == 2:
+            node = node[1]
+        if node[0] == "MatchSet":
+            return (frozenset(node[1]), node[2])
+        elif node[0] == "MatchRule" and node[1] in self.sets:
+            return self.sets[node[1]]
+        elif node[0] == "MatchObject" and object_keys(node[1]) is not None:
+            if node[1][0] == "Eq":
+                return (object_keys(node[1]), repr(node[1][1]))
+            else:
+                return (object_keys(node[1]), "{!r}-{!r}".format(*node[1][1:]))
+
+class LeftFactor:
+
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_205()
-        ])
-rules['CodeGenerator.asts'] = Matcher_CodeGenerator_8()
-rules['CodeGenerator.ast'] = Matcher_CodeGenerator_18()
-rules['CodeGenerator.Namespace'] = Matcher_CodeGenerator_27()
-rules['CodeGenerator.Rule'] = Matcher_CodeGenerator_35()
-rules['CodeGenerator.Or'] = Matcher_CodeGenerator_43()
-rules['CodeGenerator.Scope'] = Matcher_CodeGenerator_51()
-rules['CodeGenerator.And'] = Matcher_CodeGenerator_59()
-rules['CodeGenerator.Bind'] = Matcher_CodeGenerator_69()
-rules['CodeGenerator.Star'] = Matcher_CodeGenerator_77()
-rules['CodeGenerator.Not'] = Matcher_CodeGenerator_85()
-rules['CodeGenerator.MatchCallRule'] = Matcher_CodeGenerator_91()
-rules['CodeGenerator.MatchRule'] = Matcher_CodeGenerator_99()
-rules['CodeGenerator.MatchObject'] = Matcher_CodeGenerator_107()
-rules['CodeGenerator.MatchList'] = Matcher_CodeGenerator_115()
-rules['CodeGenerator.Action'] = Matcher_CodeGenerator_123()
-rules['CodeGenerator.Any'] = Matcher_CodeGenerator_127()
-rules['CodeGenerator.Eq'] = Matcher_CodeGenerator_133()
-rules['CodeGenerator.Range'] = Matcher_CodeGenerator_141()
-rules['CodeGenerator.Set'] = Matcher_CodeGenerator_151()
-rules['CodeGenerator.String'] = Matcher_CodeGenerator_155()
-rules['CodeGenerator.List'] = Matcher_CodeGenerator_161()
-rules['CodeGenerator.ListItem'] = Matcher_CodeGenerator_169()
-rules['CodeGenerator.Format'] = Matcher_CodeGenerator_175()
-rules['CodeGenerator.Call'] = Matcher_CodeGenerator_183()
-rules['CodeGenerator.Lookup'] = Matcher_CodeGenerator_189()
-rules['CodeGenerator.astList'] = Matcher_CodeGenerator_196()
-rules['CodeGenerator.matcher'] = Matcher_CodeGenerator_200()
-rules['CodeGenerator.repr'] = Matcher_CodeGenerator_206()
-if __name__ == "__main__":
+        namespaces = [self.namespace(namespace) for namespace in stream.items]
+        return stream.action(lambda self: namespaces)
+
+    def namespace(self, namespace):
+        self.names = 0
+        return namespace[:2] + [
+            rule[:-1] + [self.factor(rule[-1])]
+            for rule in namespace[2:]
+        ]
+
+    def factor(self, node):
+        if node[0] == "Or":
+            return self.factor_or([self.factor(x) for x in node[1:]])
+        elif node[0] in ["Scope", "And", "Star", "Not", "MatchList"]:
+            return node[:1] + [self.factor(x) for x in node[1:]]
+        elif node[0] == "Bind":
+            return node[:2] + [self.factor(node[2])]
+        else:
+            return node
+
+    def factor_or(self, xs):
+        groups = []
+        for x in xs:
+            if groups and self.head(x) is not None and self.head(x) == self.head(groups[-1][0]):
+                groups[-1].append(x)
+            else:
+                groups.append([x])
+        alternatives = []
+        for group in groups:
+            factored = self.factor_group(group) if len(group) > 1 else None
+            if factored is None:
+                alternatives.extend(group)
+            else:
+                alternatives.append(factored)
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return ["Or"] + alternatives
+
+    def head(self, node):
+        items = self.items(node)
+        if items:
+            return (node[0], self.unbind(items[0]))
+
+    def items(self, node):
+        if node[0] == "Scope" and node[1][0] == "And":
+            return node[1][1:]
+        elif node[0] == "And":
+            return node[1:]
+
+    def unbind(self, node):
+        if node[0] == "Bind":
+            return node[2]
+        return node
+
+    def factor_group(self, group):
+        sequences = [self.items(x) for x in group]
+        prefix = []
+        while all(len(sequence) > len(prefix) for sequence in sequences):
+            item = self.common([sequence[len(prefix)] for sequence in sequences], sequences)
+            if item is None:
+                break
+            prefix.append(item)
+        if not prefix:
+            return None
+        suffixes = [["And"] + sequence[len(prefix):] for sequence in sequences]
+        if [] in [sequence[len(prefix):] for sequence in sequences]:
+            if prefix[-1][0] != "Bind":
+                self.names += 1
+                prefix[-1] = ["Bind", "_{}".format(self.names), prefix[-1]]
+            suffixes = [
+                suffix if len(suffix) > 1 else ["And", ["Action", ["Lookup", prefix[-1][1]]]]
+                for suffix in suffixes
+            ]
+        for index, suffix in enumerate(suffixes):
+            for later in suffixes[index+1:]:
+                stale = self.find(suffix, "Bind") - self.find(later, "Bind")
+                if stale & self.find(later, "Lookup"):
+                    return None
+        x = ["And"] + prefix + [self.factor_or(suffixes)]
+        if group[0][0] == "Scope":
+            return ["Scope", x]
+        return x
+
+    def common(self, items, sequences):
+        x = self.unbind(items[0])
+        if x[0] == "Action":
+            return None
+        if any(self.unbind(item) != x for item in items):
+            return None
+        names = {item[1] for item in items if item[0] == "Bind"}
+        if len(names) > 1:
+            return None
+        if not names:
+            return x
+        name = names.pop()
+        for item, sequence in zip(items, sequences):
+            if item[0] != "Bind" and name in self.find(["And"] + sequence, "Lookup"):
+                return None
+        return ["Bind", name, x]
+
+    def find(self, node, name):
+        if not isinstance(node, list) or node[:1] == ["Scope"]:
+            return set()
+        found = {node[1]} if node[:1] == [name] else set()
+        for x in node[1:]:
+            found |= self.find(x, name)
+        return found
+
+class Inline:
+
+    def __init__(self, entries=[]):
+        self.roots = set(entries)
+
+    def run(self, stream):
+        namespaces = [self.namespace(namespace) for namespace in stream.items]
+        return stream.action(lambda self: namespaces)
+
+    def namespace(self, namespace):
+        calls = {rule[1]: self.find(rule[-1], "MatchRule") for rule in namespace[2:]}
+        sites = [x[1] for x in self.walk(namespace) if x[0] == "MatchRule"]
+        self.bodies = {
+            rule[1]: rule[-1]
+            for rule in namespace[2:]
+            if self.inlinable(rule, sites.count(rule[1])) and rule[1] not in self.reachable(calls, calls[rule[1]])
+        }
+        self.inlined = {name: [] for name in self.bodies}
+        rules = [rule[:-1] + [self.inline(rule[-1], rule[1])] for rule in namespace[2:]]
+        entries = self.entries(namespace)
+        if entries is None:
+            return namespace[:2] + rules
+        calls = {rule[1]: self.find(rule[-1], "MatchRule") for rule in rules}
+        live = self.reachable(calls, entries)
+        return namespace[:2] + [rule for rule in rules if rule[1] in live] + [
+            ["Removed", rule[1], self.reason(rule[1], entries)]
+            for rule in rules
+            if rule[1] not in live
+        ]
+
+    def inlinable(self, rule, sites):
+        return self.size(rule[-1]) * max(sites, 1) <= INLINE_MAX_SIZE
+
+    def inline(self, node, caller):
+        if node[0] == "MatchRule" and node[1] in self.bodies:
+            if caller not in self.inlined[node[1]]:
+                self.inlined[node[1]].append(caller)
+            return self.inline(self.bodies[node[1]], caller)
+        elif node[0] in ["Or", "Scope", "And", "Star", "Not", "MatchList"]:
+            return node[:1] + [self.inline(x, caller) for x in node[1:]]
+        elif node[0] in ["Bind", "Lookahead"]:
+            return node[:2] + [self.inline(node[2], caller)]
+        else:
+            return node
+
+    def entries(self, namespace):
+        entries = {rule[1] for rule in namespace[2:] if rule[1] in self.roots}
+        if not entries:
+            return None
+        for node in self.walk(namespace, skip=None):
+            if node[0] == "MatchCallRule":
+                return None
+            elif node[0] == "Call" and node[1] == ["Lookup", "run"]:
+                if node[2:3] == [] or node[2][0] != "String":
+                    return None
+                entries.add(node[2][1])
+        return entries
+
+    def reason(self, name, entries):
+        if self.inlined.get(name):
+            return "inlined into {}".format(", ".join(self.inlined[name]))
+        return "unreachable from {}".format(", ".join(sorted(entries)))
+
+    def reachable(self, calls, names):
+        reachable = set()
+        names = list(names)
+        while names:
+            name = names.pop()
+            if name not in reachable:
+                reachable.add(name)
+                names.extend(calls.get(name, []))
+        return reachable
+
+    def size(self, node):
+        if node[0] == "Action":
+            return 1
+        return 1 + sum(
+            self.size(x)
+            for x in node[1:]
+            if isinstance(x, list) and x and isinstance(x[0], str)
+        )
+
+    def find(self, node, name):
+        return {x[1] for x in self.walk(node) if x[0] == name}
+
+    def walk(self, node, skip="Action"):
+        nodes = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list) and node and isinstance(node[0], str):
+                nodes.append(node)
+                if node[0] != skip:
+                    stack.extend(node[1:])
+        return nodes
+
+def object_keys(x):
+    if x[0] == "Eq":
+        return frozenset([x[1]])
+    elif x[0] == "Range" and ord(x[2])-ord(x[1]) < 256:
+        return frozenset(chr(i) for i in range(ord(x[1]), ord(x[2])+1))
+
+rules["Inline.asts"] = Inline()
+rules["LeftFactor.asts"] = LeftFactor()
+rules["Fuse.asts"] = Fuse()
+rules["Lookahead.asts"] = Lookahead()
+def compile_grammar(source, write, profile=None, left_factor=True, inline=True, entries=[]):
+    write_text(compile_chain(
+        ["Parser.file"] +
+        (["LeftFactor.asts"] if left_factor else []) +
+        ["Fuse.asts", "Lookahead.asts"] +
+        ([("Inline.asts", Inline(entries))] if inline else []) +
+        ["CodeGenerator.asts"],
+        source,
+        profile=profile,
+        rope=True
+    ), write)
+
+def compile_grammar_to_string(source, left_factor=True, inline=True, entries=[]):
+    chunks = []
+    compile_grammar(source, chunks.append, left_factor=left_factor, inline=inline, entries=entries)
+    return "".join(chunks)
+
+def main(args, stdin, write):
+    import concurrent.futures
     import sys
     def read(path):
         if path == "-":
-            return sys.stdin.read()
+            return stdin.read()
         with open(path) as f:
             return f.read()
-    args = sys.argv[1:] or ["--compile", "-"]
+    jobs = 1
+    left_factor = True
+    inline = True
+    entries = []
+    profile = None
+    profile_outputs = []
+    outputs = []
+    args = list(args) or ["--compile", "-"]
     while args:
         command = args.pop(0)
         if command == "--support":
-            sys.stdout.write(SUPPORT)
+            outputs.append(SUPPORT)
         elif command == "--copy":
-            sys.stdout.write(read(args.pop(0)))
+            outputs.append(read(args.pop(0)))
         elif command == "--embed":
-            sys.stdout.write("{} = {}\n".format(
+            outputs.append("{} = {}\n".format(
                 args.pop(0),
                 repr(read(args.pop(0)))
             ))
+        elif command == "--jobs":
+            jobs = int(args.pop(0))
+        elif command == "--no-left-factor":
+            left_factor = False
+        elif command == "--no-inline":
+            inline = False
+        elif command == "--entry":
+            entries.append(args.pop(0))
+        elif command in ["--profile", "--profile-stacks", "--profile-backtracks"]:
+            profile = profile or Profile()
+            profile_outputs.append((command, args.pop(0)))
         elif command == "--compile":
-            sys.stdout.write(compile_chain(
-                ["Parser.file", "CodeGenerator.asts"],
-                read(args.pop(0))
-            ))
+            path = args.pop(0)
+            source = read(path)
+            outputs.append((source,))
         else:
             sys.exit("ERROR: Unknown command '{}'".format(command))
+    compiles = [output for output in outputs if isinstance(output, tuple)]
+    if jobs > 1 and len(compiles) > 1 and profile is None:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            compiled = executor.map(
+                compile_grammar_to_string,
+                *zip(*compiles),
+                [left_factor]*len(compiles),
+                [inline]*len(compiles),
+                [entries]*len(compiles)
+            )
+            for output in outputs:
+                write(next(compiled) if isinstance(output, tuple) else output)
+    else:
+        for output in outputs:
+            if isinstance(output, tuple):
+                compile_grammar(*output, write, profile, left_factor, inline, entries)
+            else:
+                write(output)
+    for command, path in profile_outputs:
+        if command == "--profile":
+            content = profile.report()
+        elif command == "--profile-backtracks":
+            content = profile.backtrack_report(compiler_sources())
+        else:
+            content = profile.collapsed_stacks()
+        if path == "-":
+            sys.stderr.write(content)
+        else:
+            with open(path, "w") as f:
+                f.write(content)
+
+def compiler_sources():
+    import glob
+    import os
+    sources = []
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for path in sorted(glob.glob(os.path.join(directory, "src", "*.rlmeta"))):
+        with open(path) as f:
+            sources.append((os.path.relpath(path), f.read()))
+    return sources
+
+if __name__ == "__main__":
+    import sys
+    main(sys.argv[1:], sys.stdin, sys.stdout.write)
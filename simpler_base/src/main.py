@@ -1,26 +1,105 @@
-if __name__ == "__main__":
+def compile_grammar(source, write, profile=None, left_factor=True, inline=True, entries=[]):
+    write_text(compile_chain(
+        ["Parser.file"] +
+        (["LeftFactor.asts"] if left_factor else []) +
+        ["Fuse.asts", "Lookahead.asts"] +
+        ([("Inline.asts", Inline(entries))] if inline else []) +
+        ["CodeGenerator.asts"],
+        source,
+        profile=profile,
+        rope=True
+    ), write)
+
+def compile_grammar_to_string(source, left_factor=True, inline=True, entries=[]):
+    chunks = []
+    compile_grammar(source, chunks.append, left_factor=left_factor, inline=inline, entries=entries)
+    return "".join(chunks)
+
+def main(args, stdin, write):
+    import concurrent.futures
     import sys
     def read(path):
         if path == "-":
-            return sys.stdin.read()
+            return stdin.read()
         with open(path) as f:
             return f.read()
-    args = sys.argv[1:] or ["--compile", "-"]
+    jobs = 1
+    left_factor = True
+    inline = True
+    entries = []
+    profile = None
+    profile_outputs = []
+    outputs = []
+    args = list(args) or ["--compile", "-"]
     while args:
         command = args.pop(0)
         if command == "--support":
-            sys.stdout.write(SUPPORT)
+            outputs.append(SUPPORT)
         elif command == "--copy":
-            sys.stdout.write(read(args.pop(0)))
+            outputs.append(read(args.pop(0)))
         elif command == "--embed":
-            sys.stdout.write("{} = {}\n".format(
+            outputs.append("{} = {}\n".format(
                 args.pop(0),
                 repr(read(args.pop(0)))
             ))
+        elif command == "--jobs":
+            jobs = int(args.pop(0))
+        elif command == "--no-left-factor":
+            left_factor = False
+        elif command == "--no-inline":
+            inline = False
+        elif command == "--entry":
+            entries.append(args.pop(0))
+        elif command in ["--profile", "--profile-stacks", "--profile-backtracks"]:
+            profile = profile or Profile()
+            profile_outputs.append((command, args.pop(0)))
         elif command == "--compile":
-            sys.stdout.write(compile_chain(
-                ["Parser.file", "CodeGenerator.asts"],
-                read(args.pop(0))
-            ))
+            path = args.pop(0)
+            source = read(path)
+            outputs.append((source,))
         else:
             sys.exit("ERROR: Unknown command '{}'".format(command))
+    compiles = [output for output in outputs if isinstance(output, tuple)]
+    if jobs > 1 and len(compiles) > 1 and profile is None:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            compiled = executor.map(
+                compile_grammar_to_string,
+                *zip(*compiles),
+                [left_factor]*len(compiles),
+                [inline]*len(compiles),
+                [entries]*len(compiles)
+            )
+            for output in outputs:
+                write(next(compiled) if isinstance(output, tuple) else output)
+    else:
+        for output in outputs:
+            if isinstance(output, tuple):
+                compile_grammar(*output, write, profile, left_factor, inline, entries)
+            else:
+                write(output)
+    for command, path in profile_outputs:
+        if command == "--profile":
+            content = profile.report()
+        elif command == "--profile-backtracks":
+            content = profile.backtrack_report(compiler_sources())
+        else:
+            content = profile.collapsed_stacks()
+        if path == "-":
+            sys.stderr.write(content)
+        else:
+            with open(path, "w") as f:
+                f.write(content)
+
+def compiler_sources():
+    import glob
+    import os
+    sources = []
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for path in sorted(glob.glob(os.path.join(directory, "src", "*.rlmeta"))):
+        with open(path) as f:
+            sources.append((os.path.relpath(path), f.read()))
+    return sources
+
+if __name__ == "__main__":
+    import sys
+    main(sys.argv[1:], sys.stdin, sys.stdout.write)
@@ -0,0 +1,393 @@
+INLINE_MAX_SIZE = 8
+
+class Lookahead:
+
+    def run(self, stream):
+        namespaces = [self.namespace(namespace) for namespace in stream.items]
+        return stream.action(lambda self: namespaces)
+
+    def namespace(self, namespace):
+        self.firsts = {rule[1]: (frozenset(), False) for rule in namespace[2:]}
+        changed = True
+        while changed:
+            changed = False
+            for rule in namespace[2:]:
+                first = self.first(rule[-1])
+                if first != self.firsts[rule[1]]:
+                    self.firsts[rule[1]] = first
+                    changed = True
+        return namespace[:2] + [
+            rule[:-1] + [self.annotate(rule[-1])]
+            for rule in namespace[2:]
+        ]
+
+    def annotate(self, node):
+        if node[0] == "Or":
+            return (
+                node[:1] +
+                [self.lookahead(x) for x in node[1:-1]] +
+                [self.annotate(x) for x in node[-1:]]
+            )
+        elif node[0] in ["Scope", "And", "Star", "Not", "MatchList"]:
+            return node[:1] + [self.annotate(x) for x in node[1:]]
+        elif node[0] == "Bind":
+            return node[:2] + [self.annotate(node[2])]
+        else:
+            return node
+
+    def lookahead(self, node):
+        keys, nullable = self.first(node)
+        if nullable or not keys:
+            return self.annotate(node)
+        return ["Lookahead", sorted(keys), self.annotate(node)]
+
+    def first(self, node):
+        return getattr(self, "first_"+node[0])(*node[1:])
+
+    def first_Or(self, *xs):
+        keys, nullable = (frozenset(), False)
+        for x in xs:
+            x_keys, x_nullable = self.first(x)
+            keys = self.union(keys, x_keys)
+            nullable = nullable or x_nullable
+        return (keys, nullable)
+
+    def first_Scope(self, x):
+        return self.first(x)
+
+    def first_And(self, *xs):
+        keys = frozenset()
+        for x in xs:
+            x_keys, x_nullable = self.first(x)
+            keys = self.union(keys, x_keys)
+            if not x_nullable:
+                return (keys, False)
+        return (keys, True)
+
+    def first_Bind(self, name, x):
+        return self.first(x)
+
+    def first_Star(self, x):
+        return (self.first(x)[0], True)
+
+    def first_Not(self, x):
+        return (frozenset(), True)
+
+    def first_MatchCallRule(self):
+        return (None, False)
+
+    def first_MatchRule(self, name):
+        return self.firsts.get(name, (None, True))
+
+    def first_MatchObject(self, x):
+        return (object_keys(x), False)
+
+    def first_MatchString(self, x):
+        return (frozenset([x[0]]), False)
+
+    def first_MatchSet(self, x, y):
+        return (frozenset(x), False)
+
+    def first_MatchStar(self, x, y):
+        return (frozenset(x), True)
+
+    def first_MatchList(self, x):
+        return (None, False)
+
+    def first_Action(self, x):
+        return (frozenset(), True)
+
+    def union(self, keys, other_keys):
+        if keys is None or other_keys is None:
+            return None
+        return keys | other_keys
+
+class Fuse:
+
+    def run(self, stream):
+        namespaces = [self.namespace(namespace) for namespace in stream.items]
+        return stream.action(lambda self: namespaces)
+
+    def namespace(self, namespace):
+        self.sets = {}
+        while True:
+            rules = [rule[:-1] + [self.fuse(rule[-1])] for rule in namespace[2:]]
+            sets = {
+                rule[1]: self.match_set(rule[-1])
+                for rule in rules
+                if self.match_set(rule[-1]) is not None
+            }
+            if sets == self.sets:
+                return namespace[:2] + rules
+            self.sets = sets
+
+    def fuse(self, node):
+        if node[0] == "Or":
+            xs = [self.fuse(x) for x in node[1:]]
+            sets = [self.match_set(x) for x in xs]
+            if len(xs) > 1 and None not in sets:
+                return [
+                    "MatchSet",
+                    sorted(frozenset().union(*[keys for keys, _ in sets])),
+                    sets[0][1]
+                ]
+            return node[:1] + xs
+        elif node[0] == "And":
+            xs = []
+            for x in [self.fuse(x) for x in node[1:]]:
+                if xs and self.match_string(xs[-1]) and self.match_string(x):
+                    xs[-1] = ["MatchString", self.match_string(xs[-1])+self.match_string(x)]
+                else:
+                    xs.append(x)
+            if len(xs) == 1 and xs[0][0] == "MatchString":
+                return xs[0]
+            return node[:1] + xs
+        elif node[0] == "Star":
+            x = self.fuse(node[1])
+            if self.match_set(x) is not None:
+                keys, description = self.match_set(x)
+                return ["MatchStar", sorted(keys), description]
+            return node[:1] + [x]
+        elif node[0] in ["Scope", "Not", "MatchList"]:
+            return node[:1] + [self.fuse(x) for x in node[1:]]
+        elif node[0] == "Bind":
+            return node[:2] + [self.fuse(node[2])]
+        else:
+            return node
+
+    def match_string(self, node):
+        if node[0] == "MatchObject" and node[1][0] == "Eq":
+            return node[1][1]
+        elif node[0] == "MatchString":
+            return node[1]
+
+    def match_set(self, node):
+        while node[0] in ["Scope", "And"] and len(node) == 2:
+            node = node[1]
+        if node[0] == "MatchSet":
+            return (frozenset(node[1]), node[2])
+        elif node[0] == "MatchRule" and node[1] in self.sets:
+            return self.sets[node[1]]
+        elif node[0] == "MatchObject" and object_keys(node[1]) is not None:
+            if node[1][0] == "Eq":
+                return (object_keys(node[1]), repr(node[1][1]))
+            else:
+                return (object_keys(node[1]), "{!r}-{!r}".format(*node[1][1:]))
+
+class LeftFactor:
+
+    def run(self, stream):
+        namespaces = [self.namespace(namespace) for namespace in stream.items]
+        return stream.action(lambda self: namespaces)
+
+    def namespace(self, namespace):
+        self.names = 0
+        return namespace[:2] + [
+            rule[:-1] + [self.factor(rule[-1])]
+            for rule in namespace[2:]
+        ]
+
+    def factor(self, node):
+        if node[0] == "Or":
+            return self.factor_or([self.factor(x) for x in node[1:]])
+        elif node[0] in ["Scope", "And", "Star", "Not", "MatchList"]:
+            return node[:1] + [self.factor(x) for x in node[1:]]
+        elif node[0] == "Bind":
+            return node[:2] + [self.factor(node[2])]
+        else:
+            return node
+
+    def factor_or(self, xs):
+        groups = []
+        for x in xs:
+            if groups and self.head(x) is not None and self.head(x) == self.head(groups[-1][0]):
+                groups[-1].append(x)
+            else:
+                groups.append([x])
+        alternatives = []
+        for group in groups:
+            factored = self.factor_group(group) if len(group) > 1 else None
+            if factored is None:
+                alternatives.extend(group)
+            else:
+                alternatives.append(factored)
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return ["Or"] + alternatives
+
+    def head(self, node):
+        items = self.items(node)
+        if items:
+            return (node[0], self.unbind(items[0]))
+
+    def items(self, node):
+        if node[0] == "Scope" and node[1][0] == "And":
+            return node[1][1:]
+        elif node[0] == "And":
+            return node[1:]
+
+    def unbind(self, node):
+        if node[0] == "Bind":
+            return node[2]
+        return node
+
+    def factor_group(self, group):
+        sequences = [self.items(x) for x in group]
+        prefix = []
+        while all(len(sequence) > len(prefix) for sequence in sequences):
+            item = self.common([sequence[len(prefix)] for sequence in sequences], sequences)
+            if item is None:
+                break
+            prefix.append(item)
+        if not prefix:
+            return None
+        suffixes = [["And"] + sequence[len(prefix):] for sequence in sequences]
+        if [] in [sequence[len(prefix):] for sequence in sequences]:
+            if prefix[-1][0] != "Bind":
+                self.names += 1
+                prefix[-1] = ["Bind", "_{}".format(self.names), prefix[-1]]
+            suffixes = [
+                suffix if len(suffix) > 1 else ["And", ["Action", ["Lookup", prefix[-1][1]]]]
+                for suffix in suffixes
+            ]
+        for index, suffix in enumerate(suffixes):
+            for later in suffixes[index+1:]:
+                stale = self.find(suffix, "Bind") - self.find(later, "Bind")
+                if stale & self.find(later, "Lookup"):
+                    return None
+        x = ["And"] + prefix + [self.factor_or(suffixes)]
+        if group[0][0] == "Scope":
+            return ["Scope", x]
+        return x
+
+    def common(self, items, sequences):
+        x = self.unbind(items[0])
+        if x[0] == "Action":
+            return None
+        if any(self.unbind(item) != x for item in items):
+            return None
+        names = {item[1] for item in items if item[0] == "Bind"}
+        if len(names) > 1:
+            return None
+        if not names:
+            return x
+        name = names.pop()
+        for item, sequence in zip(items, sequences):
+            if item[0] != "Bind" and name in self.find(["And"] + sequence, "Lookup"):
+                return None
+        return ["Bind", name, x]
+
+    def find(self, node, name):
+        if not isinstance(node, list) or node[:1] == ["Scope"]:
+            return set()
+        found = {node[1]} if node[:1] == [name] else set()
+        for x in node[1:]:
+            found |= self.find(x, name)
+        return found
+
+class Inline:
+
+    def __init__(self, entries=[]):
+        self.roots = set(entries)
+
+    def run(self, stream):
+        namespaces = [self.namespace(namespace) for namespace in stream.items]
+        return stream.action(lambda self: namespaces)
+
+    def namespace(self, namespace):
+        calls = {rule[1]: self.find(rule[-1], "MatchRule") for rule in namespace[2:]}
+        sites = [x[1] for x in self.walk(namespace) if x[0] == "MatchRule"]
+        self.bodies = {
+            rule[1]: rule[-1]
+            for rule in namespace[2:]
+            if self.inlinable(rule, sites.count(rule[1])) and rule[1] not in self.reachable(calls, calls[rule[1]])
+        }
+        self.inlined = {name: [] for name in self.bodies}
+        rules = [rule[:-1] + [self.inline(rule[-1], rule[1])] for rule in namespace[2:]]
+        entries = self.entries(namespace)
+        if entries is None:
+            return namespace[:2] + rules
+        calls = {rule[1]: self.find(rule[-1], "MatchRule") for rule in rules}
+        live = self.reachable(calls, entries)
+        return namespace[:2] + [rule for rule in rules if rule[1] in live] + [
+            ["Removed", rule[1], self.reason(rule[1], entries)]
+            for rule in rules
+            if rule[1] not in live
+        ]
+
+    def inlinable(self, rule, sites):
+        return self.size(rule[-1]) * max(sites, 1) <= INLINE_MAX_SIZE
+
+    def inline(self, node, caller):
+        if node[0] == "MatchRule" and node[1] in self.bodies:
+            if caller not in self.inlined[node[1]]:
+                self.inlined[node[1]].append(caller)
+            return self.inline(self.bodies[node[1]], caller)
+        elif node[0] in ["Or", "Scope", "And", "Star", "Not", "MatchList"]:
+            return node[:1] + [self.inline(x, caller) for x in node[1:]]
+        elif node[0] in ["Bind", "Lookahead"]:
+            return node[:2] + [self.inline(node[2], caller)]
+        else:
+            return node
+
+    def entries(self, namespace):
+        entries = {rule[1] for rule in namespace[2:] if rule[1] in self.roots}
+        if not entries:
+            return None
+        for node in self.walk(namespace, skip=None):
+            if node[0] == "MatchCallRule":
+                return None
+            elif node[0] == "Call" and node[1] == ["Lookup", "run"]:
+                if node[2:3] == [] or node[2][0] != "String":
+                    return None
+                entries.add(node[2][1])
+        return entries
+
+    def reason(self, name, entries):
+        if self.inlined.get(name):
+            return "inlined into {}".format(", ".join(self.inlined[name]))
+        return "unreachable from {}".format(", ".join(sorted(entries)))
+
+    def reachable(self, calls, names):
+        reachable = set()
+        names = list(names)
+        while names:
+            name = names.pop()
+            if name not in reachable:
+                reachable.add(name)
+                names.extend(calls.get(name, []))
+        return reachable
+
+    def size(self, node):
+        if node[0] == "Action":
+            return 1
+        return 1 + sum(
+            self.size(x)
+            for x in node[1:]
+            if isinstance(x, list) and x and isinstance(x[0], str)
+        )
+
+    def find(self, node, name):
+        return {x[1] for x in self.walk(node) if x[0] == name}
+
+    def walk(self, node, skip="Action"):
+        nodes = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list) and node and isinstance(node[0], str):
+                nodes.append(node)
+                if node[0] != skip:
+                    stack.extend(node[1:])
+        return nodes
+
+def object_keys(x):
+    if x[0] == "Eq":
+        return frozenset([x[1]])
+    elif x[0] == "Range" and ord(x[2])-ord(x[1]) < 256:
+        return frozenset(chr(i) for i in range(ord(x[1]), ord(x[2])+1))
+
+rules["Inline.asts"] = Inline()
+rules["LeftFactor.asts"] = LeftFactor()
+rules["Fuse.asts"] = Fuse()
+rules["Lookahead.asts"] = Lookahead()
@@ -1,5 +1,14 @@
+import re
+import time
+
+RUNTIME_MAX_DEPTH = 8
+
+WRITER_BUFFER_SIZE = 4096
+
 rules = {}
 
+removed = {}
+
 class Stream:
 
     def __init__(self, items):
@@ -11,37 +20,41 @@ class Stream:
     def operator_or(self, matchers):
         for matcher in matchers:
             backtrack_index = self.index
-            try:
-                return matcher.run(self)
-            except MatchError:
-                self.index = backtrack_index
-        self.error("no or match")
+            result = matcher.run(self)
+            if result is not None:
+                return result
+            self.index = backtrack_index
+        return self.error("no or match")
+
+    def lookahead(self):
+        if self.index < len(self.items) and not isinstance(self.items[self.index], list):
+            return self.items[self.index]
 
     def operator_and(self, matchers):
-        result = self.action()
+        result = NONE_ACTION
         for matcher in matchers:
             result = matcher.run(self)
+            if result is None:
+                return None
         return result
 
     def operator_star(self, matcher):
         results = []
         while True:
             backtrack_index = self.index
-            try:
-                results.append(matcher.run(self))
-            except MatchError:
+            result = matcher.run(self)
+            if result is None:
                 self.index = backtrack_index
-                return self.action(lambda self: [x.eval(self.runtime) for x in results])
+                return ListAction(results)
+            results.append(result)
 
     def operator_not(self, matcher):
         backtrack_index = self.index
-        try:
-            matcher.run(self)
-        except MatchError:
-            return self.action()
-        finally:
-            self.index = backtrack_index
-        self.error("not matched")
+        result = matcher.run(self)
+        self.index = backtrack_index
+        if result is None:
+            return NONE_ACTION
+        return self.error("not matched")
 
     def action(self, fn=lambda self: None):
         return SemanticAction(self.scope, fn)
@@ -49,27 +62,26 @@ class Stream:
     def with_scope(self, matcher):
         current_scope = self.scope
         self.scope = {}
-        try:
-            return matcher.run(self)
-        finally:
-            self.scope = current_scope
+        result = matcher.run(self)
+        self.scope = current_scope
+        return result
 
     def bind(self, name, semantic_action):
-        self.scope[name] = semantic_action
+        if semantic_action is not None:
+            self.scope[name] = semantic_action
         return semantic_action
 
     def match_list(self, matcher):
         if self.index < len(self.items):
             items, index = self.items, self.index
-            try:
-                self.items = self.items[self.index]
-                self.index = 0
-                result = matcher.run(self)
+            self.items = self.items[self.index]
+            self.index = 0
+            result = matcher.run(self)
+            if result is not None:
                 index += 1
-            finally:
-                self.items, self.index = items, index
+            self.items, self.index = items, index
             return result
-        self.error("no list found")
+        return self.error("no list found")
 
     def match_call_rule(self, namespace):
         name = namespace + "." + self.items[self.index]
@@ -78,20 +90,46 @@ class Stream:
             self.index += 1
             return rule.run(self)
         else:
-            self.error("unknown rule")
+            return self.error("unknown rule")
 
     def match(self, fn, description):
         if self.index < len(self.items):
             item = self.items[self.index]
             if fn(item):
                 self.index += 1
-                return self.action(lambda self: item)
+                return value_action(item)
+        return self.error(f"expected {description}")
+
+    def match_string(self, string):
+        if self.items[self.index:self.index+len(string)] == string:
+            self.index += len(string)
+            return value_action(string[-1])
+        for item in string:
+            if self.index >= len(self.items) or self.items[self.index] != item:
+                return self.error(f"expected {item!r}")
+            self.index += 1
+        return value_action(string[-1])
+
+    def match_star(self, char_class):
+        description, keys, pattern = char_class
+        start = self.index
+        if isinstance(self.items, str):
+            self.index = pattern.match(self.items, self.index).end()
+        else:
+            while (self.index < len(self.items) and
+                    not isinstance(self.items[self.index], list) and
+                    self.items[self.index] in keys):
+                self.index += 1
+        items = self.items[start:self.index]
         self.error(f"expected {description}")
+        return self.action(lambda self: list(items))
+
+    def needs_error(self):
+        return not self.latest_error or self.index > self.latest_error[2]
 
     def error(self, name):
-        if not self.latest_error or self.index > self.latest_error[2]:
+        if self.needs_error():
             self.latest_error = (name, self.items, self.index)
-        raise MatchError(*self.latest_error)
 
 class MatchError(Exception):
 
@@ -102,6 +140,8 @@ class MatchError(Exception):
 
 class SemanticAction:
 
+    __slots__ = ["scope", "fn", "runtime"]
+
     def __init__(self, scope, fn):
         self.scope = scope
         self.fn = fn
@@ -120,31 +160,84 @@ class SemanticAction:
         else:
             return self.runtime.lookup(name)
 
+class ValueAction:
+
+    __slots__ = ["value"]
+
+    def __init__(self, value):
+        self.value = value
+
+    def eval(self, runtime):
+        return self.value
+
+class ListAction:
+
+    __slots__ = ["actions"]
+
+    def __init__(self, actions):
+        self.actions = actions
+
+    def eval(self, runtime):
+        return [x.eval(runtime) for x in self.actions]
+
+NONE_ACTION = ValueAction(None)
+
+CHARACTER_ACTIONS = {chr(x): ValueAction(chr(x)) for x in range(256)}
+
+def value_action(value):
+    if value.__class__ is str and value in CHARACTER_ACTIONS:
+        return CHARACTER_ACTIONS[value]
+    return ValueAction(value)
+
 class Runtime:
 
-    def __init__(self, extra={"len": len, "repr": repr}):
+    def __init__(self, extra={"len": len, "repr": repr}, parent=None):
         self.vars = extra
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth+1
 
     def bind(self, name, value):
-        return Runtime(dict(self.vars, **{name: value}))
+        if self.depth >= RUNTIME_MAX_DEPTH:
+            return Runtime(dict(self.flatten(), **{name: value}))
+        return Runtime({name: value}, self)
+
+    def flatten(self):
+        if self.parent is None:
+            return dict(self.vars)
+        vars = self.parent.flatten()
+        vars.update(self.vars)
+        return vars
 
     def lookup(self, name):
-        if name in self.vars:
-            return self.vars[name]
-        else:
-            return getattr(self, name)
+        runtime = self
+        while runtime is not None:
+            if name in runtime.vars:
+                return runtime.vars[name]
+            runtime = runtime.parent
+        return getattr(self, name)
 
     def append(self, list, thing):
         list.append(thing)
 
     def join(self, items, delimiter=""):
-        return delimiter.join(
-            self.join(item, delimiter) if isinstance(item, list) else str(item)
-            for item in items
-        )
+        parts = []
+        rope = False
+        for item in items:
+            if isinstance(item, list):
+                item = self.join(item, delimiter)
+            if isinstance(item, Text):
+                rope = True
+            else:
+                item = str(item)
+            if parts and delimiter:
+                parts.append(delimiter)
+            parts.append(item)
+        if rope:
+            return Text(parts)
+        return "".join(parts)
 
     def indent(self, text, prefix="    "):
-        return "".join(prefix+line for line in text.splitlines(True))
+        return Text([text], prefix)
 
     def splice(self, depth, item):
         if depth == 0:
@@ -155,25 +248,342 @@ class Runtime:
     def concat(self, lists):
         return [x for xs in lists for x in xs]
 
-def compile_chain(grammars, source):
+def char_class(description, keys):
+    return (
+        description,
+        frozenset(keys),
+        re.compile("[{}]*".format("".join(re.escape(key) for key in keys)))
+    )
+
+class Profile:
+
+    def __init__(self):
+        self.rules = {}
+        self.operators = {}
+        self.stacks = {}
+        self.backtrack_sites = {}
+        self.frames = []
+        self.installed = {}
+
+    def install(self):
+        self.installed = dict(rules)
+        for name, matcher in self.installed.items():
+            rules[name] = ProfiledMatcher(self, name, matcher)
+
+    def uninstall(self):
+        rules.update(self.installed)
+        self.installed = {}
+
+    def stream(self, items):
+        stream = Stream(items)
+        for name in STREAM_OPERATORS:
+            setattr(stream, name, self.counted(name, getattr(stream, name)))
+        stream.operator_or = self.counted("operator_or", self.measured_or(stream))
+        return stream
+
+    def measured_or(self, stream):
+        def operator_or(matchers):
+            rule = self.frames[-1][0] if self.frames else "?"
+            site = matchers[0].__class__.__name__
+            for alternative, matcher in enumerate(matchers):
+                backtrack_index = stream.index
+                result = matcher.run(stream)
+                if result is not None:
+                    return result
+                if alternative < len(matchers)-1:
+                    self.backtracked(
+                        (rule, site, alternative+1),
+                        stream.index-backtrack_index
+                    )
+                stream.index = backtrack_index
+            return stream.error("no or match")
+        return operator_or
+
+    def backtracked(self, site, wasted):
+        if site not in self.backtrack_sites:
+            self.backtrack_sites[site] = [0, 0, 0]
+        counts = self.backtrack_sites[site]
+        counts[0] += 1
+        counts[1] += wasted
+        counts[2] = max(counts[2], wasted)
+
+    def counted(self, name, fn):
+        def operator(*args):
+            self.operators[name] = self.operators.get(name, 0) + 1
+            return fn(*args)
+        return operator
+
+    def enter(self, name):
+        self.stats(name)["calls"] += 1
+        path = name if not self.frames else "{};{}".format(self.frames[-1][3], name)
+        self.frames.append([name, time.perf_counter(), 0, path])
+
+    def leave(self, failed):
+        name, start, children, path = self.frames.pop()
+        elapsed = time.perf_counter()-start
+        self.stats(name)["total_seconds"] += elapsed
+        self.stats(name)["self_seconds"] += elapsed-children
+        if failed:
+            self.stats(name)["backtracks"] += 1
+        self.stacks[path] = self.stacks.get(path, 0)+elapsed-children
+        if self.frames:
+            self.frames[-1][2] += elapsed
+
+    def stats(self, name):
+        if name not in self.rules:
+            self.rules[name] = dict.fromkeys(PROFILE_COUNTERS, 0)
+        return self.rules[name]
+
+    def report(self):
+        lines = ["{:<32} {:>8} {:>10} {:>10} {:>10}".format(
+            "rule", "calls", "backtracks", "total", "self"
+        )]
+        for name, counts in sorted(
+            self.rules.items(),
+            key=lambda item: -item[1]["self_seconds"]
+        ):
+            lines.append("{:<32} {:>8} {:>10} {:>9.3f}s {:>9.3f}s".format(
+                name,
+                counts["calls"],
+                counts["backtracks"],
+                counts["total_seconds"],
+                counts["self_seconds"]
+            ))
+        lines.append("")
+        lines.append("{:<32} {:>12}".format("operator", "count"))
+        for name, count in sorted(self.operators.items(), key=lambda item: -item[1]):
+            lines.append("{:<32} {:>12}".format(name, count))
+        return "\n".join(lines)+"\n"
+
+    def backtrack_report(self, sources=[]):
+        lines = rule_lines(sources)
+        ordinals = {}
+        for rule, site, _ in sorted(
+            self.backtrack_sites,
+            key=lambda key: (key[0], int(key[1].rsplit("_", 1)[1]))
+        ):
+            if (rule, site) not in ordinals:
+                ordinals[(rule, site)] = len([
+                    key for key in ordinals if key[0] == rule
+                ])+1
+        report = ["{:<24} {:<48} {:>8} {:>10} {:>8}".format(
+            "line", "site", "fails", "wasted", "max"
+        )]
+        for (rule, site, alternative), (fails, wasted, longest) in sorted(
+            self.backtrack_sites.items(),
+            key=lambda item: (-item[1][1], -item[1][0])
+        ):
+            report.append("{:<24} {:<48} {:>8} {:>10} {:>8}".format(
+                lines.get(rule, rule),
+                "{} or #{} alternative {}".format(
+                    rule,
+                    ordinals[(rule, site)],
+                    alternative
+                ),
+                fails,
+                wasted,
+                longest
+            ))
+        return "\n".join(report)+"\n"
+
+    def collapsed_stacks(self):
+        return "".join(
+            "{} {}\n".format(path, round(seconds*1000000))
+            for path, seconds in sorted(self.stacks.items())
+        )
+
+def rule_lines(sources):
+    lines = {}
+    for path, source in sources:
+        grammar = None
+        for match in re.finditer(r"(\w+)\s*([{=])", source):
+            name = match.group(1)
+            if match.group(2) == "{":
+                grammar = name
+            elif grammar is not None:
+                lines.setdefault(
+                    "{}.{}".format(grammar, name),
+                    "{}:{}".format(path, source.count("\n", 0, match.start(1))+1)
+                )
+    return lines
+
+class ProfiledMatcher:
+
+    def __init__(self, profile, name, matcher):
+        self.profile = profile
+        self.name = name
+        self.matcher = matcher
+
+    def run(self, stream):
+        self.profile.enter(self.name)
+        result = self.matcher.run(stream)
+        self.profile.leave(result is None)
+        return result
+
+PROFILE_COUNTERS = [
+    "calls",
+    "backtracks",
+    "total_seconds",
+    "self_seconds",
+]
+
+STREAM_OPERATORS = [
+    "operator_and",
+    "operator_star",
+    "operator_not",
+    "lookahead",
+    "action",
+    "with_scope",
+    "bind",
+    "match_list",
+    "match_call_rule",
+    "match",
+    "match_string",
+    "match_star",
+]
+
+class Text:
+
+    __slots__ = ["parts", "prefix"]
+
+    def __init__(self, parts, prefix=None):
+        self.parts = parts
+        self.prefix = prefix
+
+    def write(self, writer):
+        if self.prefix is not None:
+            writer.indent(self.prefix)
+        for part in self.parts:
+            if isinstance(part, Text):
+                part.write(writer)
+            else:
+                writer.write(part)
+        if self.prefix is not None:
+            writer.dedent()
+
+    def __str__(self):
+        chunks = []
+        write_text(self, chunks.append)
+        return "".join(chunks)
+
+    def __repr__(self):
+        return repr(str(self))
+
+class Writer:
+
+    def __init__(self, output):
+        self.output = output
+        self.chunks = []
+        self.prefixes = []
+        self.pending = 0
+
+    def indent(self, prefix):
+        self.prefixes.append(prefix)
+        self.pending = min(self.pending, len(self.prefixes)-1)
+
+    def dedent(self):
+        self.prefixes.pop()
+        self.pending = min(self.pending, len(self.prefixes))
+
+    def write(self, text):
+        start = 0
+        while start < len(text):
+            if self.pending < len(self.prefixes):
+                self.chunks.extend(self.prefixes[self.pending:])
+                self.pending = len(self.prefixes)
+            end = text.find("\n", start)+1 or len(text)
+            self.chunks.append(text[start:end])
+            if text[end-1] == "\n":
+                self.pending = 0
+            start = end
+        if len(self.chunks) > WRITER_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.output("".join(self.chunks))
+        self.chunks = []
+
+def materialize(text):
+    if isinstance(text, Text):
+        return str(text)
+    return text
+
+def write_text(text, output):
+    if isinstance(text, Text):
+        writer = Writer(output)
+        text.write(writer)
+        writer.flush()
+    else:
+        output(str(text))
+
+def unknown_rule(rule):
+    if rule in removed:
+        return KeyError("{} was {}".format(rule, removed[rule]))
+    return KeyError(rule)
+
+def compile_chain(grammars, source, profile=None, rope=False):
     import os
     import sys
     import pprint
     runtime = Runtime()
-    for rule in grammars:
-        try:
-            source = rules[rule].run(Stream(source)).eval(runtime)
-        except MatchError as e:
-            marker = "<ERROR POSITION>"
-            if os.isatty(sys.stderr.fileno()):
-                marker = f"\033[0;31m{marker}\033[0m"
-            if isinstance(e.items, str):
-                stream_string = e.items[:e.index] + marker + e.items[e.index:]
+    if profile is not None:
+        profile.install()
+    try:
+        for rule in grammars:
+            if isinstance(rule, tuple):
+                rule, matcher = rule
+                if profile is not None:
+                    matcher = ProfiledMatcher(profile, rule, matcher)
+            elif rule in rules:
+                matcher = rules[rule]
             else:
-                stream_string = pprint.pformat(e.items)
-            sys.exit("ERROR: {}\nPOSITION: {}\nSTREAM:\n{}".format(
-                str(e),
-                e.index,
-                runtime.indent(stream_string)
-            ))
-    return source
+                raise unknown_rule(rule)
+            try:
+                stream = Stream(source) if profile is None else profile.stream(source)
+                result = matcher.run(stream)
+                if result is None:
+                    raise MatchError(*stream.latest_error)
+                source = result.eval(runtime)
+            except MatchError as e:
+                marker = "<ERROR POSITION>"
+                if os.isatty(sys.stderr.fileno()):
+                    marker = f"\033[0;31m{marker}\033[0m"
+                if isinstance(e.items, str):
+                    stream_string = e.items[:e.index] + marker + e.items[e.index:]
+                else:
+                    stream_string = pprint.pformat(e.items)
+                sys.exit("ERROR: {}\nPOSITION: {}\nSTREAM:\n{}".format(
+                    str(e),
+                    e.index,
+                    runtime.indent(stream_string)
+                ))
+    finally:
+        if profile is not None:
+            profile.uninstall()
+    return source if rope else materialize(source)
+
+def load_compiled(source, filename="<rlmeta>", cache_dir=None, namespace=None):
+    import hashlib
+    import importlib.util
+    import marshal
+    import os
+    if namespace is None:
+        namespace = {"__name__": filename}
+    if cache_dir is None:
+        code = compile(source, filename, "exec")
+    else:
+        key = hashlib.sha256(importlib.util.MAGIC_NUMBER)
+        key.update(b"\0"+filename.encode("utf-8"))
+        key.update(b"\0"+source.encode("utf-8"))
+        path = os.path.join(cache_dir, key.hexdigest()+".marshal")
+        try:
+            with open(path, "rb") as f:
+                code = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            code = compile(source, filename, "exec")
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path+".tmp", "wb") as f:
+                marshal.dump(code, f)
+            os.replace(path+".tmp", path)
+    exec(code, namespace)
+    return namespace